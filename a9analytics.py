@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+#Wafee Rahman , Richie Au , Umair Ansar
+
+"""
+Library DBMS – circulation analytics on a memory-mapped Loans snapshot
+
+- export: reads Loans (joined to LibraryInventory / Record for RecordID
+  and Genre), LibraryInventory and Staff ONCE, inside one read-only
+  transaction, and writes one raw NumPy column file per field:
+    <snap>/loans.<column>.bin, <snap>/items.<column>.bin, meta.json
+  Dates become day numbers (days since 1970-01-01; a loan not yet returned
+  gets NOT_RETURNED), genres small integer codes, overdue a 0/1 byte. The
+  production database is not touched again.
+
+- stats: maps the column files (np.memmap, nothing is read until used)
+  and computes, vectorized, in-process:
+    * daily        – loans per day
+    * duration     – loan period (dueDate - loanDate) and days overdue
+    * overdue      – overdue rate by genre and by staff member (still out
+                     and past due, or returned after the due date)
+    * utilization  – active (unreturned) loans per copy, per item
+  Tens of millions of loans take seconds; rerun as often as you like.
+
+- Needs numpy (pip install numpy). Runs against the stand-in by default:
+    python a9analytics.py export --build --loans 1000000 --out snap
+    python a9analytics.py stats --snap snap
+  or exports from Oracle:
+    python a9analytics.py export --oracle 'user/pass@host:1521/XE' --out snap
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from datetime import date, datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import a9load
+import a9queries
+import a9standin
+
+
+FETCH = 50000
+SNAPSHOT_VERSION = 2
+META_FILE = "meta.json"
+NO_GENRE = -1
+NOT_RETURNED = 2**31 - 1    # return_day of a loan still out
+
+# (field, dtype) per column file; order matches the registry query columns
+LOAN_FIELDS = [
+    ("loan_id", "<i8"),
+    ("customer_id", "<i8"),
+    ("item_id", "<i8"),
+    ("staff_id", "<i4"),
+    ("record_id", "<i8"),
+    ("genre", "<i2"),
+    ("loan_day", "<i4"),
+    ("due_day", "<i4"),
+    ("overdue", "u1"),
+    ("return_day", "<i4"),
+]
+ITEM_FIELDS = [
+    ("item_id", "<i8"),
+    ("record_id", "<i8"),
+    ("total_stock", "<i4"),
+    ("genre", "<i2"),
+]
+
+REPORTS = ["daily", "duration", "overdue", "utilization"]
+DURATION_BINS = [0, 1, 8, 15, 22, 29, 61, 91, 181, 366]
+UTILIZATION_BANDS = [(0.0, 0.0, "idle"), (0.0, 0.5, "< 50%"), (0.5, 1.0, "50-99%"),
+                     (1.0, 1.0, "100% (none left)"), (1.0, float("inf"), "> 100% (overbooked)"),
+                     (float("inf"), float("inf"), "no stock (loans out)")]
+
+
+def require_numpy():
+    if np is None:
+        print("ERROR: numpy is required for analytics (pip install numpy).")
+        sys.exit(1)
+
+
+
+# EXPORT (the only part that talks to the database)
+
+def day_numbers(values):
+    """DATE column values (datetime from cx_Oracle, ISO text from the stand-in) -> int32 days."""
+    return np.array(values, dtype="datetime64[s]").astype("datetime64[D]").astype(np.int32)
+
+
+def return_days(values):
+    """returnDate values -> day numbers, NOT_RETURNED where NULL."""
+    out = np.full(len(values), NOT_RETURNED, dtype=np.int32)
+    returned = [i for i, v in enumerate(values) if v is not None]
+    if returned:
+        out[returned] = day_numbers([values[i] for i in returned])
+    return out
+
+
+def genre_codes(values, genres):
+    """Dictionary-encode genre names; `genres` (name -> code) grows as new names appear."""
+    return np.array([NO_GENRE if g is None else genres.setdefault(g, len(genres)) for g in values],
+                    dtype=np.int16)
+
+
+def loan_arrays(columns, genres):
+    (loan_id, customer_id, item_id, staff_id, record_id, genre, loan_date, due_date, overdue,
+     return_date) = columns
+    return [loan_id, customer_id, item_id, staff_id, record_id,
+            genre_codes(genre, genres), day_numbers(loan_date), day_numbers(due_date),
+            np.array(overdue, dtype=object) == "Y", return_days(return_date)]
+
+
+def item_arrays(columns, genres):
+    item_id, record_id, total_stock, genre = columns
+    return [item_id, record_id, [0 if s is None else s for s in total_stock], genre_codes(genre, genres)]
+
+
+def column_file(table, field):
+    return f"{table}.{field}.bin"
+
+
+def export_columns(cur, query, out_dir, table, fields, to_arrays, genres, batch=FETCH):
+    """Stream one query into per-field column files. Returns the row count."""
+    cur.arraysize = batch
+    cur.execute(query.sql)
+    files = [open(os.path.join(out_dir, column_file(table, name)), "wb") for name, _ in fields]
+    rows = 0
+    try:
+        while True:
+            chunk = cur.fetchmany(batch)
+            if not chunk:
+                break
+            for f, (_, dtype), values in zip(files, fields, to_arrays(list(zip(*chunk)), genres)):
+                f.write(np.asarray(values, dtype=dtype).tobytes())
+            rows += len(chunk)
+    finally:
+        for f in files:
+            f.close()
+    return rows
+
+
+def export_snapshot(factory, dialect, out_dir, batch=FETCH, quiet=False):
+    """
+    Write a snapshot directory (built in <out_dir>.tmp, then renamed).
+    All three queries see the same point in time. Returns the metadata.
+    """
+    require_numpy()
+    tmp = out_dir + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    genres = {}
+    start = time.perf_counter()
+
+    conn = factory()
+    try:
+        cur = conn.cursor()
+        cur.execute("SET TRANSACTION READ ONLY" if dialect == "oracle" else "BEGIN")
+        loans = export_columns(cur, a9queries.get("analytics_loans"), tmp, "loans",
+                               LOAN_FIELDS, loan_arrays, genres, batch)
+        items = export_columns(cur, a9queries.get("analytics_items"), tmp, "items",
+                               ITEM_FIELDS, item_arrays, genres, batch)
+        cur.execute(a9queries.get("analytics_staff").sql)
+        staff = {str(staff_id): name for staff_id, name in cur.fetchall()}
+        cur.close()
+        conn.rollback()     # ends the read-only transaction
+    finally:
+        conn.close()
+
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "as_of": date.today().isoformat(),
+        "source": dialect,
+        "rows": {"loans": loans, "items": items},
+        "fields": {"loans": LOAN_FIELDS, "items": ITEM_FIELDS},
+        "genres": sorted(genres, key=genres.get),
+        "staff": staff,
+    }
+    with open(os.path.join(tmp, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp, out_dir)
+
+    if not quiet:
+        elapsed = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(out_dir, n)) for n in os.listdir(out_dir))
+        print(f"[Snapshot {out_dir}: {loans:,} loans, {items:,} items, {size / (1024 * 1024):.1f} MB "
+              f"in {elapsed:.1f}s ({loans / elapsed if elapsed else 0:,.0f} loans/s)]")
+    return meta
+
+
+
+# SNAPSHOT (memory-mapped, read only)
+
+class Snapshot:
+    """
+    Column arrays of an exported snapshot: snap.loans["due_day"],
+    snap.items["total_stock"], ... (np.memmap, paged in on first use).
+    """
+
+    def __init__(self, path):
+        require_numpy()
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"{path}: unsupported snapshot version {self.meta.get('version')}")
+        self.path = path
+        self.genres = self.meta["genres"]
+        self.staff = {int(k): v for k, v in self.meta["staff"].items()}
+        self.as_of = date.fromisoformat(self.meta["as_of"])
+        self.loans = self.map_table("loans")
+        self.items = self.map_table("items")
+
+    def map_table(self, table):
+        n = self.meta["rows"][table]
+        columns = {}
+        for name, dtype in self.meta["fields"][table]:
+            if n == 0:
+                columns[name] = np.zeros(0, dtype=dtype)   # mmap cannot map an empty file
+            else:
+                columns[name] = np.memmap(os.path.join(self.path, column_file(table, name)),
+                                          dtype=dtype, mode="r", shape=(n,))
+        return columns
+
+    def __len__(self):
+        return self.meta["rows"]["loans"]
+
+
+def day_number(d):
+    return (d - date(1970, 1, 1)).days
+
+
+def day_label(n):
+    return str(np.datetime64(int(n), "D"))
+
+
+
+# VECTORIZED STATS
+
+def loans_per_day(snap, first_day=None, last_day=None):
+    """(day numbers, loans started that day) for every day in the range, zeros included."""
+    days = snap.loans["loan_day"]
+    if len(days) == 0:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int64)
+    lo = int(days.min()) if first_day is None else first_day
+    hi = int(days.max()) if last_day is None else last_day
+    in_range = days[(days >= lo) & (days <= hi)]
+    counts = np.bincount(in_range - lo, minlength=hi - lo + 1)
+    return np.arange(lo, hi + 1, dtype=np.int32), counts
+
+
+def loan_periods(snap):
+    """Days between loanDate and dueDate, per loan."""
+    return snap.loans["due_day"].astype(np.int32) - snap.loans["loan_day"]
+
+
+def active_mask(snap):
+    """Loans not yet returned."""
+    return snap.loans["return_day"] == NOT_RETURNED
+
+
+def overdue_mask(snap, as_of_day=None):
+    """
+    Still out and flagged overdue or due before the as-of day (default: the
+    snapshot date), or returned after the due date.
+    """
+    as_of_day = day_number(snap.as_of) if as_of_day is None else as_of_day
+    due = snap.loans["due_day"]
+    out = active_mask(snap)
+    late_now = out & ((snap.loans["overdue"] == 1) | (due < as_of_day))
+    return late_now | (~out & (snap.loans["return_day"] > due))
+
+
+def days_overdue(snap, as_of_day=None):
+    """Days past due for the overdue loans only (up to the return for returned ones)."""
+    as_of_day = day_number(snap.as_of) if as_of_day is None else as_of_day
+    late = overdue_mask(snap, as_of_day)
+    end = np.minimum(snap.loans["return_day"][late], as_of_day)
+    return np.maximum(end - snap.loans["due_day"][late].astype(np.int64), 0)
+
+
+def distribution(values, bins=DURATION_BINS):
+    """Counts per [bins[i], bins[i+1]) plus an open-ended last bucket, and p50/p90/p99."""
+    edges = np.append(np.asarray(bins, dtype=np.int64), np.iinfo(np.int64).max)
+    counts = np.histogram(values, bins=edges)[0] if len(values) else np.zeros(len(bins), dtype=np.int64)
+    pct = np.percentile(values, [50, 90, 99]) if len(values) else np.zeros(3)
+    return counts, pct
+
+
+def rate_by(keys, mask):
+    """For each distinct key: (key, loans, matching loans, rate), busiest first."""
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    totals = np.bincount(inverse, minlength=len(uniq))
+    hits = np.bincount(inverse, weights=mask, minlength=len(uniq)).astype(np.int64)
+    order = np.argsort(-totals, kind="stable")
+    return uniq[order], totals[order], hits[order], hits[order] / np.maximum(totals[order], 1)
+
+
+def item_utilization(snap):
+    """Per item (snapshot items order): active (unreturned) loans and active loans / TotalStock."""
+    item_ids = snap.items["item_id"]
+    active = np.zeros(len(item_ids), dtype=np.int64)
+    if len(item_ids) and len(snap):
+        order = np.argsort(item_ids)
+        loaned, counts = np.unique(snap.loans["item_id"][active_mask(snap)], return_counts=True)
+        pos = np.searchsorted(item_ids, loaned, sorter=order)
+        known = pos < len(item_ids)
+        known[known] = item_ids[order[pos[known]]] == loaned[known]
+        active[order[pos[known]]] = counts[known]
+    stock = snap.items["total_stock"].astype(np.int64)
+    util = np.where(stock > 0, active / np.maximum(stock, 1), np.where(active > 0, np.inf, 0.0))
+    return active, util
+
+
+
+# REPORTS
+
+def bar(value, peak, width=30):
+    return "#" * int(round(width * value / peak)) if peak else ""
+
+
+def report_daily(snap, days=30):
+    day_nums, counts = loans_per_day(snap)
+    print(f"\nLoans per day (last {days} day(s) with data, {len(day_nums)} day(s) in snapshot)")
+    if len(day_nums) == 0:
+        print("  (no loans)")
+        return
+    peak = counts.max()
+    for d, n in zip(day_nums[-days:], counts[-days:]):
+        print(f"  {day_label(d)}  {n:>9,}  {bar(n, peak)}")
+    print(f"  mean {counts.mean():,.1f}/day, busiest {day_label(day_nums[counts.argmax()])} ({peak:,})")
+
+
+def print_distribution(title, values, bins=DURATION_BINS):
+    counts, (p50, p90, p99) = distribution(values, bins)
+    print(f"\n{title} ({len(values):,} loan(s); p50 {p50:.0f}, p90 {p90:.0f}, p99 {p99:.0f} days)")
+    peak = counts.max() if len(counts) else 0
+    for i, n in enumerate(counts):
+        if i + 1 == len(bins):
+            label = f"{bins[i]}+"
+        elif bins[i + 1] - 1 == bins[i]:
+            label = str(bins[i])
+        else:
+            label = f"{bins[i]}-{bins[i + 1] - 1}"
+        print(f"  {label:>9} days  {n:>11,}  {bar(n, peak)}")
+
+
+def report_duration(snap):
+    print_distribution("Loan period (dueDate - loanDate)", loan_periods(snap))
+    print_distribution(f"Days overdue as of {snap.as_of}", days_overdue(snap))
+
+
+def print_rates(title, labels, totals, hits, rates, top):
+    print(f"\n{title}")
+    print(f"  {'':<28}{'loans':>11}{'overdue':>11}{'rate':>8}")
+    for label, n, late, rate in list(zip(labels, totals, hits, rates))[:top]:
+        print(f"  {label:<28}{n:>11,}{late:>11,}{rate:>8.1%}")
+
+
+def report_overdue(snap, top=20):
+    late = overdue_mask(snap)
+    print(f"\nOverdue as of {snap.as_of}: {int(late.sum()):,} of {len(snap):,} loan(s) "
+          f"({late.mean() if len(snap) else 0:.1%})")
+    keys, totals, hits, rates = rate_by(snap.loans["genre"], late)
+    labels = ["(no genre)" if k == NO_GENRE else snap.genres[k] for k in keys]
+    print_rates("Overdue rate by genre", labels, totals, hits, rates, top)
+    keys, totals, hits, rates = rate_by(snap.loans["staff_id"], late)
+    labels = [f"{k} {snap.staff.get(int(k), '')}".strip() for k in keys]
+    print_rates("Overdue rate by staff (who issued the loan)", labels, totals, hits, rates, top)
+
+
+def report_utilization(snap, top=20):
+    active, util = item_utilization(snap)
+    stock = snap.items["total_stock"]
+    total_stock = int(stock.sum())
+    print(f"\nUtilization: {int(active.sum()):,} active loan(s) on {total_stock:,} copies "
+          f"({active.sum() / total_stock if total_stock else 0:.1%}), {len(util):,} item(s)")
+    for lo, hi, label in UTILIZATION_BANDS:
+        if lo == hi:
+            n = int(np.count_nonzero(util == lo))
+        else:
+            n = int(np.count_nonzero((util > lo) & (util < hi)))
+        print(f"  {label:<22}{n:>11,} item(s)")
+    busiest = np.argsort(-util, kind="stable")[:top]
+    print(f"\n  {'ItemID':>10}{'RecordID':>10}  {'genre':<18}{'copies':>7}{'loans':>7}{'util':>8}")
+    for i in busiest:
+        g = snap.items["genre"][i]
+        genre = "" if g == NO_GENRE else snap.genres[g]
+        print(f"  {snap.items['item_id'][i]:>10}{snap.items['record_id'][i]:>10}  {genre:<18}"
+              f"{stock[i]:>7}{active[i]:>7}{util[i]:>8.0%}")
+
+
+def run_reports(snap, reports=REPORTS, days=30, top=20):
+    for name in reports:
+        start = time.perf_counter()
+        if name == "daily":
+            report_daily(snap, days)
+        elif name == "duration":
+            report_duration(snap)
+        elif name == "overdue":
+            report_overdue(snap, top)
+        elif name == "utilization":
+            report_utilization(snap, top)
+        print(f"  [{name}: {(time.perf_counter() - start) * 1000:.0f} ms over {len(snap):,} loans]")
+
+
+
+# COMMAND LINE
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory-mapped Loans snapshot and circulation stats.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export_p = sub.add_parser("export", help="snapshot Loans / items / staff into column files")
+    export_p.add_argument("--out", default=None, help="snapshot directory (default snap-<today>)")
+    export_p.add_argument("--batch", type=int, default=FETCH, help="rows per fetch")
+    export_p.add_argument("--db", default="library_standin.db", help="stand-in sqlite file")
+    export_p.add_argument("--build", action="store_true", help="(re)build and seed the stand-in first")
+    export_p.add_argument("--loans", type=int, default=100000, help="loans to seed with --build")
+    export_p.add_argument("--oracle", default=None, help="user/pass@dsn to export from Oracle instead")
+    stats_p = sub.add_parser("stats", help="compute circulation stats from a snapshot")
+    stats_p.add_argument("--snap", required=True, help="snapshot directory")
+    stats_p.add_argument("--report", choices=REPORTS + ["all"], default="all")
+    stats_p.add_argument("--days", type=int, default=30, help="days shown by the daily report")
+    stats_p.add_argument("--top", type=int, default=20, help="rows shown per ranking")
+    args = parser.parse_args(argv)
+    require_numpy()
+
+    if args.command == "export":
+        if args.oracle:
+            factory, dialect = a9load.oracle_factory(args.oracle), "oracle"
+        else:
+            if args.build or not os.path.exists(args.db):
+                print(f"[Building stand-in database {args.db}...]")
+                a9standin.build(args.db, records=max(1000, args.loans // 20),
+                                customers=max(500, args.loans // 10), loans=args.loans)
+            factory, dialect = a9load.standin_factory(args.db), "sqlite"
+        export_snapshot(factory, dialect, args.out or f"snap-{date.today().isoformat()}", batch=args.batch)
+        return 0
+
+    try:
+        snap = Snapshot(args.snap)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        return 1
+    print(f"[Snapshot {args.snap}: {len(snap):,} loans from {snap.meta['source']} as of {snap.as_of}]")
+    run_reports(snap, REPORTS if args.report == "all" else [args.report], days=args.days, top=args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,544 @@
+#!/usr/bin/env python3
+#Wafee Rahman , Richie Au , Umair Ansar
+
+"""
+Library DBMS – parallel logical backup / restore of the library tables
+
+- dump: every table is exported on its own connection by a thread pool,
+  BATCH rows per fetch, into <out>/<Table>.jsonl.gz (one JSON array per
+  row, gzip level 1) plus manifest.json (columns, DATE columns, row
+  counts). On Oracle all tables are read AS OF the same SCN, so the
+  backup is consistent even while desks keep working.
+
+- restore: tables are loaded in FK-safe waves (parents first; the tables
+  of one wave load in parallel) with array inserts of BATCH rows.
+  On Oracle, foreign keys and triggers are disabled for the load, the
+  tables are truncated and filled with direct-path inserts, then the
+  constraints are re-enabled WITH VALIDATE, the triggers come back and
+  sequences / catalog / rollups are rebuilt. The stand-in loads with
+  foreign_keys off on one writer and runs PRAGMA foreign_key_check.
+
+- Both report rows, seconds, rows/s and MB per table, then validate
+  row counts against the manifest.
+
+- Runs against the stand-in by default:
+    python a9backup.py dump --out backup
+    python a9backup.py restore --from backup --db copy.db
+  or Oracle:
+    python a9backup.py dump --oracle 'user/pass@host:1521/XE' --out backup
+    python a9backup.py restore --from backup --oracle 'user/pass@host:1521/XE'
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
+from decimal import Decimal
+
+import a9load
+import a9standin
+
+
+BATCH = 10000
+WORKERS = 4
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+COMPRESS_LEVEL = 1          # fast; JSON rows still shrink ~5-8x
+
+# FK-safe load order. Every table only references tables in earlier waves.
+WAVES = [
+    ["Staff", "Author", "Address"],
+    ["Customer", "Record"],
+    ["RecordAuthor", "LibraryInventory", "Book", "EBook", "DVD"],
+    ["Loans", "Hold"],
+]
+assert sorted(t for wave in WAVES for t in wave) == sorted(a9standin.TABLES)
+
+ORACLE_DATE_FORMAT = "YYYY-MM-DD HH24:MI:SS"
+
+# Foreign keys on our tables, plus any other table's keys that point at them
+# (TRUNCATE refuses a parent while an enabled FK references it).
+ORACLE_FK_SQL = """
+SELECT c.table_name, c.constraint_name
+FROM user_constraints c
+JOIN user_constraints p ON p.constraint_name = c.r_constraint_name
+WHERE c.constraint_type = 'R'
+  AND (c.table_name IN ({tables}) OR p.table_name IN ({tables}))
+ORDER BY c.table_name, c.constraint_name
+"""
+
+# Tables stored in a cluster (performance layout): TRUNCATE TABLE refuses
+# them, the whole cluster is truncated at once instead.
+ORACLE_CLUSTER_SQL = """
+SELECT table_name, cluster_name
+FROM user_tables
+WHERE cluster_name IS NOT NULL AND table_name IN ({tables})
+"""
+
+CATALOG_REBUILD = [
+    "DELETE FROM CatalogDirty",
+    "DELETE FROM CatalogEntry",
+    "INSERT INTO CatalogDirty (RecordID) SELECT RecordID FROM Record",
+    "BEGIN refresh_catalog; END;",
+]
+
+# Same steps as rebuild_rollups() in a9cli.py
+ROLLUP_REBUILD = [
+    "DELETE FROM LoanDailyGenre",
+    "DELETE FROM LoanDailyRecord",
+    "DELETE FROM LoanDailyCustomer",
+    "DELETE FROM LoanRollupQueue",
+    "INSERT INTO LoanRollupQueue (customerId, itemId, loanDay) "
+    "SELECT customerId, itemId, TRUNC(loanDate) FROM Loans",
+    "BEGIN refresh_rollups('Y'); END;",
+]
+
+
+
+# COLUMNS AND VALUES
+
+def table_columns(conn, dialect, table):
+    """[(NAME, is_date), ...] in table order."""
+    if dialect == "oracle":
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT column_name, data_type
+            FROM user_tab_columns
+            WHERE table_name = :t
+            ORDER BY column_id
+            """,
+            {"t": table.upper()},
+        )
+        return [(name, data_type == "DATE") for name, data_type in cur.fetchall()]
+    # The stand-in keeps dates as text; same naming rule as a9service.
+    cols = []
+    for _, name, _decl, *_ in conn.execute(f"PRAGMA table_info({table})"):
+        upper = name.upper()
+        cols.append((upper, upper.endswith("DATE") or upper == "DATEOFPUBLICATION"))
+    return cols
+
+
+def encode(value):
+    """json.dumps default= hook for what cx_Oracle hands back."""
+    if isinstance(value, datetime):
+        if value.time() == datetime.min.time():
+            return value.date().isoformat()
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"cannot back up {type(value).__name__} value {value!r}")
+
+
+def insert_sql(dialect, table, columns):
+    values = []
+    for i, (name, is_date) in enumerate(columns, start=1):
+        bind = f":{i}" if dialect == "oracle" else "?"
+        if is_date:
+            bind = f"TO_DATE({bind}, '{ORACLE_DATE_FORMAT}')"
+        values.append(bind)
+    hint = "/*+ APPEND_VALUES */ " if dialect == "oracle" else ""
+    return (f"INSERT {hint}INTO {table} ({', '.join(n for n, _ in columns)}) "
+            f"VALUES ({', '.join(values)})")
+
+
+def table_file(table):
+    return f"{table}.jsonl.gz"
+
+
+def megabytes(n):
+    return n / (1024 * 1024)
+
+
+def print_result(verb, result):
+    rate = result["rows"] / result["seconds"] if result["seconds"] else 0.0
+    print(f"  {verb} {result['table']:<17}{result['rows']:>12,} rows {result['seconds']:>8.2f}s "
+          f"{rate:>12,.0f} rows/s {megabytes(result['bytes']):>9.1f} MB", flush=True)
+
+
+def print_total(verb, results, elapsed):
+    rows = sum(r["rows"] for r in results)
+    size = sum(r["bytes"] for r in results)
+    rate = rows / elapsed if elapsed else 0.0
+    print(f"[{verb} {len(results)} table(s), {rows:,} rows, {megabytes(size):.1f} MB "
+          f"in {elapsed:.1f}s ({rate:,.0f} rows/s)]")
+
+
+
+# DUMP
+
+def snapshot_scn(conn):
+    """Current SCN for AS OF queries, or None when flashback is not granted."""
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT DBMS_FLASHBACK.GET_SYSTEM_CHANGE_NUMBER FROM dual")
+        return cur.fetchone()[0]
+    except Exception as e:
+        print(f"[No flashback SCN ({str(e).strip()}); tables are read at slightly different times]")
+        return None
+    finally:
+        cur.close()
+
+
+def dump_table(factory, dialect, out_dir, table, scn=None, batch=BATCH):
+    """Write one table to <out_dir>/<table>.jsonl.gz. Returns its manifest entry."""
+    start = time.perf_counter()
+    conn = factory()
+    try:
+        columns = table_columns(conn, dialect, table)
+        as_of = " AS OF SCN :scn" if scn is not None else ""
+        cur = conn.cursor()
+        cur.arraysize = batch
+        cur.execute(f"SELECT {', '.join(n for n, _ in columns)} FROM {table}{as_of}",
+                    {"scn": scn} if as_of else ())
+        path = os.path.join(out_dir, table_file(table))
+        rows = 0
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=encode).encode
+        with gzip.open(path + ".tmp", "wt", encoding="utf-8", compresslevel=COMPRESS_LEVEL) as f:
+            while True:
+                chunk = cur.fetchmany(batch)
+                if not chunk:
+                    break
+                f.write("".join(dumps(list(r)) + "\n" for r in chunk))
+                rows += len(chunk)
+        os.replace(path + ".tmp", path)
+        cur.close()
+    finally:
+        conn.close()
+    return {
+        "table": table,
+        "file": table_file(table),
+        "columns": [n for n, _ in columns],
+        "dates": [n for n, is_date in columns if is_date],
+        "rows": rows,
+        "bytes": os.path.getsize(path),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def run_dump(factory, dialect, out_dir, workers=WORKERS, batch=BATCH, quiet=False):
+    """Export every table in parallel and write the manifest. Returns the manifest."""
+    os.makedirs(out_dir, exist_ok=True)
+    start = time.perf_counter()
+    scn = None
+    if dialect == "oracle":
+        conn = factory()
+        try:
+            scn = snapshot_scn(conn)
+        finally:
+            conn.close()
+    if not quiet:
+        print(f"[Dumping {len(a9standin.TABLES)} tables to {out_dir} with {workers} connection(s)"
+              f"{f' as of SCN {scn}' if scn is not None else ''}]")
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(dump_table, factory, dialect, out_dir, t, scn, batch)
+                   for t in a9standin.TABLES]
+        for future in as_completed(futures):
+            result = future.result()
+            results[result["table"]] = result
+            if not quiet:
+                print_result("dumped ", result)
+
+    elapsed = time.perf_counter() - start
+    manifest = {
+        "version": FORMAT_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "source": dialect,
+        "scn": scn,
+        "tables": [results[t] for t in a9standin.TABLES],
+    }
+    path = os.path.join(out_dir, MANIFEST)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+    if not quiet:
+        print_total("Dumped", manifest["tables"], elapsed)
+    return manifest
+
+
+
+# RESTORE
+
+def load_manifest(in_dir):
+    with open(os.path.join(in_dir, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{in_dir}: unsupported backup version {manifest.get('version')}")
+    entries = {e["table"]: e for e in manifest["tables"]}
+    missing = [t for t in a9standin.TABLES if t not in entries]
+    if missing:
+        raise ValueError(f"{in_dir}: backup has no {', '.join(missing)}")
+    return manifest, entries
+
+
+def read_batches(path, batch):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        rows = []
+        for line in f:
+            rows.append(json.loads(line))
+            if len(rows) >= batch:
+                yield rows
+                rows = []
+        if rows:
+            yield rows
+
+
+def restore_table(conn, dialect, in_dir, entry, batch=BATCH):
+    """Array-insert one table's file. Oracle commits every batch (direct path)."""
+    start = time.perf_counter()
+    table = entry["table"]
+    target = {name for name, _ in table_columns(conn, dialect, table)}
+    unknown = [c for c in entry["columns"] if c.upper() not in target]
+    if unknown:
+        raise ValueError(f"{table}: backup column(s) {', '.join(unknown)} not in the target table")
+    dates = set(entry["dates"])
+    sql = insert_sql(dialect, table, [(c, c in dates) for c in entry["columns"]])
+    cur = conn.cursor()
+    rows = 0
+    for chunk in read_batches(os.path.join(in_dir, entry["file"]), batch):
+        cur.executemany(sql, chunk)
+        rows += len(chunk)
+        if dialect == "oracle":
+            conn.commit()
+    conn.commit()
+    cur.close()
+    return {
+        "table": table,
+        "rows": rows,
+        "bytes": entry["bytes"],
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def restore_on_own_connection(factory, dialect, in_dir, entry, batch=BATCH):
+    conn = factory()
+    try:
+        return restore_table(conn, dialect, in_dir, entry, batch)
+    finally:
+        conn.close()
+
+
+def oracle_object_exists(cur, name):
+    cur.execute("SELECT COUNT(*) FROM user_objects WHERE object_name = :n", {"n": name.upper()})
+    return cur.fetchone()[0] > 0
+
+
+def oracle_foreign_keys(conn):
+    """(table, constraint) for every FK into or out of the library tables."""
+    cur = conn.cursor()
+    names = ", ".join(f"'{t.upper()}'" for t in a9standin.TABLES)
+    cur.execute(ORACLE_FK_SQL.format(tables=names))
+    fks = cur.fetchall()
+    cur.close()
+    return fks
+
+
+def oracle_prepare(conn, fks):
+    """Disable FKs and triggers, empty the tables."""
+    cur = conn.cursor()
+    names = ", ".join(f"'{t.upper()}'" for t in a9standin.TABLES)
+    for table, constraint in fks:
+        cur.execute(f"ALTER TABLE {table} DISABLE CONSTRAINT {constraint}")
+    for table in a9standin.TABLES:
+        cur.execute(f"ALTER TABLE {table} DISABLE ALL TRIGGERS")
+    cur.execute(ORACLE_CLUSTER_SQL.format(tables=names))
+    clustered = dict(cur.fetchall())
+    for table in reversed(a9standin.TABLES):
+        if table.upper() not in clustered:
+            cur.execute(f"TRUNCATE TABLE {table}")
+    for cluster in sorted(set(clustered.values())):
+        cur.execute(f"TRUNCATE CLUSTER {cluster}")
+    cur.close()
+
+
+def oracle_finish(conn, fks, quiet=False):
+    """
+    Re-enable FKs (validating every row) and triggers, then rebuild what
+    the disabled triggers would have maintained. Also runs after a failed
+    load, so nothing is left disabled: an FK whose rows don't validate is
+    enabled NOVALIDATE (new rows are checked). Returns the problems found.
+    """
+    failures = []
+    cur = conn.cursor()
+    for table, constraint in fks:
+        try:
+            cur.execute(f"ALTER TABLE {table} ENABLE VALIDATE CONSTRAINT {constraint}")
+        except Exception as e:
+            failures.append(f"{table}.{constraint}: {str(e).strip()}")
+            try:
+                cur.execute(f"ALTER TABLE {table} ENABLE NOVALIDATE CONSTRAINT {constraint}")
+            except Exception as e2:
+                failures.append(f"{table}.{constraint} left disabled: {str(e2).strip()}")
+    for table in a9standin.TABLES:
+        try:
+            cur.execute(f"ALTER TABLE {table} ENABLE ALL TRIGGERS")
+        except Exception as e:
+            failures.append(f"{table} triggers left disabled: {str(e).strip()}")
+
+    steps = [("sync_sequences", ["BEGIN sync_sequences; END;"]),
+             ("refresh_catalog", CATALOG_REBUILD),
+             ("refresh_rollups", ROLLUP_REBUILD)]
+    for proc, statements in steps:
+        if not oracle_object_exists(cur, proc):
+            continue
+        t0 = time.perf_counter()
+        try:
+            for sql in statements:
+                cur.execute(sql)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            failures.append(f"{proc}: {str(e).strip()}")
+            continue
+        if not quiet:
+            print(f"  {proc:<25}{time.perf_counter() - t0:>8.2f}s")
+    cur.close()
+    return failures
+
+
+def standin_prepare(conn):
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys = OFF")
+    a9standin.create_schema(conn)
+    for table in reversed(a9standin.TABLES):
+        conn.execute(f"DELETE FROM {table}")
+    conn.commit()
+
+
+def standin_finish(conn):
+    """FK violations as 'Table row N -> Parent' strings; turns foreign keys back on."""
+    failures = [f"{table} row {rowid} -> {parent}"
+                for table, rowid, parent, _ in conn.execute("PRAGMA foreign_key_check")]
+    conn.execute("PRAGMA foreign_keys = ON")
+    return failures
+
+
+def count_rows(conn, table):
+    cur = conn.cursor()
+    cur.execute(f"SELECT COUNT(*) FROM {table}")
+    n = cur.fetchone()[0]
+    cur.close()
+    return n
+
+
+def run_restore(factory, dialect, in_dir, workers=WORKERS, batch=BATCH, quiet=False):
+    """
+    Replace the library tables with the backup in in_dir.
+    Returns (per-table results, problems found while validating). If a
+    load fails the finish step still runs (FKs / triggers re-enabled) and
+    the restore is reported as incomplete in the problems.
+    """
+    manifest, entries = load_manifest(in_dir)
+    if dialect != "oracle":
+        workers = 1         # sqlite has one writer; parallel loads would just wait on the lock
+    start = time.perf_counter()
+    if not quiet:
+        print(f"[Restoring {in_dir} ({manifest['source']} backup from {manifest['created']}) "
+              f"with {workers} connection(s)]")
+
+    admin = factory()
+    results = []
+    problems = []
+    try:
+        fks = oracle_foreign_keys(admin) if dialect == "oracle" else None
+        try:
+            if dialect == "oracle":
+                oracle_prepare(admin, fks)
+            else:
+                standin_prepare(admin)
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for wave in WAVES:
+                    if dialect == "oracle":
+                        futures = [pool.submit(restore_on_own_connection, factory, dialect, in_dir,
+                                               entries[t], batch)
+                                   for t in wave]
+                        done = (f.result() for f in as_completed(futures))
+                    else:
+                        # Same connection throughout: it has foreign_keys off
+                        done = (restore_table(admin, dialect, in_dir, entries[t], batch) for t in wave)
+                    for result in done:
+                        results.append(result)
+                        if not quiet:
+                            print_result("restored", result)
+        except Exception as e:
+            admin.rollback()
+            problems.append(f"restore INCOMPLETE ({len(results)} of {len(a9standin.TABLES)} table(s) "
+                            f"loaded): {str(e).strip()}")
+            if not quiet:
+                print(f"[Restore failed: {str(e).strip()}; re-enabling constraints and triggers]")
+
+        if dialect == "oracle":
+            problems += oracle_finish(admin, fks, quiet=quiet)
+        else:
+            problems += standin_finish(admin)
+
+        for table in a9standin.TABLES:
+            expected, actual = entries[table]["rows"], count_rows(admin, table)
+            if expected != actual:
+                problems.append(f"{table}: {actual} row(s), backup has {expected}")
+    finally:
+        admin.close()
+
+    if not quiet:
+        print_total("Restored", results, time.perf_counter() - start)
+    return results, problems
+
+
+
+# COMMAND LINE
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel logical backup / restore of the library tables.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    dump_p = sub.add_parser("dump", help="export every table to a backup directory")
+    dump_p.add_argument("--out", default=None, help="backup directory (default backup-<timestamp>)")
+    restore_p = sub.add_parser("restore", help="replace every table with a backup")
+    restore_p.add_argument("--from", dest="src", required=True, help="backup directory")
+    for p in (dump_p, restore_p):
+        p.add_argument("--workers", type=int, default=WORKERS, help="connections / tables in parallel")
+        p.add_argument("--batch", type=int, default=BATCH, help="rows per fetch / array insert")
+        p.add_argument("--db", default="library_standin.db", help="stand-in sqlite file")
+        p.add_argument("--oracle", default=None, help="user/pass@dsn to run against Oracle instead")
+    dump_p.add_argument("--build", action="store_true", help="(re)build and seed the stand-in first")
+    dump_p.add_argument("--loans", type=int, default=100000, help="loans to seed with --build")
+    args = parser.parse_args(argv)
+
+    if args.oracle:
+        factory, dialect = a9load.oracle_factory(args.oracle), "oracle"
+    else:
+        if args.command == "dump" and (args.build or not os.path.exists(args.db)):
+            print(f"[Building stand-in database {args.db}...]")
+            a9standin.build(args.db, records=max(1000, args.loans // 20),
+                            customers=max(500, args.loans // 10), loans=args.loans)
+        factory, dialect = a9load.standin_factory(args.db), "sqlite"
+
+    if args.command == "dump":
+        out_dir = args.out or f"backup-{datetime.now():%Y%m%d-%H%M%S}"
+        run_dump(factory, dialect, out_dir, workers=args.workers, batch=args.batch)
+        return 0
+
+    try:
+        _, problems = run_restore(factory, dialect, args.src, workers=args.workers, batch=args.batch)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        return 1
+    if problems:
+        print(f"[Validation FAILED: {len(problems)} problem(s)]")
+        for p in problems[:20]:
+            print(f"  {p}")
+        return 1
+    print("[Validation passed: row counts match the manifest, foreign keys hold]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
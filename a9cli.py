@@ -12,17 +12,36 @@ Library DBMS – Python CLI (Linux, sqlplus-based, no cx_Oracle)
     * Create schema (BCNF version)
     * Seed data (same as GUI, per-record style)
     * Predefined demo queries
-    * Manual SQL query option
+    * Manual SQL: one statement or a whole script (a9script.py)
+
+- Optional: export A9_SERVICE='http://127.0.0.1:8510' to run predefined
+  queries 1-4 through the shared middle tier (a9service.py) instead of
+  starting a sqlplus session for each one.
 """
 
+import argparse
+import csv
+import datetime
 import os
+import re
 import sys
 import subprocess
 import textwrap
+import threading
+import time
+
+import a9queries
+import a9script
+import a9service
 
 # Change this to "sqlplus" if your environment doesn't use sqlplus64
 SQLPLUS_CMD = "sqlplus64"
 
+# Rows shown per page when query results are paged to the terminal
+PAGE_ROWS = 40
+
+service = None  # a9service.ServiceClient when A9_SERVICE is set
+
 
 
 def ensure_db_conn():
@@ -35,36 +54,402 @@ def ensure_db_conn():
     return db_conn
 
 
-def run_sqlplus(sql: str):
+def open_sqlplus(script: str):
     """
-    Run a SQL*Plus script and print its output.
-    `sql` can contain multiple statements separated by ';' or '/'.
+    Start sqlplus and feed it `script` from a background thread,
+    so we can read its output while it is still being produced.
     """
     db_conn = ensure_db_conn()
 
-    script = textwrap.dedent(f"""
-    SET PAGESIZE 100
-    SET LINESIZE 200
-    SET FEEDBACK ON
-    SET SERVEROUTPUT ON
-    {sql}
-    EXIT;
-    """)
-
     try:
-        result = subprocess.run(
+        proc = subprocess.Popen(
             [SQLPLUS_CMD, "-s", db_conn],
-            input=script.encode(),
+            stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            check=False,
         )
     except FileNotFoundError:
         print(f"ERROR: {SQLPLUS_CMD} not found on PATH. Is Oracle client installed?")
         sys.exit(1)
 
-    output = result.stdout.decode(errors="ignore")
-    print(output)
+    def feed():
+        try:
+            proc.stdin.write(script.encode())
+            proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass  # child was stopped before reading everything
+
+    threading.Thread(target=feed, daemon=True).start()
+    return proc
+
+
+def iter_sqlplus_lines(script: str):
+    """
+    Yield sqlplus output line by line as it arrives.
+    Closing the generator early (cancel, 'q' in the pager, Ctrl-C) kills sqlplus.
+    """
+    proc = open_sqlplus(script)
+    finished = False
+    try:
+        for raw in proc.stdout:
+            yield raw.decode(errors="ignore")
+        proc.wait()
+        finished = True
+    finally:
+        if not finished and proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+
+
+def run_sqlplus(sql: str):
+    """
+    Run a SQL*Plus script and print its output as it is produced.
+    `sql` can contain multiple statements separated by ';' or '/'.
+    Ctrl-C stops sqlplus and returns to the menu.
+    """
+    script = textwrap.dedent("""
+    SET PAGESIZE 100
+    SET LINESIZE 200
+    SET FEEDBACK ON
+    SET SERVEROUTPUT ON
+    {sql}
+    EXIT;
+    """).format(sql=textwrap.dedent(sql))
+
+    lines = iter_sqlplus_lines(script)
+    try:
+        for line in lines:
+            print(line, end="", flush=True)
+    except KeyboardInterrupt:
+        print("\n(Cancelled – sqlplus stopped)")
+    finally:
+        lines.close()
+
+
+
+# STRUCTURED QUERY OUTPUT (SET MARKUP CSV)
+
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+INT_RE = re.compile(r"^-?\d+$")
+NUM_RE = re.compile(r"^-?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$")
+ERROR_PREFIXES = ("ERROR at line", "ORA-", "SP2-")
+ERROR_MARKER_RE = re.compile(r"^\s*\*\s*$")  # sqlplus points at a parse error with "*"
+
+
+def csv_script(sql: str) -> str:
+    """
+    Wrap a single query so sqlplus prints it as CSV:
+    quoted strings/dates, bare numbers, one header line, no feedback.
+    """
+    return textwrap.dedent("""
+    SET MARKUP CSV ON QUOTE ON
+    SET PAGESIZE 50000
+    SET FEEDBACK OFF
+    SET VERIFY OFF
+    ALTER SESSION SET NLS_DATE_FORMAT = 'YYYY-MM-DD';
+    {sql}
+    EXIT;
+    """).format(sql=textwrap.dedent(sql))
+
+
+def split_csv_fields(record: str):
+    """
+    Split one CSV record into [(text, quoted), ...].
+    Keeps track of quoting so "0042" stays a string and 42 becomes an int.
+    """
+    fields = []
+    buf = []
+    quoted = False
+    in_quotes = False
+    i = 0
+    while i < len(record):
+        ch = record[i]
+        if in_quotes:
+            if ch == '"':
+                if i + 1 < len(record) and record[i + 1] == '"':
+                    buf.append('"')
+                    i += 1
+                else:
+                    in_quotes = False
+            else:
+                buf.append(ch)
+        elif ch == '"':
+            in_quotes = True
+            quoted = True
+        elif ch == ",":
+            fields.append(("".join(buf), quoted))
+            buf = []
+            quoted = False
+        else:
+            buf.append(ch)
+        i += 1
+    fields.append(("".join(buf), quoted))
+    return fields
+
+
+def convert_field(text: str, quoted: bool):
+    """Quoted -> str (or datetime.date for YYYY-MM-DD); bare -> int/float; empty -> None."""
+    if quoted:
+        if DATE_RE.match(text):
+            try:
+                return datetime.date.fromisoformat(text)
+            except ValueError:
+                return text
+        return text
+    text = text.strip()
+    if text == "":
+        return None
+    if INT_RE.match(text):
+        return int(text)
+    if NUM_RE.match(text):
+        return float(text)
+    return text
+
+
+def iter_csv_records(lines):
+    """
+    Join physical lines into CSV records (a quoted value may span lines).
+    Yields complete records as they become available.
+    """
+    pending = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        pending = line if pending is None else pending + "\n" + line
+        if pending.count('"') % 2 == 0:
+            yield pending
+            pending = None
+    if pending is not None:
+        yield pending
+
+
+def parse_csv_output(lines):
+    """
+    Incrementally parse sqlplus CSV output.
+    Yields the column list first, then one typed tuple per row.
+    Raises RuntimeError on ORA-/SP2- errors.
+
+    On a parse error sqlplus echoes the failing SQL line and a "*" marker
+    before "ERROR at line n:", so the first record is held back until the
+    next one shows it is really the header.
+    """
+    columns = None
+    header_line = None
+    first = None
+    errors = []
+    for record in iter_csv_records(lines):
+        if errors:
+            errors.append(record)
+            continue
+        if ERROR_MARKER_RE.match(record):
+            # The held-back "header" was the echoed SQL line
+            errors = [first, record] if first is not None else [record]
+            continue
+        if record.startswith(ERROR_PREFIXES):
+            errors = [record]
+            continue
+        if record.strip() == "":
+            continue
+        if columns is None:
+            if first is None:
+                first = record
+                continue
+            header_line, first = first, None
+            columns = [text for text, _ in split_csv_fields(header_line)]
+            yield columns
+        if record == header_line:
+            # Header repeats every PAGESIZE rows; skip it.
+            continue
+        yield tuple(convert_field(t, q) for t, q in split_csv_fields(record))
+
+    if errors:
+        raise RuntimeError("\n".join(e for e in errors if e.strip()))
+    if first is not None:
+        # Header only: the query returned no rows
+        yield [text for text, _ in split_csv_fields(first)]
+    elif columns is None:
+        yield []
+
+
+def stream_query(sql: str):
+    """
+    Run one query through sqlplus with CSV markup and parse it as it streams.
+    Yields the column list first, then typed row tuples.
+    Closing the generator stops sqlplus.
+    """
+    sql = sql.strip()
+    if not sql.endswith(";"):
+        sql += ";"
+
+    lines = iter_sqlplus_lines(csv_script(sql))
+    try:
+        yield from parse_csv_output(lines)
+    finally:
+        lines.close()
+
+
+def query_sqlplus(sql: str):
+    """
+    Run one query and return (columns, rows) where rows is a list of typed tuples.
+    (Holds the whole result; use stream_query() for large results.)
+    """
+    parsed = stream_query(sql)
+    try:
+        columns = next(parsed)
+        rows = list(parsed)
+    finally:
+        parsed.close()
+    return columns, rows
+
+
+def format_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime) and value.time() == datetime.time(0):
+        return value.date().isoformat()  # DATE from the middle tier, shown like sqlplus
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value).replace("\n", " ")
+
+
+class TableFormatter:
+    """
+    Fixed-width table output.
+    Widths and alignment come from the first page of rows, so later
+    rows can be printed without holding the whole result.
+    """
+
+    def __init__(self, columns, sample_rows, max_width=40):
+        widths = [len(c) for c in columns]
+        for row in sample_rows:
+            for i, v in enumerate(row):
+                widths[i] = max(widths[i], len(format_value(v)))
+        self.widths = [min(w, max_width) for w in widths]
+        self.numeric = [
+            bool(sample_rows) and all(isinstance(r[i], (int, float)) or r[i] is None for r in sample_rows)
+            for i in range(len(columns))
+        ]
+        self.columns = columns
+
+    def format(self, cells):
+        out = []
+        for i, text in enumerate(cells):
+            if len(text) > self.widths[i]:
+                text = text[: self.widths[i] - 1] + "…"
+            out.append(text.rjust(self.widths[i]) if self.numeric[i] else text.ljust(self.widths[i]))
+        return "  ".join(out).rstrip()
+
+    def print_header(self):
+        print(self.format(self.columns))
+        print("  ".join("-" * w for w in self.widths))
+
+    def print_row(self, row):
+        print(self.format([format_value(v) for v in row]))
+
+
+def print_rows(columns, rows, max_width=40):
+    """Print rows as an aligned table, one header, widths fitted to the data."""
+    if not columns:
+        print("(no result set)")
+        return
+
+    table = TableFormatter(columns, rows, max_width)
+    table.print_header()
+    for row in rows:
+        table.print_row(row)
+    print(f"\n{len(rows)} row(s) selected.")
+
+
+def page_query(sql: str, page_size=PAGE_ROWS, interactive=True):
+    """
+    Stream a query to the terminal one page at a time.
+    Only the current page is held in memory. Between pages:
+    ENTER = next page, q = stop (sqlplus is killed). Ctrl-C also stops.
+    """
+    parsed = stream_query(sql)
+    total = 0
+    try:
+        columns = next(parsed)
+        if not columns:
+            print("(no result set)")
+            return
+
+        table = None
+        page = []
+        for row in parsed:
+            page.append(row)
+            if len(page) < page_size:
+                continue
+            if table is None:
+                table = TableFormatter(columns, page)
+                table.print_header()
+            for r in page:
+                table.print_row(r)
+            total += len(page)
+            page = []
+            if interactive:
+                answer = input(f"-- {total} rows so far -- ENTER: more, q: stop -- ")
+                if answer.strip().lower() == "q":
+                    print("(Stopped – sqlplus killed)")
+                    return
+
+        if table is None:
+            table = TableFormatter(columns, page)
+            table.print_header()
+        for r in page:
+            table.print_row(r)
+        total += len(page)
+        print(f"\n{total} row(s) selected.")
+    except RuntimeError as e:
+        print(e)
+    except KeyboardInterrupt:
+        print(f"\n(Cancelled after {total} rows – sqlplus stopped)")
+    finally:
+        parsed.close()
+
+
+def run_query(sql: str):
+    """Run a query and page it to the terminal (errors are printed, not raised)."""
+    page_query(sql)
+
+
+def write_csv(columns, rows, out=None):
+    """Write rows as plain CSV (for piping into other tools). `rows` may be any iterable."""
+    writer = csv.writer(out or sys.stdout)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow(["" if v is None else v for v in row])
+
+
+def get_service():
+    """ServiceClient for A9_SERVICE, or None to talk to sqlplus directly."""
+    global service
+    url = os.getenv("A9_SERVICE", "").strip()
+    if not url:
+        return None
+    if service is None:
+        service = a9service.ServiceClient(url)
+    return service
+
+
+def registry_sql(name: str) -> str:
+    """A9queries statement as a sqlplus script: same text as the other clients, fetch size from the registry."""
+    query = a9queries.get(name)
+    return f"SET ARRAYSIZE {query.arraysize}\n{query.sql};"
+
+
+def run_report(name: str):
+    """Predefined query by name through the middle tier if configured, else via sqlplus."""
+    client = get_service()
+    if client is None:
+        run_query(registry_sql(name))
+        return
+    try:
+        columns, rows = client.report(name)
+    except a9service.ServiceError as e:
+        print(f"ERROR (middle tier): {e}")
+        return
+    print_rows(columns, rows)
 
 
 def pause():
@@ -93,7 +478,69 @@ def drop_schema():
     END;
     /
 
+    -- Drop catalog projection objects
+    {drop_catalog_refresh_job}
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP PROCEDURE refresh_catalog_now'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP PROCEDURE refresh_catalog'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP TYPE CatalogIdList'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP TABLE CatalogEntry CASCADE CONSTRAINTS PURGE'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP TABLE CatalogDirty CASCADE CONSTRAINTS PURGE'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+
+    -- Drop circulation rollups
+    {drop_rollup_nightly_job}
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP PROCEDURE refresh_rollups'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP TABLE LoanRollupQueue CASCADE CONSTRAINTS PURGE'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP TABLE LoanRollupBatch CASCADE CONSTRAINTS PURGE'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP TABLE LoanDailyGenre CASCADE CONSTRAINTS PURGE'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP TABLE LoanDailyRecord CASCADE CONSTRAINTS PURGE'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP TABLE LoanDailyCustomer CASCADE CONSTRAINTS PURGE'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP TABLE UtilizationDaily CASCADE CONSTRAINTS PURGE'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+
+    -- Drop key sequences
+    BEGIN EXECUTE IMMEDIATE 'DROP PROCEDURE sync_sequences'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP SEQUENCE seq_Staff'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP SEQUENCE seq_Author'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP SEQUENCE seq_Address'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP SEQUENCE seq_Customer'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP SEQUENCE seq_Record'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP SEQUENCE seq_LibraryInventory'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP SEQUENCE seq_Loans'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP SEQUENCE seq_Hold'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+
     -- Drop tables in FK-safe order
+    {drop_tombstone_purge_job}
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP PROCEDURE purge_tombstones'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP TABLE RowTombstonePurge CASCADE CONSTRAINTS PURGE'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP TABLE RowTombstone CASCADE CONSTRAINTS PURGE'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+    BEGIN EXECUTE IMMEDIATE 'DROP TABLE Hold CASCADE CONSTRAINTS PURGE';         EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
     BEGIN EXECUTE IMMEDIATE 'DROP TABLE Loans CASCADE CONSTRAINTS PURGE';        EXCEPTION WHEN OTHERS THEN NULL; END;
     /
     BEGIN EXECUTE IMMEDIATE 'DROP TABLE DVD CASCADE CONSTRAINTS PURGE';          EXCEPTION WHEN OTHERS THEN NULL; END;
@@ -117,8 +564,14 @@ def drop_schema():
     BEGIN EXECUTE IMMEDIATE 'DROP TABLE Staff CASCADE CONSTRAINTS PURGE';        EXCEPTION WHEN OTHERS THEN NULL; END;
     /
 
+    -- Drop the performance layout's cluster (a9queries.RECORD_CLUSTER_DDL)
+    BEGIN EXECUTE IMMEDIATE 'DROP CLUSTER RecordCluster'; EXCEPTION WHEN OTHERS THEN NULL; END;
+    /
+
     COMMIT;
     """
+    for job in ("TOMBSTONE_PURGE_JOB", "CATALOG_REFRESH_JOB", "ROLLUP_NIGHTLY_JOB"):
+        sql = sql.replace("{drop_" + job.lower() + "}", a9queries.drop_job_ddl(job))
 
     print("\n[Dropping schema (tables + view)...]")
     run_sqlplus(sql)
@@ -126,32 +579,53 @@ def drop_schema():
 
 
 
-def create_schema():
+def create_schema(profile="standard"):
+    """
+    Tables, view, triggers and procedures. `profile` picks the physical
+    layout (a9queries.SCHEMA_PROFILES); {storage:<Table>} marks where a
+    table's storage clause goes.
+    """
     sql = """
+    -- 0) KEY SEQUENCES (key columns default to seq_<Table>.NEXTVAL)
+    CREATE SEQUENCE seq_Staff START WITH 1 CACHE 100;
+    CREATE SEQUENCE seq_Author START WITH 1 CACHE 100;
+    CREATE SEQUENCE seq_Address START WITH 1 CACHE 100;
+    CREATE SEQUENCE seq_Customer START WITH 1 CACHE 100;
+    CREATE SEQUENCE seq_Record START WITH 1 CACHE 100;
+    CREATE SEQUENCE seq_LibraryInventory START WITH 1 CACHE 100;
+    CREATE SEQUENCE seq_Loans START WITH 1 CACHE 1000;
+    CREATE SEQUENCE seq_Hold START WITH 1 CACHE 100;
+
+    -- Storage the profile's tables are created in (performance: RecordCluster)
+    {profile_ddl}
+
     -- 1) STAFF
     CREATE TABLE Staff (
-      StaffID   INT PRIMARY KEY,
+      StaffID   INT DEFAULT ON NULL seq_Staff.NEXTVAL PRIMARY KEY,
       StaffName VARCHAR2(100) NOT NULL
-    );
+    ) ROWDEPENDENCIES;
 
     -- 2) AUTHOR
     CREATE TABLE Author (
-      AuthorID   INT PRIMARY KEY,
+      AuthorID   INT DEFAULT ON NULL seq_Author.NEXTVAL PRIMARY KEY,
       AuthorName VARCHAR2(100) NOT NULL
-    );
+    ) ROWDEPENDENCIES;
 
     -- ADDRESS
     CREATE TABLE Address (
-        AddressID  INT PRIMARY KEY,
+        AddressID  INT DEFAULT ON NULL seq_Address.NEXTVAL PRIMARY KEY,
         Street     VARCHAR2(100) NOT NULL,
         City       VARCHAR2(50)  NOT NULL,
         Province   VARCHAR2(50),
         PostalCode VARCHAR2(20)
-    );
+    ) ROWDEPENDENCIES;
+
+    -- Customer lookup by postal code prefix ('M5V', 'm5v 2t6')
+    CREATE INDEX ix_Address_Postal ON Address (UPPER(REPLACE(PostalCode, ' ', '')));
 
     -- 3) CUSTOMER
     CREATE TABLE Customer (
-      CustomerID   NUMBER(9)     PRIMARY KEY,
+      CustomerID   NUMBER(9)     DEFAULT ON NULL seq_Customer.NEXTVAL PRIMARY KEY,
       FirstName    VARCHAR2(50)  NOT NULL,
       LastName     VARCHAR2(50)  NOT NULL,
       PhoneNumber  VARCHAR2(10),
@@ -160,11 +634,16 @@ def create_schema():
           FOREIGN KEY (AddressID)
           REFERENCES Address(AddressID)
           ON DELETE SET NULL
-    );
+    ) ROWDEPENDENCIES;
+
+    -- Customer type-ahead: name prefix, phone prefix, postal code join
+    CREATE INDEX ix_Customer_Name ON Customer (UPPER(LastName), UPPER(FirstName), CustomerID);
+    CREATE INDEX ix_Customer_Phone ON Customer (PhoneNumber, CustomerID);
+    CREATE INDEX ix_Customer_AddressID ON Customer (AddressID);
 
     -- 4) RECORD (no AvailableStock; BCNF)
     CREATE TABLE Record (
-        RecordID          INT           PRIMARY KEY,
+        RecordID          INT           DEFAULT ON NULL seq_Record.NEXTVAL PRIMARY KEY,
         Title             VARCHAR2(255) NOT NULL,
         Genre             VARCHAR2(100),
         DateOfPublication DATE,
@@ -172,7 +651,7 @@ def create_schema():
         CONSTRAINT fk_Record_Staff
             FOREIGN KEY (CatalogedBy)
             REFERENCES Staff(StaffID)
-    );
+    ) {storage:Record};
 
     -- 5) RECORDAUTHOR (M:N)
     CREATE TABLE RecordAuthor (
@@ -186,17 +665,21 @@ def create_schema():
         CONSTRAINT fk_RA_Author
             FOREIGN KEY (AuthorID)
             REFERENCES Author(AuthorID)
-    );
+    ) {storage:RecordAuthor};
 
     -- 6) LIBRARY INVENTORY
     CREATE TABLE LibraryInventory (
-        ItemID     INT PRIMARY KEY,
+        ItemID     INT DEFAULT ON NULL seq_LibraryInventory.NEXTVAL PRIMARY KEY,
         RecordID   INT NOT NULL,
         TotalStock INT DEFAULT 1,
+        Barcode    VARCHAR2(32),
         CONSTRAINT fk_LI_Record
             FOREIGN KEY (RecordID)
             REFERENCES Record(RecordID)
-    );
+    ) ROWDEPENDENCIES;
+    -- Desk scans: one unique-index probe per barcode
+    CREATE UNIQUE INDEX ux_LI_Barcode ON LibraryInventory (Barcode);
+    CREATE INDEX ix_LI_RecordID ON LibraryInventory (RecordID);
 
     -- 7) BOOK (subtype of Record)
     CREATE TABLE Book (
@@ -206,7 +689,8 @@ def create_schema():
         CONSTRAINT fk_Book_Record
             FOREIGN KEY (RecordID)
             REFERENCES Record(RecordID)
-    );
+    ) {storage:Book};
+    CREATE UNIQUE INDEX ux_Book_ISBN ON Book (ISBN);
 
     -- 8) EBOOK (subtype of Record)
     CREATE TABLE EBook (
@@ -216,7 +700,7 @@ def create_schema():
         CONSTRAINT fk_EBook_Record
             FOREIGN KEY (RecordID)
             REFERENCES Record(RecordID)
-    );
+    ) {storage:EBook};
 
     -- 9) DVD (subtype of Record)
     CREATE TABLE DVD (
@@ -226,52 +710,248 @@ def create_schema():
         CONSTRAINT fk_DVD_Record
             FOREIGN KEY (RecordID)
             REFERENCES Record(RecordID)
-    );
+    ) {storage:DVD};
 
     -- 10) LOANS (simplified constraints: all column-level)
     CREATE TABLE Loans (
-      loanId     NUMBER       PRIMARY KEY,
+      loanId     NUMBER       DEFAULT ON NULL seq_Loans.NEXTVAL PRIMARY KEY,
       customerId NUMBER(9)    NOT NULL REFERENCES Customer(CustomerID) ON DELETE CASCADE,
       itemId     NUMBER       NOT NULL REFERENCES LibraryInventory(ItemID) ON DELETE CASCADE,
       staffId    NUMBER       NOT NULL REFERENCES Staff(StaffID),
       loanDate   DATE         DEFAULT SYSDATE NOT NULL,
       dueDate    DATE         NOT NULL,
       overdue    CHAR(1)      DEFAULT 'N' CHECK (overdue IN ('Y','N')),
-      CHECK (dueDate > loanDate)
+      returnDate DATE,
+      CHECK (dueDate > loanDate),
+      CHECK (returnDate IS NULL OR returnDate >= loanDate)
+    ) {storage:Loans};
+    -- Loans per item (foreign key: cascaded item deletes)
+    CREATE INDEX ix_Loans_itemId ON Loans (itemId);
+    -- Loans still out: returned loans have a NULL key and are left out, so
+    -- availability and overdue checks don't grow with history
+    CREATE INDEX ix_Loans_active ON Loans (CASE WHEN returnDate IS NULL THEN itemId END);
+    CREATE INDEX ix_Loans_active_due ON Loans (CASE WHEN returnDate IS NULL THEN dueDate END);
+
+    -- 10b) HOLD (reservation queue; a9holds.py allocates copies on return)
+    CREATE TABLE Hold (
+      HoldID       NUMBER     DEFAULT ON NULL seq_Hold.NEXTVAL PRIMARY KEY,
+      RecordID     INT        NOT NULL REFERENCES Record(RecordID) ON DELETE CASCADE,
+      CustomerID   NUMBER(9)  NOT NULL REFERENCES Customer(CustomerID) ON DELETE CASCADE,
+      Priority     INT        DEFAULT 5 NOT NULL,
+      Status       CHAR(1)    DEFAULT 'W' NOT NULL CHECK (Status IN ('W','R','F','C','X')),
+      PlacedDate   DATE       DEFAULT SYSDATE NOT NULL,
+      ExpiryDate   DATE,
+      ItemID       INT        REFERENCES LibraryInventory(ItemID) ON DELETE SET NULL,
+      ReadyDate    DATE,
+      PickupByDate DATE
+    ) ROWDEPENDENCIES;
+    -- Next hold for a record is the first entry of one ix_Hold_Queue range
+    CREATE INDEX ix_Hold_Queue ON Hold (RecordID, Status, Priority, HoldID);
+    CREATE INDEX ix_Hold_Item ON Hold (ItemID, Status);
+    CREATE INDEX ix_Hold_Customer ON Hold (CustomerID, RecordID, Status);
+
+    -- 11) VIEW – RecordAvailableStock (same text as a9queries.py)
+    {record_available_stock_view};
+
+    -- 12) ROWTOMBSTONE – keys of deleted rows (GUI delta refresh).
+    --     Inserts/updates are found with ORA_ROWSCN (tables are ROWDEPENDENCIES).
+    CREATE TABLE RowTombstone (
+      TableName VARCHAR2(30)  NOT NULL,
+      PKValue   VARCHAR2(100) NOT NULL,
+      DeletedAt DATE          DEFAULT SYSDATE NOT NULL
+    ) ROWDEPENDENCIES;
+
+    CREATE OR REPLACE TRIGGER trg_Staff_tomb AFTER DELETE ON Staff FOR EACH ROW
+    BEGIN INSERT INTO RowTombstone (TableName, PKValue) VALUES ('STAFF', TO_CHAR(:OLD.StaffID)); END;
+    /
+    CREATE OR REPLACE TRIGGER trg_Author_tomb AFTER DELETE ON Author FOR EACH ROW
+    BEGIN INSERT INTO RowTombstone (TableName, PKValue) VALUES ('AUTHOR', TO_CHAR(:OLD.AuthorID)); END;
+    /
+    CREATE OR REPLACE TRIGGER trg_Address_tomb AFTER DELETE ON Address FOR EACH ROW
+    BEGIN INSERT INTO RowTombstone (TableName, PKValue) VALUES ('ADDRESS', TO_CHAR(:OLD.AddressID)); END;
+    /
+    CREATE OR REPLACE TRIGGER trg_Customer_tomb AFTER DELETE ON Customer FOR EACH ROW
+    BEGIN INSERT INTO RowTombstone (TableName, PKValue) VALUES ('CUSTOMER', TO_CHAR(:OLD.CustomerID)); END;
+    /
+    CREATE OR REPLACE TRIGGER trg_Record_tomb AFTER DELETE ON Record FOR EACH ROW
+    BEGIN INSERT INTO RowTombstone (TableName, PKValue) VALUES ('RECORD', TO_CHAR(:OLD.RecordID)); END;
+    /
+    CREATE OR REPLACE TRIGGER trg_RecordAuthor_tomb AFTER DELETE ON RecordAuthor FOR EACH ROW
+    BEGIN INSERT INTO RowTombstone (TableName, PKValue) VALUES ('RECORDAUTHOR', TO_CHAR(:OLD.RecordID) || '|' || TO_CHAR(:OLD.AuthorID)); END;
+    /
+    CREATE OR REPLACE TRIGGER trg_LibraryInventory_tomb AFTER DELETE ON LibraryInventory FOR EACH ROW
+    BEGIN INSERT INTO RowTombstone (TableName, PKValue) VALUES ('LIBRARYINVENTORY', TO_CHAR(:OLD.ItemID)); END;
+    /
+    CREATE OR REPLACE TRIGGER trg_Book_tomb AFTER DELETE ON Book FOR EACH ROW
+    BEGIN INSERT INTO RowTombstone (TableName, PKValue) VALUES ('BOOK', TO_CHAR(:OLD.RecordID)); END;
+    /
+    CREATE OR REPLACE TRIGGER trg_EBook_tomb AFTER DELETE ON EBook FOR EACH ROW
+    BEGIN INSERT INTO RowTombstone (TableName, PKValue) VALUES ('EBOOK', TO_CHAR(:OLD.RecordID)); END;
+    /
+    CREATE OR REPLACE TRIGGER trg_DVD_tomb AFTER DELETE ON DVD FOR EACH ROW
+    BEGIN INSERT INTO RowTombstone (TableName, PKValue) VALUES ('DVD', TO_CHAR(:OLD.RecordID)); END;
+    /
+    CREATE OR REPLACE TRIGGER trg_Loans_tomb AFTER DELETE ON Loans FOR EACH ROW
+    BEGIN INSERT INTO RowTombstone (TableName, PKValue) VALUES ('LOANS', TO_CHAR(:OLD.loanId)); END;
+    /
+    CREATE OR REPLACE TRIGGER trg_Hold_tomb AFTER DELETE ON Hold FOR EACH ROW
+    BEGIN INSERT INTO RowTombstone (TableName, PKValue) VALUES ('HOLD', TO_CHAR(:OLD.HoldID)); END;
+    /
+    CREATE INDEX ix_RowTombstone_Table ON RowTombstone (TableName);
+
+    -- Nightly purge; PurgedScn tells the GUI which grids must reload in full
+    CREATE TABLE RowTombstonePurge (PurgedScn NUMBER DEFAULT 0 NOT NULL);
+    INSERT INTO RowTombstonePurge (PurgedScn) VALUES (0);
+    {purge_tombstones_proc}
+    /
+    {tombstone_purge_job}
+    /
+
+    -- Phone numbers are stored as digits only (one index range per phone lookup)
+    CREATE OR REPLACE TRIGGER trg_Customer_phone BEFORE INSERT OR UPDATE OF PhoneNumber ON Customer FOR EACH ROW
+    BEGIN :NEW.PhoneNumber := REGEXP_REPLACE(:NEW.PhoneNumber, '[^0-9]', ''); END;
+    /
+
+    -- ISBNs and barcodes are stored in the form a desk scan looks up
+    {scan_code_plsql}
+    /
+
+    -- Moves the key sequences past explicit IDs (seed data, restores)
+    CREATE OR REPLACE PROCEDURE sync_sequences AS
+      -- Move a sequence past the highest key already in its table
+      -- (after seeding / restoring rows with explicit IDs).
+      PROCEDURE bump(p_seq VARCHAR2, p_table VARCHAR2, p_col VARCHAR2) IS
+        v_max  NUMBER;
+        v_next NUMBER;
+      BEGIN
+        EXECUTE IMMEDIATE 'SELECT NVL(MAX(' || p_col || '), 0) FROM ' || p_table INTO v_max;
+        EXECUTE IMMEDIATE 'SELECT ' || p_seq || '.NEXTVAL FROM dual' INTO v_next;
+        IF v_next < v_max THEN
+          EXECUTE IMMEDIATE 'ALTER SEQUENCE ' || p_seq || ' INCREMENT BY ' || (v_max - v_next);
+          EXECUTE IMMEDIATE 'SELECT ' || p_seq || '.NEXTVAL FROM dual' INTO v_next;
+          EXECUTE IMMEDIATE 'ALTER SEQUENCE ' || p_seq || ' INCREMENT BY 1';
+        END IF;
+      END;
+    BEGIN
+      bump('seq_Staff', 'Staff', 'StaffID');
+      bump('seq_Author', 'Author', 'AuthorID');
+      bump('seq_Address', 'Address', 'AddressID');
+      bump('seq_Customer', 'Customer', 'CustomerID');
+      bump('seq_Record', 'Record', 'RecordID');
+      bump('seq_LibraryInventory', 'LibraryInventory', 'ItemID');
+      bump('seq_Loans', 'Loans', 'loanId');
+      bump('seq_Hold', 'Hold', 'HoldID');
+    END;
+    /
+
+    -- 13) CATALOG PROJECTION – one row per record with authors, media type,
+    --     subtype attributes and availability. Triggers queue changed
+    --     RecordIDs in CatalogDirty; refresh_catalog rebuilds just those.
+    CREATE TABLE CatalogEntry (
+      RecordID          INT            PRIMARY KEY,
+      Title             VARCHAR2(255)  NOT NULL,
+      Genre             VARCHAR2(100),
+      DateOfPublication DATE,
+      Authors           VARCHAR2(1000),
+      MediaType         VARCHAR2(10),
+      ISBN              VARCHAR2(20),
+      Binding           VARCHAR2(50),
+      DRMType           VARCHAR2(50),
+      FileFormat        VARCHAR2(20),
+      RunTime           INT,
+      PGRating          VARCHAR2(10),
+      TotalCopies       INT  DEFAULT 0,
+      ActiveLoans       INT  DEFAULT 0,
+      AvailableStock    INT  DEFAULT 0,
+      RefreshedAt       DATE DEFAULT SYSDATE
     );
+    CREATE INDEX ix_Catalog_Title ON CatalogEntry (UPPER(Title));
+    CREATE INDEX ix_Catalog_Genre ON CatalogEntry (Genre);
 
-    -- 11) VIEW – RecordAvailableStock
-    CREATE OR REPLACE VIEW RecordAvailableStock AS
-    SELECT
-      r.RecordID,
-      r.Title,
-      r.Genre,
-      r.DateOfPublication,
-      r.CatalogedBy,
-      li.ItemID,
-      li.TotalStock                         AS TotalCopies,
-      NVL(al.active_loans, 0)               AS ActiveLoans,
-      GREATEST(li.TotalStock - NVL(al.active_loans, 0), 0)
-        AS AvailableStock
-    FROM Record r
-    JOIN LibraryInventory li
-      ON li.RecordID = r.RecordID
-    LEFT JOIN (
-      SELECT itemId, COUNT(*) AS active_loans
-      FROM Loans
-      GROUP BY itemId
-    ) al
-      ON al.itemId = li.ItemID;
+    CREATE TABLE CatalogDirty (
+      RecordID INT NOT NULL
+    );
 
-    COMMIT;
-    """
+    CREATE OR REPLACE TYPE CatalogIdList AS TABLE OF NUMBER;
+    /
+
+    -- refresh_catalog, refresh_catalog_now, queue triggers, CATALOG_REFRESH_JOB
+    {catalog_plsql}
+
+    -- 14) CIRCULATION ROLLUPS – daily summary tables for the reports menu.
+    --     Checkouts append to LoanRollupQueue (no hot rows for desks);
+    --     refresh_rollups folds the queue into the daily tables and takes
+    --     one utilization snapshot per day.
+    CREATE TABLE LoanRollupQueue (
+      customerId INT  NOT NULL,
+      itemId     INT  NOT NULL,
+      loanDay    DATE NOT NULL
+    );
 
-    print("\n[Creating schema (tables + view)...]")
+    CREATE GLOBAL TEMPORARY TABLE LoanRollupBatch (
+      customerId INT,
+      itemId     INT,
+      loanDay    DATE
+    ) ON COMMIT DELETE ROWS;
+
+    CREATE TABLE LoanDailyGenre (
+      LoanDay DATE          NOT NULL,
+      Genre   VARCHAR2(100) NOT NULL,
+      Loans   INT DEFAULT 0 NOT NULL,
+      CONSTRAINT pk_LoanDailyGenre PRIMARY KEY (LoanDay, Genre)
+    );
+
+    CREATE TABLE LoanDailyRecord (
+      LoanDay  DATE NOT NULL,
+      RecordID INT  NOT NULL,
+      Loans    INT DEFAULT 0 NOT NULL,
+      CONSTRAINT pk_LoanDailyRecord PRIMARY KEY (LoanDay, RecordID)
+    );
+
+    CREATE TABLE LoanDailyCustomer (
+      LoanDay    DATE NOT NULL,
+      CustomerID INT  NOT NULL,
+      Loans      INT DEFAULT 0 NOT NULL,
+      CONSTRAINT pk_LoanDailyCustomer PRIMARY KEY (LoanDay, CustomerID)
+    );
+
+    CREATE TABLE UtilizationDaily (
+      SnapshotDay DATE NOT NULL,
+      RecordID    INT  NOT NULL,
+      TotalCopies INT DEFAULT 0 NOT NULL,
+      ActiveLoans INT DEFAULT 0 NOT NULL,
+      CONSTRAINT pk_UtilizationDaily PRIMARY KEY (SnapshotDay, RecordID)
+    );
+
+    -- trg_Loans_rollup, refresh_rollups, ROLLUP_NIGHTLY_JOB
+    {rollup_plsql}
+
+    COMMIT;
+    """.replace("{record_available_stock_view}",
+                textwrap.indent(a9queries.view_ddl(), "    ").lstrip())
+    for name, ddl in (("scan_code_plsql", "\n/\n".join(a9queries.scan_code_plsql())),
+                      ("purge_tombstones_proc", a9queries.PURGE_TOMBSTONES_PROC),
+                      ("tombstone_purge_job", a9queries.TOMBSTONE_PURGE_JOB),
+                      ("catalog_plsql", "\n/\n".join(a9queries.catalog_plsql()) + "\n/"),
+                      ("rollup_plsql", "\n/\n".join(a9queries.rollup_plsql()) + "\n/")):
+        sql = sql.replace("{" + name + "}", textwrap.indent(ddl, "    ").lstrip())
+    sql = sql.replace("{profile_ddl}", "\n    ".join(f"{ddl};" for ddl in a9queries.profile_ddl(profile)))
+    sql = re.sub(r"\{storage:(\w+)\}", lambda m: a9queries.table_storage(m.group(1), profile), sql)
+
+    print(f"\n[Creating schema (tables + view, {profile} layout)...]")
     run_sqlplus(sql)
     print("[Create schema completed]\n")
 
 
 
+def ask_profile():
+    """Physical layout for Create Schema (ENTER = standard)."""
+    print("\nLayout: S) standard heap tables  P) performance (IOT RecordAuthor,")
+    print("        Record + subtypes clustered, Loans compressed by month)")
+    choice = input("Layout [S/p]: ").strip().lower()
+    return "performance" if choice.startswith("p") else "standard"
+
+
 def seed_data():
     sql = """
     -- 1) STAFF (1–10 so all CatalogedBy values are valid)
@@ -327,143 +1007,158 @@ def seed_data():
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (1, '1984', 'Dystopian', TO_DATE('1949-06-08','YYYY-MM-DD'), 1);
     INSERT INTO RecordAuthor VALUES (1, 1);
-    INSERT INTO LibraryInventory VALUES (101, 1, 4);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (101, 1, 4);
     INSERT INTO Book VALUES (1, '9780451524935', 'Paperback');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (2, 'Animal Farm', 'Political Satire', TO_DATE('1945-08-17','YYYY-MM-DD'), 1);
     INSERT INTO RecordAuthor VALUES (2, 1);
-    INSERT INTO LibraryInventory VALUES (102, 2, 3);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (102, 2, 3);
     INSERT INTO Book VALUES (2, '9780451526342', 'Paperback');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (3, 'Pride and Prejudice', 'Romance', TO_DATE('1813-01-28','YYYY-MM-DD'), 2);
     INSERT INTO RecordAuthor VALUES (3, 2);
-    INSERT INTO LibraryInventory VALUES (103, 3, 3);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (103, 3, 3);
     INSERT INTO Book VALUES (3, '9780141439518', 'Hardcover');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (4, 'Harry Potter and the Philosopher''s Stone', 'Fantasy', TO_DATE('1997-06-26','YYYY-MM-DD'), 3);
     INSERT INTO RecordAuthor VALUES (4, 3);
-    INSERT INTO LibraryInventory VALUES (104, 4, 5);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (104, 4, 5);
     INSERT INTO Book VALUES (4, '9780747532699', 'Hardcover');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (5, 'Harry Potter and the Chamber of Secrets', 'Fantasy', TO_DATE('1998-07-02','YYYY-MM-DD'), 3);
     INSERT INTO RecordAuthor VALUES (5, 3);
-    INSERT INTO LibraryInventory VALUES (105, 5, 4);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (105, 5, 4);
     INSERT INTO Book VALUES (5, '9780747538493', 'Paperback');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (6, 'The Hobbit', 'Fantasy', TO_DATE('1937-09-21','YYYY-MM-DD'), 4);
     INSERT INTO RecordAuthor VALUES (6, 4);
-    INSERT INTO LibraryInventory VALUES (106, 6, 3);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (106, 6, 3);
     INSERT INTO Book VALUES (6, '9780261102217', 'Hardcover');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (7, 'The Fellowship of the Ring', 'Fantasy', TO_DATE('1954-07-29','YYYY-MM-DD'), 4);
     INSERT INTO RecordAuthor VALUES (7, 4);
-    INSERT INTO LibraryInventory VALUES (107, 7, 2);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (107, 7, 2);
     INSERT INTO Book VALUES (7, '9780261102354', 'Hardcover');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (8, 'Murder on the Orient Express', 'Mystery', TO_DATE('1934-01-01','YYYY-MM-DD'), 5);
     INSERT INTO RecordAuthor VALUES (8, 5);
-    INSERT INTO LibraryInventory VALUES (108, 8, 3);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (108, 8, 3);
     INSERT INTO Book VALUES (8, '9780007119318', 'Paperback');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (9, 'The Shining', 'Horror', TO_DATE('1977-01-28','YYYY-MM-DD'), 6);
     INSERT INTO RecordAuthor VALUES (9, 6);
-    INSERT INTO LibraryInventory VALUES (109, 9, 2);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (109, 9, 2);
     INSERT INTO Book VALUES (9, '9780307743657', 'Paperback');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (10, 'IT', 'Horror', TO_DATE('1986-09-15','YYYY-MM-DD'), 6);
     INSERT INTO RecordAuthor VALUES (10, 6);
-    INSERT INTO LibraryInventory VALUES (110, 10, 2);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (110, 10, 2);
     INSERT INTO Book VALUES (10, '9781501142970', 'Paperback');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (11, 'Foundation', 'Science Fiction', TO_DATE('1951-06-01','YYYY-MM-DD'), 7);
     INSERT INTO RecordAuthor VALUES (11, 7);
-    INSERT INTO LibraryInventory VALUES (111, 11, 3);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (111, 11, 3);
     INSERT INTO Book VALUES (11, '9780553293357', 'Paperback');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (12, 'I, Robot', 'Science Fiction', TO_DATE('1950-12-02','YYYY-MM-DD'), 7);
     INSERT INTO RecordAuthor VALUES (12, 7);
-    INSERT INTO LibraryInventory VALUES (112, 12, 3);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (112, 12, 3);
     INSERT INTO Book VALUES (12, '9780553382563', 'Paperback');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (13, 'Sapiens', 'Non-Fiction', TO_DATE('2011-01-01','YYYY-MM-DD'), 2);
     INSERT INTO RecordAuthor VALUES (13, 8);
-    INSERT INTO LibraryInventory VALUES (113, 13, 4);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (113, 13, 4);
     INSERT INTO Book VALUES (13, '9780771038501', 'Paperback');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (14, 'Homo Deus', 'Non-Fiction', TO_DATE('2015-01-01','YYYY-MM-DD'), 2);
     INSERT INTO RecordAuthor VALUES (14, 8);
-    INSERT INTO LibraryInventory VALUES (114, 14, 3);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (114, 14, 3);
     INSERT INTO Book VALUES (14, '9780771038693', 'Paperback');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (15, 'Outliers', 'Non-Fiction', TO_DATE('2008-11-18','YYYY-MM-DD'), 9);
     INSERT INTO RecordAuthor VALUES (15, 9);
-    INSERT INTO LibraryInventory VALUES (115, 15, 2);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (115, 15, 2);
     INSERT INTO Book VALUES (15, '9780316017923', 'Paperback');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (16, 'The Tipping Point', 'Non-Fiction', TO_DATE('2000-03-01','YYYY-MM-DD'), 9);
     INSERT INTO RecordAuthor VALUES (16, 9);
-    INSERT INTO LibraryInventory VALUES (116, 16, 2);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (116, 16, 2);
     INSERT INTO Book VALUES (16, '9780316346627', 'Paperback');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (17, 'American Gods', 'Fantasy', TO_DATE('2001-06-19','YYYY-MM-DD'), 10);
     INSERT INTO RecordAuthor VALUES (17, 10);
-    INSERT INTO LibraryInventory VALUES (117, 17, 3);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (117, 17, 3);
     INSERT INTO Book VALUES (17, '9780380789030', 'Paperback');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (18, 'Coraline', 'Fantasy', TO_DATE('2002-08-02','YYYY-MM-DD'), 10);
     INSERT INTO RecordAuthor VALUES (18, 10);
-    INSERT INTO LibraryInventory VALUES (118, 18, 3);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (118, 18, 3);
     INSERT INTO Book VALUES (18, '9780380807345', 'Paperback');
 
     -- 5) DVD RECORDS
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (19, 'Inception', 'Sci-Fi Movie', TO_DATE('2010-07-16','YYYY-MM-DD'), 4);
     INSERT INTO RecordAuthor VALUES (19, 10);
-    INSERT INTO LibraryInventory VALUES (119, 19, 5);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (119, 19, 5);
     INSERT INTO DVD VALUES (19, 148, 'PG-13');
 
     INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy)
       VALUES (20, 'The Matrix', 'Sci-Fi Movie', TO_DATE('1999-03-31','YYYY-MM-DD'), 4);
     INSERT INTO RecordAuthor VALUES (20, 7);
-    INSERT INTO LibraryInventory VALUES (120, 20, 5);
+    INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (120, 20, 5);
     INSERT INTO DVD VALUES (20, 136, 'R');
 
     -- 6) LOANS (15 example rows)
-    INSERT INTO Loans VALUES (1, 1001, 101, 1, TO_DATE('2025-11-01','YYYY-MM-DD'), TO_DATE('2025-11-15','YYYY-MM-DD'), 'Y');
-    INSERT INTO Loans VALUES (2, 1002, 104, 2, TO_DATE('2025-11-10','YYYY-MM-DD'), TO_DATE('2025-11-24','YYYY-MM-DD'), 'N');
-    INSERT INTO Loans VALUES (3, 1003, 119, 3, TO_DATE('2025-11-12','YYYY-MM-DD'), TO_DATE('2025-11-26','YYYY-MM-DD'), 'N');
-    INSERT INTO Loans VALUES (4, 1004, 120, 4, TO_DATE('2025-11-05','YYYY-MM-DD'), TO_DATE('2025-11-19','YYYY-MM-DD'), 'Y');
-    INSERT INTO Loans VALUES (5, 1005, 113, 5, TO_DATE('2025-11-08','YYYY-MM-DD'), TO_DATE('2025-11-22','YYYY-MM-DD'), 'N');
-    INSERT INTO Loans VALUES (6, 1006, 114, 1, TO_DATE('2025-11-03','YYYY-MM-DD'), TO_DATE('2025-11-17','YYYY-MM-DD'), 'Y');
-    INSERT INTO Loans VALUES (7, 1007, 115, 2, TO_DATE('2025-11-09','YYYY-MM-DD'), TO_DATE('2025-11-23','YYYY-MM-DD'), 'N');
-    INSERT INTO Loans VALUES (8, 1008, 116, 3, TO_DATE('2025-11-11','YYYY-MM-DD'), TO_DATE('2025-11-25','YYYY-MM-DD'), 'N');
-    INSERT INTO Loans VALUES (9, 1009, 117, 4, TO_DATE('2025-11-02','YYYY-MM-DD'), TO_DATE('2025-11-16','YYYY-MM-DD'), 'Y');
-    INSERT INTO Loans VALUES (10,1010, 118, 5, TO_DATE('2025-11-04','YYYY-MM-DD'), TO_DATE('2025-11-18','YYYY-MM-DD'), 'Y');
-    INSERT INTO Loans VALUES (11,1001, 104, 1, TO_DATE('2025-11-13','YYYY-MM-DD'), TO_DATE('2025-11-27','YYYY-MM-DD'), 'N');
-    INSERT INTO Loans VALUES (12,1002, 105, 2, TO_DATE('2025-11-14','YYYY-MM-DD'), TO_DATE('2025-11-28','YYYY-MM-DD'), 'N');
-    INSERT INTO Loans VALUES (13,1003, 106, 3, TO_DATE('2025-11-06','YYYY-MM-DD'), TO_DATE('2025-11-20','YYYY-MM-DD'), 'Y');
-    INSERT INTO Loans VALUES (14,1004, 107, 4, TO_DATE('2025-11-07','YYYY-MM-DD'), TO_DATE('2025-11-21','YYYY-MM-DD'), 'N');
-    INSERT INTO Loans VALUES (15,1005, 108, 5, TO_DATE('2025-11-15','YYYY-MM-DD'), TO_DATE('2025-11-29','YYYY-MM-DD'), 'N');
+    INSERT INTO Loans VALUES (1, 1001, 101, 1, TO_DATE('2025-11-01','YYYY-MM-DD'), TO_DATE('2025-11-15','YYYY-MM-DD'), 'Y', NULL);
+    INSERT INTO Loans VALUES (2, 1002, 104, 2, TO_DATE('2025-11-10','YYYY-MM-DD'), TO_DATE('2025-11-24','YYYY-MM-DD'), 'N', NULL);
+    INSERT INTO Loans VALUES (3, 1003, 119, 3, TO_DATE('2025-11-12','YYYY-MM-DD'), TO_DATE('2025-11-26','YYYY-MM-DD'), 'N', NULL);
+    INSERT INTO Loans VALUES (4, 1004, 120, 4, TO_DATE('2025-11-05','YYYY-MM-DD'), TO_DATE('2025-11-19','YYYY-MM-DD'), 'Y', NULL);
+    INSERT INTO Loans VALUES (5, 1005, 113, 5, TO_DATE('2025-11-08','YYYY-MM-DD'), TO_DATE('2025-11-22','YYYY-MM-DD'), 'N', NULL);
+    INSERT INTO Loans VALUES (6, 1006, 114, 1, TO_DATE('2025-11-03','YYYY-MM-DD'), TO_DATE('2025-11-17','YYYY-MM-DD'), 'Y', NULL);
+    INSERT INTO Loans VALUES (7, 1007, 115, 2, TO_DATE('2025-11-09','YYYY-MM-DD'), TO_DATE('2025-11-23','YYYY-MM-DD'), 'N', NULL);
+    INSERT INTO Loans VALUES (8, 1008, 116, 3, TO_DATE('2025-11-11','YYYY-MM-DD'), TO_DATE('2025-11-25','YYYY-MM-DD'), 'N', NULL);
+    INSERT INTO Loans VALUES (9, 1009, 117, 4, TO_DATE('2025-11-02','YYYY-MM-DD'), TO_DATE('2025-11-16','YYYY-MM-DD'), 'Y', NULL);
+    INSERT INTO Loans VALUES (10,1010, 118, 5, TO_DATE('2025-11-04','YYYY-MM-DD'), TO_DATE('2025-11-18','YYYY-MM-DD'), 'Y', NULL);
+    INSERT INTO Loans VALUES (11,1001, 104, 1, TO_DATE('2025-11-13','YYYY-MM-DD'), TO_DATE('2025-11-27','YYYY-MM-DD'), 'N', NULL);
+    INSERT INTO Loans VALUES (12,1002, 105, 2, TO_DATE('2025-11-14','YYYY-MM-DD'), TO_DATE('2025-11-28','YYYY-MM-DD'), 'N', NULL);
+    INSERT INTO Loans VALUES (13,1003, 106, 3, TO_DATE('2025-11-06','YYYY-MM-DD'), TO_DATE('2025-11-20','YYYY-MM-DD'), 'Y', NULL);
+    INSERT INTO Loans VALUES (14,1004, 107, 4, TO_DATE('2025-11-07','YYYY-MM-DD'), TO_DATE('2025-11-21','YYYY-MM-DD'), 'N', NULL);
+    INSERT INTO Loans VALUES (15,1005, 108, 5, TO_DATE('2025-11-15','YYYY-MM-DD'), TO_DATE('2025-11-29','YYYY-MM-DD'), 'N', NULL);
+
+    -- Shelf labels for the seeded items (a9queries.py "assign_barcodes")
+    {assign_barcodes};
 
     COMMIT;
-    """
+
+    -- Build CatalogEntry rows for everything queued by the inserts above
+    BEGIN refresh_catalog; END;
+    /
+    -- ...and fold the seeded loans into the circulation rollups
+    BEGIN refresh_rollups('Y'); END;
+    /
+    -- Generated keys continue after the seeded IDs
+    BEGIN sync_sequences; END;
+    /
+    COMMIT;
+    """.replace("{assign_barcodes}",
+                textwrap.indent(a9queries.get("assign_barcodes").sql, "    ").lstrip())
 
     print("\n[Seeding data...]")
     run_sqlplus(sql)
@@ -479,70 +1174,31 @@ def predefined_queries():
 Predefined Queries
 -------------------------------------------
 1) Show RecordAvailableStock
-2) Show all Loans with customer + title
+2) Show current Loans with customer + title
 3) Show overdue loans only
 4) Show number of records cataloged by each staff
+5) Catalog search (title prefix or author)
+6) Availability for a list of RecordIDs / ItemIDs / ISBNs
+7) Find customer (name prefix, phone or postal code)
+8) Hold queue for a record
 B) Back to main menu
 """)
         choice = input("Choose: ").strip()
 
-        if choice == "1":
-            sql = """
-            SELECT *
-            FROM RecordAvailableStock
-            ORDER BY RecordID;
-            """
-            run_sqlplus(sql)
+        if choice in ("1", "2", "3", "4"):
+            run_report(a9queries.REPORTS[int(choice) - 1])
 
-        elif choice == "2":
-            sql = """
-            SELECT
-              l.loanId,
-              c.CustomerID,
-              c.FirstName || ' ' || c.LastName AS CustomerName,
-              r.Title,
-              l.loanDate,
-              l.dueDate,
-              l.overdue
-            FROM Loans l
-            JOIN Customer c          ON c.CustomerID = l.customerId
-            JOIN LibraryInventory li ON li.ItemID    = l.itemId
-            JOIN Record r            ON r.RecordID   = li.RecordID
-            ORDER BY l.loanId;
-            """
-            run_sqlplus(sql)
+        elif choice == "5":
+            catalog_search()
 
-        elif choice == "3":
-            sql = """
-            SELECT
-              l.loanId,
-              c.CustomerID,
-              c.FirstName || ' ' || c.LastName AS CustomerName,
-              r.Title,
-              l.loanDate,
-              l.dueDate,
-              l.overdue
-            FROM Loans l
-            JOIN Customer c          ON c.CustomerID = l.customerId
-            JOIN LibraryInventory li ON li.ItemID    = l.itemId
-            JOIN Record r            ON r.RecordID   = li.RecordID
-            WHERE l.overdue = 'Y'
-            ORDER BY l.dueDate;
-            """
-            run_sqlplus(sql)
+        elif choice == "6":
+            availability_list()
 
-        elif choice == "4":
-            sql = """
-            SELECT
-              s.StaffID,
-              s.StaffName,
-              COUNT(r.RecordID) AS RecordsCataloged
-            FROM Staff s
-            LEFT JOIN Record r ON r.CatalogedBy = s.StaffID
-            GROUP BY s.StaffID, s.StaffName
-            ORDER BY RecordsCataloged DESC, s.StaffName;
-            """
-            run_sqlplus(sql)
+        elif choice == "7":
+            find_customer()
+
+        elif choice == "8":
+            hold_queue()
 
         elif choice in ("B", "b"):
             break
@@ -555,29 +1211,467 @@ B) Back to main menu
 
 
 
+def catalog_search():
+    """
+    Look up titles in the CatalogEntry projection (one indexed table,
+    no joins). Pending catalog changes are applied first by
+    refresh_catalog_now, which commits only its own (autonomous) work.
+    """
+    term = input("Title starts with / author contains: ").strip()
+    if not term:
+        print("No search term entered.")
+        return
+
+    term = term.replace("'", "''")
+    sql = f"""
+VARIABLE term VARCHAR2(200)
+EXEC :term := '{term}'
+BEGIN refresh_catalog_now; END;
+/
+{registry_sql("catalog_search")}
+"""
+    run_query(sql)
+
+
+def find_customer():
+    """
+    Customers by last-name prefix ('Smi', 'Jane Smi', 'Smith, Ja'), phone
+    digits or postal code prefix: one indexed range, first 20 matches.
+    """
+    text = input("Name / phone / postal code: ").strip()
+    client = get_service()
+    if client is not None:
+        try:
+            columns, rows = client.customers(text)
+        except a9service.ServiceError as e:
+            print(f"ERROR (middle tier): {e}")
+            return
+        print_rows(columns, rows)
+        return
+
+    plan = a9queries.customer_search(text)
+    if plan is None:
+        print("Type at least two letters, three phone digits or a postal code prefix.")
+        return
+    name, binds = plan
+    variables = []
+    for bind, value in binds.items():
+        value = value.replace("'", "''")
+        variables.append(f"VARIABLE {bind} VARCHAR2(60)\nEXEC :{bind} := '{value}'")
+    variables = "\n".join(variables)
+    # Registry text unchanged (shared cursor with the GUI / middle tier);
+    # ROWLIMIT stops sqlplus after the first arraysize-sized fetch.
+    run_query(f"""
+{variables}
+SET ROWLIMIT {a9queries.CUSTOMER_LOOKUP_LIMIT}
+{registry_sql(name)}
+SET ROWLIMIT OFF
+""")
+
+
+def hold_queue():
+    """
+    Holds on one record: ready copies on the hold shelf, then waiting
+    holds in the order a returned copy will be handed out.
+    """
+    text = input("RecordID: ").strip()
+    if not text.isdigit():
+        print("Enter a numeric RecordID.")
+        return
+    client = get_service()
+    if client is not None:
+        try:
+            columns, rows = client.holds(int(text))
+        except a9service.ServiceError as e:
+            print(f"ERROR (middle tier): {e}")
+            return
+        print_rows(columns, rows)
+        return
+
+    run_query(f"""
+VARIABLE record_id NUMBER
+EXEC :record_id := {int(text)}
+{registry_sql("hold_queue")}
+""")
+
+
+# BATCHED AVAILABILITY (one query for a whole list of keys)
+
+AVAILABILITY_PROMPTS = {"R": "record", "I": "item", "S": "isbn"}
+
+# sqlplus can't bind a collection, so the direct path writes the keys into
+# the statement as collection constructors. Constructors take at most 999
+# arguments; longer lists are a UNION ALL of several, a few keys per line.
+KEYS_PER_CONSTRUCTOR = 999
+KEYS_PER_LINE = 20
+
+
+def inline_keys(sql: str, type_name: str, keys) -> str:
+    """Registry text with TABLE(:keys) replaced by literal collection(s) of `keys`."""
+    literals = [str(k) if isinstance(k, int) else "'" + k.replace("'", "''") + "'" for k in keys]
+    parts = []
+    for i in range(0, len(literals), KEYS_PER_CONSTRUCTOR):
+        chunk = literals[i:i + KEYS_PER_CONSTRUCTOR]
+        lines = ",\n    ".join(", ".join(chunk[j:j + KEYS_PER_LINE])
+                                for j in range(0, len(chunk), KEYS_PER_LINE))
+        parts.append(f"SELECT COLUMN_VALUE FROM TABLE({type_name}(\n    {lines}))")
+    return sql.replace("TABLE(:keys)", "(" + "\n  UNION ALL ".join(parts) + ")")
+
+
+def read_keys():
+    """Keys typed on one line, or @path to read them from a file."""
+    text = input("Keys (comma / space separated, or @file): ").strip()
+    if text.startswith("@"):
+        with open(os.path.expanduser(text[1:]), encoding="utf-8") as f:
+            return f.read()
+    return text
+
+
+def availability_list():
+    """Availability for many RecordIDs / ItemIDs / ISBNs with one query."""
+    choice = input("Key type – R) RecordID  I) ItemID  S) ISBN [R]: ").strip().upper() or "R"
+    kind = AVAILABILITY_PROMPTS.get(choice)
+    if kind is None:
+        print("Invalid key type.")
+        return
+    try:
+        keys = a9queries.availability_keys(kind, read_keys())
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        return
+    if not keys:
+        print("No keys entered.")
+        return
+
+    name, type_name = a9queries.AVAILABILITY[kind]
+    client = get_service()
+    start = time.perf_counter()
+    try:
+        if client is not None:
+            columns, rows, missing = client.availability(kind, keys)
+        else:
+            query = a9queries.get(name)
+            columns, rows = query_sqlplus(
+                f"SET ARRAYSIZE {query.arraysize}\n{inline_keys(query.sql, type_name, keys)};")
+            rows, missing = a9queries.in_key_order(kind, keys, columns, rows)
+    except (a9service.ServiceError, RuntimeError) as e:
+        print(f"ERROR: {e}")
+        return
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+    print_rows(columns, rows)
+    if missing:
+        print(f"Not found ({len(missing)}): {', '.join(map(str, missing))}")
+    print(f"[{len(keys)} key(s) in one query, {elapsed_ms:.0f} ms]")
+
+
+# CIRCULATION REPORTS (read only from the daily rollup tables)
+
+# Registry names in menu order (a9queries.ROLLUP_REPORTS). :days is the
+# window, counted back from the latest rolled-up day.
+ROLLUP_REPORTS = a9queries.ROLLUP_REPORTS
+
+REPORT_DAYS = 90
+
+
+def rollup_report(name: str, days: int):
+    """Fold queued loans into the rollups, then run one report over them."""
+    run_query(f"""
+VARIABLE days NUMBER
+EXEC :days := {int(days)}
+BEGIN refresh_rollups; END;
+/
+{registry_sql(name)}
+""")
+
+
+def rebuild_rollups():
+    """
+    Recompute the daily tables from the current Loans rows.
+    Loans deleted since they were rolled up drop out of the history.
+    """
+    sql = """
+    DELETE FROM LoanDailyGenre;
+    DELETE FROM LoanDailyRecord;
+    DELETE FROM LoanDailyCustomer;
+    DELETE FROM LoanRollupQueue;
+    INSERT INTO LoanRollupQueue (customerId, itemId, loanDay)
+    SELECT customerId, itemId, TRUNC(loanDate) FROM Loans;
+    BEGIN refresh_rollups('Y'); END;
+    /
+    COMMIT;
+    """
+    print("\n[Rebuilding circulation rollups...]")
+    run_sqlplus(sql)
+    print("[Rebuild completed]\n")
+
+
+def circulation_reports():
+    while True:
+        print("""
+-------------------------------------------
+Circulation Reports (daily rollups)
+-------------------------------------------""")
+        for n, name in enumerate(ROLLUP_REPORTS, 1):
+            print(f"{n}) {a9queries.get(name).title}")
+        print("R) Rebuild rollups from Loans")
+        print("B) Back to main menu\n")
+        choice = input("Choose: ").strip()
+
+        if choice in ("B", "b"):
+            break
+
+        if choice in ("R", "r"):
+            rebuild_rollups()
+
+        elif choice.isdigit() and 1 <= int(choice) <= len(ROLLUP_REPORTS):
+            text = input(f"Days back [{REPORT_DAYS}]: ").strip()
+            if text and not text.isdigit():
+                print("Days must be a whole number.")
+            else:
+                rollup_report(ROLLUP_REPORTS[int(choice) - 1], int(text or REPORT_DAYS))
+
+        else:
+            print("Invalid choice.")
+
+        pause()
+
+
+# SQL SCRIPTS (split with a9script, DML / PL/SQL runs batched into one block)
+
+SCRIPT_MARKER = "@@a9 "
+ELAPSED_RE = re.compile(r"^Elapsed: (\d+):(\d+):(\d+(?:\.\d+)?)")
+
+
+def script_for_sqlplus(statements, transaction=False):
+    """
+    One sqlplus script for the whole run. A PROMPT marker goes before each
+    round trip so the output can be matched back to statements. Runs of
+    DML / PL/SQL become one a9script block; the check block after it makes
+    WHENEVER SQLERROR stop the script when a statement inside it failed.
+    """
+    out = [
+        "SET PAGESIZE 100",
+        "SET LINESIZE 200",
+        "SET FEEDBACK 1",
+        "SET TIMING ON",
+        "SET SQLBLANKLINES ON",
+        "SET DEFINE OFF",
+        f"VARIABLE a9_report VARCHAR2({a9script.REPORT_SIZE})",
+        "VARIABLE a9_failed NUMBER",
+        f"WHENEVER SQLERROR EXIT FAILURE {'ROLLBACK' if transaction else 'COMMIT'}",
+    ]
+    for group in a9script.plan(statements):
+        if len(group) > 1:
+            out += [
+                f"PROMPT {SCRIPT_MARKER}batch {group[0].index}",
+                "SET TIMING OFF FEEDBACK OFF HEADING OFF",
+                a9script.batch_block(group),
+                "/",
+                "PRINT a9_report",
+                "BEGIN IF :a9_failed > 0 THEN RAISE_APPLICATION_ERROR(-20000, 'script stopped'); END IF; END;",
+                "/",
+                "SET TIMING ON FEEDBACK 1 HEADING ON",
+            ]
+            continue
+        stmt = group[0]
+        out.append(f"PROMPT {SCRIPT_MARKER}stmt {stmt.index}")
+        if stmt.kind == "sqlplus":
+            out.append(stmt.text)
+        elif stmt.is_plsql_unit:
+            out += [stmt.text, "/"]
+        else:
+            out.append(stmt.text + ";")
+    out += [f"PROMPT {SCRIPT_MARKER}end", "COMMIT;", "EXIT;"]
+    return "\n".join(out) + "\n"
+
+
+def elapsed_ms(line):
+    m = ELAPSED_RE.match(line)
+    if not m:
+        return None
+    h, mnt, sec = m.groups()
+    return ((int(h) * 60 + int(mnt)) * 60 + float(sec)) * 1000.0
+
+
+def first_error(lines):
+    for line in lines:
+        if line.startswith(("ORA-", "SP2-")):
+            return line.strip()
+    return None
+
+
+def run_script(text: str, transaction=False):
+    """
+    Run a multi-statement script in one sqlplus session and print each
+    statement's result and time, then a summary. Stops at the first error;
+    with `transaction` the whole script is rolled back on error, otherwise
+    what ran before it is committed (one COMMIT at the end either way).
+    """
+    statements = a9script.split_statements(text)
+    if not statements:
+        print("No SQL entered.")
+        return False
+    if transaction:
+        breaking = a9script.ends_transaction(statements)
+        if breaking:
+            print(f"ERROR: statement {breaking[0].index} ({a9script.summary(breaking[0].text, 40)}) "
+                  "commits on its own in Oracle; it can't be part of one transaction.")
+            return False
+
+    by_index = {s.index: s for s in statements}
+    results = {}   # index -> (result, ms)
+    error = None   # (index, message)
+    section, lines_in = None, []
+    finished = False
+    trips = 0
+
+    def close_section():
+        nonlocal error
+        if section is None:
+            return
+        kind, idx = section
+        if kind == "batch":
+            report = []
+            for line in lines_in:
+                if line.startswith(("ERROR", "ORA-", "SP2-")):
+                    break
+                if line.strip():
+                    report.append(line.rstrip())
+            done, failed = a9script.parse_report("\n".join(report))
+            for i, (rows, ms) in sorted(done.items()):
+                results[i] = ("OK" if rows is None else f"{rows} row(s)", ms)
+                print(f"[{i}] {a9script.summary(by_index[i].text)}  ->  {results[i][0]}  ({ms:.2f} ms)")
+            if failed is None and not done and first_error(lines_in):
+                failed = (idx, "batch not run: " + first_error(lines_in))
+            if failed:
+                error = failed
+                print(f"[{failed[0]}] ERROR: {failed[1]}")
+            return
+        msg = first_error(lines_in)
+        if msg:
+            error = (idx, msg)
+            return
+        ms = next((elapsed_ms(l) for l in lines_in if elapsed_ms(l) is not None), None)
+        feedback = [l.strip() for l in lines_in if l.strip() and elapsed_ms(l) is None]
+        results[idx] = (feedback[-1] if feedback else "OK", ms)
+
+    start = time.perf_counter()
+    lines = iter_sqlplus_lines(script_for_sqlplus(statements, transaction))
+    try:
+        for line in lines:
+            line = line.rstrip("\n")
+            if line.startswith(SCRIPT_MARKER):
+                close_section()
+                parts = line[len(SCRIPT_MARKER):].split()
+                if parts[0] == "end":
+                    section, finished = None, True
+                    continue
+                section, lines_in = (parts[0], int(parts[1])), []
+                trips += 1
+                if parts[0] == "stmt":
+                    print(f"\n[{parts[1]}] {a9script.summary(by_index[int(parts[1])].text)}")
+                continue
+            if section is None:
+                continue
+            lines_in.append(line)
+            if section[0] == "stmt":
+                print(line, flush=True)
+        close_section()
+    except KeyboardInterrupt:
+        print("\n(Cancelled – sqlplus stopped, uncommitted work rolled back)")
+        return False
+    finally:
+        lines.close()
+
+    if error and transaction:
+        outcome = "rolled back"
+    elif error or finished:
+        outcome = "committed"
+    else:
+        outcome = "sqlplus stopped early"
+    elapsed = (time.perf_counter() - start) * 1000.0
+
+    print("\n--- Script summary " + "-" * 45)
+    rows = []
+    for stmt in statements:
+        if stmt.index in results:
+            result, ms = results[stmt.index]
+        elif error and stmt.index == error[0]:
+            result, ms = "ERROR: " + error[1], None
+        else:
+            result, ms = "not run", None
+        rows.append([str(stmt.index), a9script.summary(stmt.text, 50), result,
+                     "" if ms is None else f"{ms:.2f}"])
+    table = TableFormatter(["#", "Statement", "Result", "ms"], rows, max_width=50)
+    table.print_header()
+    for row in rows:
+        print(table.format(row))
+    print(f"\n{len(results)}/{len(statements)} statement(s) in {trips} round trip(s), "
+          f"{elapsed:.0f} ms total (incl. sqlplus start), {outcome}.")
+    return error is None and finished
+
+
+def read_script():
+    """
+    Read statements from the terminal: ends at a line holding only '.', or at
+    an empty line when no PL/SQL block is open. '@file.sql' loads a file.
+    """
+    lines = []
+    while True:
+        line = input("SQL> " if not lines else f"{len(lines) + 1:>3}  ")
+        if not lines and line.strip().startswith("@"):
+            path = line.strip()[1:].strip()
+            try:
+                with open(path, encoding="utf-8") as f:
+                    return f.read()
+            except OSError as e:
+                print(f"ERROR: can't read {path}: {e}")
+                return ""
+        if line.strip() == ".":
+            break
+        if not line.strip():
+            if not lines:
+                break
+            statements = a9script.split_statements("\n".join(lines))
+            if not (statements and statements[-1].is_plsql_unit and lines[-1].strip() != "/"):
+                break
+        lines.append(line)
+    return "\n".join(lines)
+
+
 def manual_sql():
     print("""
 -------------------------------------------
 Manual SQL Console (sqlplus via Python)
 -------------------------------------------
-Enter a single SQL statement (without the trailing ';').
-It will be executed via sqlplus and the output printed.
+Enter one statement or a whole script (';' ends SQL statements,
+'/' on its own line ends PL/SQL blocks). Finish with an empty line
+or '.', or type @file.sql to run a file.
+
+Runs of INSERT / UPDATE / DELETE / PL/SQL are sent as one block per
+round trip; each statement's result and time is shown at the end.
 
 Examples:
   SELECT * FROM Staff;
-  SELECT * FROM RecordAvailableStock;
+  UPDATE Loans SET overdue = 'Y' WHERE dueDate < SYSDATE;
+  BEGIN refresh_catalog_now; END;
+  /
 
 Leave empty and press ENTER to return to main menu.
 """)
-    stmt = input("SQL> ").strip()
-    if not stmt:
+    text = read_script()
+    statements = a9script.split_statements(text)
+    if not statements:
         print("No SQL entered. Returning to main menu.")
         return
 
-    if not stmt.endswith(";"):
-        stmt = stmt + ";"
+    if len(statements) == 1 and statements[0].kind == "query":
+        run_query(statements[0].text + ";")
+        return
 
-    run_sqlplus(stmt)
+    answer = input("Run as one transaction (all or nothing)? [y/N]: ").strip().lower()
+    run_script(text, transaction=(answer == "y"))
 
 
 def view_manual():
@@ -604,6 +1698,7 @@ Main Menu - Library DBMS (BCNF/3NF)
   3) Seed Data
   4) Run Predefined Demo Queries
   5) Manual SQL Query
+  6) Circulation Reports (rollups)
 
   E) End/Exit
 -----------------------------------------------------------------
@@ -618,7 +1713,7 @@ Main Menu - Library DBMS (BCNF/3NF)
             pause()
 
         elif choice == "2":
-            create_schema()
+            create_schema(ask_profile())
             pause()
 
         elif choice == "3":
@@ -632,6 +1727,9 @@ Main Menu - Library DBMS (BCNF/3NF)
             manual_sql()
             pause()
 
+        elif choice == "6":
+            circulation_reports()
+
         elif choice in ("E", "e"):
             print("Exiting...")
             break
@@ -641,9 +1739,42 @@ Main Menu - Library DBMS (BCNF/3NF)
             pause()
 
 
-if __name__ == "__main__":
+def main():
+    parser = argparse.ArgumentParser(description="Library DBMS – Oracle CLI (sqlplus)")
+    parser.add_argument("--query", help="run one query non-interactively and exit")
+    parser.add_argument("--csv", action="store_true", help="with --query: print plain CSV instead of a table")
+    parser.add_argument("--script", help="run a SQL script file ('-' = stdin) non-interactively and exit")
+    parser.add_argument("--transaction", action="store_true", help="with --script: all or nothing")
+    args = parser.parse_args()
+
+    if args.script:
+        if args.script == "-":
+            text = sys.stdin.read()
+        else:
+            with open(args.script, encoding="utf-8") as f:
+                text = f.read()
+        sys.exit(0 if run_script(text, transaction=args.transaction) else 1)
+
+    if args.query:
+        if not args.csv:
+            page_query(args.query, interactive=False)
+            return
+        parsed = stream_query(args.query)
+        try:
+            write_csv(next(parsed), parsed)
+        except RuntimeError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        finally:
+            parsed.close()
+        return
+
     print_banner()
     try:
         main_menu()
     except KeyboardInterrupt:
         print("\n(Interrupted by user)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+#Wafee Rahman , Richie Au , Umair Ansar
+
+"""
+Library DBMS – chunked checksum diff between two library databases
+
+- Each table is split into primary-key ranges of about CHUNK_ROWS rows.
+  The servers compute COUNT(*) and two ORA_HASH sums per chunk
+  (one GROUP BY query per segment of SEGMENT_CHUNKS chunks), so a few
+  numbers per chunk cross the wire, not the rows.
+
+- Segments are checked by a pool of workers, each with its own
+  connection to both databases.
+
+- A chunk whose count or sums differ is split FANOUT ways and checked
+  again, down to ranges of ROW_RANGE keys; there the per-row hashes are
+  compared and every row only on one side, or different on both sides,
+  is reported (the first --show of them column by column).
+
+- Oracle sides are read AS OF one SCN each, so desks can keep working
+  while the comparison runs. Both sides must be the same kind: two
+  stand-in files or two Oracle schemas built from the same DDL.
+
+- Usage:
+    python a9compare.py training.db restored.db
+    python a9compare.py 'oracle:user/pass@prod:1521/XE' 'oracle:user/pass@train:1521/XE'
+  Exit status 0 = identical, 1 = differences, 2 = could not compare.
+"""
+
+import argparse
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import a9backup
+import a9load
+import a9service
+import a9standin
+
+
+CHUNK_ROWS = 10000     # rows per top-level chunk (estimated from key range and count)
+SEGMENT_CHUNKS = 16    # chunks per worker task (one GROUP BY query per side)
+FANOUT = 16            # sub-ranges per mismatched chunk on the way down
+ROW_RANGE = 256        # ranges this narrow are compared row by row
+WORKERS = 4
+SHOW = 20              # differing rows shown column by column
+HASH_MAX = 4294967295  # ORA_HASH max_bucket: full 32 bits
+
+# Primary-key columns per table; the leading one is chunked on
+TABLE_KEYS = a9service.TABLE_KEYS
+assert sorted(TABLE_KEYS) == sorted(a9standin.TABLES)
+
+
+
+# SIDES
+
+class Side:
+    """One of the two databases: connection factory, dialect, snapshot SCN."""
+
+    def __init__(self, spec):
+        if spec.startswith("oracle:"):
+            self.factory = a9load.oracle_factory(spec[len("oracle:"):])
+            self.dialect = "oracle"
+            self.label = "oracle:" + spec.rpartition("@")[2]
+        else:
+            if not os.path.exists(spec):
+                raise FileNotFoundError(f"no stand-in database at {spec}")
+            self.factory = a9load.standin_factory(spec)
+            self.dialect = "sqlite"
+            self.label = spec
+        self.scn = None
+        self.lock = threading.Lock()
+        self.queries = 0
+        self.fetched = 0
+
+    def source(self, table):
+        """FROM clause for `table`: AS OF the snapshot SCN on Oracle."""
+        return f"{table} AS OF SCN {int(self.scn)}" if self.scn is not None else table
+
+    def query(self, conn, sql, binds=None):
+        cur = conn.cursor()
+        try:
+            cur.arraysize = 1000
+            cur.execute(sql, binds or {})
+            rows = cur.fetchall()
+        finally:
+            cur.close()
+        with self.lock:
+            self.queries += 1
+            self.fetched += len(rows)
+        return rows
+
+
+def row_expr(dialect, columns):
+    """One text value per row for ORA_HASH (NULLs as '', dates to the second)."""
+    parts = []
+    for name, is_date in columns:
+        if dialect == "oracle":
+            parts.append(f"TO_CHAR({name}, '{a9backup.ORACLE_DATE_FORMAT}')" if is_date else name)
+        else:
+            parts.append(f"COALESCE({name}, '')")
+    return " || '|' || ".join(parts)
+
+
+def bucket_expr(dialect, key):
+    """Chunk number of a row within [lo, ...) for GROUP BY."""
+    if dialect == "oracle":
+        return f"TRUNC(({key} - :lo) / :width)"
+    return f"(({key} - :lo) / :width)"  # integer division in sqlite
+
+
+
+# CHECKSUMS
+
+def chunk_sums(side, conn, ctx, lo, hi, width):
+    """{chunk number: (rows, hash sum 0, hash sum 1)} for [lo, hi) in chunks of `width` keys."""
+    key, expr = ctx["key"], ctx["expr"]
+    bucket = bucket_expr(side.dialect, key)
+    # Inline view: Oracle won't match a bind in both the select list and GROUP BY
+    rows = side.query(conn, f"""
+        SELECT chunk, COUNT(*), SUM(h0), SUM(h1)
+        FROM (
+          SELECT {bucket} AS chunk,
+                 ORA_HASH({expr}, {HASH_MAX}, 0) AS h0,
+                 ORA_HASH({expr}, {HASH_MAX}, 1) AS h1
+          FROM {side.source(ctx['table'])}
+          WHERE {key} >= :lo AND {key} < :hi
+        ) c
+        GROUP BY chunk
+    """, {"lo": lo, "hi": hi, "width": width})
+    return {int(b): (int(n), int(s0), int(s1)) for b, n, s0, s1 in rows}
+
+
+def row_hashes(side, conn, ctx, lo, hi):
+    """{primary key tuple: (hash 0, hash 1)} for every row in [lo, hi)."""
+    key, expr = ctx["key"], ctx["expr"]
+    rows = side.query(conn, f"""
+        SELECT {', '.join(ctx['keys'])},
+               ORA_HASH({expr}, {HASH_MAX}, 0),
+               ORA_HASH({expr}, {HASH_MAX}, 1)
+        FROM {side.source(ctx['table'])}
+        WHERE {key} >= :lo AND {key} < :hi
+    """, {"lo": lo, "hi": hi})
+    n = len(ctx["keys"])
+    return {tuple(r[:n]): tuple(r[n:]) for r in rows}
+
+
+def mismatched_chunks(left, right, lconn, rconn, ctx, lo, hi, width):
+    """[(chunk lo, chunk hi), ...] whose count or sums differ between the sides."""
+    a = chunk_sums(left, lconn, ctx, lo, hi, width)
+    b = chunk_sums(right, rconn, ctx, lo, hi, width)
+    bad = []
+    for bucket in sorted(set(a) | set(b)):
+        if a.get(bucket) != b.get(bucket):
+            c_lo = lo + bucket * width
+            bad.append((c_lo, min(c_lo + width, hi)))
+    return bad
+
+
+def drill(left, right, lconn, rconn, ctx, lo, hi):
+    """Narrow a mismatched range down to rows: [(key tuple, status), ...]."""
+    if hi - lo <= ROW_RANGE:
+        a = row_hashes(left, lconn, ctx, lo, hi)
+        b = row_hashes(right, rconn, ctx, lo, hi)
+        diffs = []
+        for key in sorted(set(a) | set(b)):
+            if key not in b:
+                diffs.append((key, "only in left"))
+            elif key not in a:
+                diffs.append((key, "only in right"))
+            elif a[key] != b[key]:
+                diffs.append((key, "differs"))
+        return diffs
+    width = math.ceil((hi - lo) / FANOUT)
+    diffs = []
+    for c_lo, c_hi in mismatched_chunks(left, right, lconn, rconn, ctx, lo, hi, width):
+        diffs.extend(drill(left, right, lconn, rconn, ctx, c_lo, c_hi))
+    return diffs
+
+
+def check_segment(left, right, ctx, lo, hi, width):
+    """One worker task: checksum a segment, drill into its bad chunks. Returns (bad chunks, diffs)."""
+    lconn, rconn = left.factory(), right.factory()
+    try:
+        bad = mismatched_chunks(left, right, lconn, rconn, ctx, lo, hi, width)
+        diffs = []
+        for c_lo, c_hi in bad:
+            diffs.extend(drill(left, right, lconn, rconn, ctx, c_lo, c_hi))
+        return len(bad), diffs
+    finally:
+        lconn.close()
+        rconn.close()
+
+
+
+# PLANNING
+
+def key_stats(side, conn, table, key):
+    count, lo, hi = side.query(conn, f"SELECT COUNT(*), MIN({key}), MAX({key}) FROM {side.source(table)}")[0]
+    return int(count), lo, hi
+
+
+def plan_table(left, right, lconn, rconn, table, chunk_rows=CHUNK_ROWS):
+    """Context + segments for one table; segments are (lo, hi, chunk width) key ranges."""
+    keys = TABLE_KEYS[table]
+    key = keys[0]
+    lcols = a9backup.table_columns(lconn, left.dialect, table)
+    rcols = a9backup.table_columns(rconn, right.dialect, table)
+    rnames = {name for name, _ in rcols}
+    columns = [c for c in lcols if c[0] in rnames]
+    ctx = {
+        "table": table,
+        "key": key,
+        "keys": keys,
+        "columns": [name for name, _ in columns],
+        "expr": row_expr(left.dialect, columns),
+        "column_drift": sorted({n for n, _ in lcols} ^ rnames),
+    }
+
+    lcount, llo, lhi = key_stats(left, lconn, table, key)
+    rcount, rlo, rhi = key_stats(right, rconn, table, key)
+    ctx["rows"] = (lcount, rcount)
+    bounds = [v for v in (llo, lhi, rlo, rhi) if v is not None]
+    if not bounds:
+        return ctx, []
+    lo, hi = int(min(bounds)), int(max(bounds)) + 1
+    rows = max(lcount, rcount, 1)
+    width = max(1, math.ceil((hi - lo) * chunk_rows / rows))
+    ctx["chunks"] = math.ceil((hi - lo) / width)
+    step = width * SEGMENT_CHUNKS
+    return ctx, [(s, min(s + step, hi), width) for s in range(lo, hi, step)]
+
+
+def snapshot(side):
+    if side.dialect != "oracle":
+        return
+    conn = side.factory()
+    try:
+        side.scn = a9backup.snapshot_scn(conn)
+    finally:
+        conn.close()
+
+
+
+# ROW DETAIL
+
+def fetch_row(side, conn, ctx, key):
+    where = " AND ".join(f"{k} = :k{i}" for i, k in enumerate(ctx["keys"]))
+    rows = side.query(conn, f"SELECT {', '.join(ctx['columns'])} FROM {side.source(ctx['table'])} WHERE {where}",
+                      {f"k{i}": v for i, v in enumerate(key)})
+    return rows[0] if rows else None
+
+
+def describe(left, right, ctx, diffs, limit):
+    """Column-level lines for the first `limit` differing rows of one table."""
+    lines = []
+    lconn, rconn = left.factory(), right.factory()
+    try:
+        for key, status in diffs[:limit]:
+            name = ", ".join(f"{k}={v}" for k, v in zip(ctx["keys"], key))
+            if status != "differs":
+                lines.append(f"  {ctx['table']} {name}: {status}")
+                continue
+            a, b = fetch_row(left, lconn, ctx, key), fetch_row(right, rconn, ctx, key)
+            changed = [f"{col} {x!r} | {y!r}" for col, x, y in zip(ctx["columns"], a, b) if x != y]
+            lines.append(f"  {ctx['table']} {name}: differs – {'; '.join(changed) or '(formatting only)'}")
+    finally:
+        lconn.close()
+        rconn.close()
+    return lines
+
+
+
+# COMPARE
+
+def run_compare(left, right, tables=None, workers=WORKERS, chunk_rows=CHUNK_ROWS, show=SHOW, quiet=False):
+    """Compare every table; returns {table: {"rows", "chunks", "bad_chunks", "diffs", "seconds"}}."""
+    if left.dialect != right.dialect:
+        raise ValueError(f"cannot compare {left.dialect} with {right.dialect}: ORA_HASH values differ")
+    tables = tables or a9standin.TABLES
+    snapshot(left)
+    snapshot(right)
+    if not quiet:
+        print(f"[Comparing {left.label} (left) with {right.label} (right): {len(tables)} table(s), "
+              f"{workers} worker(s), ~{chunk_rows:,} rows per chunk]")
+
+    start = time.perf_counter()
+    lconn, rconn = left.factory(), right.factory()
+    try:
+        plans = [plan_table(left, right, lconn, rconn, t, chunk_rows) for t in tables]
+    finally:
+        lconn.close()
+        rconn.close()
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for ctx, segments in plans:
+            results[ctx["table"]] = {"ctx": ctx, "bad_chunks": 0, "diffs": [], "pending": len(segments),
+                                     "started": time.perf_counter(), "seconds": 0.0}
+            for lo, hi, width in segments:
+                futures[pool.submit(check_segment, left, right, ctx, lo, hi, width)] = ctx["table"]
+            if not segments and not quiet:
+                print_table(results[ctx["table"]])
+        for future in as_completed(futures):
+            result = results[futures[future]]
+            bad, diffs = future.result()
+            result["bad_chunks"] += bad
+            result["diffs"].extend(diffs)
+            result["pending"] -= 1
+            if not result["pending"]:
+                result["seconds"] = time.perf_counter() - result["started"]
+                result["diffs"].sort()
+                if not quiet:
+                    print_table(result)
+
+    elapsed = time.perf_counter() - start
+    if not quiet:
+        print_summary(left, right, results, elapsed, show)
+    return results
+
+
+def print_table(result):
+    ctx = result["ctx"]
+    lrows, rrows = ctx["rows"]
+    counts = {}
+    for _, status in result["diffs"]:
+        counts[status] = counts.get(status, 0) + 1
+    detail = ", ".join(f"{n} {s}" for s, n in counts.items()) or "identical"
+    print(f"  {ctx['table']:<17}{lrows:>12,} |{rrows:>12,} rows {ctx.get('chunks', 0):>6} chunk(s) "
+          f"{result['bad_chunks']:>5} differ {result['seconds']:>7.2f}s  {detail}", flush=True)
+    if ctx["column_drift"]:
+        print(f"  {'':<17}columns on one side only (not compared): {', '.join(ctx['column_drift'])}")
+
+
+def print_summary(left, right, results, elapsed, show):
+    rows = sum(sum(r["ctx"]["rows"]) for r in results.values())
+    fetched = left.fetched + right.fetched
+    queries = left.queries + right.queries
+    differing = {t: r for t, r in results.items() if r["diffs"] or r["ctx"]["column_drift"]}
+    print(f"[Done in {elapsed:.1f}s: {len(differing)} table(s) differ, "
+          f"{sum(len(r['diffs']) for r in results.values()):,} row(s); "
+          f"{queries:,} queries fetched {fetched:,} checksum rows for {rows:,} table rows]")
+    for table, result in differing.items():
+        if result["diffs"]:
+            for line in describe(left, right, result["ctx"], result["diffs"], show):
+                print(line)
+            if len(result["diffs"]) > show:
+                print(f"  {table}: ... {len(result['diffs']) - show:,} more")
+
+
+
+# COMMAND LINE
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chunked checksum diff between two library databases.")
+    parser.add_argument("left", help="stand-in file, or oracle:user/pass@dsn")
+    parser.add_argument("right", help="stand-in file, or oracle:user/pass@dsn")
+    parser.add_argument("--tables", default=None, help="comma-separated tables (default all of them)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="segments checked in parallel")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="rows per top-level chunk")
+    parser.add_argument("--show", type=int, default=SHOW, help="differing rows shown per table")
+    args = parser.parse_args(argv)
+
+    tables = None
+    if args.tables:
+        by_upper = {t.upper(): t for t in a9standin.TABLES}
+        try:
+            tables = [by_upper[t.strip().upper()] for t in args.tables.split(",") if t.strip()]
+        except KeyError as e:
+            parser.error(f"unknown table {e.args[0]}")
+
+    try:
+        left, right = Side(args.left), Side(args.right)
+        results = run_compare(left, right, tables, workers=args.workers,
+                              chunk_rows=args.chunk, show=args.show)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        return 2
+    same = all(not r["diffs"] and not r["ctx"]["column_drift"] for r in results.values())
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,22 @@
+import queue
+import threading
+import time
 import tkinter as tk
+from array import array
 from tkinter import ttk, messagebox
 import cx_Oracle
 
+import a9holds
+import a9queries
+import a9script
+import a9service
+from a9rowstore import ColumnStore
+
 
 # CPS510 – Library DBMS GUI
 #   Schema in 3NF / BCNF with:
 #   Staff, Author, Address, Customer, Record, RecordAuthor,
-#   LibraryInventory, Book, EBook, DVD, Loans, RecordAvailableStock
+#   LibraryInventory, Book, EBook, DVD, Loans, Hold, RecordAvailableStock
 #
 #   Wafee Rahman, Richie Au, Umair Ansar
 
@@ -15,6 +25,28 @@ connection = None
 cursor = None
 oracle_client_initialized = False  # ensure init_oracle_client only once
 
+# Connection health: background ping (doubles as idle keepalive), a quick
+# ping before actions after idle time, reconnect with backoff.
+PING_INTERVAL_MS = 15000
+PING_TIMEOUT_MS = 5000      # call_timeout while pinging, so a dead link can't hang the UI
+ACTION_PING_AFTER_S = 5     # ping before a button action if idle this long
+RECONNECT_BACKOFF_S = [1, 2, 5, 10, 30]
+RECONNECT_POLL_MS = 100     # how often the UI checks on a reconnect running in a worker
+
+# Replayed on every (re)connect
+SESSION_SETUP = [
+    "ALTER SESSION SET NLS_DATE_FORMAT = 'YYYY-MM-DD'",
+]
+
+connect_params = None       # cx_Oracle.connect kwargs, kept for reconnects
+service = None              # a9service.ServiceClient when logged in through the middle tier
+conn_state = "disconnected" # connected / reconnecting / disconnected
+last_round_trip = 0.0       # time.monotonic() of the last successful round trip
+reconnect_attempt = 0
+reconnect_after_id = None
+reconnect_running = False   # a worker thread is inside cx_Oracle.connect
+reconnect_results = queue.Queue()  # (conn, cursor) or the cx_Oracle.Error, from the worker
+
 TABLE_NAMES = [
     "STAFF",
     "AUTHOR",
@@ -27,12 +59,65 @@ TABLE_NAMES = [
     "EBOOK",
     "DVD",
     "LOANS",
+    "HOLD",
     "RECORDAVAILABLESTOCK",  # view
+    "CATALOGENTRY",          # catalog projection (maintained by triggers)
 ]
 
+# Shown in Browse but never edited directly
+READ_ONLY_TABLES = {"RECORDAVAILABLESTOCK", "CATALOGENTRY"}
+
+# Base tables with change tracking: ORA_ROWSCN (tables are ROWDEPENDENCIES)
+# for inserts/updates, RowTombstone (filled by triggers) for deletes.
+# Value = primary-key columns; a row's key is their values joined with '|'.
+TRACKED_TABLES = {
+    "Staff": ["StaffID"],
+    "Author": ["AuthorID"],
+    "Address": ["AddressID"],
+    "Customer": ["CustomerID"],
+    "Record": ["RecordID"],
+    "RecordAuthor": ["RecordID", "AuthorID"],
+    "LibraryInventory": ["ItemID"],
+    "Book": ["RecordID"],
+    "EBook": ["RecordID"],
+    "DVD": ["RecordID"],
+    "Loans": ["loanId"],
+    "Hold": ["HoldID"],
+}
+
+# Surrogate keys: table -> (sequence, key column). Key columns default to
+# seq.NEXTVAL, so Add Row can leave them blank and read the ID back.
+SEQUENCES = {
+    "Staff": ("seq_Staff", "StaffID"),
+    "Author": ("seq_Author", "AuthorID"),
+    "Address": ("seq_Address", "AddressID"),
+    "Customer": ("seq_Customer", "CustomerID"),
+    "Record": ("seq_Record", "RecordID"),
+    "LibraryInventory": ("seq_LibraryInventory", "ItemID"),
+    "Loans": ("seq_Loans", "loanId"),
+    "Hold": ("seq_Hold", "HoldID"),
+}
+SEQUENCE_CACHE = {"Loans": 1000}  # others use 100
+
 current_table = None
 current_columns = []  # column names in the table Treeview
 
+# Loaded rows live in a columnar store; the grid shows `current_view`
+# (row indices into the store) so sort / filter never re-query.
+current_store = None
+current_view = None
+grid_shown = 0       # rows currently in the Treeview (current_view[:grid_shown])
+sort_column = None
+sort_reverse = False
+GRID_MAX_ROWS = 20000  # rows rendered into the Treeview at once
+FETCH_BATCH = 1000
+filter_after_id = None  # pending debounced quick-filter callback
+
+# Delta refresh state for the loaded table
+current_scn = None   # SCN the grid is current as of (None = no delta refresh)
+current_keys = {}    # row key -> store row index
+current_key_idx = [] # positions of the key columns in current_columns
+
 
 
 # STATUS + LOG
@@ -64,7 +149,7 @@ def show_login_dialog(root):
 
     dlg = tk.Toplevel(root)
     dlg.title("Oracle Login")
-    dlg.geometry("350x250")
+    dlg.geometry("350x290")
     dlg.resizable(False, False)
     dlg.transient(root)
     dlg.grab_set()
@@ -72,7 +157,7 @@ def show_login_dialog(root):
     # Center the dialog over root
     root.update_idletasks()
     x = root.winfo_x() + (root.winfo_width() // 2) - 175
-    y = root.winfo_y() + (root.winfo_height() // 2) - 125
+    y = root.winfo_y() + (root.winfo_height() // 2) - 145
     dlg.geometry(f"+{x}+{y}")
 
     # Fields
@@ -101,9 +186,33 @@ def show_login_dialog(root):
         row=5, column=0, columnspan=2, pady=4
     )
 
+    # Optional: go through a9service.py instead of opening an Oracle session
+    tk.Label(dlg, text="Middle tier URL:").grid(row=6, column=0, sticky="e", padx=8, pady=4)
+    service_var = tk.StringVar(value="")
+    tk.Entry(dlg, textvariable=service_var, width=25).grid(row=6, column=1, padx=8, pady=4)
+
     def do_connect():
         nonlocal dlg
-        global connection, cursor, oracle_client_initialized
+        global connection, cursor, oracle_client_initialized, service
+
+        url = service_var.get().strip()
+        if url:
+            client = a9service.ServiceClient(url)
+            try:
+                health = client.health()
+            except a9service.ServiceError as e:
+                messagebox.showerror("Connection Error", str(e))
+                set_status("Connection failed")
+                log("Middle tier unreachable: " + str(e))
+                return
+            service = client
+            conn_var.set(f"● Middle tier ({health['dialect']})")
+            set_status(f"Connected via middle tier {client.base_url}")
+            log(f"Using middle tier {client.base_url} (pool of {health['pool_size']}). "
+                "Browse & Edit go through it; Schema, SQL Console and Reports need a direct login.")
+            dlg.grab_release()
+            dlg.destroy()
+            return
 
         user = user_var.get().strip()
         pwd = pwd_var.get()
@@ -138,11 +247,8 @@ def show_login_dialog(root):
             if sysdba_var.get():
                 connect_kwargs["mode"] = cx_Oracle.SYSDBA
 
-            conn = cx_Oracle.connect(**connect_kwargs)
-            cur = conn.cursor()
-
-            connection = conn
-            cursor = cur
+            open_connection(connect_kwargs)
+            start_health_checks()
 
             set_status(f"Connected as {user}@{host}/{svc}")
             log("Connected to Oracle, version: " + connection.version)
@@ -156,13 +262,13 @@ def show_login_dialog(root):
 
     def on_cancel():
         # If no connection yet and user cancels, close the whole app
-        if connection is None:
+        if connection is None and service is None:
             root.destroy()
         dlg.grab_release()
         dlg.destroy()
 
     btn_frame = tk.Frame(dlg)
-    btn_frame.grid(row=6, column=0, columnspan=2, pady=10)
+    btn_frame.grid(row=7, column=0, columnspan=2, pady=10)
 
     tk.Button(btn_frame, text="Connect", command=do_connect, width=10).pack(side="left", padx=5)
     tk.Button(btn_frame, text="Cancel", command=on_cancel, width=10).pack(side="left", padx=5)
@@ -172,44 +278,283 @@ def show_login_dialog(root):
 
 
 
+# CONNECTION HEALTH (ping / keepalive / reconnect)
+
+def connect_session(params):
+    """Connect with `params` and replay SESSION_SETUP; touches no UI, so it can run in a worker."""
+    conn = cx_Oracle.connect(threaded=True, **params)
+    try:
+        conn.module = "a9gui"
+        conn.client_identifier = params["user"]
+        cur = conn.cursor()
+        for stmt in SESSION_SETUP:
+            cur.execute(stmt)
+    except cx_Oracle.Error:
+        conn.close()
+        raise
+    return conn, cur
+
+
+def open_connection(params):
+    """Connect with `params` and swap in the new connection + cursor."""
+    install_connection(*connect_session(params), params)
+
+
+def install_connection(conn, cur, params):
+    """Make conn / cur the session every action uses (UI thread only)."""
+    global connection, cursor, connect_params, last_round_trip
+
+    old = connection
+    connection = conn
+    cursor = cur
+    connect_params = params
+    last_round_trip = time.monotonic()
+    set_conn_state("connected")
+
+    if old is not None:
+        try:
+            old.close()
+        except cx_Oracle.Error:
+            pass
+
+
+def set_conn_state(state, rtt_ms=None):
+    global conn_state
+    conn_state = state
+    if state == "connected" and rtt_ms is not None:
+        conn_var.set(f"● Connected  {rtt_ms:.1f} ms")
+    elif state == "connected":
+        conn_var.set("● Connected")
+    elif state == "reconnecting":
+        conn_var.set(f"○ Reconnecting (attempt {reconnect_attempt})…")
+    else:
+        conn_var.set("○ Disconnected")
+
+
+def ping():
+    """One lightweight round trip; returns milliseconds or None if the link is down."""
+    global last_round_trip
+    if connection is None:
+        return None
+    try:
+        connection.call_timeout = PING_TIMEOUT_MS
+        start = time.perf_counter()
+        connection.ping()
+        rtt_ms = (time.perf_counter() - start) * 1000.0
+    except cx_Oracle.Error:
+        return None
+    finally:
+        try:
+            connection.call_timeout = 0
+        except cx_Oracle.Error:
+            pass
+    last_round_trip = time.monotonic()
+    return rtt_ms
+
+
+def start_health_checks():
+    root.after(PING_INTERVAL_MS, health_check)
+
+
+def health_check():
+    """Periodic ping; keeps idle sessions alive and notices drops early."""
+    if conn_state == "connected":
+        rtt_ms = ping()
+        if rtt_ms is None:
+            connection_lost("ping failed")
+        else:
+            set_conn_state("connected", rtt_ms)
+    root.after(PING_INTERVAL_MS, health_check)
+
+
+def connection_lost(reason):
+    global reconnect_attempt
+    if conn_state == "reconnecting":
+        return
+    log(f"Connection lost ({reason}); reconnecting...")
+    reconnect_attempt = 0
+    set_conn_state("reconnecting")
+    schedule_reconnect()
+
+
+def schedule_reconnect():
+    global reconnect_after_id
+    delay = RECONNECT_BACKOFF_S[min(reconnect_attempt, len(RECONNECT_BACKOFF_S) - 1)]
+    reconnect_after_id = root.after(int(delay * 1000), try_reconnect)
+
+
+def try_reconnect():
+    """
+    Start one reconnect attempt in a worker thread (a connect to a dead host
+    can block for minutes, so never on the Tk thread); poll_reconnect installs
+    the new session or schedules the next attempt with a longer delay.
+    """
+    global reconnect_attempt, reconnect_after_id, reconnect_running
+    if reconnect_after_id is not None:
+        root.after_cancel(reconnect_after_id)  # called directly by an action
+        reconnect_after_id = None
+    if reconnect_running:
+        return
+    reconnect_attempt += 1
+    reconnect_running = True
+    set_conn_state("reconnecting")
+    threading.Thread(target=reconnect_worker, args=(connect_params,), daemon=True).start()
+    root.after(RECONNECT_POLL_MS, poll_reconnect)
+
+
+def reconnect_worker(params):
+    """Runs off the UI thread; reports through reconnect_results only."""
+    try:
+        reconnect_results.put(connect_session(params))
+    except cx_Oracle.Error as e:
+        reconnect_results.put(e)
+
+
+def poll_reconnect():
+    global reconnect_attempt, reconnect_running
+    try:
+        result = reconnect_results.get_nowait()
+    except queue.Empty:
+        root.after(RECONNECT_POLL_MS, poll_reconnect)
+        return
+    reconnect_running = False
+    if isinstance(result, cx_Oracle.Error):
+        log(f"Reconnect attempt {reconnect_attempt} failed: {result}")
+        schedule_reconnect()
+        return
+    install_connection(*result, connect_params)
+    reconnect_attempt = 0
+    log("Reconnected; session setup replayed.")
+
+
+def db_action(func):
+    """
+    Wrap a button command: after idle time, ping the connection first. If it
+    dropped, start reconnecting right away (in the background) and tell the
+    user to retry, instead of letting the action fail half-way.
+    """
+    def run():
+        if connection is not None:
+            if conn_state == "reconnecting":
+                try_reconnect()
+                messagebox.showwarning("Not Connected", "Database unreachable; reconnecting in the background.")
+                return
+            if time.monotonic() - last_round_trip > ACTION_PING_AFTER_S:
+                rtt_ms = ping()
+                if rtt_ms is None:
+                    connection_lost("ping before action failed")
+                    try_reconnect()
+                    messagebox.showwarning("Not Connected", "Database unreachable; reconnecting in the background.")
+                    return
+                set_conn_state("connected", rtt_ms)
+        func()
+    return run
+
+
+
 # DDL: CREATE / DROP TABLES & VIEW 
+
+SYNC_SEQUENCES_SQL = """
+CREATE OR REPLACE PROCEDURE sync_sequences AS
+  -- Move a sequence past the highest key already in its table
+  -- (after seeding / restoring rows with explicit IDs).
+  PROCEDURE bump(p_seq VARCHAR2, p_table VARCHAR2, p_col VARCHAR2) IS
+    v_max  NUMBER;
+    v_next NUMBER;
+  BEGIN
+    EXECUTE IMMEDIATE 'SELECT NVL(MAX(' || p_col || '), 0) FROM ' || p_table INTO v_max;
+    EXECUTE IMMEDIATE 'SELECT ' || p_seq || '.NEXTVAL FROM dual' INTO v_next;
+    IF v_next < v_max THEN
+      EXECUTE IMMEDIATE 'ALTER SEQUENCE ' || p_seq || ' INCREMENT BY ' || (v_max - v_next);
+      EXECUTE IMMEDIATE 'SELECT ' || p_seq || '.NEXTVAL FROM dual' INTO v_next;
+      EXECUTE IMMEDIATE 'ALTER SEQUENCE ' || p_seq || ' INCREMENT BY 1';
+    END IF;
+  END;
+BEGIN
+  bump('seq_Staff', 'Staff', 'StaffID');
+  bump('seq_Author', 'Author', 'AuthorID');
+  bump('seq_Address', 'Address', 'AddressID');
+  bump('seq_Customer', 'Customer', 'CustomerID');
+  bump('seq_Record', 'Record', 'RecordID');
+  bump('seq_LibraryInventory', 'LibraryInventory', 'ItemID');
+  bump('seq_Loans', 'Loans', 'loanId');
+  bump('seq_Hold', 'Hold', 'HoldID');
+END;
+"""
+
+
+# Phone numbers are stored as digits only, so a phone lookup is one index range
+PHONE_TRIGGER_SQL = """
+CREATE OR REPLACE TRIGGER trg_Customer_phone
+BEFORE INSERT OR UPDATE OF PhoneNumber ON Customer
+FOR EACH ROW
+BEGIN
+  :NEW.PhoneNumber := REGEXP_REPLACE(:NEW.PhoneNumber, '[^0-9]', '');
+END;
+"""
+
+
+def tombstone_trigger_sql(table, key_cols):
+    """AFTER DELETE trigger that records the deleted row's key in RowTombstone."""
+    key_expr = " || '|' || ".join(f"TO_CHAR(:OLD.{c})" for c in key_cols)
+    return f"""
+    CREATE OR REPLACE TRIGGER trg_{table}_tomb
+    AFTER DELETE ON {table}
+    FOR EACH ROW
+    BEGIN
+      INSERT INTO RowTombstone (TableName, PKValue)
+      VALUES ('{table.upper()}', {key_expr});
+    END;
+    """
+
+
 def create_tables():
     if cursor is None:
         messagebox.showwarning("Not Connected", "Connect to the database first.")
         return
 
-    log("Creating tables and view...")
+    profile = profile_var.get()
+    log(f"Creating tables and view ({profile} layout)...")
     set_status("Creating tables...")
 
+    # Sequences first: the key columns default to them
     ddl_statements = [
+        f"CREATE SEQUENCE {seq} START WITH 1 CACHE {SEQUENCE_CACHE.get(table, 100)}"
+        for table, (seq, _) in SEQUENCES.items()
+    ]
+    # Storage the profile's tables are created in (RecordCluster)
+    ddl_statements += a9queries.profile_ddl(profile)
+    ddl_statements += [
         # 1) Staff
         """
         CREATE TABLE Staff (
-          StaffID   INT PRIMARY KEY,
+          StaffID   INT DEFAULT ON NULL seq_Staff.NEXTVAL PRIMARY KEY,
           StaffName VARCHAR2(100) NOT NULL
-        )
+        ) ROWDEPENDENCIES
         """,
         # 2) Author
         """
         CREATE TABLE Author (
-          AuthorID   INT PRIMARY KEY,
+          AuthorID   INT DEFAULT ON NULL seq_Author.NEXTVAL PRIMARY KEY,
           AuthorName VARCHAR2(100) NOT NULL
-        )
+        ) ROWDEPENDENCIES
         """,
         # 3) Address
         """
         CREATE TABLE Address (
-          AddressID  INT           PRIMARY KEY,
+          AddressID  INT           DEFAULT ON NULL seq_Address.NEXTVAL PRIMARY KEY,
           Street     VARCHAR2(100),
           City       VARCHAR2(100),
           Province   VARCHAR2(50),
           PostalCode VARCHAR2(10)
-        )
+        ) ROWDEPENDENCIES
         """,
+        # Customer lookup by postal code prefix ('M5V', 'm5v 2t6')
+        "CREATE INDEX ix_Address_Postal ON Address (UPPER(REPLACE(PostalCode, ' ', '')))",
         # 4) Customer
         """
         CREATE TABLE Customer (
-          CustomerID  NUMBER(9)    PRIMARY KEY,
+          CustomerID  NUMBER(9)    DEFAULT ON NULL seq_Customer.NEXTVAL PRIMARY KEY,
           FirstName   VARCHAR2(50) NOT NULL,
           LastName    VARCHAR2(50) NOT NULL,
           PhoneNumber VARCHAR2(15),
@@ -217,12 +562,16 @@ def create_tables():
           CONSTRAINT fk_Customer_Address
             FOREIGN KEY (AddressID)
             REFERENCES Address(AddressID)
-        )
+        ) ROWDEPENDENCIES
         """,
+        # Customer type-ahead: name prefix, phone prefix, postal code join
+        "CREATE INDEX ix_Customer_Name ON Customer (UPPER(LastName), UPPER(FirstName), CustomerID)",
+        "CREATE INDEX ix_Customer_Phone ON Customer (PhoneNumber, CustomerID)",
+        "CREATE INDEX ix_Customer_AddressID ON Customer (AddressID)",
         # 5) Record
-        """
+        f"""
         CREATE TABLE Record (
-           RecordID          INT           PRIMARY KEY,
+           RecordID          INT           DEFAULT ON NULL seq_Record.NEXTVAL PRIMARY KEY,
            Title             VARCHAR2(255) NOT NULL,
            Genre             VARCHAR2(100),
            DateOfPublication DATE,
@@ -230,10 +579,10 @@ def create_tables():
            CONSTRAINT fk_Record_Staff
               FOREIGN KEY (CatalogedBy)
               REFERENCES Staff(StaffID)
-        )
+        ) {a9queries.table_storage("Record", profile)}
         """,
         # 6) RecordAuthor
-        """
+        f"""
         CREATE TABLE RecordAuthor (
            RecordID INT NOT NULL,
            AuthorID INT NOT NULL,
@@ -245,32 +594,38 @@ def create_tables():
            CONSTRAINT fk_RA_Author
               FOREIGN KEY (AuthorID)
               REFERENCES Author(AuthorID)
-        )
+        ) {a9queries.table_storage("RecordAuthor", profile)}
         """,
         # 7) LibraryInventory
         """
         CREATE TABLE LibraryInventory (
-           ItemID     INT PRIMARY KEY,
+           ItemID     INT DEFAULT ON NULL seq_LibraryInventory.NEXTVAL PRIMARY KEY,
            RecordID   INT NOT NULL,
            TotalStock INT DEFAULT 1,
+           Barcode    VARCHAR2(32),
            CONSTRAINT fk_LI_Record
               FOREIGN KEY (RecordID)
               REFERENCES Record(RecordID)
-        )
+        ) ROWDEPENDENCIES
         """,
+        # Desk scans: one unique-index probe per barcode
+        "CREATE UNIQUE INDEX ux_LI_Barcode ON LibraryInventory (Barcode)",
+        "CREATE INDEX ix_LI_RecordID ON LibraryInventory (RecordID)",
         # 8) Book
-        """
+        f"""
         CREATE TABLE Book (
            RecordID INT PRIMARY KEY,
            DRMType  VARCHAR2(50),
            Binding  VARCHAR2(50),
+           ISBN     VARCHAR2(20),
            CONSTRAINT fk_Book_Record
               FOREIGN KEY (RecordID)
               REFERENCES Record(RecordID)
-        )
+        ) {a9queries.table_storage("Book", profile)}
         """,
+        "CREATE UNIQUE INDEX ux_Book_ISBN ON Book (ISBN)",
         # 9) EBook
-        """
+        f"""
         CREATE TABLE EBook (
            RecordID   INT PRIMARY KEY,
            DRMType    VARCHAR2(50),
@@ -278,10 +633,10 @@ def create_tables():
            CONSTRAINT fk_EBook_Record
               FOREIGN KEY (RecordID)
               REFERENCES Record(RecordID)
-        )
+        ) {a9queries.table_storage("EBook", profile)}
         """,
         # 10) DVD
-        """
+        f"""
         CREATE TABLE DVD (
            RecordID INT PRIMARY KEY,
            RunTime  INT,
@@ -289,18 +644,19 @@ def create_tables():
            CONSTRAINT fk_DVD_Record
               FOREIGN KEY (RecordID)
               REFERENCES Record(RecordID)
-        )
+        ) {a9queries.table_storage("DVD", profile)}
         """,
         # 11) Loans
-        """
+        f"""
         CREATE TABLE Loans (
-          loanId     NUMBER       PRIMARY KEY,
+          loanId     NUMBER       DEFAULT ON NULL seq_Loans.NEXTVAL PRIMARY KEY,
           customerId NUMBER(9)    NOT NULL,
           itemId     NUMBER       NOT NULL,
           staffId    NUMBER       NOT NULL,
           loanDate   DATE         DEFAULT SYSDATE NOT NULL,
           dueDate    DATE         NOT NULL,
           overdue    CHAR(1)      DEFAULT 'N' CHECK (overdue IN ('Y','N')),
+          returnDate DATE,
 
           CONSTRAINT fkLoansCustomer FOREIGN KEY (customerId)
            REFERENCES Customer(CustomerID) ON DELETE CASCADE,
@@ -311,9 +667,59 @@ def create_tables():
           CONSTRAINT fkLoansStaff FOREIGN KEY (staffId)
            REFERENCES Staff(StaffID),
 
-          CONSTRAINT chkDueDate CHECK (dueDate > loanDate)
-        )
+          CONSTRAINT chkDueDate CHECK (dueDate > loanDate),
+
+          CONSTRAINT chkReturnDate CHECK (returnDate IS NULL OR returnDate >= loanDate)
+        ) {a9queries.table_storage("Loans", profile)}
+        """,
+        # Loans per item (foreign key: cascaded item deletes)
+        "CREATE INDEX ix_Loans_itemId ON Loans (itemId)",
+        # Loans still out: returned loans have a NULL key and are left out, so
+        # availability and overdue checks don't grow with history
+        "CREATE INDEX ix_Loans_active ON Loans (CASE WHEN returnDate IS NULL THEN itemId END)",
+        "CREATE INDEX ix_Loans_active_due ON Loans (CASE WHEN returnDate IS NULL THEN dueDate END)",
+        # 12) Hold (reservation queue; a9holds.py allocates copies on return)
+        """
+        CREATE TABLE Hold (
+          HoldID       NUMBER     DEFAULT ON NULL seq_Hold.NEXTVAL PRIMARY KEY,
+          RecordID     INT        NOT NULL,
+          CustomerID   NUMBER(9)  NOT NULL,
+          Priority     INT        DEFAULT 5 NOT NULL,
+          Status       CHAR(1)    DEFAULT 'W' NOT NULL CHECK (Status IN ('W','R','F','C','X')),
+          PlacedDate   DATE       DEFAULT SYSDATE NOT NULL,
+          ExpiryDate   DATE,
+          ItemID       INT,
+          ReadyDate    DATE,
+          PickupByDate DATE,
+
+          CONSTRAINT fk_Hold_Record FOREIGN KEY (RecordID)
+           REFERENCES Record(RecordID) ON DELETE CASCADE,
+
+          CONSTRAINT fk_Hold_Customer FOREIGN KEY (CustomerID)
+           REFERENCES Customer(CustomerID) ON DELETE CASCADE,
+
+          CONSTRAINT fk_Hold_Item FOREIGN KEY (ItemID)
+           REFERENCES LibraryInventory(ItemID) ON DELETE SET NULL
+        ) ROWDEPENDENCIES
+        """,
+        # Next hold for a record is the first entry of one ix_Hold_Queue range
+        "CREATE INDEX ix_Hold_Queue ON Hold (RecordID, Status, Priority, HoldID)",
+        "CREATE INDEX ix_Hold_Item ON Hold (ItemID, Status)",
+        "CREATE INDEX ix_Hold_Customer ON Hold (CustomerID, RecordID, Status)",
+        # 13) RowTombstone (deleted keys, for delta refresh of the Browse grid)
+        """
+        CREATE TABLE RowTombstone (
+          TableName VARCHAR2(30)  NOT NULL,
+          PKValue   VARCHAR2(100) NOT NULL,
+          DeletedAt DATE          DEFAULT SYSDATE NOT NULL
+        ) ROWDEPENDENCIES
         """,
+        "CREATE INDEX ix_RowTombstone_Table ON RowTombstone (TableName)",
+        # Purge watermark (one row; see a9queries.PURGE_TOMBSTONES_PROC)
+        "CREATE TABLE RowTombstonePurge (PurgedScn NUMBER DEFAULT 0 NOT NULL)",
+        "INSERT INTO RowTombstonePurge (PurgedScn) SELECT 0 FROM dual WHERE NOT EXISTS (SELECT 1 FROM RowTombstonePurge)",
+        a9queries.PURGE_TOMBSTONES_PROC,
+        a9queries.TOMBSTONE_PURGE_JOB,
     ]
 
     for ddl in ddl_statements:
@@ -323,36 +729,39 @@ def create_tables():
         except cx_Oracle.DatabaseError as e:
             log("Issue creating object (maybe exists): " + str(e))
 
-    view_sql = """
-    CREATE OR REPLACE VIEW RecordAvailableStock AS
-    SELECT
-      r.RecordID,
-      r.Title,
-      r.Genre,
-      r.DateOfPublication,
-      r.CatalogedBy,
-      li.ItemID,
-      li.TotalStock                         AS TotalCopies,
-      NVL(al.active_loans, 0)               AS ActiveLoans,
-      GREATEST(li.TotalStock - NVL(al.active_loans, 0), 0)
-       AS AvailableStock
-    FROM Record r
-    JOIN LibraryInventory li
-      ON li.RecordID = r.RecordID
-    LEFT JOIN (
-      SELECT itemId, COUNT(*) AS active_loans
-      FROM Loans
-      GROUP BY itemId
-    ) al
-      ON al.itemId = li.ItemID
-    """
-
     try:
-        cursor.execute(view_sql)
+        cursor.execute(a9queries.view_ddl())
         log("View RecordAvailableStock created/replaced.")
     except cx_Oracle.DatabaseError as e:
         log("Issue creating view: " + str(e))
 
+    for table, key_cols in TRACKED_TABLES.items():
+        try:
+            cursor.execute(tombstone_trigger_sql(table, key_cols))
+        except cx_Oracle.DatabaseError as e:
+            log(f"Issue creating tombstone trigger on {table}: {e}")
+    log("Tombstone triggers created/replaced.")
+
+    try:
+        cursor.execute(PHONE_TRIGGER_SQL)
+    except cx_Oracle.DatabaseError as e:
+        log("Issue creating trg_Customer_phone: " + str(e))
+
+    # ISBNs and barcodes are stored in the form a desk scan looks up
+    for table, column in a9queries.SCAN_CODE_COLUMNS:
+        try:
+            cursor.execute(a9queries.scan_code_trigger_sql(table, column))
+        except cx_Oracle.DatabaseError as e:
+            log(f"Issue creating trg_{table}_{column.lower()}: {e}")
+
+    try:
+        cursor.execute(SYNC_SEQUENCES_SQL)
+    except cx_Oracle.DatabaseError as e:
+        log("Issue creating sync_sequences: " + str(e))
+
+    create_catalog_objects()
+    create_rollup_objects()
+
     connection.commit()
     set_status("Tables and view created")
     log("DDL completed.")
@@ -375,7 +784,27 @@ def drop_tables():
     except cx_Oracle.DatabaseError as e:
         log("Issue dropping view (maybe it doesn't exist): " + str(e))
 
+    for job in ("TOMBSTONE_PURGE_JOB", "CATALOG_REFRESH_JOB", "ROLLUP_NIGHTLY_JOB"):
+        cursor.execute(a9queries.drop_job_ddl(job))
+    for stmt in ("DROP PROCEDURE refresh_catalog_now", "DROP PROCEDURE refresh_catalog", "DROP TYPE CatalogIdList",
+                 "DROP PROCEDURE refresh_rollups", "DROP PROCEDURE sync_sequences", "DROP PROCEDURE purge_tombstones"):
+        try:
+            cursor.execute(stmt)
+        except cx_Oracle.DatabaseError as e:
+            log(f"Issue running '{stmt}' (maybe it doesn't exist): {e}")
+
     tables = [
+        "LoanRollupQueue",
+        "LoanRollupBatch",
+        "LoanDailyGenre",
+        "LoanDailyRecord",
+        "LoanDailyCustomer",
+        "UtilizationDaily",
+        "CatalogEntry",
+        "CatalogDirty",
+        "RowTombstonePurge",
+        "RowTombstone",
+        "Hold",
         "Loans",
         "DVD",
         "EBook",
@@ -396,12 +825,247 @@ def drop_tables():
         except cx_Oracle.DatabaseError as e:
             log(f"Issue dropping {t} (maybe it doesn't exist): {e}")
 
+    # performance layout only (a9queries.RECORD_CLUSTER_DDL)
+    try:
+        cursor.execute("DROP CLUSTER RecordCluster")
+        log("Cluster RecordCluster dropped.")
+    except cx_Oracle.DatabaseError:
+        pass
+
+    for seq, _ in SEQUENCES.values():
+        try:
+            cursor.execute(f"DROP SEQUENCE {seq}")
+        except cx_Oracle.DatabaseError as e:
+            log(f"Issue dropping {seq} (maybe it doesn't exist): {e}")
+
     connection.commit()
     set_status("Schema dropped")
     log("Drop completed.")
 
 
 
+# CATALOG PROJECTION (one row per record: authors, media type, subtype, availability)
+
+def create_catalog_objects():
+    """
+    CatalogEntry is a denormalized copy of Record + authors + Book/EBook/DVD
+    + availability. Triggers queue changed RecordIDs in CatalogDirty;
+    the refresh_catalog procedure rebuilds just those entries (every
+    minute from CATALOG_REFRESH_JOB). The PL/SQL is a9queries.catalog_plsql().
+    """
+    catalog_ddl = [
+        """
+        CREATE TABLE CatalogEntry (
+          RecordID          INT            PRIMARY KEY,
+          Title             VARCHAR2(255)  NOT NULL,
+          Genre             VARCHAR2(100),
+          DateOfPublication DATE,
+          Authors           VARCHAR2(1000),
+          MediaType         VARCHAR2(10),
+          ISBN              VARCHAR2(20),
+          Binding           VARCHAR2(50),
+          DRMType           VARCHAR2(50),
+          FileFormat        VARCHAR2(20),
+          RunTime           INT,
+          PGRating          VARCHAR2(10),
+          TotalCopies       INT  DEFAULT 0,
+          ActiveLoans       INT  DEFAULT 0,
+          AvailableStock    INT  DEFAULT 0,
+          RefreshedAt       DATE DEFAULT SYSDATE
+        )
+        """,
+        "CREATE INDEX ix_Catalog_Title ON CatalogEntry (UPPER(Title))",
+        "CREATE INDEX ix_Catalog_Genre ON CatalogEntry (Genre)",
+        """
+        CREATE TABLE CatalogDirty (
+          RecordID INT NOT NULL
+        )
+        """,
+        "CREATE OR REPLACE TYPE CatalogIdList AS TABLE OF NUMBER",
+    ] + a9queries.catalog_plsql()
+
+    for ddl in catalog_ddl:
+        try:
+            cursor.execute(ddl)
+        except cx_Oracle.DatabaseError as e:
+            log("Issue creating catalog object (maybe exists): " + str(e))
+    log("Catalog projection (CatalogEntry + triggers) created/replaced.")
+
+
+def refresh_catalog(full=False):
+    """
+    Apply queued catalog changes now (full=True re-queues every record
+    first). refresh_catalog_now commits in its own transaction, so
+    pending work in this session is neither committed nor rolled back.
+    """
+    cursor.callproc("refresh_catalog_now", ["Y" if full else "N"])
+
+
+def rebuild_catalog():
+    if cursor is None:
+        messagebox.showwarning("Not Connected", "Connect to the database first.")
+        return
+    try:
+        refresh_catalog(full=True)
+    except cx_Oracle.DatabaseError as e:
+        messagebox.showerror("Catalog Error", str(e))
+        log("Catalog rebuild error: " + str(e))
+        return
+    set_status("Catalog rebuilt")
+    log("CatalogEntry rebuilt from Record / Author / Book / EBook / DVD / inventory.")
+
+
+
+# CIRCULATION ROLLUPS (daily summary tables behind the Reports tab)
+
+def create_rollup_objects():
+    """
+    Checkouts append to LoanRollupQueue (no shared hot rows for desks);
+    refresh_rollups() folds the queue into LoanDailyGenre / LoanDailyRecord /
+    LoanDailyCustomer and snapshots UtilizationDaily once per day. The
+    PL/SQL is a9queries.rollup_plsql().
+    """
+    rollup_ddl = [
+        """
+        CREATE TABLE LoanRollupQueue (
+          customerId INT  NOT NULL,
+          itemId     INT  NOT NULL,
+          loanDay    DATE NOT NULL
+        )
+        """,
+        """
+        CREATE GLOBAL TEMPORARY TABLE LoanRollupBatch (
+          customerId INT,
+          itemId     INT,
+          loanDay    DATE
+        ) ON COMMIT DELETE ROWS
+        """,
+        """
+        CREATE TABLE LoanDailyGenre (
+          LoanDay DATE          NOT NULL,
+          Genre   VARCHAR2(100) NOT NULL,
+          Loans   INT DEFAULT 0 NOT NULL,
+          CONSTRAINT pk_LoanDailyGenre PRIMARY KEY (LoanDay, Genre)
+        )
+        """,
+        """
+        CREATE TABLE LoanDailyRecord (
+          LoanDay  DATE NOT NULL,
+          RecordID INT  NOT NULL,
+          Loans    INT DEFAULT 0 NOT NULL,
+          CONSTRAINT pk_LoanDailyRecord PRIMARY KEY (LoanDay, RecordID)
+        )
+        """,
+        """
+        CREATE TABLE LoanDailyCustomer (
+          LoanDay    DATE NOT NULL,
+          CustomerID INT  NOT NULL,
+          Loans      INT DEFAULT 0 NOT NULL,
+          CONSTRAINT pk_LoanDailyCustomer PRIMARY KEY (LoanDay, CustomerID)
+        )
+        """,
+        """
+        CREATE TABLE UtilizationDaily (
+          SnapshotDay DATE NOT NULL,
+          RecordID    INT  NOT NULL,
+          TotalCopies INT DEFAULT 0 NOT NULL,
+          ActiveLoans INT DEFAULT 0 NOT NULL,
+          CONSTRAINT pk_UtilizationDaily PRIMARY KEY (SnapshotDay, RecordID)
+        )
+        """,
+    ] + a9queries.rollup_plsql()
+
+    for ddl in rollup_ddl:
+        try:
+            cursor.execute(ddl)
+        except cx_Oracle.DatabaseError as e:
+            log("Issue creating rollup object (maybe exists): " + str(e))
+    log("Circulation rollups (daily tables, trigger, nightly job) created/replaced.")
+
+
+def refresh_rollups(snapshot=False):
+    """Fold queued loans into the daily tables (snapshot=True re-takes today's utilization)."""
+    cursor.callproc("refresh_rollups", ["Y" if snapshot else "N"])
+    connection.commit()
+
+
+def rebuild_rollups():
+    """
+    Recompute the daily tables from the current Loans rows.
+    Loans deleted since they were rolled up drop out of the history.
+    """
+    if cursor is None:
+        messagebox.showwarning("Not Connected", "Connect to the database first.")
+        return
+    if not messagebox.askyesno("Confirm", "Recompute all circulation rollups from Loans?"):
+        return
+    try:
+        for table in ("LoanDailyGenre", "LoanDailyRecord", "LoanDailyCustomer", "LoanRollupQueue"):
+            cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(
+            """
+            INSERT INTO LoanRollupQueue (customerId, itemId, loanDay)
+            SELECT customerId, itemId, TRUNC(loanDate) FROM Loans
+            """
+        )
+        refresh_rollups(snapshot=True)
+    except cx_Oracle.DatabaseError as e:
+        connection.rollback()
+        messagebox.showerror("Rollup Error", str(e))
+        log("Rollup rebuild error: " + str(e))
+        return
+    set_status("Rollups rebuilt")
+    log("Circulation rollups rebuilt from Loans.")
+
+
+# Reports tab: registry names in menu order. :days is the window, counted
+# back from the latest rolled-up day so old demo data still shows.
+ROLLUP_REPORTS = a9queries.ROLLUP_REPORTS
+
+REPORT_DAYS = 90
+
+
+def run_report():
+    if cursor is None:
+        messagebox.showwarning("Not Connected", "Connect to the database first.")
+        return
+
+    titles = [a9queries.get(name).title for name in ROLLUP_REPORTS]
+    title = report_var.get()
+    if title not in titles:
+        messagebox.showinfo("No Report", "Choose a report.")
+        return
+    try:
+        days = int(days_var.get() or REPORT_DAYS)
+    except ValueError:
+        messagebox.showerror("Invalid Days", "Days must be a whole number.")
+        return
+
+    try:
+        refresh_rollups()
+        start = time.perf_counter()
+        query = a9queries.get(ROLLUP_REPORTS[titles.index(title)])
+        cols, rows = run_query(query.sql, {"days": days}, arraysize=query.arraysize)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+    except cx_Oracle.DatabaseError as e:
+        messagebox.showerror("Report Error", str(e))
+        log("Report error: " + str(e))
+        return
+
+    report_tree.delete(*report_tree.get_children())
+    report_tree["columns"] = cols
+    report_tree["show"] = "headings"
+    for col in cols:
+        report_tree.heading(col, text=col)
+        report_tree.column(col, width=140, anchor="w")
+    for row in rows:
+        report_tree.insert("", "end", values=["" if v is None else v for v in row])
+
+    set_status(f"{title}: {len(rows)} rows in {elapsed_ms:.1f} ms")
+    log(f"Report '{title}' ({days} days) -> {len(rows)} rows.")
+
+
+
 # SEED DATA 
 def seed_data():
     if cursor is None:
@@ -506,6 +1170,15 @@ def seed_data():
         (18, 118, "Coraline", "Fantasy", "2002-08-02", 10, 10, "PhysicalCopy", "Paperback", 3),
     ]
 
+    # ISBNs (same as the a9cli.py seed), for desk scans
+    book_isbns = {
+        1: "9780451524935", 2: "9780451526342", 3: "9780141439518", 4: "9780747532699",
+        5: "9780747538493", 6: "9780261102217", 7: "9780261102354", 8: "9780007119318",
+        9: "9780307743657", 10: "9781501142970", 11: "9780553293357", 12: "9780553382563",
+        13: "9780771038501", 14: "9780771038693", 15: "9780316017923", 16: "9780316346627",
+        17: "9780380789030", 18: "9780380807345",
+    }
+
     for (
         record_id,
         item_id,
@@ -554,13 +1227,14 @@ def seed_data():
 
         cursor.execute(
             """
-            INSERT INTO Book (RecordID, DRMType, Binding)
-            VALUES (:record_id, :drm_type, :binding)
+            INSERT INTO Book (RecordID, DRMType, Binding, ISBN)
+            VALUES (:record_id, :drm_type, :binding, :isbn)
             """,
             {
                 "record_id": record_id,
                 "drm_type": drm_type,
                 "binding": binding,
+                "isbn": book_isbns.get(record_id),
             },
         )
 
@@ -722,8 +1396,21 @@ def seed_data():
         """,
         loan_rows,
     )
+    cursor.execute(a9queries.get("assign_barcodes").sql)
 
     connection.commit()
+    try:
+        refresh_catalog()
+    except cx_Oracle.DatabaseError as e:
+        log("Issue refreshing catalog: " + str(e))
+    try:
+        refresh_rollups(snapshot=True)
+    except cx_Oracle.DatabaseError as e:
+        log("Issue refreshing rollups: " + str(e))
+    try:
+        cursor.callproc("sync_sequences")  # generated IDs continue after the seeded ones
+    except cx_Oracle.DatabaseError as e:
+        log("Issue syncing sequences: " + str(e))
     set_status("Seed data inserted")
     log("Seed data inserted.")
 
@@ -735,6 +1422,8 @@ def get_table_metadata(table_name):
     """
     Returns list of (column_name, data_type) for a table/view.
     """
+    if service is not None:
+        return service.columns(table_name)
     if cursor is None:
         raise RuntimeError("Not connected")
 
@@ -750,21 +1439,41 @@ def get_table_metadata(table_name):
     return cursor.fetchall()  # [(name, type), ...]
 
 
-def run_query(sql, params=None):
+def run_query(sql, params=None, arraysize=100):
     if params is None:
         params = {}
+    cursor.arraysize = arraysize
     cursor.execute(sql, params)
     rows = cursor.fetchall()
     cols = [d[0] for d in cursor.description]
     return cols, rows
 
 
+def query_store(sql, params=None):
+    """
+    Run a query and load it straight into a ColumnStore in batches,
+    without building the full list of row tuples first.
+    """
+    if params is None:
+        params = {}
+    cursor.arraysize = FETCH_BATCH
+    cursor.execute(sql, params)
+    cols = [d[0] for d in cursor.description]
+    store = ColumnStore(cols)
+    while True:
+        batch = cursor.fetchmany()
+        if not batch:
+            break
+        store.extend(batch)
+    return store
+
+
 
 # BROWSE TAB: LOAD / ADD / EDIT / DELETE / SEARCH
 
 def load_table():
     global current_table, current_columns
-    if cursor is None:
+    if cursor is None and service is None:
         messagebox.showwarning("Not Connected", "Connect to the database first.")
         return
 
@@ -773,66 +1482,422 @@ def load_table():
         messagebox.showwarning("No Table Selected", "Choose a table or view.")
         return
 
+    if service is not None:
+        load_table_via_service(table)
+        return
+
+    key_cols = tracked_key_columns(table)
     try:
+        if table.upper() == "CATALOGENTRY":
+            refresh_catalog()
+        # SCN first: anything committed after it shows up in the next delta.
+        scn = get_current_scn() if key_cols else None
         sql = f"SELECT * FROM {table}"
-        cols, rows = run_query(sql)
+        store = query_store(sql)
     except cx_Oracle.DatabaseError as e:
         messagebox.showerror("Error", str(e))
         log(f"Error loading table {table}: {e}")
         return
 
     current_table = table
-    current_columns = cols
+    show_store(store)
+    if scn is not None:
+        start_change_tracking(scn)
 
-    # Clear tree
-    for col in tree["columns"]:
-        tree.heading(col, text="")
-        tree.column(col, width=0)
-    tree.delete(*tree.get_children())
+    set_status(f"Loaded {table}")
+    log(f"Loaded table/view: {table} ({len(store)} rows)")
 
-    tree["columns"] = cols
-    tree["show"] = "headings"
 
-    for col in cols:
-        tree.heading(col, text=col)
-        tree.column(col, width=120, anchor="w")
+def load_table_via_service(table):
+    """Load through the middle tier (no SCN tracking: Refresh reloads)."""
+    global current_table
+    try:
+        cols, rows = service.browse(table)
+    except a9service.ServiceError as e:
+        messagebox.showerror("Error", str(e))
+        log(f"Error loading table {table}: {e}")
+        return
 
-    for row in rows:
-        tree.insert("", "end", values=row)
+    store = ColumnStore(cols)
+    store.extend(rows)
+    current_table = table
+    show_store(store)
+    index_loaded_rows()
 
-    set_status(f"Loaded {table}")
-    log(f"Loaded table/view: {table}")
+    set_status(f"Loaded {table} (middle tier)")
+    log(f"Loaded table/view via middle tier: {table} ({len(store)} rows)")
 
 
-def add_row():
-    if cursor is None or current_table is None:
-        messagebox.showwarning("No Table Loaded", "Load a table first.")
-        return
+def service_key(values):
+    """Primary key of a grid row as {column: value}, for middle-tier edits/deletes."""
+    key_cols = tracked_key_columns(current_table) or []
+    return {col: values[i] for col, i in zip(key_cols, current_key_idx)}
 
-    if current_table.upper() == "RECORDAVAILABLESTOCK":
-        messagebox.showinfo("Read-Only", "This view is read-only.")
-        return
 
-    metadata = get_table_metadata(current_table)
 
-    form = tk.Toplevel(root)
-    form.title(f"Add row to {current_table}")
-    form.geometry("400x500")
+# BROWSE TAB: DELTA REFRESH (ORA_ROWSCN + RowTombstone)
 
-    entries = {}
-    for idx, (col, col_type) in enumerate(metadata):
-        lbl = tk.Label(form, text=f"{col} ({col_type})")
-        lbl.grid(row=idx, column=0, sticky="w", padx=8, pady=4)
-        ent = tk.Entry(form, width=30)
-        ent.grid(row=idx, column=1, padx=8, pady=4)
-        entries[col] = ent
+def tracked_key_columns(table):
+    """PK columns if `table` has change tracking, else None (views, unknown tables)."""
+    for name, key_cols in TRACKED_TABLES.items():
+        if name.upper() == table.upper():
+            return key_cols
+    return None
 
-    def on_save():
-        values_expr = []
-        binds = {}
-        for col, col_type in metadata:
-            v = entries[col].get().strip()
-            if v == "":
+
+def get_current_scn():
+    try:
+        cursor.execute("SELECT DBMS_FLASHBACK.GET_SYSTEM_CHANGE_NUMBER FROM dual")
+    except cx_Oracle.DatabaseError:
+        # No EXECUTE on DBMS_FLASHBACK: an SCN a few seconds old is safe
+        # (the next delta just re-sends a few unchanged rows).
+        cursor.execute("SELECT TIMESTAMP_TO_SCN(SYSTIMESTAMP - INTERVAL '5' SECOND) FROM dual")
+    return cursor.fetchone()[0]
+
+
+def row_key(values):
+    return "|".join(str(values[i]) for i in current_key_idx)
+
+
+def index_loaded_rows():
+    """Index the loaded rows by primary key (for delta refresh and CRUD patching)."""
+    global current_keys, current_key_idx
+    current_keys = {}
+    current_key_idx = []
+    key_cols = tracked_key_columns(current_table) if current_table else None
+    if not key_cols:
+        return False
+    upper_cols = [c.upper() for c in current_columns]
+    try:
+        current_key_idx = [upper_cols.index(c.upper()) for c in key_cols]
+    except ValueError:
+        return False
+    current_keys = {
+        row_key(current_store.row(idx)): idx for idx in current_store.all_indices()
+    }
+    return True
+
+
+def start_change_tracking(scn):
+    """Remember the snapshot SCN the loaded rows are current as of."""
+    global current_scn
+    current_scn = scn if index_loaded_rows() else None
+
+
+def refresh_table():
+    """
+    Refresh button / after CRUD: fetch only rows changed since the grid's
+    snapshot (ORA_ROWSCN > SCN) plus deleted keys from RowTombstone, and
+    patch them into the store and Treeview. Falls back to a full load for
+    views, search results, when the table selection changed, or when
+    tombstones newer than the grid's SCN have been purged.
+    """
+    global current_scn
+    if cursor is None and service is None:
+        messagebox.showwarning("Not Connected", "Connect to the database first.")
+        return
+
+    table = table_var.get().strip()
+    if current_scn is None or current_table is None or table.upper() != current_table.upper():
+        load_table()
+        return
+
+    try:
+        new_scn = get_current_scn()
+        cursor.execute(
+            f"SELECT t.* FROM {current_table} t WHERE ORA_ROWSCN > :scn",
+            {"scn": current_scn},
+        )
+        cols = [d[0] for d in cursor.description]
+        changed = cursor.fetchall()
+        cursor.execute(
+            """
+            SELECT PKValue
+            FROM RowTombstone
+            WHERE TableName = :t AND ORA_ROWSCN > :scn
+            """,
+            {"t": current_table.upper(), "scn": current_scn},
+        )
+        deleted = [r[0] for r in cursor.fetchall()]
+        # Read after the tombstones: a purge committing in between raises
+        # the watermark, which only costs a reload.
+        cursor.execute("SELECT MAX(PurgedScn) FROM RowTombstonePurge")
+        purged_scn = cursor.fetchone()[0] or 0
+    except cx_Oracle.DatabaseError as e:
+        log(f"Delta refresh failed ({e}); reloading {current_table}.")
+        load_table()
+        return
+
+    if current_scn < purged_scn:
+        log(f"Tombstones since the grid was loaded were purged; reloading {current_table}.")
+        load_table()
+        return
+
+    if cols != current_columns:
+        load_table()
+        return
+
+    if changed or deleted:
+        clear_lookup_caches(current_table)
+    gone = [current_keys.pop(key, None) for key in deleted]
+    remove_grid_rows([idx for idx in gone if idx is not None])
+    for row in changed:
+        key = row_key(row)
+        idx = current_keys.get(key)
+        if idx is None:
+            current_keys[key] = insert_grid_row(row)
+        else:
+            update_grid_row(idx, row)
+
+    current_scn = new_scn
+    set_status(f"Refreshed {current_table}: {len(changed)} changed, {len(deleted)} deleted")
+    log(f"Delta refresh of {current_table}: {len(changed)} changed row(s), {len(deleted)} deleted.")
+
+
+def insert_grid_row(row):
+    """
+    Add a row to the store and, if it passes the quick filter, to the grid
+    at its place in the active sort order.
+    """
+    global grid_shown
+    idx = current_store.append(row)
+    text = filter_var.get().strip()
+    if text and not current_store.filter_indices(text, indices=[idx]):
+        return idx
+
+    if sort_column is None:
+        pos = len(current_view)
+    else:
+        pos = current_store.insert_position(
+            current_view, idx, current_store.column_index(sort_column), reverse=sort_reverse
+        )
+    current_view.insert(pos, idx)
+    if pos < GRID_MAX_ROWS:
+        tree.insert("", pos, iid=str(idx), values=current_store.display_row(idx))
+        if grid_shown < GRID_MAX_ROWS:
+            grid_shown += 1
+        else:
+            # Keep the Treeview capped: the row pushed past the limit leaves it
+            tree.delete(str(current_view[GRID_MAX_ROWS]))
+    return idx
+
+
+def update_grid_row(idx, row):
+    current_store.update(idx, row)
+    if tree.exists(str(idx)):
+        tree.item(str(idx), values=current_store.display_row(idx))
+
+
+def remove_grid_rows(idxs):
+    """Drop rows from the store, the view and the grid (one pass over the view)."""
+    global current_view, grid_shown
+    if not idxs:
+        return
+    clear_lookup_caches(current_table)
+    for idx in idxs:
+        current_store.delete(idx)
+    shown = [str(idx) for idx in idxs if tree.exists(str(idx))]
+    if shown:
+        tree.delete(*shown)
+    gone = set(idxs)
+    current_view = array("l", (i for i in current_view if i not in gone))
+
+    # Rows that were past the cap move up into the freed places
+    grid_shown -= len(shown)
+    for idx in current_view[grid_shown:GRID_MAX_ROWS]:
+        tree.insert("", "end", iid=str(idx), values=current_store.display_row(idx))
+    grid_shown = min(len(current_view), GRID_MAX_ROWS)
+
+
+def show_store(store):
+    """Make `store` the grid's data and (re)build the columns."""
+    global current_columns, current_store, current_view, sort_column, sort_reverse, current_scn
+
+    current_store = store
+    current_columns = store.columns
+    current_scn = None  # set again by load_table() for tracked tables
+    current_view = store.all_indices()
+    sort_column = None
+    sort_reverse = False
+    filter_var.set("")
+
+    # Clear tree
+    for col in tree["columns"]:
+        tree.heading(col, text="")
+        tree.column(col, width=0)
+    tree.delete(*tree.get_children())
+
+    tree["columns"] = store.columns
+    tree["show"] = "headings"
+
+    for col in store.columns:
+        tree.heading(col, text=col, command=lambda c=col: sort_grid(c))
+        tree.column(col, width=120, anchor="w")
+
+    render_grid()
+
+
+def render_grid():
+    """Redraw the Treeview from current_view (item iid = store row index)."""
+    global grid_shown
+    tree.delete(*tree.get_children())
+    grid_shown = 0
+    if current_store is None:
+        return
+    for idx in current_view[:GRID_MAX_ROWS]:
+        tree.insert("", "end", iid=str(idx), values=current_store.display_row(idx))
+
+    shown = grid_shown = min(len(current_view), GRID_MAX_ROWS)
+    if shown < len(current_view):
+        set_status(f"Showing first {shown} of {len(current_view)} rows (sort / filter to narrow)")
+
+
+def sort_grid(col):
+    """Header click: sort loaded rows in memory (click again to reverse)."""
+    global current_view, sort_column, sort_reverse
+    if current_store is None:
+        return
+
+    sort_reverse = (not sort_reverse) if sort_column == col else False
+    sort_column = col
+    current_view = current_store.sorted_indices(
+        current_store.column_index(col), reverse=sort_reverse, indices=current_view
+    )
+
+    for c in current_store.columns:
+        arrow = ""
+        if c == sort_column:
+            arrow = " ▼" if sort_reverse else " ▲"
+        tree.heading(c, text=c + arrow)
+    render_grid()
+
+
+def schedule_quick_filter(event=None):
+    """Debounce typing in the Filter box (filter once the user pauses)."""
+    global filter_after_id
+    if filter_after_id is not None:
+        root.after_cancel(filter_after_id)
+    filter_after_id = root.after(250, apply_quick_filter)
+
+
+def apply_quick_filter():
+    """Narrow the loaded rows in memory as the user types in the Filter box."""
+    global current_view, filter_after_id
+    filter_after_id = None
+    if current_store is None:
+        return
+
+    current_view = current_store.filter_indices(filter_var.get().strip())
+    if sort_column is not None:
+        current_view = current_store.sorted_indices(
+            current_store.column_index(sort_column), reverse=sort_reverse, indices=current_view
+        )
+    render_grid()
+    if len(current_view) <= GRID_MAX_ROWS:
+        set_status(f"{current_table}: {len(current_view)} of {len(current_store)} rows")
+
+
+# BROWSE TAB: IN-PLACE PATCHING AFTER CRUD (RETURNING INTO)
+
+def returning_clause(metadata, key_only=False):
+    """
+    Build ' RETURNING c1, c2 INTO :r_c1, :r_c2' plus the output variables,
+    so a DML statement hands back the rows it touched (no re-SELECT).
+    """
+    cols = metadata
+    if key_only and current_key_idx:
+        cols = [metadata[i] for i in current_key_idx]
+
+    out_vars = {}
+    for col, col_type in cols:
+        t = col_type.upper()
+        if t == "DATE" or t.startswith("TIMESTAMP"):
+            var = cursor.var(cx_Oracle.DATETIME)
+        elif t in ("NUMBER", "FLOAT", "INTEGER"):
+            var = cursor.var(cx_Oracle.NUMBER)
+        else:
+            var = cursor.var(cx_Oracle.STRING, 4000)
+        out_vars["r_" + col.lower()] = var
+
+    col_list = ", ".join(col for col, _ in cols)
+    bind_list = ", ".join(":" + name for name in out_vars)
+    return f" RETURNING {col_list} INTO {bind_list}", out_vars
+
+
+def returned_rows(out_vars):
+    """Turn RETURNING output variables into row tuples (one per affected row)."""
+    columns = []
+    for var in out_vars.values():
+        value = var.getvalue()
+        if not isinstance(value, list):
+            value = [value]
+        # NUMBER out-binds come back as float; match what SELECT shows.
+        columns.append([int(v) if isinstance(v, float) and v.is_integer() else v for v in value])
+    return list(zip(*columns))
+
+
+def patch_grid(rows):
+    """Insert or update the given full rows in the store and grid, in place."""
+    clear_lookup_caches(current_table)
+    patched = []
+    for row in rows:
+        key = row_key(row)
+        idx = current_keys.get(key)
+        if idx is None:
+            idx = insert_grid_row(row)
+            current_keys[key] = idx
+        else:
+            update_grid_row(idx, row)
+        patched.append(idx)
+    return patched
+
+
+def add_row():
+    if (cursor is None and service is None) or current_table is None:
+        messagebox.showwarning("No Table Loaded", "Load a table first.")
+        return
+
+    if current_table.upper() in READ_ONLY_TABLES:
+        messagebox.showinfo("Read-Only", f"{current_table} is read-only.")
+        return
+
+    metadata = get_table_metadata(current_table)
+
+    form = tk.Toplevel(root)
+    form.title(f"Add row to {current_table}")
+    form.geometry("400x500")
+
+    seq_key = next((key.upper() for t, (_, key) in SEQUENCES.items()
+                    if t.upper() == current_table.upper()), None)
+
+    entries = {}
+    for idx, (col, col_type) in enumerate(metadata):
+        hint = "  – blank = next ID" if col.upper() == seq_key else ""
+        lbl = tk.Label(form, text=f"{col} ({col_type}){hint}")
+        lbl.grid(row=idx, column=0, sticky="w", padx=8, pady=4)
+        ent = tk.Entry(form, width=30)
+        ent.grid(row=idx, column=1, padx=8, pady=4)
+        entries[col] = ent
+
+    def on_save():
+        if service is not None:
+            row = {col: entries[col].get().strip() or None for col, _ in metadata}
+            try:
+                rows = service.insert(current_table, row)[1]
+            except a9service.ServiceError as e:
+                messagebox.showerror("Insert Error", str(e))
+                log("Insert error: " + str(e))
+                return
+            log(f"Inserted row into {current_table} (middle tier)")
+            form.destroy()
+            patch_grid(rows)
+            return
+
+        values_expr = []
+        binds = {}
+        for col, col_type in metadata:
+            v = entries[col].get().strip()
+            if v == "":
                 v = None
             bind_name = col.lower()
             binds[bind_name] = v
@@ -844,29 +1909,56 @@ def add_row():
 
         col_list = ", ".join(col for col, _ in metadata)
         val_list = ", ".join(values_expr)
-        sql = f"INSERT INTO {current_table} ({col_list}) VALUES ({val_list})"
+        returning_sql, out_vars = returning_clause(metadata)
+        sql = f"INSERT INTO {current_table} ({col_list}) VALUES ({val_list})" + returning_sql
+        binds.update(out_vars)
 
         try:
             cursor.execute(sql, binds)
             connection.commit()
             log(f"Inserted row into {current_table}")
             form.destroy()
-            load_table()
+            patched = patch_grid(returned_rows(out_vars))
+            if patched and tree.exists(str(patched[0])):
+                tree.selection_set(str(patched[0]))
+                tree.focus(str(patched[0]))
+                tree.see(str(patched[0]))
         except cx_Oracle.DatabaseError as e:
             messagebox.showerror("Insert Error", str(e))
             log("Insert error: " + str(e))
 
-    btn = tk.Button(form, text="Save", command=on_save)
+    btn = tk.Button(form, text="Save", command=db_action(on_save))
     btn.grid(row=len(metadata), column=0, columnspan=2, pady=10)
 
 
+def key_where(metadata, values):
+    """
+    WHERE clause matching the grid row `values` on every primary-key column
+    of current_table (the first column for tables without a known key).
+    Returns (where, binds, key column names).
+    """
+    key_cols = [c.upper() for c in tracked_key_columns(current_table) or [metadata[0][0]]]
+    clauses, binds, names = [], {}, []
+    for idx, (col, col_type) in enumerate(metadata):
+        if col.upper() not in key_cols:
+            continue
+        bind = col.lower() + "_pk"
+        binds[bind] = values[idx]
+        names.append(col)
+        if col_type.upper() == "DATE":
+            clauses.append(f"{col} = TO_DATE(:{bind}, 'YYYY-MM-DD')")
+        else:
+            clauses.append(f"{col} = :{bind}")
+    return " AND ".join(clauses), binds, names
+
+
 def edit_row():
-    if cursor is None or current_table is None:
+    if (cursor is None and service is None) or current_table is None:
         messagebox.showwarning("No Table Loaded", "Load a table first.")
         return
 
-    if current_table.upper() == "RECORDAVAILABLESTOCK":
-        messagebox.showinfo("Read-Only", "This view is read-only.")
+    if current_table.upper() in READ_ONLY_TABLES:
+        messagebox.showinfo("Read-Only", f"{current_table} is read-only.")
         return
 
     selected = tree.focus()
@@ -882,8 +1974,7 @@ def edit_row():
     form.geometry("400x500")
 
     entries = {}
-    pk_col, pk_type = metadata[0]
-    pk_value_original = values[0]
+    where_expr, key_binds, key_names = key_where(metadata, values)
 
     for idx, (col, col_type) in enumerate(metadata):
         lbl = tk.Label(form, text=f"{col} ({col_type})")
@@ -891,21 +1982,31 @@ def edit_row():
         ent = tk.Entry(form, width=30)
         ent.grid(row=idx, column=1, padx=8, pady=4)
         ent.insert(0, values[idx] if values[idx] is not None else "")
-        if idx == 0:
+        if col in key_names:
             ent.config(state="disabled")  # PK immutable
         entries[col] = ent
 
     def on_save():
-        set_clauses = []
-        binds = {}
+        if service is not None:
+            key = service_key(values)
+            row = {col: entries[col].get().strip() or None
+                   for col, _ in metadata if col not in key}
+            try:
+                rows = service.update(current_table, key, row)[1]
+            except a9service.ServiceError as e:
+                messagebox.showerror("Update Error", str(e))
+                log("Update error: " + str(e))
+                return
+            log(f"Updated row in {current_table} (middle tier)")
+            form.destroy()
+            patch_grid(rows)
+            return
 
-        # pk binding
-        pk_bind = pk_col.lower() + "_pk"
-        pk_val = pk_value_original
-        binds[pk_bind] = pk_val
+        set_clauses = []
+        binds = dict(key_binds)
 
-        for idx, (col, col_type) in enumerate(metadata):
-            if idx == 0:
+        for col, col_type in metadata:
+            if col in key_names:
                 continue
             bind_name = col.lower()
             v = entries[col].get().strip()
@@ -919,35 +2020,35 @@ def edit_row():
                 set_clauses.append(f"{col} = :{bind_name}")
 
         set_sql = ", ".join(set_clauses)
+        if not set_sql:
+            messagebox.showinfo("Nothing to Update", f"Every column of {current_table} is part of its key.")
+            return
 
-        if pk_type.upper() == "DATE":
-            where_expr = f"{pk_col} = TO_DATE(:{pk_bind}, 'YYYY-MM-DD')"
-        else:
-            where_expr = f"{pk_col} = :{pk_bind}"
-
-        sql = f"UPDATE {current_table} SET {set_sql} WHERE {where_expr}"
+        returning_sql, out_vars = returning_clause(metadata)
+        sql = f"UPDATE {current_table} SET {set_sql} WHERE {where_expr}" + returning_sql
+        binds.update(out_vars)
 
         try:
             cursor.execute(sql, binds)
             connection.commit()
             log(f"Updated row in {current_table}")
             form.destroy()
-            load_table()
+            patch_grid(returned_rows(out_vars))
         except cx_Oracle.DatabaseError as e:
             messagebox.showerror("Update Error", str(e))
             log("Update error: " + str(e))
 
-    btn = tk.Button(form, text="Save", command=on_save)
+    btn = tk.Button(form, text="Save", command=db_action(on_save))
     btn.grid(row=len(metadata), column=0, columnspan=2, pady=10)
 
 
 def delete_row():
-    if cursor is None or current_table is None:
+    if (cursor is None and service is None) or current_table is None:
         messagebox.showwarning("No Table Loaded", "Load a table first.")
         return
 
-    if current_table.upper() == "RECORDAVAILABLESTOCK":
-        messagebox.showinfo("Read-Only", "This view is read-only.")
+    if current_table.upper() in READ_ONLY_TABLES:
+        messagebox.showinfo("Read-Only", f"{current_table} is read-only.")
         return
 
     selected = tree.focus()
@@ -959,32 +2060,42 @@ def delete_row():
         return
 
     values = tree.item(selected, "values")
-    metadata = get_table_metadata(current_table)
-    pk_col, pk_type = metadata[0]
-    pk_val = values[0]
 
-    pk_bind = pk_col.lower() + "_pk"
-    binds = {pk_bind: pk_val}
+    if service is not None:
+        try:
+            service.delete(current_table, service_key(values))
+        except a9service.ServiceError as e:
+            messagebox.showerror("Delete Error", str(e))
+            log("Delete error: " + str(e))
+            return
+        log(f"Deleted row from {current_table} (middle tier)")
+        current_keys.pop(row_key(values), None)
+        remove_grid_rows([int(selected)])
+        return
 
-    if pk_type.upper() == "DATE":
-        where_expr = f"{pk_col} = TO_DATE(:{pk_bind}, 'YYYY-MM-DD')"
-    else:
-        where_expr = f"{pk_col} = :{pk_bind}"
+    metadata = get_table_metadata(current_table)
+    where_expr, binds, _ = key_where(metadata, values)
 
-    sql = f"DELETE FROM {current_table} WHERE {where_expr}"
+    returning_sql, out_vars = returning_clause(metadata, key_only=True)
+    sql = f"DELETE FROM {current_table} WHERE {where_expr}" + returning_sql
+    binds.update(out_vars)
 
     try:
         cursor.execute(sql, binds)
         connection.commit()
         log(f"Deleted row from {current_table}")
-        load_table()
+        gone = [
+            current_keys.pop("|".join(str(v) for v in key_values), None)
+            for key_values in returned_rows(out_vars)
+        ]
+        remove_grid_rows([idx for idx in gone if idx is not None])
     except cx_Oracle.DatabaseError as e:
         messagebox.showerror("Delete Error", str(e))
         log("Delete error: " + str(e))
 
 
 def search_table():
-    if cursor is None or current_table is None:
+    if (cursor is None and service is None) or current_table is None:
         messagebox.showwarning("No Table Loaded", "Load a table first.")
         return
 
@@ -993,6 +2104,27 @@ def search_table():
         messagebox.showinfo("No Search Term", "Enter a search term.")
         return
 
+    if service is not None:
+        try:
+            cols, rows = service.search(current_table, term)
+        except a9service.ServiceError as e:
+            messagebox.showerror("Search Error", str(e))
+            log("Search error: " + str(e))
+            return
+        store = ColumnStore(cols)
+        store.extend(rows)
+        show_store(store)
+        index_loaded_rows()
+        set_status(f"Search in {current_table}: {len(store)} rows (middle tier)")
+        log(f"Search '{term}' in {current_table} via middle tier: {len(store)} row(s) found.")
+        return
+
+    if current_table.upper() == "CATALOGENTRY":
+        try:
+            refresh_catalog()
+        except cx_Oracle.DatabaseError as e:
+            log("Issue refreshing catalog: " + str(e))
+
     metadata = get_table_metadata(current_table)
     text_cols = [col for col, t in metadata if "CHAR" in t.upper() or "CLOB" in t.upper()]
 
@@ -1005,87 +2137,974 @@ def search_table():
     sql = f"SELECT * FROM {current_table} WHERE {where_sql}"
 
     try:
-        cols, rows = run_query(sql, {"term": "%" + term.lower() + "%"})
+        store = query_store(sql, {"term": "%" + term.lower() + "%"})
     except cx_Oracle.DatabaseError as e:
         messagebox.showerror("Search Error", str(e))
         log("Search error: " + str(e))
         return
 
-    global current_columns
-    current_columns = cols
+    show_store(store)
+    index_loaded_rows()
+
+    set_status(f"Search in {current_table}: {len(store)} rows")
+    log(f"Search '{term}' in {current_table}: {len(store)} row(s) found.")
 
-    tree.delete(*tree.get_children())
-    tree["columns"] = cols
-    tree["show"] = "headings"
 
-    for col in cols:
-        tree.heading(col, text=col)
-        tree.column(col, width=120, anchor="w")
 
+# SQL CONSOLE TAB
+
+def show_console_result(cols, rows):
+    console_tree.delete(*console_tree.get_children())
+    console_tree["columns"] = cols
+    console_tree["show"] = "headings" if cols else ""
+    for col in cols:
+        console_tree.heading(col, text=col)
+        console_tree.column(col, width=120, anchor="w")
     for row in rows:
-        tree.insert("", "end", values=row)
+        console_tree.insert("", "end", values=row)
 
-    set_status(f"Search in {current_table}: {len(rows)} rows")
-    log(f"Search '{term}' in {current_table}: {len(rows)} row(s) found.")
 
+def run_console_statement(stmt):
+    """One statement in its own round trip -> (result text, query result or None)."""
+    cursor.execute(stmt.text)
+    if stmt.kind == "query":
+        rows = cursor.fetchall()
+        return f"{len(rows)} row(s)", ([d[0] for d in cursor.description], rows)
+    if stmt.kind == "dml":
+        return f"{cursor.rowcount} row(s)", None
+    return "OK", None
 
 
-# SQL CONSOLE TAB
+def run_console_batch(group):
+    """
+    Several DML / PL/SQL statements as one generated block (one round trip).
+    Returns ({index: (result, ms)}, (index, message) or None).
+    """
+    report = cursor.var(str, a9script.REPORT_SIZE)
+    failed = cursor.var(int)
+    try:
+        cursor.execute(a9script.batch_block(group), a9_report=report, a9_failed=failed)
+    except cx_Oracle.DatabaseError as e:
+        # the block didn't compile (e.g. unknown table): nothing ran
+        return {}, (group[0].index, "batch not run: " + str(e).strip())
+    done, error = a9script.parse_report(report.getvalue())
+    results = {
+        idx: ("OK" if rows is None else f"{rows} row(s)", ms)
+        for idx, (rows, ms) in done.items()
+    }
+    return results, error
+
 
 def execute_sql_console():
+    """
+    Run the console text as a script: statements are split with a9script,
+    consecutive DML / PL/SQL go to the server as one block per round trip,
+    queries and DDL run on their own. Stops at the first error.
+    Single transaction: everything commits together or rolls back together;
+    otherwise what ran before an error is committed (one commit per script).
+    """
     if cursor is None:
         messagebox.showwarning("Not Connected", "Connect to the database first.")
         return
 
-    sql = sql_text.get("1.0", "end").strip()
-    if not sql:
+    statements = a9script.split_statements(sql_text.get("1.0", "end"))
+    if not statements:
         messagebox.showinfo("No SQL", "Enter a SQL statement.")
         return
 
+    single_txn = txn_var.get()
+    if single_txn:
+        breaking = a9script.ends_transaction(statements)
+        if breaking:
+            messagebox.showerror(
+                "Single Transaction",
+                f"Statement {breaking[0].index} ({a9script.summary(breaking[0].text, 40)}) "
+                "commits on its own in Oracle. Remove it or untick Single transaction.",
+            )
+            return
+
+    script_tree.delete(*script_tree.get_children())
+    results = {}        # index -> (result, ms)
+    error = None        # (index, message)
+    last_query = None
+    trips = 0
+    start = time.perf_counter()
+
+    for group in a9script.plan(statements):
+        trips += 1
+        if len(group) > 1:
+            done, error = run_console_batch(group)
+            results.update(done)
+        else:
+            stmt = group[0]
+            if stmt.kind == "sqlplus":
+                results[stmt.index] = ("skipped (SQL*Plus command)", None)
+                trips -= 1
+                continue
+            t0 = time.perf_counter()
+            try:
+                result, query = run_console_statement(stmt)
+                results[stmt.index] = (result, (time.perf_counter() - t0) * 1000.0)
+                last_query = query or last_query
+            except cx_Oracle.DatabaseError as e:
+                error = (stmt.index, str(e).strip())
+        if error:
+            break
+
+    if error and single_txn:
+        connection.rollback()
+        outcome = "rolled back"
+    else:
+        connection.commit()
+        outcome = "committed"
+    elapsed = (time.perf_counter() - start) * 1000.0
+
+    for stmt in statements:
+        if stmt.index in results:
+            result, ms = results[stmt.index]
+        elif error and stmt.index == error[0]:
+            result, ms = "ERROR: " + error[1].splitlines()[0], None
+        else:
+            result, ms = "not run", None
+        script_tree.insert(
+            "", "end",
+            values=(stmt.index, a9script.summary(stmt.text), result, "" if ms is None else f"{ms:.2f}"),
+        )
+
+    if last_query:
+        show_console_result(*last_query)
+    else:
+        show_console_result([], [])
+
+    msg = (f"Script: {len(results)}/{len(statements)} statement(s) in {trips} round trip(s), "
+           f"{elapsed:.1f} ms, {outcome}")
+    set_status(msg)
+    log("SQL console: " + msg)
+    if error:
+        messagebox.showerror("SQL Error", f"Statement {error[0]}:\n{error[1]}")
+        log(f"SQL console error (statement {error[0]}): {error[1]}")
+
+
+
+# SQL CONSOLE: EXPLAIN / PROFILE
+
+# Full scans on tables with at least this many rows (user_tables.num_rows) are flagged red.
+LARGE_TABLE_ROWS = 10000
+
+PROFILE_STATS = {
+    "session logical reads": "Buffer gets",
+    "physical reads": "Physical reads",
+    "SQL*Net roundtrips to/from client": "Round trips",
+}
+
+
+def get_session_stats():
+    """
+    Returns {stat_name: value} for PROFILE_STATS from v$mystat,
+    or None if the user can't read the v$ views.
+    """
     try:
+        cursor.execute(
+            """
+            SELECT sn.name, ms.value
+            FROM v$mystat ms
+            JOIN v$statname sn ON sn.statistic# = ms.statistic#
+            WHERE sn.name IN ('session logical reads', 'physical reads',
+                              'SQL*Net roundtrips to/from client')
+            """
+        )
+        return dict(cursor.fetchall())
+    except cx_Oracle.DatabaseError:
+        return None
+
+
+def get_table_sizes():
+    """Returns {TABLE_NAME: num_rows} from optimizer statistics."""
+    try:
+        cursor.execute("SELECT table_name, NVL(num_rows, 0) FROM user_tables")
+        return dict(cursor.fetchall())
+    except cx_Oracle.DatabaseError:
+        return {}
+
+
+def get_session_parameter(name):
+    """This session's value of an initialization parameter, or None if v$parameter is unreadable."""
+    try:
+        cursor.execute("SELECT value FROM v$parameter WHERE name = :n", {"n": name})
+        row = cursor.fetchone()
+    except cx_Oracle.DatabaseError:
+        return None
+    return row[0] if row else None
+
+
+def last_statement_id():
+    """
+    (sql_id, child_number) of the statement this session ran just before
+    this query, or None. Call it straight after the statement of interest:
+    any other query in between becomes the "previous" one.
+    """
+    try:
+        cursor.execute(
+            """
+            SELECT prev_sql_id, prev_child_number
+            FROM v$session
+            WHERE sid = SYS_CONTEXT('USERENV', 'SID')
+            """
+        )
+        row = cursor.fetchone()
+    except cx_Oracle.DatabaseError:
+        return None
+    return row if row and row[0] else None
+
+
+def fetch_last_plan(statement_id):
+    """
+    Plan lines with actual row-source statistics for one cursor
+    (sql_id, child_number) from last_statement_id()
+    (needs SELECT on v$sql_plan_statistics_all).
+    Returns list of dicts, or None if unavailable.
+    """
+    if statement_id is None:
+        return None
+    try:
+        cursor.execute(
+            """
+            SELECT p.id, p.parent_id, p.operation, p.options, p.object_name,
+                   p.cardinality, p.last_output_rows, p.last_cr_buffer_gets,
+                   p.last_elapsed_time
+            FROM v$sql_plan_statistics_all p
+            WHERE p.sql_id = :sql_id
+              AND p.child_number = :child
+            ORDER BY p.id
+            """,
+            {"sql_id": statement_id[0], "child": statement_id[1]},
+        )
+        rows = cursor.fetchall()
+    except cx_Oracle.DatabaseError:
+        return None
+    if not rows:
+        return None
+    return [
+        {
+            "id": r[0], "parent_id": r[1], "operation": r[2], "options": r[3],
+            "object": r[4], "e_rows": r[5], "a_rows": r[6], "buffers": r[7],
+            "time_ms": None if r[8] is None else r[8] / 1000.0,
+        }
+        for r in rows
+    ]
+
+
+def fetch_estimated_plan(sql):
+    """
+    EXPLAIN PLAN (estimates only, statement not executed). The plan_table
+    rows are undone to a savepoint, so the session's own uncommitted work
+    is left as it was.
+    """
+    statement_id = "A9GUI_EXPLAIN"
+    cursor.execute("SAVEPOINT a9gui_explain")
+    try:
+        cursor.execute("DELETE FROM plan_table WHERE statement_id = :s", {"s": statement_id})
+        cursor.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {sql}")
+        cursor.execute(
+            """
+            SELECT id, parent_id, operation, options, object_name, cardinality
+            FROM plan_table
+            WHERE statement_id = :s
+            ORDER BY id
+            """,
+            {"s": statement_id},
+        )
+        rows = cursor.fetchall()
+    finally:
+        # Also on a failed EXPLAIN, or the plan_table delete stays pending
+        cursor.execute("ROLLBACK TO SAVEPOINT a9gui_explain")
+    return [
+        {
+            "id": r[0], "parent_id": r[1], "operation": r[2], "options": r[3],
+            "object": r[4], "e_rows": r[5], "a_rows": None, "buffers": None,
+            "time_ms": None,
+        }
+        for r in rows
+    ]
+
+
+def show_plan_window(title, summary, plan_lines, table_sizes):
+    win = tk.Toplevel(root)
+    win.title(title)
+    win.geometry("950x450")
+
+    tk.Label(win, text=summary, justify="left", anchor="w").pack(fill="x", padx=8, pady=6)
+
+    cols = ("object", "e_rows", "a_rows", "buffers", "time_ms")
+    plan_tree = ttk.Treeview(win, columns=cols)
+    plan_tree.heading("#0", text="Operation")
+    plan_tree.column("#0", width=330, anchor="w")
+    for col, text, width in (
+        ("object", "Object", 170),
+        ("e_rows", "E-Rows", 80),
+        ("a_rows", "A-Rows", 80),
+        ("buffers", "Buffers", 80),
+        ("time_ms", "A-Time (ms)", 100),
+    ):
+        plan_tree.heading(col, text=text)
+        plan_tree.column(col, width=width, anchor="e" if col != "object" else "w")
+    plan_tree.tag_configure("fullscan", background="#fff3b0")
+    plan_tree.tag_configure("fullscan_large", background="#ffb3b3")
+    plan_tree.pack(fill="both", expand=True, padx=8, pady=4)
+
+    items = {}
+    for line in plan_lines:
+        op = line["operation"] + (" " + line["options"] if line["options"] else "")
+        tags = ()
+        if line["operation"] == "TABLE ACCESS" and line["options"] == "FULL":
+            rows = table_sizes.get((line["object"] or "").upper(), 0)
+            tags = ("fullscan_large",) if rows >= LARGE_TABLE_ROWS else ("fullscan",)
+        parent = items.get(line["parent_id"], "")
+        items[line["id"]] = plan_tree.insert(
+            parent,
+            "end",
+            text=op,
+            open=True,
+            tags=tags,
+            values=(
+                line["object"] or "",
+                "" if line["e_rows"] is None else line["e_rows"],
+                "" if line["a_rows"] is None else line["a_rows"],
+                "" if line["buffers"] is None else line["buffers"],
+                "" if line["time_ms"] is None else f"{line['time_ms']:.2f}",
+            ),
+        )
+
+    tk.Label(
+        win,
+        text="Yellow = full table scan; red = full scan on a table with "
+             f">= {LARGE_TABLE_ROWS} rows (consider an index or a tighter WHERE).",
+        anchor="w",
+    ).pack(fill="x", padx=8, pady=4)
+
+
+def explain_profile_console():
+    """
+    Explain / Profile the statement in the SQL console.
+    - SELECT / WITH: runs it with row-source statistics and shows the actual
+      plan, rows, buffer gets, elapsed time and round trips.
+    - Anything else: EXPLAIN PLAN only (statement is not executed).
+    """
+    if cursor is None:
+        messagebox.showwarning("Not Connected", "Connect to the database first.")
+        return
+
+    statements = a9script.split_statements(sql_text.get("1.0", "end"))
+    if not statements:
+        messagebox.showinfo("No SQL", "Enter a SQL statement.")
+        return
+    if len(statements) > 1:
+        log(f"Explain / Profile: script has {len(statements)} statements, using the first.")
+    sql = statements[0].text
+
+    table_sizes = get_table_sizes()
+    is_query = sql.lower().startswith(("select", "with"))
+    prev_level = None
+
+    try:
+        if not is_query:
+            plan_lines = fetch_estimated_plan(sql)
+            show_plan_window("Explain Plan", "Estimated plan (statement was not executed).",
+                             plan_lines, table_sizes)
+            log("SQL console: EXPLAIN PLAN shown.")
+            return
+
+        # Row-source statistics only when the session's setting can be put back
+        prev_level = get_session_parameter("statistics_level")
+        if prev_level is not None and prev_level.upper() != "ALL":
+            cursor.execute("ALTER SESSION SET statistics_level = ALL")
+        before = get_session_stats()
+        start = time.perf_counter()
         cursor.execute(sql)
-        if sql.lower().startswith("select"):
-            rows = cursor.fetchall()
-            cols = [d[0] for d in cursor.description]
+        # Fetch to the end so the statistics are complete, but don't keep the rows
+        row_count = 0
+        while True:
+            chunk = cursor.fetchmany(cursor.arraysize)
+            if not chunk:
+                break
+            row_count += len(chunk)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        statement_id = last_statement_id()   # before any other query
+        after = get_session_stats()
+        plan_lines = fetch_last_plan(statement_id)
+    except cx_Oracle.DatabaseError as e:
+        messagebox.showerror("Explain Error", str(e))
+        log("Explain/Profile error: " + str(e))
+        return
+    finally:
+        if is_query and prev_level is not None and prev_level.upper() != "ALL":
+            try:
+                cursor.execute(f"ALTER SESSION SET statistics_level = {prev_level}")
+            except cx_Oracle.DatabaseError:
+                pass
+
+    summary = [f"Rows: {row_count}    Elapsed: {elapsed_ms:.1f} ms"]
+    if before is not None and after is not None:
+        # The stats query and the sql_id lookup cost one round trip each; don't count them.
+        parts = []
+        for name, label in PROFILE_STATS.items():
+            delta = after.get(name, 0) - before.get(name, 0)
+            if name.startswith("SQL*Net"):
+                delta = max(delta - 2, 0)
+            parts.append(f"{label}: {delta}")
+        summary.append("    ".join(parts))
+    else:
+        summary.append("Session statistics unavailable (needs SELECT on v$mystat / v$statname).")
+
+    if plan_lines is None:
+        summary.append("Actual plan unavailable (needs SELECT on v$sql_plan_statistics_all); "
+                       "showing estimated plan.")
+        try:
+            plan_lines = fetch_estimated_plan(sql)
+        except cx_Oracle.DatabaseError as e:
+            messagebox.showerror("Explain Error", str(e))
+            log("Explain/Profile error: " + str(e))
+            return
+
+    show_plan_window("Explain / Profile", "\n".join(summary), plan_lines, table_sizes)
+    set_status(f"Profiled statement: {row_count} rows in {elapsed_ms:.1f} ms")
+    log(f"SQL console: profiled statement ({row_count} rows, {elapsed_ms:.1f} ms).")
+
+
+# DESK TAB: BARCODE / ISBN SCAN
+
+# Recent scans and record details on the direct Oracle path (the middle
+# tier keeps its own). Scans are cleared whenever this GUI writes; details
+# only lose the record (or the copy counts) a write touched, and re-read
+# their counts after DETAIL_STOCK_TTL_S for loans made at other desks.
+scan_cache = a9queries.LRUCache(a9service.LOOKUP_CACHE_SIZE, a9service.LOOKUP_CACHE_TTL_S)
+detail_cache = a9queries.DetailCache(a9service.DETAIL_CACHE_SIZE, a9service.DETAIL_CACHE_TTL_S,
+                                     a9service.DETAIL_STOCK_TTL_S)
+
+
+def clear_lookup_caches(table):
+    """After a grid write to `table`."""
+    scan_cache.clear()
+    detail_cache.invalidate_table(table)
+
+
+def circulated(record_id=None, item_id=None):
+    """After a desk action: scans, and the copy counts of that one record."""
+    scan_cache.clear()
+    detail_cache.invalidate(record_id, item_id, stock_only=True)
+
+
+def scan_item():
+    """Resolve the scanned barcode / ISBN to record, item and availability."""
+    if cursor is None and service is None:
+        messagebox.showwarning("Not Connected", "Connect to the database first.")
+        return
+    code = a9queries.scan_code(scan_var.get())
+    if not code:
+        return
+
+    start = time.perf_counter()
+    try:
+        if service is not None:
+            hits = service.lookups.hits
+            cols, rows = service.lookup(code)
+            cached = service.lookups.hits > hits
+        else:
+            result = scan_cache.get(code)
+            cached = result is not None
+            if result is None:
+                query = a9queries.get("scan_lookup")
+                result = scan_cache.put(code, run_query(query.sql, {"code": code}, query.arraysize))
+            cols, rows = result
+    except (cx_Oracle.DatabaseError, a9service.ServiceError) as e:
+        messagebox.showerror("Lookup Error", str(e))
+        log(f"Lookup error for {code}: {e}")
+        return
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+    show_desk_rows(scan_tree, cols, rows)
+    scan_var.set("")  # ready for the next scan
+
+    source = "recent scans" if cached else "database"
+    if rows:
+        avail = cols.index("AVAILABLESTOCK")
+        free = sum(r[avail] or 0 for r in rows)
+        set_status(f"{code}: {rows[0][cols.index('TITLE')]} – {free} available "
+                   f"({elapsed_ms:.1f} ms, {source})")
+    else:
+        set_status(f"{code}: no item with this barcode or ISBN ({elapsed_ms:.1f} ms, {source})")
+    log(f"Scan {code} -> {len(rows)} item(s) from {source}.")
+
+
+def show_desk_rows(tree, cols, rows):
+    tree.delete(*tree.get_children())
+    tree["columns"] = cols
+    tree["show"] = "headings"
+    for col in cols:
+        tree.heading(col, text=col)
+        tree.column(col, width=110 if col != "TITLE" else 260, anchor="w")
+    for row in rows:
+        tree.insert("", "end", values=["" if v is None else v for v in row])
+
+
+# DESK TAB: AVAILABILITY FOR A LIST (cart, reading list, course reserves)
+
+# Label in the kind dropdown -> a9queries.AVAILABILITY kind
+AVAILABILITY_KINDS = {"RecordIDs": "record", "ItemIDs": "item", "ISBNs": "isbn"}
 
-            console_tree.delete(*console_tree.get_children())
-            console_tree["columns"] = cols
-            console_tree["show"] = "headings"
+key_list_types = {}  # collection type name -> (connection, cx_Oracle ObjectType)
 
-            for col in cols:
-                console_tree.heading(col, text=col)
-                console_tree.column(col, width=120, anchor="w")
 
-            for row in rows:
-                console_tree.insert("", "end", values=row)
+def key_list(type_name, keys):
+    """Python list -> one collection object for a TABLE(:keys) bind (type looked up once per session)."""
+    cached = key_list_types.get(type_name)
+    if cached is None or cached[0] is not connection:
+        cached = key_list_types[type_name] = (connection, connection.gettype(type_name))
+    return cached[1].newobject(keys)
 
-            set_status("SQL executed (SELECT)")
-            log("SQL console: SELECT executed.")
+
+def check_availability():
+    """Availability for every pasted RecordID / ItemID / ISBN in one query."""
+    if cursor is None and service is None:
+        messagebox.showwarning("Not Connected", "Connect to the database first.")
+        return
+    kind = AVAILABILITY_KINDS[avail_kind_var.get()]
+    try:
+        keys = a9queries.availability_keys(kind, avail_text.get("1.0", "end"))
+    except ValueError as e:
+        messagebox.showerror("Bad Key", str(e))
+        return
+    if not keys:
+        messagebox.showwarning("No Keys", f"Paste one or more {avail_kind_var.get()} first.")
+        return
+
+    start = time.perf_counter()
+    try:
+        if service is not None:
+            cols, rows, missing = service.availability(kind, keys)
+        else:
+            name, type_name = a9queries.AVAILABILITY[kind]
+            query = a9queries.get(name)
+            cols, rows = run_query(query.sql, {"keys": key_list(type_name, keys)}, query.arraysize)
+            rows, missing = a9queries.in_key_order(kind, keys, cols, rows)
+    except (cx_Oracle.DatabaseError, a9service.ServiceError) as e:
+        messagebox.showerror("Availability Error", str(e))
+        log(f"Availability error: {e}")
+        return
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+    show_desk_rows(avail_tree, cols, rows)
+    avail = cols.index("AVAILABLESTOCK")
+    free = sum(r[avail] or 0 for r in rows)
+    msg = (f"{len(keys)} key(s) -> {len(rows)} item(s), {free} copies available "
+           f"in {elapsed_ms:.1f} ms (one query)")
+    if missing:
+        msg += f"; not found: {', '.join(map(str, missing[:10]))}{' ...' if len(missing) > 10 else ''}"
+    set_status(msg)
+    log(f"Availability: {msg}")
+
+
+# DESK TAB: CUSTOMER TYPE-AHEAD
+
+# Typing is debounced; each lookup runs on a worker thread over its own
+# session, so a newer keystroke can cancel the query still in flight
+# (connection.cancel()) and stale results are dropped, never shown.
+CUSTOMER_DEBOUNCE_MS = 200
+CUSTOMER_POLL_MS = 20
+
+customer_after_id = None
+customer_seq = 0                 # bumped per keystroke; only the latest lookup is shown
+customer_results = queue.Queue() # (seq, cols, rows, elapsed_ms, error) from the workers
+customer_lock = threading.Lock() # one lookup at a time on the type-ahead session
+customer_inflight = 0
+lookup_conn = None               # second Oracle session, only for type-ahead
+lookup_running = False           # a statement is executing on lookup_conn
+lookup_client = None             # or a second ServiceClient (clients aren't thread-safe)
+
+
+def schedule_customer_lookup(event=None):
+    """Debounce typing in the Find Customer box; cancel the lookup in flight."""
+    global customer_after_id, customer_seq
+    customer_seq += 1
+    if customer_after_id is not None:
+        root.after_cancel(customer_after_id)
+    if lookup_running and lookup_conn is not None:
+        try:
+            lookup_conn.cancel()
+        except cx_Oracle.Error:
+            pass
+    customer_after_id = root.after(CUSTOMER_DEBOUNCE_MS, start_customer_lookup)
+
+
+def start_customer_lookup():
+    global customer_after_id, customer_inflight
+    customer_after_id = None
+    if cursor is None and service is None:
+        return
+    text = customer_var.get()
+    plan = a9queries.customer_search(text)
+    if plan is None:
+        customer_tree.delete(*customer_tree.get_children())
+        return
+    customer_inflight += 1
+    threading.Thread(target=customer_worker, args=(customer_seq, text, plan), daemon=True).start()
+    root.after(CUSTOMER_POLL_MS, poll_customer_results)
+
+
+class LookupCancelled(Exception):
+    pass
+
+
+def customer_worker(seq, text, plan):
+    """Runs off the UI thread; reports through customer_results only."""
+    global lookup_conn, lookup_client, lookup_running
+    start = time.perf_counter()
+    try:
+        with customer_lock:
+            if seq != customer_seq:
+                raise LookupCancelled()
+            if service is not None:
+                if lookup_client is None:
+                    lookup_client = a9service.ServiceClient(service.base_url)
+                cols, rows = lookup_client.customers(text)
+            else:
+                if lookup_conn is None:
+                    lookup_conn, setup_cur = connect_session(connect_params)
+                    setup_cur.close()
+                name, binds = plan
+                limit = a9queries.CUSTOMER_LOOKUP_LIMIT
+                cur = lookup_conn.cursor()
+                cur.arraysize = limit
+                lookup_running = True
+                try:
+                    cur.execute(a9queries.get(name).sql, binds)
+                    cols = [d[0] for d in cur.description]
+                    rows = cur.fetchmany(limit)
+                finally:
+                    lookup_running = False
+                cur.close()
+        customer_results.put((seq, cols, rows, (time.perf_counter() - start) * 1000.0, None))
+    except LookupCancelled:
+        customer_results.put((seq, None, None, 0.0, None))
+    except (cx_Oracle.Error, a9service.ServiceError) as e:
+        cancelled = isinstance(e, cx_Oracle.Error) and "ORA-01013" in str(e)
+        if not cancelled and isinstance(e, cx_Oracle.Error):
+            lookup_conn = None  # reopened on the next keystroke
+        customer_results.put((seq, None, None, 0.0, None if cancelled else e))
+
+
+def poll_customer_results():
+    """Show the latest lookup's rows; drop anything a newer keystroke made stale."""
+    global customer_inflight
+    while True:
+        try:
+            seq, cols, rows, elapsed_ms, error = customer_results.get_nowait()
+        except queue.Empty:
+            break
+        customer_inflight -= 1
+        if seq != customer_seq:
+            continue
+        if error is not None:
+            set_status(f"Customer lookup failed: {error}")
+            log(f"Customer lookup error: {error}")
+        elif cols is not None:
+            show_desk_rows(customer_tree, cols, rows)
+            more = "+" if len(rows) == a9queries.CUSTOMER_LOOKUP_LIMIT else ""
+            set_status(f"{len(rows)}{more} customer(s) for {customer_var.get().strip()!r} "
+                       f"in {elapsed_ms:.1f} ms")
+    if customer_inflight:
+        root.after(CUSTOMER_POLL_MS, poll_customer_results)
+
+
+# CIRCULATION TAB: CHECKOUT / RETURN / HOLDS
+
+# Same hold-aware rules as the middle tier (a9holds.py): a copy set aside
+# for someone's hold is not lent to anyone else, and a return hands the
+# copy to the next hold in the same transaction.
+
+def read_ids(*fields):
+    """Integer values of (label, StringVar) fields, or None after a warning."""
+    values = []
+    for label, var in fields:
+        text = var.get().strip()
+        if not text.isdigit():
+            messagebox.showwarning("Missing Value", f"Enter a numeric {label}.")
+            return None
+        values.append(int(text))
+    return values
+
+
+def next_key(table):
+    """Next value of the table's key sequence (the direct path passes keys explicitly)."""
+    seq, _ = SEQUENCES[table]
+    cursor.execute(f"SELECT {seq}.NEXTVAL FROM dual")
+    return cursor.fetchone()[0]
+
+
+def describe_allocated(allocated):
+    if not allocated:
+        return "no hold waiting"
+    return ", ".join(f"hold {hold_id} ready for customer {customer_id}" for hold_id, customer_id in allocated)
+
+
+def circulation_action(title, direct, via_service):
+    """
+    Run one desk action as its own transaction: via_service() through the
+    middle tier, else direct() on the GUI session, then commit. Returns its
+    result, or None after showing the error (a queue rule is a warning).
+    """
+    if cursor is None and service is None:
+        messagebox.showwarning("Not Connected", "Connect to the database first.")
+        return None
+    try:
+        if service is not None:
+            result = via_service()
         else:
+            result = direct()
             connection.commit()
-            console_tree.delete(*console_tree.get_children())
-            console_tree["columns"] = []
-            console_tree["show"] = ""
-            set_status("SQL executed (non-SELECT)")
-            log("SQL console: non-SELECT executed.")
+    except (a9holds.HoldConflict, LookupError) as e:
+        if connection is not None:
+            connection.rollback()
+        messagebox.showwarning(title, str(e))
+        return None
+    except (cx_Oracle.DatabaseError, a9service.ServiceError) as e:
+        if connection is not None and service is None:
+            connection.rollback()
+        if isinstance(e, a9service.ServiceError) and e.status in (404, 409):
+            messagebox.showwarning(title, str(e))
+        else:
+            messagebox.showerror(title, str(e))
+            log(f"{title} error: {e}")
+        return None
+    return result
+
+
+def desk_checkout():
+    ids = read_ids(("Customer ID", circ_customer_var), ("Item ID", circ_item_var), ("Staff ID", circ_staff_var))
+    if ids is None:
+        return
+    customer_id, item_id, staff_id = ids
+
+    def direct():
+        loan_id = next_key("Loans")
+        return loan_id, a9holds.checkout(cursor, loan_id, customer_id, item_id, staff_id)
+
+    def via_service():
+        cols, rows = service.checkout(customer_id, item_id, staff_id)
+        return rows[0][cols.index("LOANID")], []
+
+    result = circulation_action("Check Out", direct, via_service)
+    if result is None:
+        return
+    loan_id, allocated = result
+    circulated(item_id=item_id)
+    circ_loan_var.set(str(loan_id))
+    msg = f"Loan {loan_id}: item {item_id} to customer {customer_id}"
+    if allocated:
+        msg += f"; their held copy went to the next in line ({describe_allocated(allocated)})"
+    set_status(msg)
+    log(msg)
+
+
+def desk_return():
+    ids = read_ids(("Loan ID", circ_loan_var))
+    if ids is None:
+        return
+    loan_id = ids[0]
+
+    def direct():
+        result = a9holds.return_loan(cursor, loan_id)
+        if result is None:
+            raise LookupError(f"no loan {loan_id} out")
+        return result
+
+    def via_service():
+        result = service.return_loan(loan_id)
+        result["allocated"] = [(a["holdId"], a["customerId"]) for a in result["allocated"]]
+        return result
+
+    result = circulation_action("Return", direct, via_service)
+    if result is None:
+        return
+    circulated(item_id=result["itemId"])
+    msg = f"Loan {loan_id} returned (item {result['itemId']}): {describe_allocated(result['allocated'])}"
+    set_status(msg)
+    log(msg)
+
+
+def desk_place_hold():
+    ids = read_ids(("Customer ID", circ_customer_var), ("Record ID", circ_record_var),
+                   ("Priority", circ_priority_var))
+    if ids is None:
+        return
+    customer_id, record_id, priority = ids
+
+    def direct():
+        hold_id = next_key("Hold")
+        hold = a9holds.place_hold(cursor, hold_id, record_id, customer_id, priority)
+        return hold[0], hold[4]
+
+    def via_service():
+        cols, rows = service.place_hold(record_id, customer_id, priority)
+        return rows[0][cols.index("HOLDID")], rows[0][cols.index("STATUS")]
+
+    result = circulation_action("Place Hold", direct, via_service)
+    if result is None:
+        return
+    hold_id, status = result
+    circulated(record_id=record_id)
+    circ_hold_var.set(str(hold_id))
+    msg = f"Hold {hold_id} on record {record_id} for customer {customer_id}: {a9queries.HOLD_STATUSES[status]}"
+    set_status(msg)
+    log(msg)
+    show_hold_queue()
+
+
+def desk_cancel_hold():
+    ids = read_ids(("Hold ID", circ_hold_var))
+    if ids is None:
+        return
+    hold_id = ids[0]
+
+    def direct():
+        hold = a9holds.fetch_one(cursor, "hold_by_id", {"hold_id": hold_id})
+        allocated = a9holds.cancel_hold(cursor, hold_id)
+        if hold is None or allocated is None:
+            raise LookupError(f"no hold {hold_id}")
+        return hold[1], allocated
+
+    def via_service():
+        result = service.cancel_hold(hold_id)
+        return result["recordId"], [(a["holdId"], a["customerId"]) for a in result["allocated"]]
+
+    result = circulation_action("Cancel Hold", direct, via_service)
+    if result is None:
+        return
+    record_id, allocated = result
+    circulated(record_id=record_id)
+    msg = f"Hold {hold_id} cancelled" + (f"; {describe_allocated(allocated)}" if allocated else "")
+    set_status(msg)
+    log(msg)
+    show_hold_queue()
+
+
+def show_hold_queue():
+    """Ready holds, then waiting ones in the order they will be served."""
+    if cursor is None and service is None:
+        messagebox.showwarning("Not Connected", "Connect to the database first.")
+        return
+    ids = read_ids(("Record ID", circ_record_var))
+    if ids is None:
+        return
+    record_id = ids[0]
+    try:
+        if service is not None:
+            cols, rows = service.holds(record_id)
+        else:
+            query = a9queries.get("hold_queue")
+            cols, rows = run_query(query.sql, {"record_id": record_id}, query.arraysize)
+    except (cx_Oracle.DatabaseError, a9service.ServiceError) as e:
+        messagebox.showerror("Hold Queue Error", str(e))
+        return
+    show_desk_rows(hold_tree, cols, rows)
+    status = cols.index("STATUS")
+    ready = sum(1 for r in rows if r[status] == "R")
+    set_status(f"Record {record_id}: {ready} ready on the hold shelf, {len(rows) - ready} waiting")
+
+
+# RECORD TAB: ONE TITLE (record, subtype, authors, items) IN ONE ROUND TRIP
+
+DETAIL_SOURCES = {"cache": "recent lookups", "stock": "recent lookups + live counts", "database": "database"}
+
+
+def fetch_record_detail(record_id):
+    """(detail or None, where it came from): detail_cache, middle tier or one record_detail query."""
+    if service is not None:
+        return service.record(record_id), "middle tier"
+
+    def run(name, binds):
+        query = a9queries.get(name)
+        return run_query(query.sql, binds, query.arraysize)
+
+    detail, source = a9queries.cached_record_detail(detail_cache, record_id, run)
+    return detail, DETAIL_SOURCES[source]
+
+
+def show_record_detail():
+    if cursor is None and service is None:
+        messagebox.showwarning("Not Connected", "Connect to the database first.")
+        return
+    ids = read_ids(("Record ID", detail_record_var))
+    if ids is None:
+        return
+    record_id = ids[0]
+
+    start = time.perf_counter()
+    try:
+        detail, source = fetch_record_detail(record_id)
+    except a9service.ServiceError as e:
+        if e.status != 404:
+            messagebox.showerror("Record Error", str(e))
+            return
+        detail, source = None, "middle tier"
     except cx_Oracle.DatabaseError as e:
-        messagebox.showerror("SQL Error", str(e))
-        log("SQL console error: " + str(e))
+        messagebox.showerror("Record Error", str(e))
+        log(f"Record detail error for {record_id}: {e}")
+        return
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+    item_cols = list(a9queries.RECORD_DETAIL_ITEM_COLUMNS)
+    if detail is None:
+        detail_info_var.set("")
+        show_desk_rows(detail_item_tree, item_cols, [])
+        set_status(f"No record {record_id} ({elapsed_ms:.1f} ms)")
+        return
+
+    rec = detail["record"]
+    published = "" if rec["DATEOFPUBLICATION"] is None else str(rec["DATEOFPUBLICATION"])[:10]
+    subtype = ", ".join(f"{col.title()}: {rec[col]}" for col in a9queries.RECORD_DETAIL_COLUMNS[6:]
+                        if rec[col] is not None)
+    authors = "; ".join(a["AUTHORNAME"] for a in detail["authors"]) or "(none)"
+    detail_info_var.set(
+        f"{rec['TITLE']}  [{rec['MEDIATYPE'] or 'no subtype'}]\n"
+        f"Genre: {rec['GENRE'] or '-'}   Published: {published or '-'}   Cataloged by staff {rec['CATALOGEDBY']}\n"
+        f"{subtype or 'No subtype attributes'}\n"
+        f"Authors: {authors}"
+    )
+    show_desk_rows(detail_item_tree, item_cols,
+                   [tuple(item[c] for c in item_cols) for item in detail["items"]])
+    free = sum(item["AVAILABLESTOCK"] or 0 for item in detail["items"])
+    set_status(f"Record {record_id}: {len(detail['items'])} item(s), {free} available "
+               f"({elapsed_ms:.1f} ms, {source})")
 
 
 # BUILD GUI
 def build_gui():
-    global root, status_var, log_text
-    global table_var, tree, search_var
-    global sql_text, console_tree
+    global root, status_var, conn_var, log_text
+    global table_var, tree, search_var, filter_var
+    global sql_text, console_tree, script_tree, txn_var
+    global report_var, days_var, report_tree
+    global scan_var, scan_tree, avail_kind_var, avail_text, avail_tree
+    global customer_var, customer_tree
+    global circ_customer_var, circ_item_var, circ_staff_var, circ_loan_var
+    global circ_record_var, circ_priority_var, circ_hold_var, hold_tree
+    global profile_var, detail_record_var, detail_info_var, detail_item_tree
 
     root = tk.Tk()
     root.title("Library DBMS – Oracle GUI")
     root.geometry("1100x700")
 
+    status_bar = tk.Frame(root)
+    status_bar.pack(fill="x")
+
     status_var = tk.StringVar(value="Not connected")
-    status_label = tk.Label(root, textvariable=status_var, anchor="w", relief="sunken")
-    status_label.pack(fill="x")
+    status_label = tk.Label(status_bar, textvariable=status_var, anchor="w", relief="sunken")
+    status_label.pack(side="left", fill="x", expand=True)
+
+    # Connection state + last ping round trip (updated by health_check)
+    conn_var = tk.StringVar(value="○ Disconnected")
+    conn_label = tk.Label(status_bar, textvariable=conn_var, anchor="e", relief="sunken", width=28)
+    conn_label.pack(side="right")
 
     notebook = ttk.Notebook(root)
     notebook.pack(fill="both", expand=True)
@@ -1094,15 +3113,28 @@ def build_gui():
     schema_frame = ttk.Frame(notebook)
     notebook.add(schema_frame, text="Schema")
 
-    create_btn = ttk.Button(schema_frame, text="Create Tables & View", command=create_tables)
-    create_btn.pack(pady=10)
+    create_row = ttk.Frame(schema_frame)
+    create_row.pack(pady=10)
+
+    create_btn = ttk.Button(create_row, text="Create Tables & View", command=db_action(create_tables))
+    create_btn.pack(side="left")
+
+    # standard = heap tables; performance = IOT / cluster / compressed Loans (a9queries.SCHEMA_PROFILES)
+    tk.Label(create_row, text="Layout:").pack(side="left", padx=(15, 0))
+    profile_var = tk.StringVar(value=a9queries.SCHEMA_PROFILES[0])
+    ttk.Combobox(
+        create_row, textvariable=profile_var, values=a9queries.SCHEMA_PROFILES, width=12, state="readonly",
+    ).pack(side="left", padx=5)
 
-    drop_btn = ttk.Button(schema_frame, text="Drop Tables & View", command=drop_tables)
+    drop_btn = ttk.Button(schema_frame, text="Drop Tables & View", command=db_action(drop_tables))
     drop_btn.pack(pady=5)
 
-    seed_btn = ttk.Button(schema_frame, text="Seed Database", command=seed_data)
+    seed_btn = ttk.Button(schema_frame, text="Seed Database", command=db_action(seed_data))
     seed_btn.pack(pady=5)
 
+    catalog_btn = ttk.Button(schema_frame, text="Rebuild Catalog", command=db_action(rebuild_catalog))
+    catalog_btn.pack(pady=5)
+
     info_lbl = tk.Label(
         schema_frame,
         text="Actions above operate on the Library schema.\n"
@@ -1124,7 +3156,7 @@ def build_gui():
     table_combo.pack(side="left", padx=5)
     table_combo.set("RECORDAVAILABLESTOCK")
 
-    load_btn = ttk.Button(top_browse, text="Load", command=load_table)
+    load_btn = ttk.Button(top_browse, text="Load", command=db_action(load_table))
     load_btn.pack(side="left", padx=5)
 
     # Search controls
@@ -1132,9 +3164,16 @@ def build_gui():
     search_var = tk.StringVar()
     search_entry = ttk.Entry(top_browse, textvariable=search_var, width=25)
     search_entry.pack(side="left", padx=5)
-    search_btn = ttk.Button(top_browse, text="Go", command=search_table)
+    search_btn = ttk.Button(top_browse, text="Go", command=db_action(search_table))
     search_btn.pack(side="left")
 
+    # Quick filter over already-loaded rows (no database round trip)
+    tk.Label(top_browse, text="Filter loaded:").pack(side="left", padx=(20, 0))
+    filter_var = tk.StringVar()
+    filter_entry = ttk.Entry(top_browse, textvariable=filter_var, width=20)
+    filter_entry.pack(side="left", padx=5)
+    filter_entry.bind("<KeyRelease>", schedule_quick_filter)
+
     # Treeview
     tree_frame = ttk.Frame(browse_frame)
     tree_frame.pack(fill="both", expand=True, padx=5, pady=5)
@@ -1150,16 +3189,16 @@ def build_gui():
     btn_frame = ttk.Frame(browse_frame)
     btn_frame.pack(fill="x", padx=5, pady=5)
 
-    add_btn = ttk.Button(btn_frame, text="Add Row", command=add_row)
+    add_btn = ttk.Button(btn_frame, text="Add Row", command=db_action(add_row))
     add_btn.pack(side="left", padx=5)
 
-    edit_btn = ttk.Button(btn_frame, text="Edit Row", command=edit_row)
+    edit_btn = ttk.Button(btn_frame, text="Edit Row", command=db_action(edit_row))
     edit_btn.pack(side="left", padx=5)
 
-    delete_btn = ttk.Button(btn_frame, text="Delete Row", command=delete_row)
+    delete_btn = ttk.Button(btn_frame, text="Delete Row", command=db_action(delete_row))
     delete_btn.pack(side="left", padx=5)
 
-    refresh_btn = ttk.Button(btn_frame, text="Refresh", command=load_table)
+    refresh_btn = ttk.Button(btn_frame, text="Refresh", command=db_action(refresh_table))
     refresh_btn.pack(side="left", padx=5)
 
     # TAB 3: SQL CONSOLE
@@ -1172,8 +3211,26 @@ def build_gui():
     sql_text = tk.Text(upper_console, height=6)
     sql_text.pack(fill="x", padx=5, pady=5)
 
-    exec_btn = ttk.Button(upper_console, text="Execute SQL", command=execute_sql_console)
-    exec_btn.pack(pady=5)
+    console_btns = ttk.Frame(upper_console)
+    console_btns.pack(pady=5)
+
+    exec_btn = ttk.Button(console_btns, text="Execute SQL", command=db_action(execute_sql_console))
+    exec_btn.pack(side="left", padx=5)
+
+    explain_btn = ttk.Button(console_btns, text="Explain / Profile", command=db_action(explain_profile_console))
+    explain_btn.pack(side="left", padx=5)
+
+    txn_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(console_btns, text="Single transaction", variable=txn_var).pack(side="left", padx=15)
+
+    # One line per script statement: result and time
+    script_tree = ttk.Treeview(
+        upper_console, columns=("#", "Statement", "Result", "ms"), show="headings", height=5,
+    )
+    for col, width in (("#", 40), ("Statement", 520), ("Result", 260), ("ms", 80)):
+        script_tree.heading(col, text=col)
+        script_tree.column(col, width=width, anchor="e" if col in ("#", "ms") else "w")
+    script_tree.pack(fill="x", padx=5)
 
     result_frame = ttk.Frame(console_frame)
     result_frame.pack(fill="both", expand=True, padx=5, pady=5)
@@ -1185,6 +3242,148 @@ def build_gui():
     vsb2.pack(side="right", fill="y")
     console_tree.configure(yscrollcommand=vsb2.set)
 
+    # TAB 4: REPORTS (circulation rollups)
+    reports_frame = ttk.Frame(notebook)
+    notebook.add(reports_frame, text="Reports")
+
+    top_reports = ttk.Frame(reports_frame)
+    top_reports.pack(fill="x", padx=5, pady=5)
+
+    tk.Label(top_reports, text="Report:").pack(side="left")
+    report_var = tk.StringVar()
+    report_combo = ttk.Combobox(
+        top_reports, textvariable=report_var,
+        values=[a9queries.get(name).title for name in ROLLUP_REPORTS], width=45, state="readonly",
+    )
+    report_combo.pack(side="left", padx=5)
+    report_combo.current(0)
+
+    tk.Label(top_reports, text="Days:").pack(side="left", padx=(20, 0))
+    days_var = tk.StringVar(value=str(REPORT_DAYS))
+    ttk.Entry(top_reports, textvariable=days_var, width=6).pack(side="left", padx=5)
+
+    run_report_btn = ttk.Button(top_reports, text="Run", command=db_action(run_report))
+    run_report_btn.pack(side="left", padx=5)
+
+    rebuild_rollups_btn = ttk.Button(top_reports, text="Rebuild Rollups", command=db_action(rebuild_rollups))
+    rebuild_rollups_btn.pack(side="left", padx=5)
+
+    report_result = ttk.Frame(reports_frame)
+    report_result.pack(fill="both", expand=True, padx=5, pady=5)
+
+    report_tree = ttk.Treeview(report_result)
+    report_tree.pack(side="left", fill="both", expand=True)
+
+    vsb3 = ttk.Scrollbar(report_result, orient="vertical", command=report_tree.yview)
+    vsb3.pack(side="right", fill="y")
+    report_tree.configure(yscrollcommand=vsb3.set)
+
+    # TAB 5: DESK (scan a barcode or ISBN)
+    desk_frame = ttk.Frame(notebook)
+    notebook.add(desk_frame, text="Desk")
+
+    top_desk = ttk.Frame(desk_frame)
+    top_desk.pack(fill="x", padx=5, pady=5)
+
+    tk.Label(top_desk, text="Scan barcode / ISBN:").pack(side="left")
+    scan_var = tk.StringVar()
+    scan_entry = ttk.Entry(top_desk, textvariable=scan_var, width=30)
+    scan_entry.pack(side="left", padx=5)
+    # Scanners type the code and press Enter
+    scan_entry.bind("<Return>", lambda event: db_action(scan_item)())
+    ttk.Button(top_desk, text="Look Up", command=db_action(scan_item)).pack(side="left", padx=5)
+
+    scan_tree = ttk.Treeview(desk_frame, height=6)
+    scan_tree.pack(fill="both", expand=True, padx=5, pady=5)
+
+    customer_frame = ttk.Frame(desk_frame)
+    customer_frame.pack(fill="x", padx=5, pady=5)
+
+    tk.Label(customer_frame, text="Find customer (name, phone or postal code):").pack(side="left")
+    customer_var = tk.StringVar()
+    customer_entry = ttk.Entry(customer_frame, textvariable=customer_var, width=30)
+    customer_entry.pack(side="left", padx=5)
+    customer_entry.bind("<KeyRelease>", schedule_customer_lookup)
+
+    customer_tree = ttk.Treeview(desk_frame, height=6)
+    customer_tree.pack(fill="both", expand=True, padx=5, pady=5)
+
+    avail_frame = ttk.Frame(desk_frame)
+    avail_frame.pack(fill="x", padx=5, pady=5)
+
+    tk.Label(avail_frame, text="Availability for a list of").pack(side="left")
+    avail_kind_var = tk.StringVar(value="RecordIDs")
+    ttk.Combobox(
+        avail_frame, textvariable=avail_kind_var, values=list(AVAILABILITY_KINDS),
+        width=10, state="readonly",
+    ).pack(side="left", padx=5)
+    tk.Label(avail_frame, text="(comma / space / one per line):").pack(side="left")
+    ttk.Button(avail_frame, text="Check Availability",
+               command=db_action(check_availability)).pack(side="left", padx=5)
+
+    avail_text = tk.Text(desk_frame, height=3)
+    avail_text.pack(fill="x", padx=5)
+
+    avail_tree = ttk.Treeview(desk_frame, height=8)
+    avail_tree.pack(fill="both", expand=True, padx=5, pady=5)
+
+    # TAB 6: CIRCULATION (checkout / return / holds)
+    circ_frame = ttk.Frame(notebook)
+    notebook.add(circ_frame, text="Circulation")
+
+    circ_customer_var = tk.StringVar()
+    circ_item_var = tk.StringVar()
+    circ_staff_var = tk.StringVar(value="1")
+    circ_loan_var = tk.StringVar()
+    circ_record_var = tk.StringVar()
+    circ_priority_var = tk.StringVar(value=str(a9queries.HOLD_PRIORITY))
+    circ_hold_var = tk.StringVar()
+
+    loan_row = ttk.Frame(circ_frame)
+    loan_row.pack(fill="x", padx=5, pady=5)
+    for label, var, width in (("Customer ID:", circ_customer_var, 10), ("Item ID:", circ_item_var, 10),
+                              ("Staff ID:", circ_staff_var, 6)):
+        tk.Label(loan_row, text=label).pack(side="left", padx=(10, 0))
+        ttk.Entry(loan_row, textvariable=var, width=width).pack(side="left", padx=5)
+    ttk.Button(loan_row, text="Check Out", command=db_action(desk_checkout)).pack(side="left", padx=5)
+    tk.Label(loan_row, text="Loan ID:").pack(side="left", padx=(30, 0))
+    ttk.Entry(loan_row, textvariable=circ_loan_var, width=12).pack(side="left", padx=5)
+    ttk.Button(loan_row, text="Return", command=db_action(desk_return)).pack(side="left", padx=5)
+
+    hold_row = ttk.Frame(circ_frame)
+    hold_row.pack(fill="x", padx=5, pady=5)
+    for label, var, width in (("Record ID:", circ_record_var, 10), ("Priority (1 first):", circ_priority_var, 4)):
+        tk.Label(hold_row, text=label).pack(side="left", padx=(10, 0))
+        ttk.Entry(hold_row, textvariable=var, width=width).pack(side="left", padx=5)
+    ttk.Button(hold_row, text="Place Hold", command=db_action(desk_place_hold)).pack(side="left", padx=5)
+    ttk.Button(hold_row, text="Show Queue", command=db_action(show_hold_queue)).pack(side="left", padx=5)
+    tk.Label(hold_row, text="Hold ID:").pack(side="left", padx=(30, 0))
+    ttk.Entry(hold_row, textvariable=circ_hold_var, width=12).pack(side="left", padx=5)
+    ttk.Button(hold_row, text="Cancel Hold", command=db_action(desk_cancel_hold)).pack(side="left", padx=5)
+
+    hold_tree = ttk.Treeview(circ_frame, height=12)
+    hold_tree.pack(fill="both", expand=True, padx=5, pady=5)
+
+    # TAB 7: RECORD (one title with authors, subtype, items, availability)
+    record_frame = ttk.Frame(notebook)
+    notebook.add(record_frame, text="Record")
+
+    top_record = ttk.Frame(record_frame)
+    top_record.pack(fill="x", padx=5, pady=5)
+
+    tk.Label(top_record, text="Record ID:").pack(side="left")
+    detail_record_var = tk.StringVar()
+    detail_entry = ttk.Entry(top_record, textvariable=detail_record_var, width=12)
+    detail_entry.pack(side="left", padx=5)
+    detail_entry.bind("<Return>", lambda event: db_action(show_record_detail)())
+    ttk.Button(top_record, text="Show", command=db_action(show_record_detail)).pack(side="left", padx=5)
+
+    detail_info_var = tk.StringVar()
+    tk.Label(record_frame, textvariable=detail_info_var, justify="left", anchor="w").pack(fill="x", padx=10, pady=5)
+
+    detail_item_tree = ttk.Treeview(record_frame, height=10)
+    detail_item_tree.pack(fill="both", expand=True, padx=5, pady=5)
+
     # BOTTOM LOG PANEL
     log_frame = ttk.Frame(root)
     log_frame.pack(fill="both", expand=False)
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+#Wafee Rahman , Richie Au , Umair Ansar
+
+"""
+Library DBMS – hold queue (reservations) with allocation when a loan ends
+
+- A hold is a customer waiting for a title (RecordID). Statuses:
+    W waiting, R ready (a copy set aside until PickupByDate),
+    F filled (checked out), C cancelled, X expired.
+
+- Each record's queue is a range of ix_Hold_Queue (RecordID, Status,
+  Priority, HoldID), kept in allocation order by the index itself, so the
+  next hold is one index probe (O(log n)) however many are waiting. No
+  queue is ever scanned or sorted.
+
+- return_loan() ends a loan and hands the copy to the next eligible hold
+  in the same transaction; checkout() won't lend a copy set aside for
+  someone else and fills the borrower's own hold. The caller commits.
+  Each of them first locks the record's LibraryInventory rows
+  (SELECT ... FOR UPDATE), so desks on separate connections or separate
+  middle tiers can't hand out the same copy twice.
+  Used by the middle tier (a9service.py) and the GUI Circulation tab.
+
+- Allocation throughput under long queues (stand-in or Oracle):
+    python a9holds.py bench --build --titles 20 --queue 5000 --desks 4
+    python a9holds.py bench --oracle 'user/pass@host:1521/XE' --desks 8
+  Nightly sweep of holds past their pickup / expiry date:
+    python a9holds.py expire --oracle 'user/pass@host:1521/XE'
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import a9load
+import a9queries
+import a9standin
+
+
+HOLD_PRIORITY = a9queries.HOLD_PRIORITY
+HOLD_PICKUP_DAYS = a9queries.HOLD_PICKUP_DAYS
+LOAN_DAYS = 14
+
+# Benchmark rows use keys from here up (one block per desk), removed afterwards.
+BENCH_ID_BASE = 800000000
+BENCH_ID_BLOCK = 1000000
+
+
+class HoldConflict(Exception):
+    """A queue rule says no (the middle tier answers 409)."""
+
+
+
+# STATEMENTS (registry text, same on the stand-in and Oracle)
+
+def fetch_one(cur, name, binds):
+    query = a9queries.get(name)
+    cur.arraysize = query.arraysize
+    cur.execute(query.sql, binds)
+    return cur.fetchone()
+
+
+def fetch_all(cur, name, binds):
+    query = a9queries.get(name)
+    cur.arraysize = query.arraysize
+    cur.execute(query.sql, binds)
+    return cur.fetchall()
+
+
+def execute(cur, name, binds):
+    """Run a DML statement; returns the rows it changed."""
+    cur.execute(a9queries.get(name).sql, binds)
+    return cur.rowcount
+
+
+def lock_items(cur, name, binds):
+    """
+    Lock a record's LibraryInventory rows until the caller commits
+    (lock_record_items / lock_item_record), so free copies are counted and
+    handed out by one session at a time. A stand-in cursor takes sqlite's
+    database write lock instead (BEGIN IMMEDIATE), unless its transaction
+    already writes.
+    """
+    if isinstance(cur, sqlite3.Cursor):
+        if not cur.connection.in_transaction:
+            cur.execute("BEGIN IMMEDIATE")
+        return
+    fetch_all(cur, name, binds)
+
+
+def today_iso(today=None):
+    return today or date.today().isoformat()
+
+
+def days_after(today, days):
+    return (date.fromisoformat(today) + timedelta(days=days)).isoformat()
+
+
+
+# QUEUE OPERATIONS
+
+def allocate(cur, item_id, today=None):
+    """
+    Give the free copies of one item to the head of its record's queue.
+    Expired holds met at the head are closed on the way. Returns the
+    [(HoldID, CustomerID), ...] made ready (normally none or one).
+    """
+    today = today_iso(today)
+    lock_items(cur, "lock_item_record", {"item_id": item_id})
+    found = fetch_one(cur, "hold_free_copies", {"item_id": item_id})
+    if found is None:
+        return []
+    _, record_id, free = found
+    free = free or 0
+    allocated = []
+    while free > 0:
+        head = fetch_one(cur, "hold_queue_head", {"record_id": record_id, "today": today})
+        if head is None:
+            break
+        hold_id, customer_id, expired = head
+        if expired:
+            execute(cur, "hold_set_status", {"hold_id": hold_id, "status": "X", "was": "W"})
+            continue
+        claimed = execute(cur, "hold_claim", {
+            "hold_id": hold_id,
+            "item_id": item_id,
+            "today": today,
+            "pickup_by": days_after(today, HOLD_PICKUP_DAYS),
+        })
+        if claimed:
+            allocated.append((hold_id, customer_id))
+            free -= 1
+    return allocated
+
+
+def return_loan(cur, loan_id, today=None):
+    """
+    End a loan (returnDate set, the row kept) and allocate the copy that came back.
+    Returns {"loanId", "itemId", "allocated"}, or None if the loan isn't out.
+    """
+    today = today_iso(today)
+    loan = fetch_one(cur, "loan_for_return", {"loan_id": loan_id})
+    if loan is None or not execute(cur, "return_loan", {"loan_id": loan_id, "return_date": today}):
+        return None
+    item_id = loan[1]
+    return {"loanId": loan_id, "itemId": item_id, "allocated": allocate(cur, item_id, today)}
+
+
+def place_hold(cur, hold_id, record_id, customer_id, priority=HOLD_PRIORITY, expiry_date=None, today=None):
+    """
+    Queue a hold; if a copy is free right now it is set aside at once.
+    Returns the hold row (HOLD_COLUMNS order).
+    """
+    today = today_iso(today)
+    lock_items(cur, "lock_record_items", {"record_id": record_id})
+    if fetch_one(cur, "hold_open_for_customer", {"customer_id": customer_id, "record_id": record_id}):
+        raise HoldConflict(f"customer {customer_id} already has a hold on record {record_id}")
+    items = fetch_all(cur, "hold_free_copies_by_record", {"record_id": record_id})
+    if not items:
+        raise HoldConflict(f"record {record_id} has no inventory to hold")
+    execute(cur, "hold_place", {
+        "hold_id": hold_id,
+        "record_id": record_id,
+        "customer_id": customer_id,
+        "priority": int(priority),
+        "today": today,
+        "expiry_date": expiry_date,
+    })
+    for item_id, _, free in items:
+        if free and free > 0:
+            allocate(cur, item_id, today)
+    return fetch_one(cur, "hold_by_id", {"hold_id": hold_id})
+
+
+def cancel_hold(cur, hold_id, today=None):
+    """
+    Cancel a waiting or ready hold; a copy it had set aside goes to the
+    next in line. Returns the allocations made, or None if no such hold.
+    """
+    hold = fetch_one(cur, "hold_by_id", {"hold_id": hold_id})
+    if hold is None:
+        return None
+    status, item_id = hold[4], hold[7]
+    if status not in ("W", "R"):
+        raise HoldConflict(f"hold {hold_id} is already {a9queries.HOLD_STATUSES[status]}")
+    if not execute(cur, "hold_set_status", {"hold_id": hold_id, "status": "C", "was": status}):
+        raise HoldConflict(f"hold {hold_id} changed while cancelling; try again")
+    if status == "R" and item_id is not None:
+        return allocate(cur, item_id, today)
+    return []
+
+
+def expire_holds(cur, today=None):
+    """
+    Close holds past their expiry date and ready copies not picked up
+    in time (those copies go to the next in line). Returns (expired, allocated).
+    """
+    today = today_iso(today)
+    expired, allocated = 0, []
+    for hold_id, status, item_id in fetch_all(cur, "holds_expired", {"today": today}):
+        if not execute(cur, "hold_set_status", {"hold_id": hold_id, "status": "X", "was": status}):
+            continue
+        expired += 1
+        if status == "R" and item_id is not None:
+            allocated += allocate(cur, item_id, today)
+    return expired, allocated
+
+
+def checkout(cur, loan_id, customer_id, item_id, staff_id, days=LOAN_DAYS, today=None):
+    """
+    Lend one copy, hold-aware: copies set aside for other customers are
+    not free, the borrower's own ready copy is, and the borrower's open
+    hold on the record is filled. Returns the allocations made because a
+    different copy had been set aside for them.
+    """
+    today = today_iso(today)
+    lock_items(cur, "lock_item_record", {"item_id": item_id})
+    found = fetch_one(cur, "hold_free_copies", {"item_id": item_id})
+    if found is None:
+        raise LookupError(f"no inventory item {item_id}")
+    _, record_id, free = found
+    free = free or 0
+    hold = fetch_one(cur, "hold_open_for_customer", {"customer_id": customer_id, "record_id": record_id})
+    if hold is not None and hold[1] == "R" and hold[2] == item_id:
+        free += 1
+    if free <= 0:
+        raise HoldConflict(f"item {item_id} has no copies free for customer {customer_id} "
+                           f"(on loan or on the hold shelf)")
+
+    execute(cur, "checkout", {
+        "loan_id": loan_id,
+        "customer_id": customer_id,
+        "item_id": item_id,
+        "staff_id": staff_id,
+        "loan_date": today,
+        "due_date": days_after(today, int(days)),
+    })
+    if hold is None:
+        return []
+    hold_id, status, held_item = hold
+    execute(cur, "hold_set_status", {"hold_id": hold_id, "status": "F", "was": status})
+    if status == "R" and held_item is not None and held_item != item_id:
+        return allocate(cur, held_item, today)
+    return []
+
+
+
+# BENCHMARK (long queues, many returns)
+
+class Title:
+    """One hot record in the benchmark: its item and the bench loans on it."""
+
+    def __init__(self, item_id, record_id):
+        self.item_id = item_id
+        self.record_id = record_id
+        self.loans = []
+
+
+def cleanup_bench(factory):
+    """Remove bench holds / loans (keys in BENCH_ID_BASE ..)."""
+    conn = factory()
+    try:
+        cur = conn.cursor()
+        top = BENCH_ID_BASE + 100 * BENCH_ID_BLOCK
+        cur.execute("DELETE FROM Hold WHERE HoldID >= :base AND HoldID < :top",
+                    {"base": BENCH_ID_BASE, "top": top})
+        cur.execute("DELETE FROM Loans WHERE loanId >= :base AND loanId < :top",
+                    {"base": BENCH_ID_BASE, "top": top})
+        conn.commit()
+        cur.close()
+    finally:
+        conn.close()
+
+
+def queue_depth(cur, titles):
+    cur.execute(f"""
+        SELECT COUNT(*) FROM Hold
+        WHERE Status = 'W' AND RecordID IN ({", ".join(str(t.record_id) for t in titles)})
+    """)
+    return cur.fetchone()[0]
+
+
+def setup_bench(factory, titles=20, queue=5000, seed=510):
+    """
+    Put every copy of `titles` records on loan and queue `queue` waiting
+    holds (random priorities, random customers) behind each.
+    Returns ([Title, ...], staff_id).
+    """
+    rnd = random.Random(seed)
+    today = today_iso()
+    conn = factory()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT CustomerID FROM Customer")
+        customers = [r[0] for r in cur.fetchall()]
+        cur.execute("SELECT MIN(StaffID) FROM Staff")
+        staff_id = cur.fetchone()[0]
+        cur.execute("SELECT ItemID, RecordID FROM LibraryInventory ORDER BY ItemID")
+        candidates = cur.fetchall()
+        # Titles with one item row and a free copy, so every copy in play is a bench loan
+        hot, seen = [], set()
+        for item_id, record_id in candidates:
+            if record_id in seen:
+                continue
+            seen.add(record_id)
+            free = fetch_all(cur, "hold_free_copies_by_record", {"record_id": record_id})
+            if len(free) == 1 and (free[0][2] or 0) > 0:
+                hot.append(Title(item_id, record_id))
+                if len(hot) == titles:
+                    break
+        if not customers or staff_id is None or not hot:
+            raise SystemExit("ERROR: the database needs customers, staff and inventory (use --build).")
+
+        next_id = BENCH_ID_BASE
+        for title in hot:
+            _, _, free = fetch_one(cur, "hold_free_copies", {"item_id": title.item_id})
+            for _ in range(free):
+                checkout(cur, next_id, rnd.choice(customers), title.item_id, staff_id, today=today)
+                title.loans.append(next_id)
+                next_id += 1
+            holds = []
+            for _ in range(queue):
+                holds.append({
+                    "hold_id": next_id,
+                    "record_id": title.record_id,
+                    "customer_id": rnd.choice(customers),
+                    "priority": rnd.randint(1, 9),
+                    "today": today,
+                    "expiry_date": None,
+                })
+                next_id += 1
+            cur.executemany(a9queries.get("hold_place").sql, holds)
+            conn.commit()
+        cur.close()
+    finally:
+        conn.close()
+    return hot, staff_id
+
+
+def run_desk(desk_no, factory, titles, staff_id, stats, deadline, counts):
+    """
+    One desk cycling through its titles: return a loan (allocates the copy
+    to the head of the queue), then the ready customer picks it up (checkout
+    fills the hold). Each step is its own transaction.
+    """
+    conn = factory()
+    cur = conn.cursor()
+    next_loan = BENCH_ID_BASE + (desk_no + 1) * BENCH_ID_BLOCK
+    try:
+        while titles and time.perf_counter() < deadline:
+            for title in list(titles):
+                if not title.loans:
+                    titles.remove(title)
+                    continue
+                loan_id = title.loans.pop(0)
+                start = time.perf_counter()
+                try:
+                    result = return_loan(cur, loan_id)
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    stats["return"].record(0.0, str(e))
+                    title.loans.append(loan_id)
+                    continue
+                stats["return"].record((time.perf_counter() - start) * 1000.0)
+                allocated = result["allocated"] if result else []
+                with counts["lock"]:
+                    counts["allocated"] += len(allocated)
+
+                for _, customer_id in allocated:
+                    start = time.perf_counter()
+                    try:
+                        checkout(cur, next_loan, customer_id, title.item_id, staff_id)
+                        conn.commit()
+                    except Exception as e:
+                        conn.rollback()
+                        stats["pickup"].record(0.0, str(e))
+                        continue
+                    stats["pickup"].record((time.perf_counter() - start) * 1000.0)
+                    title.loans.append(next_loan)
+                    next_loan += 1
+                if time.perf_counter() >= deadline:
+                    break
+    finally:
+        cur.close()
+        conn.close()
+
+
+def run_bench(factory, titles=20, queue=5000, desks=4, seconds=10.0, seed=510, keep=False):
+    cleanup_bench(factory)
+    print(f"[Queueing {queue:,} holds behind each of {titles} titles (all copies on loan)...]")
+    t0 = time.perf_counter()
+    hot, staff_id = setup_bench(factory, titles, queue, seed)
+    print(f"[Setup {time.perf_counter() - t0:.1f}s]")
+
+    conn = factory()
+    try:
+        before = queue_depth(conn.cursor(), hot)
+    finally:
+        conn.close()
+
+    stats = {"return": a9load.OpStats(), "pickup": a9load.OpStats()}
+    counts = {"lock": threading.Lock(), "allocated": 0}
+    start = time.perf_counter()
+    deadline = start + seconds
+    with ThreadPoolExecutor(max_workers=desks) as pool:
+        futures = [pool.submit(run_desk, d, factory, hot[d::desks], staff_id, stats, deadline, counts)
+                   for d in range(desks)]
+        for f in futures:
+            f.result()
+    elapsed = time.perf_counter() - start
+
+    conn = factory()
+    try:
+        after = queue_depth(conn.cursor(), hot)
+    finally:
+        conn.close()
+
+    a9load.print_report(stats, elapsed, desks)
+    print()
+    print(f"Allocations: {counts['allocated']:,} in {elapsed:.1f}s "
+          f"= {counts['allocated'] / elapsed if elapsed else 0:,.0f}/s")
+    print(f"Queue depth: {before / len(hot):,.0f} -> {after / len(hot):,.0f} waiting per title "
+          f"({len(hot)} titles)")
+
+    if not keep:
+        cleanup_bench(factory)
+
+
+
+# MAIN
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hold queue: allocation benchmark and expiry sweep.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    bench = sub.add_parser("bench", help="allocation throughput under long hold queues")
+    bench.add_argument("--titles", type=int, default=20, help="records with a hold queue")
+    bench.add_argument("--queue", type=int, default=5000, help="waiting holds per title")
+    bench.add_argument("--desks", type=int, default=4, help="concurrent desks (connections)")
+    bench.add_argument("--seconds", type=float, default=10.0, help="run time")
+    bench.add_argument("--build", action="store_true", help="(re)build and seed the stand-in first")
+    bench.add_argument("--records", type=int, default=5000, help="records to seed with --build")
+    bench.add_argument("--keep", action="store_true", help="keep the bench holds and loans")
+
+    expire = sub.add_parser("expire", help="close holds past their pickup / expiry date")
+    expire.add_argument("--today", default=None, help="YYYY-MM-DD (default today)")
+
+    for p in (bench, expire):
+        p.add_argument("--db", default="library_standin.db", help="stand-in sqlite file")
+        p.add_argument("--oracle", default=None, help="user/pass@dsn to run against Oracle instead")
+    args = parser.parse_args(argv)
+
+    if args.oracle:
+        factory = a9load.oracle_factory(args.oracle)
+    else:
+        if getattr(args, "build", False) or not os.path.exists(args.db):
+            records = getattr(args, "records", 5000)
+            print(f"[Building stand-in database {args.db}...]")
+            a9standin.build(args.db, records=records, customers=max(100, records // 2), loans=records * 2)
+        factory = a9load.standin_factory(args.db)
+
+    if args.command == "bench":
+        run_bench(factory, titles=args.titles, queue=args.queue, desks=args.desks,
+                  seconds=args.seconds, keep=args.keep)
+        return
+
+    conn = factory()
+    try:
+        cur = conn.cursor()
+        expired, allocated = expire_holds(cur, args.today)
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"{expired} hold(s) expired; {len(allocated)} copy(ies) passed to the next in line")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
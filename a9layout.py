@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+#Wafee Rahman , Richie Au , Umair Ansar
+
+"""
+Library DBMS – physical layout comparison (standard vs performance profile)
+
+- Runs the project's own registry queries against each layout, with the
+  same random keys, and prints latency (p50 / p95 ms) side by side:
+    * scan_lookup         – ISBN scan: Book + Record + LibraryInventory + Loans
+    * record_authors      – RecordAuthor range + Author probes
+    * available_by_record – RecordAvailableStock for one RecordID
+    * overdue_notices     – Loans by due date, joined out to customer / title
+    * analytics_loans     – every Loans row (full scan)
+  plus the space each group of tables takes and, on Oracle, logical reads
+  per execution (when the account may read v$mystat).
+
+- Layouts are a9queries.SCHEMA_PROFILES: standard heap tables, or
+  performance (index-organized RecordAuthor, Record + subtypes in one
+  cluster, compressed month-partitioned Loans). The stand-in only has the
+  index-organized RecordAuthor (WITHOUT ROWID); the rest needs Oracle.
+
+- Stand-in: builds one sqlite file per layout from the same seed
+    python a9layout.py --records 20000 --repeat 300
+  Oracle: one schema per layout (GUI Schema tab / CLI option 2 "Layout")
+    python a9layout.py --oracle 'lib_std/pw@localhost:1521/XE' \\
+                       --oracle 'lib_perf/pw@localhost:1521/XE'
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date
+
+import a9load
+import a9queries
+import a9standin
+
+
+# (registry name, share of --repeat). Full-result queries run less often.
+CHECKS = [
+    ("scan_lookup", 1.0),
+    ("record_authors", 1.0),
+    ("available_by_record", 1.0),
+    ("overdue_notices", 0.02),
+    ("analytics_loans", 0.02),
+]
+WARMUP = 5
+
+# Space is reported per group: a cluster holds all four record tables.
+SPACE_GROUPS = {
+    "Record + subtypes": ("RECORD", "BOOK", "EBOOK", "DVD", "RECORDCLUSTER"),
+    "RecordAuthor": ("RECORDAUTHOR",),
+    "Loans": ("LOANS",),
+}
+
+# Bytes per table, its indexes included (index segments count for their table)
+ORACLE_SPACE_SQL = """
+SELECT NVL(i.table_name, s.segment_name), SUM(s.bytes)
+FROM user_segments s
+LEFT JOIN user_indexes i ON i.index_name = s.segment_name
+GROUP BY NVL(i.table_name, s.segment_name)
+"""
+
+SQLITE_SPACE_SQL = """
+SELECT UPPER(m.tbl_name), SUM(d.pgsize)
+FROM dbstat d
+JOIN sqlite_master m ON m.name = d.name
+GROUP BY UPPER(m.tbl_name)
+"""
+
+LOGICAL_READS_SQL = """
+SELECT s.value
+FROM v$mystat s
+JOIN v$statname n ON n.statistic# = s.statistic#
+WHERE n.name = 'session logical reads'
+"""
+
+
+class Layout:
+    """One database to measure: a label, a connection factory and its dialect."""
+
+    def __init__(self, label, factory, dialect):
+        self.label = label
+        self.factory = factory
+        self.dialect = dialect
+
+
+
+# KEYS (read once from the first layout; every layout gets the same ones)
+
+def sample_keys(cur, repeat, seed=510):
+    cur.execute("SELECT RecordID FROM Record")
+    records = [r[0] for r in cur.fetchall()]
+    cur.execute("SELECT ISBN FROM Book WHERE ISBN IS NOT NULL")
+    isbns = [r[0] for r in cur.fetchall()]
+    if not records or not isbns:
+        raise SystemExit("ERROR: no records / ISBNs to measure with (seed the schema first).")
+    rnd = random.Random(seed)
+    return {
+        "record_id": [rnd.choice(records) for _ in range(repeat)],
+        "code": [rnd.choice(isbns) for _ in range(repeat)],
+    }
+
+
+def binds_for(name, keys, i, today):
+    query = a9queries.get(name)
+    values = {"after": 0, "as_of": today}
+    for bind in ("record_id", "code"):
+        if bind in query.binds:
+            values[bind] = keys[bind][i % len(keys[bind])]
+    return {b: values[b] for b in query.binds}
+
+
+
+# MEASUREMENT
+
+def logical_reads(cur):
+    """Session logical reads so far, or None (stand-in / no v$mystat access)."""
+    try:
+        cur.execute(LOGICAL_READS_SQL)
+        return cur.fetchone()[0]
+    except Exception:
+        return None
+
+
+def run_check(curs, name, runs, keys, today):
+    """
+    Execute + fetch `runs` times on every cursor, taking the layouts in turn
+    for each key so drift (caches, other load) hits them alike.
+    Returns [(sorted ms, logical reads per run or None)] in cursor order.
+    """
+    query = a9queries.get(name)
+    for cur in curs:
+        cur.arraysize = query.arraysize
+        for i in range(WARMUP):
+            cur.execute(query.sql, binds_for(name, keys, i, today))
+            cur.fetchall()
+    reads_before = [logical_reads(cur) for cur in curs]
+    timings = [[] for _ in curs]
+    for i in range(runs):
+        binds = binds_for(name, keys, i, today)
+        for cur, ms in zip(curs, timings):
+            start = time.perf_counter()
+            cur.execute(query.sql, binds)
+            cur.fetchall()
+            ms.append((time.perf_counter() - start) * 1000.0)
+    results = []
+    for cur, before, ms in zip(curs, reads_before, timings):
+        after = logical_reads(cur)
+        reads = None if before is None or after is None else (after - before) / runs
+        results.append((sorted(ms), reads))
+    return results
+
+
+def space_by_group(cur, dialect):
+    """SPACE_GROUPS -> KB, or {} when the database can't say."""
+    try:
+        cur.execute(ORACLE_SPACE_SQL if dialect == "oracle" else SQLITE_SPACE_SQL)
+        sizes = dict(cur.fetchall())
+    except Exception:
+        return {}
+    return {group: sum(sizes.get(name, 0) or 0 for name in names) / 1024.0
+            for group, names in SPACE_GROUPS.items()}
+
+
+def oracle_profile(cur):
+    cur.execute(a9queries.PROFILE_CHECK_SQL)
+    return a9queries.detect_profile(cur.fetchall())
+
+
+def measure(layouts, keys, repeat, today):
+    """Per layout: ({query: (sorted ms, reads)}, space by group)."""
+    conns = [layout.factory() for layout in layouts]
+    try:
+        curs = [conn.cursor() for conn in conns]
+        for layout, cur in zip(layouts, curs):
+            if layout.dialect == "oracle":
+                layout.label = f"{oracle_profile(cur)} ({layout.label})"
+        results = [{} for _ in layouts]
+        for name, share in CHECKS:
+            runs = max(3, int(repeat * share))
+            print(f"[{name}: {runs} run(s) per layout...]")
+            for res, outcome in zip(results, run_check(curs, name, runs, keys, today)):
+                res[name] = outcome
+        spaces = [space_by_group(cur, layout.dialect) for layout, cur in zip(layouts, curs)]
+        return results, spaces
+    finally:
+        for conn in conns:
+            conn.close()
+
+
+def percentile(sorted_ms, pct):
+    if not sorted_ms:
+        return 0.0
+    return sorted_ms[min(len(sorted_ms) - 1, int(len(sorted_ms) * pct / 100.0))]
+
+
+
+# REPORT
+
+def print_report(layouts, results, spaces):
+    width = 24
+    print("=================================================================")
+    print("| Physical layout comparison")
+    print("=================================================================")
+    for n, layout in enumerate(layouts, 1):
+        print(f"  [{n}] {layout.label}")
+    print()
+
+    head = "".join(f"{f'[{n}] p50 / p95 ms':>{width}}" for n in range(1, len(layouts) + 1))
+    change = f"{'p50 change':>12}" if len(layouts) == 2 else ""
+    print(f"{'query':<22}{'runs':>6}{head}{change}")
+    for name, _ in CHECKS:
+        cells, p50s = "", []
+        for res in results:
+            timings, _ = res[name]
+            p50s.append(percentile(timings, 50))
+            cells += f"{f'{p50s[-1]:.3f} / {percentile(timings, 95):.3f}':>{width}}"
+        runs = len(results[0][name][0])
+        delta = ""
+        if len(p50s) == 2 and p50s[0]:
+            delta = f"{(p50s[1] - p50s[0]) / p50s[0] * 100:>+11.0f}%"
+        print(f"{name:<22}{runs:>6}{cells}{delta}")
+
+    if any(res[name][1] is not None for res in results for name, _ in CHECKS):
+        print()
+        print(f"{'logical reads / run':<28}" + "".join(f"{f'[{n}]':>{width}}" for n in range(1, len(layouts) + 1)))
+        for name, _ in CHECKS:
+            cells = "".join(f"{'-' if res[name][1] is None else f'{res[name][1]:.1f}':>{width}}"
+                            for res in results)
+            print(f"{name:<28}{cells}")
+
+    if any(spaces):
+        print()
+        print(f"{'space (KB, with indexes)':<28}" + "".join(f"{f'[{n}]':>{width}}" for n in range(1, len(layouts) + 1)))
+        for group in SPACE_GROUPS:
+            cells = "".join(f"{'-' if group not in sp else f'{sp[group]:,.0f}':>{width}}" for sp in spaces)
+            print(f"{group:<28}{cells}")
+
+
+
+# MAIN
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the standard and performance schema layouts.")
+    parser.add_argument("--oracle", action="append", default=[],
+                        help="user/pass@dsn of a schema to measure (give one per layout)")
+    parser.add_argument("--records", type=int, default=20000, help="stand-in: records to seed per layout")
+    parser.add_argument("--repeat", type=int, default=300, help="runs per key lookup query")
+    parser.add_argument("--today", default=None, help="YYYY-MM-DD for overdue_notices (default today)")
+    parser.add_argument("--keep", default=None, help="stand-in: keep the built files in this directory")
+    args = parser.parse_args(argv)
+    today = args.today or date.today().isoformat()
+
+    workdir = None
+    if args.oracle:
+        layouts = [Layout(conn.split("@")[0].split("/")[0] + "@" + conn.split("@")[-1],
+                          a9load.oracle_factory(conn), "oracle")
+                   for conn in args.oracle]
+    else:
+        workdir = args.keep or tempfile.mkdtemp(prefix="a9layout_")
+        os.makedirs(workdir, exist_ok=True)
+        layouts = []
+        for profile in a9queries.SCHEMA_PROFILES:
+            path = os.path.join(workdir, f"{profile}.db")
+            print(f"[Building {profile} stand-in {path} ({args.records:,} records)...]")
+            a9standin.build(path, records=args.records, customers=max(100, args.records // 2),
+                            loans=args.records * 5, profile=profile)
+            layouts.append(Layout(f"{profile} (stand-in {path})", a9load.standin_factory(path), "sqlite"))
+
+    try:
+        conn = layouts[0].factory()
+        try:
+            keys = sample_keys(conn.cursor(), args.repeat)
+        finally:
+            conn.close()
+
+        results, spaces = measure(layouts, keys, args.repeat, today)
+        print()
+        print_report(layouts, results, spaces)
+    finally:
+        if workdir and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+#Wafee Rahman , Richie Au , Umair Ansar
+
+"""
+Library DBMS – multi-desk concurrent load generator
+
+- Simulates N circulation desks hitting the schema at the same time.
+  Each desk is one worker thread with its own connection.
+
+- Operation mix (weights, default search=40,avail=35,checkout=15,report=10):
+    * search    – LIKE search over Record text columns (like search_table)
+    * avail     – availability lookup in RecordAvailableStock by RecordID
+    * checkout  – INSERT into Loans
+    * report    – "records cataloged per staff" aggregate report
+
+- Prints throughput, latency histograms and lock-wait / error counts.
+
+- Runs against the local stand-in (a9standin.py, sqlite) by default:
+    python a9load.py --desks 50 --seconds 30
+  or against Oracle (needs cx_Oracle):
+    python a9load.py --oracle 'user/pass@host:1521/XE' --desks 50
+"""
+
+import argparse
+import bisect
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import a9queries
+import a9standin
+
+
+OPERATIONS = ["search", "avail", "checkout", "report"]
+DEFAULT_MIX = "search=40,avail=35,checkout=15,report=10"
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended).
+BUCKETS_MS = [0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+# Checkouts use loanIds starting here, one block per desk, so desks never collide.
+LOAN_ID_BASE = 900000000
+LOAN_ID_BLOCK = 1000000
+
+
+# Same statement text as the CLI / GUI / middle tier (a9queries.py)
+SEARCH_SQL = a9queries.get("record_text_search").sql
+AVAIL_SQL = a9queries.get("available_by_record").sql
+CHECKOUT_SQL = a9queries.get("checkout").sql
+REPORT_SQL = a9queries.get("staff").sql
+
+SEARCH_TERMS = ["shadow", "river", "fantasy", "horror", "night", "stone", "potter", "ring", "secret"]
+
+# Substrings that identify lock waits / deadlocks / busy errors (Oracle + sqlite).
+LOCK_MARKERS = ("ORA-00054", "ORA-00060", "ORA-30006", "database is locked", "database is busy")
+
+
+
+# CONNECTIONS
+
+def standin_factory(path):
+    def factory():
+        return a9standin.connect(path)
+    return factory
+
+
+def oracle_factory(conn_str):
+    """
+    conn_str is 'user/pass@dsn', same shape as DB_CONN for the CLI.
+    cx_Oracle is only needed when this option is used.
+    """
+    try:
+        import cx_Oracle
+    except ImportError:
+        print("ERROR: cx_Oracle is required for --oracle (pip install cx_Oracle).")
+        sys.exit(1)
+
+    def factory():
+        return cx_Oracle.connect(conn_str, encoding="UTF-8")
+    return factory
+
+
+
+# STATS
+
+class OpStats:
+    """Per-operation counters + latency histogram (thread-safe)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.errors = 0
+        self.lock_waits = 0
+        self.lock_wait_ms = 0.0     # time lost in lock waits / deadlocks before they errored
+        self.lock_wait_max_ms = 0.0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def record(self, elapsed_ms, error=None):
+        with self.lock:
+            if error is not None:
+                self.errors += 1
+                if any(m in error for m in LOCK_MARKERS):
+                    self.lock_waits += 1
+                    self.lock_wait_ms += elapsed_ms
+                    self.lock_wait_max_ms = max(self.lock_wait_max_ms, elapsed_ms)
+                return
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            self.buckets[bisect.bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+
+    def percentile(self, pct):
+        """Approximate percentile: upper bound of the bucket holding it (never above max_ms)."""
+        if self.count == 0:
+            return 0.0
+        target = self.count * pct / 100.0
+        seen = 0
+        for idx, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return min(BUCKETS_MS[idx], self.max_ms) if idx < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+
+
+# WORKLOAD
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip().lower()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation in mix: {name} (choose from {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("Operation mix must have at least one positive weight.")
+    return mix
+
+
+def load_keys(conn):
+    """Fetch the key ranges the desks pick from (records, items, customers, staff)."""
+    cur = conn.cursor()
+    keys = {}
+    for name, sql in (
+        ("records", "SELECT RecordID FROM Record"),
+        ("items", "SELECT ItemID FROM LibraryInventory"),
+        ("customers", "SELECT CustomerID FROM Customer"),
+        ("staff", "SELECT StaffID FROM Staff"),
+    ):
+        cur.execute(sql)
+        keys[name] = [r[0] for r in cur.fetchall()]
+        if not keys[name]:
+            raise RuntimeError(f"No rows for {name}; create and seed the schema first.")
+    cur.close()
+    return keys
+
+
+def run_desk(desk_no, factory, mix, keys, stats, deadline, ops_limit, seed):
+    rnd = random.Random(seed + desk_no)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    next_loan_id = LOAN_ID_BASE + desk_no * LOAN_ID_BLOCK
+    today = time.strftime("%Y-%m-%d")
+    due = time.strftime("%Y-%m-%d", time.localtime(time.time() + 14 * 86400))
+
+    conn = factory()
+    cur = conn.cursor()
+    done = 0
+    try:
+        while time.perf_counter() < deadline and (ops_limit is None or done < ops_limit):
+            op = rnd.choices(names, weights)[0]
+            error = None
+            start = time.perf_counter()
+            try:
+                if op == "search":
+                    cur.execute(SEARCH_SQL, {"term": "%" + rnd.choice(SEARCH_TERMS) + "%"})
+                    cur.fetchall()
+                elif op == "avail":
+                    cur.execute(AVAIL_SQL, {"record_id": rnd.choice(keys["records"])})
+                    cur.fetchall()
+                elif op == "checkout":
+                    cur.execute(
+                        CHECKOUT_SQL,
+                        {
+                            "loan_id": next_loan_id,
+                            "customer_id": rnd.choice(keys["customers"]),
+                            "item_id": rnd.choice(keys["items"]),
+                            "staff_id": rnd.choice(keys["staff"]),
+                            "loan_date": today,
+                            "due_date": due,
+                        },
+                    )
+                    conn.commit()
+                    next_loan_id += 1
+                else:
+                    cur.execute(REPORT_SQL)
+                    cur.fetchall()
+            except Exception as e:  # sqlite3.Error / cx_Oracle.DatabaseError
+                error = str(e)
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+            stats[op].record((time.perf_counter() - start) * 1000.0, error)
+            done += 1
+    finally:
+        cur.close()
+        conn.close()
+    return done
+
+
+def cleanup_checkouts(factory):
+    """Remove loans written by a previous run (loanId >= LOAN_ID_BASE)."""
+    conn = factory()
+    try:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM Loans WHERE loanId >= :base", {"base": LOAN_ID_BASE})
+        conn.commit()
+        cur.close()
+    finally:
+        conn.close()
+
+
+def run_load(factory, desks=10, seconds=10.0, ops_per_desk=None, mix=None, seed=510):
+    """
+    Run the workload and return (stats_by_op, elapsed_seconds).
+    Stops at `seconds` or after `ops_per_desk` operations per desk.
+    """
+    mix = mix or parse_mix(DEFAULT_MIX)
+
+    conn = factory()
+    try:
+        keys = load_keys(conn)
+    finally:
+        conn.close()
+
+    stats = {op: OpStats() for op in OPERATIONS}
+    start = time.perf_counter()
+    deadline = start + seconds
+    with ThreadPoolExecutor(max_workers=desks) as pool:
+        futures = [
+            pool.submit(run_desk, d, factory, mix, keys, stats, deadline, ops_per_desk, seed)
+            for d in range(desks)
+        ]
+        for f in futures:
+            f.result()
+    return stats, time.perf_counter() - start
+
+
+
+# REPORT
+
+def print_report(stats, elapsed, desks):
+    total = sum(s.count for s in stats.values())
+    errors = sum(s.errors for s in stats.values())
+    lock_waits = sum(s.lock_waits for s in stats.values())
+    lock_wait_ms = sum(s.lock_wait_ms for s in stats.values())
+
+    print("=================================================================")
+    print(f"| Load run: {desks} desks, {elapsed:.1f}s")
+    print("=================================================================")
+    print(f"Throughput : {total / elapsed if elapsed else 0:.1f} ops/s ({total} ok)")
+    print(f"Errors     : {errors}  (lock waits / deadlocks: {lock_waits}, {lock_wait_ms:.1f} ms spent waiting)")
+    print()
+    print(f"{'op':<10}{'ok':>8}{'err':>6}{'lock':>6}{'avg ms':>9}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>9}"
+          f"{'wait avg':>10}{'wait max':>10}")
+    for op, s in stats.items():
+        if s.count == 0 and s.errors == 0:
+            continue
+        avg = s.total_ms / s.count if s.count else 0.0
+        wait = s.lock_wait_ms / s.lock_waits if s.lock_waits else 0.0
+        print(f"{op:<10}{s.count:>8}{s.errors:>6}{s.lock_waits:>6}{avg:>9.2f}"
+              f"{s.percentile(50):>8.1f}{s.percentile(95):>8.1f}{s.percentile(99):>8.1f}{s.max_ms:>9.1f}"
+              f"{wait:>10.1f}{s.lock_wait_max_ms:>10.1f}")
+
+    for op, s in stats.items():
+        if s.count == 0:
+            continue
+        print(f"\nLatency histogram – {op}")
+        peak = max(s.buckets) or 1
+        lower = 0
+        for idx, n in enumerate(s.buckets):
+            upper = BUCKETS_MS[idx] if idx < len(BUCKETS_MS) else None
+            label = f"{lower:g}-{upper:g} ms" if upper is not None else f">{lower:g} ms"
+            if n:
+                print(f"  {label:<14}{n:>8}  {'#' * max(1, int(40 * n / peak))}")
+            if upper is not None:
+                lower = upper
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent circulation desks.")
+    parser.add_argument("--desks", type=int, default=10, help="number of concurrent desks (workers)")
+    parser.add_argument("--seconds", type=float, default=10.0, help="run time limit")
+    parser.add_argument("--ops", type=int, default=None, help="operations per desk (optional cap)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation weights, e.g. " + DEFAULT_MIX)
+    parser.add_argument("--db", default="library_standin.db", help="stand-in sqlite file")
+    parser.add_argument("--build", action="store_true", help="(re)build and seed the stand-in first")
+    parser.add_argument("--records", type=int, default=5000, help="records to seed with --build")
+    parser.add_argument("--oracle", default=None, help="user/pass@dsn to run against Oracle instead")
+    parser.add_argument("--keep", action="store_true", help="keep the loans written by checkouts")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.oracle:
+        factory = oracle_factory(args.oracle)
+    else:
+        if args.build or not os.path.exists(args.db):
+            print(f"[Building stand-in database {args.db}...]")
+            a9standin.build(args.db, records=args.records,
+                            customers=max(100, args.records // 2), loans=args.records * 2)
+        factory = standin_factory(args.db)
+
+    stats, elapsed = run_load(factory, desks=args.desks, seconds=args.seconds,
+                              ops_per_desk=args.ops, mix=mix)
+    print_report(stats, elapsed, args.desks)
+
+    if not args.keep:
+        cleanup_checkouts(factory)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
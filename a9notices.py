@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+#Wafee Rahman , Richie Au , Umair Ansar
+
+"""
+Library DBMS – overdue notice pipeline (nightly batch)
+
+- Streams overdue loans joined with Customer / Address / Record
+  ("overdue_notices" in a9queries.py) in loanId order, BATCH rows per fetch.
+
+- Each batch is rendered and written by a worker pool (processes by
+  default) into one file:
+    * txt   – printable notices separated by form feeds
+    * mbox  – one email-ready message per notice
+  At most 2 x workers batches are in flight, so memory stays flat no
+  matter how many loans are overdue.
+
+- Resumable: <out>/state.json holds the loanId watermark below which every
+  notice is on disk. A rerun continues after it; files from batches past
+  the watermark are discarded and regenerated.
+
+- Reports notices per second while running and at the end.
+
+- Runs against the stand-in by default:
+    python a9notices.py --build --loans 1000000 --out notices
+  or Oracle:
+    python a9notices.py --oracle 'user/pass@host:1521/XE' --out notices
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime
+from email.message import EmailMessage
+from email.utils import format_datetime
+
+import a9load
+import a9queries
+import a9standin
+
+
+BATCH = 5000
+WORKERS = os.cpu_count() or 4
+PROGRESS_EVERY_S = 2.0
+LIBRARY_NAME = "Library DBMS"
+SENDER = "circulation@library.example"
+STATE_FILE = "state.json"
+
+NOTICE_TEMPLATE = """\
+{library} – OVERDUE NOTICE                              {as_of}
+
+{name}
+{address}
+
+Our records show the item below is past its due date.
+
+  Title    : {title}
+  Item ID  : {item_id}
+  Loan ID  : {loan_id}
+  Borrowed : {loan_date}
+  Due      : {due_date}   ({days} day(s) overdue)
+
+Please return it to any branch, or call us to renew.
+Customer ID {customer_id}{phone}
+"""
+
+
+
+# RENDERING (runs in the workers)
+
+def day(value):
+    """DATE from cx_Oracle (datetime) or the stand-in (ISO text) -> date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def render_notice(row, as_of):
+    (loan_id, loan_date, due_date, customer_id, first, last, phone,
+     street, city, province, postal, item_id, _record_id, title) = row
+    due = day(due_date)
+    address = "\n".join(p for p in (
+        street, " ".join(p for p in (city, province, postal) if p)) if p) or "(no address on file)"
+    return NOTICE_TEMPLATE.format(
+        library=LIBRARY_NAME,
+        as_of=as_of.isoformat(),
+        name=f"{first} {last}",
+        address=address,
+        title=title,
+        item_id=item_id,
+        loan_id=loan_id,
+        loan_date=day(loan_date).isoformat(),
+        due_date=due.isoformat(),
+        days=max((as_of - due).days, 0),
+        customer_id=customer_id,
+        phone=f" – phone on file {phone}" if phone else "",
+    )
+
+
+def render_mbox_entry(row, text, as_of, stamp):
+    msg = EmailMessage()
+    msg["From"] = SENDER
+    msg["To"] = f"customer-{row[3]}@notices.invalid"  # Customer has no email column yet
+    msg["Subject"] = f"Overdue: {row[13]}"
+    msg["Date"] = stamp
+    msg["X-Loan-ID"] = str(row[0])
+    msg["X-Customer-ID"] = str(row[3])
+    msg.set_content(text, cte="8bit")
+    body = msg.as_bytes().decode("utf-8").replace("\nFrom ", "\n>From ")
+    return f"From {SENDER} {as_of.strftime('%a %b %d 00:00:00 %Y')}\n{body}\n"
+
+
+def write_batch(out_dir, fmt, rows, as_of_text):
+    """Render one batch and write it atomically. Returns (first, last, notices)."""
+    as_of = date.fromisoformat(as_of_text)
+    stamp = format_datetime(datetime.combine(as_of, datetime.min.time()).astimezone())
+    first, last = rows[0][0], rows[-1][0]
+    path = os.path.join(out_dir, batch_file_name(first, last, fmt))
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for i, row in enumerate(rows):
+            text = render_notice(row, as_of)
+            if fmt == "mbox":
+                f.write(render_mbox_entry(row, text, as_of, stamp))
+            else:
+                f.write(text if i == 0 else "\f\n" + text)
+    os.replace(tmp, path)
+    return first, last, len(rows)
+
+
+def batch_file_name(first, last, fmt):
+    return f"notices-{first:012d}-{last:012d}.{fmt}"
+
+
+
+# WATERMARK STATE
+
+def load_state(out_dir, as_of):
+    path = os.path.join(out_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {"as_of": as_of, "watermark": 0, "notices": 0}
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get("as_of") != as_of:
+        print(f"[state.json is for {state.get('as_of')}, not {as_of}: starting over]")
+        return {"as_of": as_of, "watermark": 0, "notices": 0}
+    return state
+
+
+def save_state(out_dir, state):
+    path = os.path.join(out_dir, STATE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+
+def discard_past_watermark(out_dir, watermark):
+    """Remove batch files an interrupted run wrote beyond the watermark (and stray .tmp files)."""
+    removed = 0
+    for name in os.listdir(out_dir):
+        if name.endswith(".tmp"):
+            os.remove(os.path.join(out_dir, name))
+            continue
+        if not name.startswith("notices-"):
+            continue
+        first = int(name.split("-")[1])
+        if first > watermark:
+            os.remove(os.path.join(out_dir, name))
+            removed += 1
+    return removed
+
+
+class Progress:
+    """
+    Tracks finished batches. Batches finish out of order; the watermark only
+    moves past a batch once every earlier batch is on disk too.
+    """
+
+    def __init__(self, out_dir, state):
+        self.lock = threading.Lock()
+        self.out_dir = out_dir
+        self.state = state
+        self.next_seq = 0
+        self.done = {}          # seq -> (last loanId, notices) finished out of order
+        self.notices = 0        # this run
+        self.error = None
+
+    def finished(self, seq, last, count):
+        with self.lock:
+            self.done[seq] = (last, count)
+            self.notices += count
+            moved = False
+            while self.next_seq in self.done:
+                last_id, n = self.done.pop(self.next_seq)
+                self.state["watermark"] = last_id
+                self.state["notices"] += n
+                self.next_seq += 1
+                moved = True
+            if moved:
+                save_state(self.out_dir, self.state)
+
+    def failed(self, exc):
+        with self.lock:
+            if self.error is None:
+                self.error = exc
+
+
+
+# PIPELINE
+
+def run_pipeline(factory, out_dir, as_of=None, fmt="txt", batch=BATCH, workers=WORKERS,
+                 threads=False, restart=False, limit=None, quiet=False):
+    """
+    Generate notices for every overdue loan past the watermark.
+    Returns (notices written this run, elapsed seconds, final state).
+    """
+    as_of = as_of or date.today().isoformat()
+    os.makedirs(out_dir, exist_ok=True)
+    state = {"as_of": as_of, "watermark": 0, "notices": 0} if restart else load_state(out_dir, as_of)
+    discard_past_watermark(out_dir, state["watermark"])
+    save_state(out_dir, state)
+
+    if not quiet:
+        print(f"[Overdue notices as of {as_of}: resuming after loanId {state['watermark']}, "
+              f"{workers} {'thread' if threads else 'process'} worker(s), batch {batch}]")
+
+    progress = Progress(out_dir, state)
+    in_flight = threading.BoundedSemaphore(workers * 2)
+    pool_cls = ThreadPoolExecutor if threads else ProcessPoolExecutor
+    query = a9queries.get("overdue_notices")
+
+    conn = factory()
+    start = time.perf_counter()
+    last_report = start
+    fetched = 0
+    try:
+        cur = conn.cursor()
+        cur.arraysize = batch
+        cur.execute(query.sql, {"after": state["watermark"], "as_of": as_of})
+        with pool_cls(max_workers=workers) as pool:
+            seq = 0
+            while progress.error is None:
+                rows = cur.fetchmany(batch)
+                if not rows:
+                    break
+                if limit is not None and fetched + len(rows) > limit:
+                    rows = rows[:limit - fetched]
+                fetched += len(rows)
+                in_flight.acquire()
+                future = pool.submit(write_batch, out_dir, fmt, [tuple(r) for r in rows], as_of)
+                future.add_done_callback(batch_done(progress, in_flight, seq))
+                seq += 1
+
+                now = time.perf_counter()
+                if not quiet and now - last_report >= PROGRESS_EVERY_S:
+                    last_report = now
+                    print(f"  {progress.notices:>10} notices  {progress.notices / (now - start):10.0f}/s"
+                          f"  watermark loanId {state['watermark']}", flush=True)
+                if limit is not None and fetched >= limit:
+                    break
+        cur.close()
+    finally:
+        conn.close()
+
+    if progress.error is not None:
+        raise progress.error
+    return progress.notices, time.perf_counter() - start, state
+
+
+def batch_done(progress, in_flight, seq):
+    def callback(future):
+        in_flight.release()
+        exc = future.exception()
+        if exc is not None:
+            progress.failed(exc)
+            return
+        _, last, count = future.result()
+        progress.finished(seq, last, count)
+    return callback
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write overdue notices for every overdue loan.")
+    parser.add_argument("--out", default=None, help="output directory (default notices-<as-of>)")
+    parser.add_argument("--as-of", default=None, help="YYYY-MM-DD; loans due before this are overdue (default today)")
+    parser.add_argument("--format", choices=["txt", "mbox"], default="txt")
+    parser.add_argument("--batch", type=int, default=BATCH, help="rows per fetch / per output file")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--threads", action="store_true", help="render in threads instead of processes")
+    parser.add_argument("--restart", action="store_true", help="ignore the saved watermark")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many notices (testing)")
+    parser.add_argument("--db", default="library_standin.db", help="stand-in sqlite file")
+    parser.add_argument("--build", action="store_true", help="(re)build and seed the stand-in first")
+    parser.add_argument("--loans", type=int, default=100000, help="loans to seed with --build")
+    parser.add_argument("--oracle", default=None, help="user/pass@dsn to run against Oracle instead")
+    args = parser.parse_args(argv)
+
+    as_of = args.as_of or date.today().isoformat()
+    try:
+        date.fromisoformat(as_of)
+    except ValueError:
+        parser.error("--as-of must be YYYY-MM-DD")
+
+    if args.oracle:
+        factory = a9load.oracle_factory(args.oracle)
+    else:
+        if args.build or not os.path.exists(args.db):
+            print(f"[Building stand-in database {args.db}...]")
+            a9standin.build(args.db, records=max(1000, args.loans // 20),
+                            customers=max(500, args.loans // 10), loans=args.loans)
+        factory = a9load.standin_factory(args.db)
+
+    out_dir = args.out or f"notices-{as_of}"
+    try:
+        notices, elapsed, state = run_pipeline(
+            factory, out_dir, as_of=as_of, fmt=args.format, batch=args.batch,
+            workers=args.workers, threads=args.threads, restart=args.restart, limit=args.limit,
+        )
+    except KeyboardInterrupt:
+        print("\n(Interrupted – rerun the same command to resume from the watermark)")
+        return 1
+
+    rate = notices / elapsed if elapsed else 0.0
+    print(f"[Done: {notices} notice(s) in {elapsed:.1f}s ({rate:.0f}/s); "
+          f"{state['notices']} total for {as_of}, watermark loanId {state['watermark']}, files in {out_dir}]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
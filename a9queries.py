@@ -0,0 +1,1480 @@
+#!/usr/bin/env python3
+#Wafee Rahman , Richie Au , Umair Ansar
+
+"""
+Library DBMS – shared query registry (CLI, GUI, middle tier, tools)
+
+- Statements that more than one program runs live here once, by name:
+    * sql        – text with :named binds (no trailing ';')
+    * binds      – bind names the text expects
+    * columns    – result columns, for queries
+    * tables     – tables / views the statement reads or writes
+    * arraysize  – rows per fetch round trip
+    * cache_ttl  – seconds a result may be reused (0 = never cached)
+
+- Every client sends byte-identical text, so Oracle hard-parses each
+  statement once and all sessions share the same cursor.
+
+- ResultCache keeps results up to cache_ttl and drops every entry whose
+  query touches a table as soon as that table is written. LRUCache keeps
+  the most recent lookups on the client side (desk scans).
+
+- List the registry:
+    python a9queries.py
+"""
+
+import re
+import sys
+import textwrap
+import threading
+import time
+from collections import OrderedDict
+
+
+BIND_RE = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+
+# Tables behind the RecordAvailableStock view
+STOCK_TABLES = ("RecordAvailableStock", "Record", "LibraryInventory", "Loans", "Hold")
+
+# A Loans row with no returnDate is a copy still out; returned loans stay as
+# history. ix_Loans_active / ix_Loans_active_due index
+#   CASE WHEN returnDate IS NULL THEN itemId END   (and ... dueDate END)
+# whose key is NULL once the loan is returned. Oracle keeps all-NULL keys
+# out of a B-tree, so these indexes hold only what is out now, however much
+# history piles up. A query uses them by repeating the expression exactly:
+#   WHERE CASE WHEN l.returnDate IS NULL THEN l.itemId END = +li.ItemID
+# The unary plus drops li.ItemID's column affinity, without which sqlite
+# (the stand-in) won't probe an expression index from another table's
+# column; Oracle ignores it.
+
+
+class Query:
+    """One named statement plus the metadata clients tune / cache with."""
+
+    __slots__ = ("name", "sql", "title", "binds", "columns", "tables", "arraysize", "cache_ttl")
+
+    def __init__(self, name, sql, title, binds, columns, tables, arraysize, cache_ttl):
+        self.name = name
+        self.sql = sql
+        self.title = title
+        self.binds = binds
+        self.columns = columns
+        self.tables = tables
+        self.arraysize = arraysize
+        self.cache_ttl = cache_ttl
+
+    def __repr__(self):
+        return f"Query({self.name!r})"
+
+    def touches(self, table):
+        return table.upper() in (t.upper() for t in self.tables)
+
+
+REGISTRY = {}
+
+
+def register(name, sql, tables, title=None, columns=(), arraysize=100, cache_ttl=0):
+    sql = textwrap.dedent(sql).strip()
+    binds = tuple(dict.fromkeys(b.lower() for b in BIND_RE.findall(strip_literals(sql))))
+    REGISTRY[name] = Query(name, sql, title or name, binds, tuple(columns), tuple(tables),
+                           arraysize, cache_ttl)
+    return REGISTRY[name]
+
+
+def strip_literals(sql):
+    """Text with '...' literals blanked, so ':' inside strings isn't read as a bind."""
+    return re.sub(r"'(?:[^']|'')*'", "''", sql)
+
+
+def get(name):
+    try:
+        return REGISTRY[name]
+    except KeyError:
+        raise KeyError(f"unknown query {name!r} (registered: {', '.join(REGISTRY)})") from None
+
+
+def touching(table):
+    """Names of the queries that read or write `table`."""
+    return [q.name for q in REGISTRY.values() if q.touches(table)]
+
+
+def view_ddl(dialect="oracle"):
+    """RecordAvailableStock from the registered query (sqlite: the stand-in)."""
+    head = "CREATE OR REPLACE VIEW" if dialect == "oracle" else "CREATE VIEW IF NOT EXISTS"
+    return f"{head} RecordAvailableStock AS\n{get('record_available_stock').sql}"
+
+
+
+# VIEWS
+
+register("record_available_stock", """
+SELECT
+  s.RecordID,
+  s.Title,
+  s.Genre,
+  s.DateOfPublication,
+  s.CatalogedBy,
+  s.ItemID,
+  s.TotalCopies,
+  s.ActiveLoans,
+  s.OnHoldShelf,
+  GREATEST(s.TotalCopies - s.ActiveLoans - s.OnHoldShelf, 0)
+    AS AvailableStock
+FROM (
+  SELECT
+    r.RecordID,
+    r.Title,
+    r.Genre,
+    r.DateOfPublication,
+    r.CatalogedBy,
+    li.ItemID,
+    li.TotalStock                       AS TotalCopies,
+    (SELECT COUNT(*)
+       FROM Loans l
+      WHERE CASE WHEN l.returnDate IS NULL THEN l.itemId END = +li.ItemID)
+                                        AS ActiveLoans,
+    (SELECT COUNT(*)
+       FROM Hold h
+      WHERE h.ItemID = li.ItemID AND h.Status = 'R')
+                                        AS OnHoldShelf
+  FROM Record r
+  JOIN LibraryInventory li
+    ON li.RecordID = r.RecordID
+) s
+""", tables=STOCK_TABLES[1:], title="RecordAvailableStock view body",
+    columns=("RECORDID", "TITLE", "GENRE", "DATEOFPUBLICATION", "CATALOGEDBY",
+             "ITEMID", "TOTALCOPIES", "ACTIVELOANS", "ONHOLDSHELF", "AVAILABLESTOCK"))
+
+
+
+# PREDEFINED REPORTS (CLI option 4, middle tier /reports/<name>)
+
+LOAN_COLUMNS = ("LOANID", "CUSTOMERID", "CUSTOMERNAME", "TITLE", "LOANDATE", "DUEDATE", "OVERDUE")
+LOAN_TABLES = ("Loans", "Customer", "LibraryInventory", "Record")
+
+register("stock", """
+SELECT *
+FROM RecordAvailableStock
+ORDER BY RecordID
+""", tables=STOCK_TABLES, title="Show RecordAvailableStock",
+    columns=get("record_available_stock").columns, arraysize=500, cache_ttl=5)
+
+register("loans", """
+SELECT
+  l.loanId,
+  c.CustomerID,
+  c.FirstName || ' ' || c.LastName AS CustomerName,
+  r.Title,
+  l.loanDate,
+  l.dueDate,
+  l.overdue
+FROM Loans l
+JOIN Customer c          ON c.CustomerID = l.customerId
+JOIN LibraryInventory li ON li.ItemID    = l.itemId
+JOIN Record r            ON r.RecordID   = li.RecordID
+WHERE l.returnDate IS NULL
+ORDER BY l.loanId
+""", tables=LOAN_TABLES, title="Show current Loans with customer + title",
+    columns=LOAN_COLUMNS, arraysize=1000, cache_ttl=10)
+
+register("overdue", """
+SELECT
+  l.loanId,
+  c.CustomerID,
+  c.FirstName || ' ' || c.LastName AS CustomerName,
+  r.Title,
+  l.loanDate,
+  l.dueDate,
+  l.overdue
+FROM Loans l
+JOIN Customer c          ON c.CustomerID = l.customerId
+JOIN LibraryInventory li ON li.ItemID    = l.itemId
+JOIN Record r            ON r.RecordID   = li.RecordID
+WHERE CASE WHEN l.returnDate IS NULL THEN l.dueDate END < CURRENT_DATE
+ORDER BY l.dueDate
+""", tables=LOAN_TABLES, title="Show overdue loans only",
+    columns=LOAN_COLUMNS, arraysize=500, cache_ttl=10)
+
+register("staff", """
+SELECT
+  s.StaffID,
+  s.StaffName,
+  COUNT(r.RecordID) AS RecordsCataloged
+FROM Staff s
+LEFT JOIN Record r ON r.CatalogedBy = s.StaffID
+GROUP BY s.StaffID, s.StaffName
+ORDER BY RecordsCataloged DESC, s.StaffName
+""", tables=("Staff", "Record"), title="Show number of records cataloged by each staff",
+    columns=("STAFFID", "STAFFNAME", "RECORDSCATALOGED"), cache_ttl=60)
+
+# Menu / API order
+REPORTS = ["stock", "loans", "overdue", "staff"]
+
+register("catalog_search", """
+SELECT
+  RecordID, Title, Authors, MediaType, Genre,
+  TotalCopies, ActiveLoans, AvailableStock
+FROM CatalogEntry
+WHERE UPPER(Title) LIKE UPPER(:term) || '%'
+   OR UPPER(Authors) LIKE '%' || UPPER(:term) || '%'
+ORDER BY Title
+""", tables=("CatalogEntry",), title="Catalog search (title prefix or author)",
+    columns=("RECORDID", "TITLE", "AUTHORS", "MEDIATYPE", "GENRE",
+             "TOTALCOPIES", "ACTIVELOANS", "AVAILABLESTOCK"))
+
+
+
+# CIRCULATION (checkout path, load generator)
+
+register("available_by_item", """
+SELECT AvailableStock FROM RecordAvailableStock WHERE ItemID = :item_id
+""", tables=STOCK_TABLES, title="Available copies of one item",
+    columns=("AVAILABLESTOCK",), arraysize=1)
+
+register("available_by_record", """
+SELECT * FROM RecordAvailableStock
+WHERE RecordID = :record_id
+""", tables=STOCK_TABLES, title="Availability of one record",
+    columns=get("record_available_stock").columns, arraysize=10)
+
+register("checkout", """
+INSERT INTO Loans (loanId, customerId, itemId, staffId, loanDate, dueDate, overdue)
+VALUES (:loan_id, :customer_id, :item_id, :staff_id,
+        TO_DATE(:loan_date, 'YYYY-MM-DD'),
+        TO_DATE(:due_date, 'YYYY-MM-DD'),
+        'N')
+""", tables=("Loans",), title="Check out (new Loans row)")
+
+# Overdue loans still out come from ix_Loans_active_due, so returned history
+# is never read (Oracle; the stand-in prefers walking loanId in order).
+register("overdue_notices", """
+SELECT
+  l.loanId, l.loanDate, l.dueDate,
+  c.CustomerID, c.FirstName, c.LastName, c.PhoneNumber,
+  a.Street, a.City, a.Province, a.PostalCode,
+  li.ItemID, r.RecordID, r.Title
+FROM Loans l
+JOIN Customer c          ON c.CustomerID = l.customerId
+LEFT JOIN Address a      ON a.AddressID  = c.AddressID
+JOIN LibraryInventory li ON li.ItemID    = l.itemId
+JOIN Record r            ON r.RecordID   = li.RecordID
+WHERE CASE WHEN l.returnDate IS NULL THEN l.dueDate END < TO_DATE(:as_of, 'YYYY-MM-DD')
+  AND l.loanId > :after
+ORDER BY l.loanId
+""", tables=("Loans", "Customer", "Address", "LibraryInventory", "Record"),
+    title="Overdue loans for notices (after a loanId watermark)",
+    columns=("LOANID", "LOANDATE", "DUEDATE", "CUSTOMERID", "FIRSTNAME", "LASTNAME", "PHONENUMBER",
+             "STREET", "CITY", "PROVINCE", "POSTALCODE", "ITEMID", "RECORDID", "TITLE"),
+    arraysize=5000)
+
+register("record_text_search", """
+SELECT * FROM Record
+WHERE LOWER(Title) LIKE :term OR LOWER(Genre) LIKE :term
+""", tables=("Record",), title="Record title / genre search", arraysize=500)
+
+
+
+# CIRCULATION REPORTS (daily rollup tables; :days counts back from the
+# latest rolled-up day so old demo data still shows)
+
+register("rollup_genre_daily", """
+SELECT LoanDay, Genre, Loans
+FROM LoanDailyGenre
+WHERE LoanDay > (SELECT MAX(LoanDay) FROM LoanDailyGenre) - :days
+ORDER BY LoanDay DESC, Loans DESC, Genre
+""", tables=("LoanDailyGenre",), title="Loans per day by genre",
+    columns=("LOANDAY", "GENRE", "LOANS"), arraysize=500)
+
+register("rollup_genre_weekly", """
+SELECT TRUNC(LoanDay, 'IW') AS WeekStart, Genre, SUM(Loans) AS Loans
+FROM LoanDailyGenre
+WHERE LoanDay > (SELECT MAX(LoanDay) FROM LoanDailyGenre) - :days
+GROUP BY TRUNC(LoanDay, 'IW'), Genre
+ORDER BY WeekStart DESC, Loans DESC, Genre
+""", tables=("LoanDailyGenre",), title="Loans per week by genre",
+    columns=("WEEKSTART", "GENRE", "LOANS"), arraysize=500)
+
+register("rollup_top_titles", """
+SELECT * FROM (
+  SELECT t.RecordID, r.Title, t.Loans
+  FROM (
+    SELECT RecordID, SUM(Loans) AS Loans
+    FROM LoanDailyRecord
+    WHERE LoanDay > (SELECT MAX(LoanDay) FROM LoanDailyRecord) - :days
+    GROUP BY RecordID
+  ) t
+  JOIN Record r ON r.RecordID = t.RecordID
+  ORDER BY t.Loans DESC, t.RecordID
+)
+WHERE ROWNUM <= 20
+""", tables=("LoanDailyRecord", "Record"), title="Top 20 borrowed titles",
+    columns=("RECORDID", "TITLE", "LOANS"), arraysize=20)
+
+register("rollup_customers", """
+SELECT * FROM (
+  SELECT a.CustomerID,
+         c.FirstName || ' ' || c.LastName AS CustomerName,
+         a.Loans, a.ActiveDays, a.LastLoanDay
+  FROM (
+    SELECT CustomerID, SUM(Loans) AS Loans,
+           COUNT(*) AS ActiveDays, MAX(LoanDay) AS LastLoanDay
+    FROM LoanDailyCustomer
+    WHERE LoanDay > (SELECT MAX(LoanDay) FROM LoanDailyCustomer) - :days
+    GROUP BY CustomerID
+  ) a
+  JOIN Customer c ON c.CustomerID = a.CustomerID
+  ORDER BY a.Loans DESC, a.CustomerID
+)
+WHERE ROWNUM <= 50
+""", tables=("LoanDailyCustomer", "Customer"), title="Customer activity (top 50)",
+    columns=("CUSTOMERID", "CUSTOMERNAME", "LOANS", "ACTIVEDAYS", "LASTLOANDAY"), arraysize=50)
+
+register("rollup_utilization", """
+SELECT SnapshotDay,
+       SUM(TotalCopies) AS TotalCopies,
+       SUM(ActiveLoans) AS ActiveLoans,
+       ROUND(100 * SUM(ActiveLoans) / NULLIF(SUM(TotalCopies), 0), 1) AS UtilizationPct
+FROM UtilizationDaily
+WHERE SnapshotDay > (SELECT MAX(SnapshotDay) FROM UtilizationDaily) - :days
+GROUP BY SnapshotDay
+ORDER BY SnapshotDay DESC
+""", tables=("UtilizationDaily",), title="Utilization over time (ActiveLoans / TotalCopies)",
+    columns=("SNAPSHOTDAY", "TOTALCOPIES", "ACTIVELOANS", "UTILIZATIONPCT"), arraysize=500)
+
+# Menu order for the CLI / GUI Reports tab
+ROLLUP_REPORTS = ["rollup_genre_daily", "rollup_genre_weekly", "rollup_top_titles",
+                  "rollup_customers", "rollup_utilization"]
+
+
+
+# ITEM LOOKUP (barcode / ISBN scanned at the desk)
+
+# Items without a label get 'LIB' + zero-padded ItemID (seed data, migrations)
+register("assign_barcodes", """
+UPDATE LibraryInventory
+SET Barcode = 'LIB' || LPAD(ItemID, 9, '0')
+WHERE Barcode IS NULL
+""", tables=("LibraryInventory",), title="Label items that have no barcode")
+
+# One round trip: each branch is a unique-index probe (ux_LI_Barcode /
+# ux_Book_ISBN), active loans come from the ix_Loans_active index.
+register("scan_lookup", """
+SELECT s.MatchedOn, s.ItemID, s.Barcode, s.RecordID, s.Title, s.Genre, s.ISBN,
+       s.TotalCopies, s.ActiveLoans, s.OnHoldShelf,
+       GREATEST(s.TotalCopies - s.ActiveLoans - s.OnHoldShelf, 0) AS AvailableStock
+FROM (
+  SELECT 'BARCODE' AS MatchedOn, li.ItemID, li.Barcode, r.RecordID, r.Title, r.Genre, b.ISBN,
+         li.TotalStock AS TotalCopies,
+         (SELECT COUNT(*) FROM Loans l
+           WHERE CASE WHEN l.returnDate IS NULL THEN l.itemId END = +li.ItemID) AS ActiveLoans,
+         (SELECT COUNT(*) FROM Hold h WHERE h.ItemID = li.ItemID AND h.Status = 'R') AS OnHoldShelf
+  FROM LibraryInventory li
+  JOIN Record r    ON r.RecordID = li.RecordID
+  LEFT JOIN Book b ON b.RecordID = li.RecordID
+  WHERE li.Barcode = :code
+  UNION ALL
+  SELECT 'ISBN', li.ItemID, li.Barcode, r.RecordID, r.Title, r.Genre, b.ISBN,
+         li.TotalStock,
+         (SELECT COUNT(*) FROM Loans l
+           WHERE CASE WHEN l.returnDate IS NULL THEN l.itemId END = +li.ItemID),
+         (SELECT COUNT(*) FROM Hold h WHERE h.ItemID = li.ItemID AND h.Status = 'R')
+  FROM Book b
+  JOIN Record r            ON r.RecordID = b.RecordID
+  JOIN LibraryInventory li ON li.RecordID = b.RecordID
+  WHERE b.ISBN = :code
+) s
+ORDER BY s.ItemID
+""", tables=("LibraryInventory", "Book", "Record", "Loans", "Hold"), title="Item by scanned barcode or ISBN",
+    columns=("MATCHEDON", "ITEMID", "BARCODE", "RECORDID", "TITLE", "GENRE", "ISBN",
+             "TOTALCOPIES", "ACTIVELOANS", "ONHOLDSHELF", "AVAILABLESTOCK"), arraysize=10)
+
+
+# Authors of one record: a RecordAuthor range on its leading RecordID, then
+# one Author probe per row (the whole record in one index block when
+# RecordAuthor is index-organized, see SCHEMA_PROFILES)
+register("record_authors", """
+SELECT ra.RecordID, a.AuthorID, a.AuthorName
+FROM RecordAuthor ra
+JOIN Author a ON a.AuthorID = ra.AuthorID
+WHERE ra.RecordID = :record_id
+ORDER BY a.AuthorName
+""", tables=("RecordAuthor", "Author"), title="Authors of one record",
+    columns=("RECORDID", "AUTHORID", "AUTHORNAME"), arraysize=20)
+
+
+def scan_code(text):
+    """What a scanner or a typed ISBN gives -> the stored form (no spaces / hyphens, upper case)."""
+    return re.sub(r"[\s-]", "", text or "").upper()
+
+
+
+# BATCHED AVAILABILITY (a cart, reading list or course reserve list at once)
+
+# :keys is one collection bind: SYS.ODCINUMBERLIST / ODCIVARCHAR2LIST on
+# Oracle (a JSON array on the stand-in). 1 or 1,000 keys is the same
+# statement in one round trip, and each key is an index probe.
+AVAILABILITY_SQL = """
+SELECT s.LookupKey, s.RecordID, s.Title, s.ItemID, s.TotalCopies, s.ActiveLoans, s.OnHoldShelf,
+       GREATEST(s.TotalCopies - s.ActiveLoans - s.OnHoldShelf, 0) AS AvailableStock
+FROM (
+  SELECT /*+ LEADING(k) USE_NL({nl}) */
+         k.COLUMN_VALUE AS LookupKey, r.RecordID, r.Title, li.ItemID,
+         li.TotalStock AS TotalCopies,
+         (SELECT COUNT(*) FROM Loans l
+           WHERE CASE WHEN l.returnDate IS NULL THEN l.itemId END = +li.ItemID) AS ActiveLoans,
+         (SELECT COUNT(*) FROM Hold h WHERE h.ItemID = li.ItemID AND h.Status = 'R') AS OnHoldShelf
+  FROM TABLE(:keys) k
+  {joins}
+) s
+"""
+
+AVAILABILITY_COLUMNS = ("LOOKUPKEY", "RECORDID", "TITLE", "ITEMID",
+                        "TOTALCOPIES", "ACTIVELOANS", "ONHOLDSHELF", "AVAILABLESTOCK")
+
+# kind -> (registry name, Oracle collection type for :keys)
+AVAILABILITY = {
+    "record": ("availability_by_records", "SYS.ODCINUMBERLIST"),
+    "item": ("availability_by_items", "SYS.ODCINUMBERLIST"),
+    "isbn": ("availability_by_isbns", "SYS.ODCIVARCHAR2LIST"),
+}
+
+# Element limit of the SYS.ODCI*LIST varrays
+MAX_AVAILABILITY_KEYS = 32767
+
+register("availability_by_records", AVAILABILITY_SQL.format(nl="li r", joins="""\
+JOIN LibraryInventory li ON li.RecordID = k.COLUMN_VALUE
+  JOIN Record r            ON r.RecordID  = li.RecordID"""),
+    tables=("LibraryInventory", "Record", "Loans", "Hold"), title="Availability for a list of RecordIDs",
+    columns=AVAILABILITY_COLUMNS, arraysize=1000)
+
+register("availability_by_items", AVAILABILITY_SQL.format(nl="li r", joins="""\
+JOIN LibraryInventory li ON li.ItemID   = k.COLUMN_VALUE
+  JOIN Record r            ON r.RecordID  = li.RecordID"""),
+    tables=("LibraryInventory", "Record", "Loans", "Hold"), title="Availability for a list of ItemIDs",
+    columns=AVAILABILITY_COLUMNS, arraysize=1000)
+
+register("availability_by_isbns", AVAILABILITY_SQL.format(nl="b li r", joins="""\
+JOIN Book b              ON b.ISBN      = k.COLUMN_VALUE
+  JOIN LibraryInventory li ON li.RecordID = b.RecordID
+  JOIN Record r            ON r.RecordID  = b.RecordID"""),
+    tables=("Book", "LibraryInventory", "Record", "Loans", "Hold"), title="Availability for a list of ISBNs",
+    columns=AVAILABILITY_COLUMNS, arraysize=1000)
+
+
+def availability_keys(kind, values):
+    """
+    Keys as typed or pasted (text split on commas / semicolons / whitespace,
+    or a list) -> distinct keys in input order: ints for record / item,
+    normalised ISBNs for isbn. Raises ValueError on a bad key.
+    """
+    if kind not in AVAILABILITY:
+        raise ValueError(f"unknown key kind {kind!r} (choose from {', '.join(AVAILABILITY)})")
+    if isinstance(values, str):
+        values = re.split(r"[\s,;]+", values)
+    keys = []
+    for value in values:
+        text = str(value).strip()
+        if not text:
+            continue
+        if kind == "isbn":
+            keys.append(scan_code(text))
+        elif re.fullmatch(r"\d+", text):
+            keys.append(int(text))
+        else:
+            raise ValueError(f"{kind} ID must be a whole number, got {text!r}")
+    keys = list(dict.fromkeys(keys))
+    if len(keys) > MAX_AVAILABILITY_KEYS:
+        raise ValueError(f"at most {MAX_AVAILABILITY_KEYS} keys per lookup ({len(keys)} given)")
+    return keys
+
+
+def in_key_order(kind, keys, columns, rows):
+    """Rows sorted by their key's position in `keys`, plus the keys nothing matched."""
+    key_col, item_col = columns.index("LOOKUPKEY"), columns.index("ITEMID")
+    if kind != "isbn":  # NUMBER keys may come back as float
+        rows = [tuple(int(v) if i == key_col else v for i, v in enumerate(r)) for r in rows]
+    position = {k: i for i, k in enumerate(keys)}
+    rows = sorted(rows, key=lambda r: (position.get(r[key_col], len(position)), r[item_col]))
+    found = {r[key_col] for r in rows}
+    return rows, [k for k in keys if k not in found]
+
+
+# CUSTOMER LOOKUP (desk type-ahead: name prefix, phone, postal code)
+
+# Every branch is a range on an index (ix_Customer_Name on UPPER names,
+# ix_Customer_Phone on the digits-only PhoneNumber, ix_Address_Postal on
+# the packed postal code), read in index order so only the first
+# CUSTOMER_LOOKUP_LIMIT rows are touched however many patrons match.
+CUSTOMER_LOOKUP_LIMIT = 20
+
+CUSTOMER_LOOKUP_SQL = """
+SELECT /*+ FIRST_ROWS(20) */
+       c.CustomerID, c.FirstName, c.LastName, c.PhoneNumber,
+       a.Street, a.City, a.PostalCode
+FROM {source}
+WHERE {where}
+ORDER BY {order}
+"""
+
+CUSTOMER_LOOKUP_COLUMNS = ("CUSTOMERID", "FIRSTNAME", "LASTNAME", "PHONENUMBER",
+                           "STREET", "CITY", "POSTALCODE")
+
+CUSTOMER_LOOKUP_TABLES = ("Customer", "Address")
+
+CUSTOMER_NAME_ORDER = "UPPER(c.LastName), UPPER(c.FirstName), c.CustomerID"
+
+register("customer_by_last_name", CUSTOMER_LOOKUP_SQL.format(
+    source="Customer c\nLEFT JOIN Address a ON a.AddressID = c.AddressID",
+    where="UPPER(c.LastName) >= :last_from AND UPPER(c.LastName) < :last_to",
+    order=CUSTOMER_NAME_ORDER,
+), tables=CUSTOMER_LOOKUP_TABLES, title="Customers by last-name prefix",
+    columns=CUSTOMER_LOOKUP_COLUMNS, arraysize=CUSTOMER_LOOKUP_LIMIT)
+
+register("customer_by_full_name", CUSTOMER_LOOKUP_SQL.format(
+    source="Customer c\nLEFT JOIN Address a ON a.AddressID = c.AddressID",
+    where="UPPER(c.LastName) >= :last_from AND UPPER(c.LastName) < :last_to\n"
+          "  AND UPPER(c.FirstName) >= :first_from AND UPPER(c.FirstName) < :first_to",
+    order=CUSTOMER_NAME_ORDER,
+), tables=CUSTOMER_LOOKUP_TABLES, title="Customers by last + first name prefix",
+    columns=CUSTOMER_LOOKUP_COLUMNS, arraysize=CUSTOMER_LOOKUP_LIMIT)
+
+register("customer_by_phone", CUSTOMER_LOOKUP_SQL.format(
+    source="Customer c\nLEFT JOIN Address a ON a.AddressID = c.AddressID",
+    where="c.PhoneNumber >= :phone_from AND c.PhoneNumber < :phone_to",
+    order="c.PhoneNumber, c.CustomerID",
+), tables=CUSTOMER_LOOKUP_TABLES, title="Customers by phone number prefix (digits)",
+    columns=CUSTOMER_LOOKUP_COLUMNS, arraysize=CUSTOMER_LOOKUP_LIMIT)
+
+register("customer_by_postal", CUSTOMER_LOOKUP_SQL.format(
+    source="Address a\nJOIN Customer c ON c.AddressID = a.AddressID",
+    where="UPPER(REPLACE(a.PostalCode, ' ', '')) >= :postal_from\n"
+          "  AND UPPER(REPLACE(a.PostalCode, ' ', '')) < :postal_to",
+    order="UPPER(REPLACE(a.PostalCode, ' ', ''))",
+), tables=CUSTOMER_LOOKUP_TABLES, title="Customers by postal code prefix",
+    columns=CUSTOMER_LOOKUP_COLUMNS, arraysize=CUSTOMER_LOOKUP_LIMIT)
+
+POSTAL_PREFIX_RE = re.compile(r"[A-Z]\d[A-Z](\d([A-Z]\d?)?)?")
+
+
+def phone_digits(text):
+    """Phone number as stored: digits only ('(416) 555-0101' -> '4165550101')."""
+    return re.sub(r"\D", "", text or "")
+
+
+def prefix_range(prefix):
+    """[from, to) bounds matching every string that starts with `prefix` (index range scan)."""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def customer_search(text):
+    """
+    What the desk typed -> (query name, binds), or None if too short.
+    Digits (with phone punctuation) search phones, 'M5V' / 'M5V 2T6'
+    postal codes, anything else names: 'Smi', 'Jane Smi' or 'Smith, Ja'.
+    """
+    text = (text or "").strip()
+    packed = re.sub(r"\s", "", text).upper()
+    if len(packed) < 2:
+        return None
+    if re.fullmatch(r"[\d\s().+-]+", text):
+        digits = phone_digits(text)
+        if len(digits) < 3:
+            return None
+        low, high = prefix_range(digits)
+        return "customer_by_phone", {"phone_from": low, "phone_to": high}
+    if POSTAL_PREFIX_RE.fullmatch(packed):
+        low, high = prefix_range(packed)
+        return "customer_by_postal", {"postal_from": low, "postal_to": high}
+    if "," in text:
+        last, _, first = (p.strip().upper() for p in text.partition(","))
+    else:
+        words = text.upper().split()
+        first, last = (" ".join(words[:-1]), words[-1]) if len(words) > 1 else ("", words[0])
+    if not last:
+        return None
+    last_from, last_to = prefix_range(last)
+    if not first:
+        return "customer_by_last_name", {"last_from": last_from, "last_to": last_to}
+    first_from, first_to = prefix_range(first)
+    return "customer_by_full_name", {"last_from": last_from, "last_to": last_to,
+                                     "first_from": first_from, "first_to": first_to}
+
+
+# HOLD QUEUE (reservations; a9holds.py allocates copies as loans end)
+
+# A record's queue is the ('W') range of ix_Hold_Queue (RecordID, Status,
+# Priority, HoldID), already in allocation order: lowest Priority first,
+# then first come first served. The next hold is the first entry of that
+# range, one index probe however many customers are waiting.
+HOLD_STATUSES = {"W": "waiting", "R": "ready", "F": "filled", "C": "cancelled", "X": "expired"}
+HOLD_PRIORITY = 5       # default; 1 (first) .. 9
+HOLD_PICKUP_DAYS = 7    # a ready copy waits on the hold shelf this long
+
+HOLD_COLUMNS = ("HOLDID", "RECORDID", "CUSTOMERID", "PRIORITY", "STATUS",
+                "PLACEDDATE", "EXPIRYDATE", "ITEMID", "READYDATE", "PICKUPBYDATE")
+
+register("hold_queue_head", """
+SELECT /*+ INDEX(h ix_Hold_Queue) FIRST_ROWS(1) */
+       h.HoldID, h.CustomerID,
+       CASE WHEN h.ExpiryDate < TO_DATE(:today, 'YYYY-MM-DD') THEN 1 ELSE 0 END AS Expired
+FROM Hold h
+WHERE h.RecordID = :record_id
+  AND h.Status = 'W'
+ORDER BY h.Priority, h.HoldID
+""", tables=("Hold",), title="Next waiting hold for a record",
+    columns=("HOLDID", "CUSTOMERID", "EXPIRED"), arraysize=1)
+
+# Copies not on loan and not set aside for a ready hold
+HOLD_FREE_COPIES_SQL = """
+SELECT li.ItemID, li.RecordID,
+       li.TotalStock
+       - (SELECT COUNT(*) FROM Loans l
+          WHERE CASE WHEN l.returnDate IS NULL THEN l.itemId END = +li.ItemID)
+       - (SELECT COUNT(*) FROM Hold h WHERE h.ItemID = li.ItemID AND h.Status = 'R')
+         AS FreeCopies
+FROM LibraryInventory li
+WHERE {where}
+"""
+
+register("hold_free_copies", HOLD_FREE_COPIES_SQL.format(where="li.ItemID = :item_id"),
+         tables=("LibraryInventory", "Loans", "Hold"), title="Free copies of one item",
+         columns=("ITEMID", "RECORDID", "FREECOPIES"), arraysize=1)
+
+register("hold_free_copies_by_record", HOLD_FREE_COPIES_SQL.format(where="li.RecordID = :record_id"),
+         tables=("LibraryInventory", "Loans", "Hold"), title="Free copies of each item of a record",
+         columns=("ITEMID", "RECORDID", "FREECOPIES"), arraysize=10)
+
+# Row locks: every path that counts a record's free copies first locks that
+# record's LibraryInventory rows, in ItemID order so two desks can't
+# deadlock. A return and a checkout of the same copy then take turns
+# instead of both seeing it free. (The stand-in has no row locks;
+# a9holds.lock_items takes sqlite's write lock instead.)
+register("lock_record_items", """
+SELECT ItemID FROM LibraryInventory
+WHERE RecordID = :record_id
+ORDER BY ItemID
+FOR UPDATE
+""", tables=("LibraryInventory",), title="Lock a record's items (hold queue)",
+    columns=("ITEMID",), arraysize=10)
+
+register("lock_item_record", """
+SELECT ItemID FROM LibraryInventory
+WHERE RecordID = (SELECT RecordID FROM LibraryInventory WHERE ItemID = :item_id)
+ORDER BY ItemID
+FOR UPDATE
+""", tables=("LibraryInventory",), title="Lock the items of an item's record (hold queue)",
+    columns=("ITEMID",), arraysize=10)
+
+register("hold_place", """
+INSERT INTO Hold (HoldID, RecordID, CustomerID, Priority, Status, PlacedDate, ExpiryDate)
+VALUES (:hold_id, :record_id, :customer_id, :priority, 'W',
+        TO_DATE(:today, 'YYYY-MM-DD'),
+        TO_DATE(:expiry_date, 'YYYY-MM-DD'))
+""", tables=("Hold",), title="Place a hold (new waiting Hold row)")
+
+# Conditional on the status read a moment ago: a desk that loses the race
+# for the same hold updates 0 rows and moves on to the next one.
+register("hold_claim", """
+UPDATE Hold
+SET Status = 'R',
+    ItemID = :item_id,
+    ReadyDate = TO_DATE(:today, 'YYYY-MM-DD'),
+    PickupByDate = TO_DATE(:pickup_by, 'YYYY-MM-DD')
+WHERE HoldID = :hold_id
+  AND Status = 'W'
+""", tables=("Hold",), title="Set a copy aside for a waiting hold")
+
+register("hold_set_status", """
+UPDATE Hold SET Status = :status WHERE HoldID = :hold_id AND Status = :was
+""", tables=("Hold",), title="Move a hold from one status to another")
+
+register("hold_by_id", f"""
+SELECT {", ".join(HOLD_COLUMNS)} FROM Hold WHERE HoldID = :hold_id
+""", tables=("Hold",), title="One hold", columns=HOLD_COLUMNS, arraysize=1)
+
+# Ready before waiting ('R' < 'W'): a customer with a copy on the shelf fills that hold first
+register("hold_open_for_customer", """
+SELECT h.HoldID, h.Status, h.ItemID
+FROM Hold h
+WHERE h.CustomerID = :customer_id
+  AND h.RecordID = :record_id
+  AND h.Status IN ('R', 'W')
+ORDER BY h.Status, h.HoldID
+""", tables=("Hold",), title="A customer's open hold on a record",
+    columns=("HOLDID", "STATUS", "ITEMID"), arraysize=1)
+
+register("hold_queue", """
+SELECT h.HoldID, h.Status, h.Priority, h.CustomerID,
+       c.FirstName || ' ' || c.LastName AS CustomerName,
+       h.PlacedDate, h.ExpiryDate, h.ItemID, h.PickupByDate
+FROM Hold h
+JOIN Customer c ON c.CustomerID = h.CustomerID
+WHERE h.RecordID = :record_id
+  AND h.Status IN ('R', 'W')
+ORDER BY h.Status, h.Priority, h.HoldID
+""", tables=("Hold", "Customer"), title="Hold queue for a record (ready, then waiting in order)",
+    columns=("HOLDID", "STATUS", "PRIORITY", "CUSTOMERID", "CUSTOMERNAME",
+             "PLACEDDATE", "EXPIRYDATE", "ITEMID", "PICKUPBYDATE"))
+
+register("holds_expired", """
+SELECT HoldID, Status, ItemID
+FROM Hold
+WHERE (Status = 'R' AND PickupByDate < TO_DATE(:today, 'YYYY-MM-DD'))
+   OR (Status = 'W' AND ExpiryDate < TO_DATE(:today, 'YYYY-MM-DD'))
+""", tables=("Hold",), title="Holds past their pickup / expiry date",
+    columns=("HOLDID", "STATUS", "ITEMID"))
+
+register("loan_for_return", """
+SELECT loanId, itemId, customerId FROM Loans WHERE loanId = :loan_id AND returnDate IS NULL
+""", tables=("Loans",), title="Loan being returned (still out)",
+    columns=("LOANID", "ITEMID", "CUSTOMERID"), arraysize=1)
+
+# The row stays as history; its keys in ix_Loans_active(_due) become NULL
+register("return_loan", """
+UPDATE Loans
+SET returnDate = TO_DATE(:return_date, 'YYYY-MM-DD')
+WHERE loanId = :loan_id
+  AND returnDate IS NULL
+""", tables=("Loans",), title="Return (end the loan, keep it as history)")
+
+
+# RECORD DETAIL (one title: record, subtype, authors, items, live availability)
+
+# One round trip for what used to be seven SELECT *s. Rows are authors x
+# items of the one record (LEFT JOINs: a record with neither is one row);
+# record_detail() folds them back. Every join is a RecordID / ItemID index
+# probe, and in the performance layout Record + its subtype is one block.
+# AvailableStock leaves out copies on the hold shelf, like a9holds does.
+RECORD_DETAIL_COLUMNS = ("RECORDID", "TITLE", "GENRE", "DATEOFPUBLICATION", "CATALOGEDBY", "MEDIATYPE",
+                         "ISBN", "BINDING", "DRMTYPE", "FILEFORMAT", "RUNTIME", "PGRATING")
+RECORD_DETAIL_AUTHOR_COLUMNS = ("AUTHORID", "AUTHORNAME")
+RECORD_DETAIL_STOCK_COLUMNS = ("TOTALCOPIES", "ACTIVELOANS", "ONHOLDSHELF", "AVAILABLESTOCK")
+RECORD_DETAIL_ITEM_COLUMNS = ("ITEMID", "BARCODE") + RECORD_DETAIL_STOCK_COLUMNS
+
+register("record_detail", """
+SELECT d.*,
+       GREATEST(d.TotalCopies - d.ActiveLoans - d.OnHoldShelf, 0) AS AvailableStock
+FROM (
+  SELECT r.RecordID, r.Title, r.Genre, r.DateOfPublication, r.CatalogedBy,
+         CASE
+           WHEN b.RecordID IS NOT NULL THEN 'BOOK'
+           WHEN e.RecordID IS NOT NULL THEN 'EBOOK'
+           WHEN v.RecordID IS NOT NULL THEN 'DVD'
+         END AS MediaType,
+         b.ISBN, b.Binding, e.DRMType, e.FileFormat, v.RunTime, v.PGRating,
+         a.AuthorID, a.AuthorName,
+         li.ItemID, li.Barcode, li.TotalStock AS TotalCopies,
+         (SELECT COUNT(*) FROM Loans l
+           WHERE CASE WHEN l.returnDate IS NULL THEN l.itemId END = +li.ItemID) AS ActiveLoans,
+         (SELECT COUNT(*) FROM Hold h WHERE h.ItemID = li.ItemID AND h.Status = 'R') AS OnHoldShelf
+  FROM Record r
+  LEFT JOIN Book b              ON b.RecordID  = r.RecordID
+  LEFT JOIN EBook e             ON e.RecordID  = r.RecordID
+  LEFT JOIN DVD v               ON v.RecordID  = r.RecordID
+  LEFT JOIN RecordAuthor ra     ON ra.RecordID = r.RecordID
+  LEFT JOIN Author a            ON a.AuthorID  = ra.AuthorID
+  LEFT JOIN LibraryInventory li ON li.RecordID = r.RecordID
+  WHERE r.RecordID = :record_id
+) d
+ORDER BY d.AuthorName, d.AuthorID, d.ItemID
+""", tables=("Record", "Book", "EBook", "DVD", "RecordAuthor", "Author", "LibraryInventory", "Loans", "Hold"),
+    title="Record detail (authors, subtype, items, availability)",
+    columns=RECORD_DETAIL_COLUMNS + RECORD_DETAIL_AUTHOR_COLUMNS + RECORD_DETAIL_ITEM_COLUMNS,
+    arraysize=100)
+
+
+# Just the counts of one record's items: what a cached detail re-reads once
+# its stock is older than DetailCache.stock_ttl.
+register("record_detail_stock", """
+SELECT d.*,
+       GREATEST(d.TotalCopies - d.ActiveLoans - d.OnHoldShelf, 0) AS AvailableStock
+FROM (
+  SELECT li.ItemID, li.TotalStock AS TotalCopies,
+         (SELECT COUNT(*) FROM Loans l
+           WHERE CASE WHEN l.returnDate IS NULL THEN l.itemId END = +li.ItemID) AS ActiveLoans,
+         (SELECT COUNT(*) FROM Hold h WHERE h.ItemID = li.ItemID AND h.Status = 'R') AS OnHoldShelf
+  FROM LibraryInventory li
+  WHERE li.RecordID = :record_id
+) d
+ORDER BY d.ItemID
+""", tables=("LibraryInventory", "Loans", "Hold"), title="Record detail: stock counts per item",
+    columns=("ITEMID",) + RECORD_DETAIL_STOCK_COLUMNS, arraysize=100)
+
+
+def record_detail(columns, rows):
+    """
+    record_detail rows -> {"record": {...}, "authors": [{...}], "items": [{...}]}
+    (column names as keys), or None when there is no such record.
+    """
+    if not rows:
+        return None
+    idx = {c.upper(): i for i, c in enumerate(columns)}
+
+    def pick(row, names):
+        return {c: row[idx[c]] for c in names}
+
+    authors, items = {}, {}
+    for row in rows:
+        if row[idx["AUTHORID"]] is not None:
+            authors.setdefault(row[idx["AUTHORID"]], pick(row, RECORD_DETAIL_AUTHOR_COLUMNS))
+        if row[idx["ITEMID"]] is not None:
+            items.setdefault(row[idx["ITEMID"]], pick(row, RECORD_DETAIL_ITEM_COLUMNS))
+    return {
+        "record": pick(rows[0], RECORD_DETAIL_COLUMNS),
+        "authors": list(authors.values()),
+        "items": sorted(items.values(), key=lambda item: item["ITEMID"]),
+    }
+
+
+def cached_record_detail(cache, record_id, run):
+    """
+    record_detail through a DetailCache. run(name, binds) -> (columns, rows)
+    executes a registered query and is only called on a miss or stale stock.
+    Returns (detail or None, "cache" | "stock" | "database").
+    """
+    token = cache.begin()
+    detail, stock_fresh = cache.get(record_id)
+    if detail is not None:
+        if stock_fresh:
+            return detail, "cache"
+        refreshed = cache.put_stock(record_id, detail, *run("record_detail_stock", {"record_id": record_id}),
+                                    token=token)
+        if refreshed is not None:
+            return refreshed, "stock"
+    detail = record_detail(*run("record_detail", {"record_id": record_id}))
+    if detail is not None:
+        cache.put(record_id, detail, token)
+    return detail, "database"
+
+
+# ANALYTICS SNAPSHOT (a9analytics.py export; read once, analysed offline)
+
+register("analytics_loans", """
+SELECT l.loanId, l.customerId, l.itemId, l.staffId, li.RecordID, r.Genre,
+       l.loanDate, l.dueDate, l.overdue, l.returnDate
+FROM Loans l
+JOIN LibraryInventory li ON li.ItemID   = l.itemId
+JOIN Record r            ON r.RecordID  = li.RecordID
+""", tables=("Loans", "LibraryInventory", "Record"), title="Loans with record / genre (snapshot)",
+    columns=("LOANID", "CUSTOMERID", "ITEMID", "STAFFID", "RECORDID", "GENRE",
+             "LOANDATE", "DUEDATE", "OVERDUE", "RETURNDATE"),
+    arraysize=50000)
+
+register("analytics_items", """
+SELECT li.ItemID, li.RecordID, li.TotalStock, r.Genre
+FROM LibraryInventory li
+JOIN Record r ON r.RecordID = li.RecordID
+""", tables=("LibraryInventory", "Record"), title="Items with record / genre (snapshot)",
+    columns=("ITEMID", "RECORDID", "TOTALSTOCK", "GENRE"), arraysize=50000)
+
+register("analytics_staff", """
+SELECT StaffID, StaffName FROM Staff
+""", tables=("Staff",), title="Staff names (snapshot)", columns=("STAFFID", "STAFFNAME"))
+
+
+
+# PHYSICAL DESIGN PROFILES (GUI / CLI schema creation; main.sql: DEFINE a9_profile)
+
+# standard: every table is a heap table. performance:
+#   * RecordAuthor is index-organized: its rows are the primary-key index
+#     (prefix-compressed on RecordID), so there is no separate table to visit
+#   * Record and its Book / EBook / DVD rows share the RecordCluster index
+#     cluster: everything about one RecordID sits in one block
+#   * Loans is compressed and partitioned by month of loanDate, so date
+#     ranges read only their months and old months take fewer blocks
+# Clustered tables take ROWDEPENDENCIES from the cluster. An index-organized
+# table can't have it; the GUI's delta refresh then sees block-level
+# ORA_ROWSCN on RecordAuthor (unchanged rows re-sent, none missed).
+SCHEMA_PROFILES = ("standard", "performance")
+
+RECORD_CLUSTER_DDL = [
+    "CREATE CLUSTER RecordCluster (RecordID INT) SIZE 512 ROWDEPENDENCIES",
+    "CREATE INDEX ix_RecordCluster ON CLUSTER RecordCluster",
+]
+
+PERFORMANCE_STORAGE = {
+    "Record": "CLUSTER RecordCluster (RecordID)",
+    "Book": "CLUSTER RecordCluster (RecordID)",
+    "EBook": "CLUSTER RecordCluster (RecordID)",
+    "DVD": "CLUSTER RecordCluster (RecordID)",
+    "RecordAuthor": "ORGANIZATION INDEX COMPRESS 1",
+    "Loans": ("ROW STORE COMPRESS ADVANCED "
+              "PARTITION BY RANGE (loanDate) INTERVAL (NUMTOYMINTERVAL(1, 'MONTH')) "
+              "(PARTITION p_old VALUES LESS THAN (DATE '2000-01-01')) "
+              "ROWDEPENDENCIES"),
+}
+
+# How an Oracle schema was built: one row per table that differs by profile
+PROFILE_TABLES = ("Record", "RecordAuthor", "Book", "EBook", "DVD", "Loans")
+
+PROFILE_CHECK_SQL = f"""
+SELECT table_name, iot_type, cluster_name, partitioned
+FROM user_tables
+WHERE table_name IN ({", ".join(f"'{t.upper()}'" for t in PROFILE_TABLES)})
+"""
+
+
+def check_profile(profile):
+    if profile not in SCHEMA_PROFILES:
+        raise ValueError(f"unknown schema profile {profile!r} (one of {', '.join(SCHEMA_PROFILES)})")
+    return profile
+
+
+def table_storage(table, profile="standard"):
+    """Text after a table's closing ')' in CREATE TABLE for the profile."""
+    if check_profile(profile) == "performance":
+        return PERFORMANCE_STORAGE.get(table, "ROWDEPENDENCIES")
+    return "ROWDEPENDENCIES"
+
+
+def profile_ddl(profile="standard"):
+    """Objects the profile's tables are created in (run before the tables)."""
+    return list(RECORD_CLUSTER_DDL) if check_profile(profile) == "performance" else []
+
+
+def detect_profile(rows):
+    """PROFILE_CHECK_SQL rows -> 'performance', 'standard' or 'mixed'."""
+    special = {name.upper(): bool(iot or cluster or partitioned == "YES")
+               for name, iot, cluster, partitioned in rows}
+    if not special or not any(special.values()):
+        return "standard"
+    return "performance" if all(special.values()) else "mixed"
+
+
+
+# SHARED PL/SQL (GUI / CLI create these from here; main.sql carries the same
+# text, checked by `python a9queries.py --check main.sql`)
+
+def job_ddl(name, action, interval):
+    """PL/SQL block creating a DBMS_SCHEDULER job; a no-op without CREATE JOB or if it exists."""
+    action = action.replace("'", "''")
+    return textwrap.dedent(f"""\
+        BEGIN
+          DBMS_SCHEDULER.CREATE_JOB(
+            job_name        => '{name}',
+            job_type        => 'PLSQL_BLOCK',
+            job_action      => '{action}',
+            repeat_interval => '{interval}',
+            enabled         => TRUE
+          );
+        EXCEPTION
+          WHEN OTHERS THEN NULL;
+        END;""")
+
+
+def drop_job_ddl(name):
+    return f"BEGIN DBMS_SCHEDULER.DROP_JOB('{name}', force => TRUE); EXCEPTION WHEN OTHERS THEN NULL; END;"
+
+
+# Scanned codes are stored the way scan_code() writes them, so a typed
+# "978-0-13-..." and the stored row meet in the unique index
+SCAN_CODE_COLUMNS = (("Book", "ISBN"), ("LibraryInventory", "Barcode"))
+
+
+def scan_code_trigger_sql(table, column):
+    """BEFORE trigger storing `column` as scan_code() would (no spaces / hyphens, upper case)."""
+    return textwrap.dedent(f"""\
+        CREATE OR REPLACE TRIGGER trg_{table}_{column.lower()}
+        BEFORE INSERT OR UPDATE OF {column} ON {table}
+        FOR EACH ROW
+        BEGIN
+          :NEW.{column} := UPPER(REGEXP_REPLACE(:NEW.{column}, '[[:space:]-]', ''));
+        END;""")
+
+
+def scan_code_plsql():
+    return [scan_code_trigger_sql(table, column) for table, column in SCAN_CODE_COLUMNS]
+
+
+# RowTombstone only needs to cover the oldest grid still open. The purge
+# keeps TOMBSTONE_KEEP_DAYS and records the newest commit SCN it removed in
+# RowTombstonePurge; a grid loaded before that SCN may have missed a delete
+# and reloads in full (a9gui.refresh_table).
+TOMBSTONE_KEEP_DAYS = 7
+
+PURGE_TOMBSTONES_PROC = f"""\
+CREATE OR REPLACE PROCEDURE purge_tombstones (p_keep_days IN NUMBER DEFAULT {TOMBSTONE_KEEP_DAYS}) AS
+  v_scn NUMBER;
+BEGIN
+  SELECT MAX(ORA_ROWSCN) INTO v_scn
+  FROM RowTombstone
+  WHERE DeletedAt < SYSDATE - p_keep_days;
+  IF v_scn IS NULL THEN
+    RETURN;
+  END IF;
+  -- Watermark and delete commit together; only rows at or below the
+  -- recorded SCN go, so a delete committing meanwhile is kept.
+  UPDATE RowTombstonePurge SET PurgedScn = GREATEST(PurgedScn, v_scn);
+  DELETE FROM RowTombstone
+  WHERE DeletedAt < SYSDATE - p_keep_days
+    AND ORA_ROWSCN <= v_scn;
+  COMMIT;
+END;"""
+
+TOMBSTONE_PURGE_JOB = job_ddl("TOMBSTONE_PURGE_JOB", "BEGIN purge_tombstones; END;",
+                              "FREQ=DAILY;BYHOUR=2;BYMINUTE=0")
+
+# CatalogEntry: triggers queue changed RecordIDs in CatalogDirty and
+# refresh_catalog rebuilds just those. CATALOG_REFRESH_JOB applies the queue
+# every minute; readers that want it applied now call refresh_catalog_now,
+# which commits in its own (autonomous) transaction, never the caller's.
+
+# Queued records rebuilt (and committed) per pass of refresh_catalog
+CATALOG_BATCH = 5000
+
+REFRESH_CATALOG_PROC = f"""\
+CREATE OR REPLACE PROCEDURE refresh_catalog AS
+  c_batch CONSTANT PLS_INTEGER := {CATALOG_BATCH};
+  v_ids CatalogIdList;
+BEGIN
+  -- Claim the queued ids c_batch at a time and commit each batch, so a full
+  -- rebuild never holds every RecordID or one huge transaction. Later
+  -- changes queue new rows. It commits: run it in its own transaction
+  -- (CATALOG_REFRESH_JOB, refresh_catalog_now).
+  LOOP
+    DELETE FROM CatalogDirty
+    WHERE ROWNUM <= c_batch
+    RETURNING RecordID BULK COLLECT INTO v_ids;
+    EXIT WHEN v_ids.COUNT = 0;
+
+    DELETE FROM CatalogEntry
+    WHERE RecordID IN (SELECT COLUMN_VALUE FROM TABLE(v_ids));
+
+    INSERT INTO CatalogEntry (
+      RecordID, Title, Genre, DateOfPublication, Authors, MediaType,
+      ISBN, Binding, DRMType, FileFormat, RunTime, PGRating,
+      TotalCopies, ActiveLoans, AvailableStock, RefreshedAt
+    )
+    SELECT
+      r.RecordID,
+      r.Title,
+      r.Genre,
+      r.DateOfPublication,
+      (SELECT LISTAGG(a.AuthorName, '; ') WITHIN GROUP (ORDER BY a.AuthorName)
+         FROM RecordAuthor ra
+         JOIN Author a ON a.AuthorID = ra.AuthorID
+        WHERE ra.RecordID = r.RecordID),
+      CASE
+        WHEN b.RecordID IS NOT NULL THEN 'BOOK'
+        WHEN e.RecordID IS NOT NULL THEN 'EBOOK'
+        WHEN d.RecordID IS NOT NULL THEN 'DVD'
+      END,
+      b.ISBN,
+      b.Binding,
+      COALESCE(b.DRMType, e.DRMType),
+      e.FileFormat,
+      d.RunTime,
+      d.PGRating,
+      NVL(s.TotalCopies, 0),
+      NVL(s.ActiveLoans, 0),
+      NVL(s.AvailableStock, 0),
+      SYSDATE
+    FROM Record r
+    LEFT JOIN Book b  ON b.RecordID = r.RecordID
+    LEFT JOIN EBook e ON e.RecordID = r.RecordID
+    LEFT JOIN DVD d   ON d.RecordID = r.RecordID
+    LEFT JOIN (
+      SELECT RecordID,
+             SUM(TotalCopies)    AS TotalCopies,
+             SUM(ActiveLoans)    AS ActiveLoans,
+             SUM(AvailableStock) AS AvailableStock
+      FROM RecordAvailableStock
+      GROUP BY RecordID
+    ) s ON s.RecordID = r.RecordID
+    WHERE r.RecordID IN (SELECT COLUMN_VALUE FROM TABLE(v_ids));
+
+    COMMIT;
+    EXIT WHEN v_ids.COUNT < c_batch;
+  END LOOP;
+END;"""
+
+REFRESH_CATALOG_NOW_PROC = """\
+CREATE OR REPLACE PROCEDURE refresh_catalog_now (p_full IN VARCHAR2 DEFAULT 'N') AS
+  PRAGMA AUTONOMOUS_TRANSACTION;
+BEGIN
+  IF p_full = 'Y' THEN
+    INSERT INTO CatalogDirty (RecordID) SELECT RecordID FROM Record;
+  END IF;
+  refresh_catalog;
+  COMMIT;
+END;"""
+
+# Tables whose rows carry the RecordID directly (Hold: a copy set aside
+# for a ready hold is not available)
+CATALOG_SOURCE_TABLES = ("Record", "RecordAuthor", "Book", "EBook", "DVD", "LibraryInventory", "Hold")
+
+
+def catalog_trigger_sql(table):
+    """Queue the row's record; an update that moves it to another record queues both."""
+    return textwrap.dedent(f"""\
+        CREATE OR REPLACE TRIGGER trg_{table}_catalog
+        AFTER INSERT OR UPDATE OR DELETE ON {table}
+        FOR EACH ROW
+        BEGIN
+          IF :NEW.RecordID IS NOT NULL THEN
+            INSERT INTO CatalogDirty (RecordID) VALUES (:NEW.RecordID);
+          END IF;
+          IF :OLD.RecordID IS NOT NULL AND (:NEW.RecordID IS NULL OR :NEW.RecordID <> :OLD.RecordID) THEN
+            INSERT INTO CatalogDirty (RecordID) VALUES (:OLD.RecordID);
+          END IF;
+        END;""")
+
+
+CATALOG_AUTHOR_TRIGGER = """\
+CREATE OR REPLACE TRIGGER trg_Author_catalog
+AFTER UPDATE OF AuthorName ON Author
+FOR EACH ROW
+BEGIN
+  INSERT INTO CatalogDirty (RecordID)
+  SELECT RecordID FROM RecordAuthor WHERE AuthorID = :NEW.AuthorID;
+END;"""
+
+CATALOG_LOANS_TRIGGER = """\
+CREATE OR REPLACE TRIGGER trg_Loans_catalog
+AFTER INSERT OR UPDATE OR DELETE ON Loans
+FOR EACH ROW
+DECLARE
+  mutating EXCEPTION;
+  PRAGMA EXCEPTION_INIT(mutating, -4091);
+BEGIN
+  INSERT INTO CatalogDirty (RecordID)
+  SELECT RecordID FROM LibraryInventory
+  WHERE ItemID IN (:NEW.itemId, :OLD.itemId);
+EXCEPTION
+  -- Cascaded from a LibraryInventory delete; that trigger queues the record.
+  WHEN mutating THEN NULL;
+END;"""
+
+CATALOG_REFRESH_JOB = job_ddl("CATALOG_REFRESH_JOB", "BEGIN refresh_catalog; COMMIT; END;", "FREQ=MINUTELY")
+
+
+def catalog_plsql():
+    """Catalog procedures, source-table triggers and the refresh job, in creation order."""
+    return ([REFRESH_CATALOG_PROC, REFRESH_CATALOG_NOW_PROC]
+            + [catalog_trigger_sql(t) for t in CATALOG_SOURCE_TABLES]
+            + [CATALOG_AUTHOR_TRIGGER, CATALOG_LOANS_TRIGGER, CATALOG_REFRESH_JOB])
+
+
+# Circulation rollups: checkouts append to LoanRollupQueue (no hot rows for
+# desks); refresh_rollups folds the queue into the daily tables in batches of
+# ROLLUP_BATCH claimed rows, so a long backlog never sits in PGA at once.
+ROLLUP_BATCH = 10000
+
+LOANS_ROLLUP_TRIGGER = """\
+CREATE OR REPLACE TRIGGER trg_Loans_rollup
+AFTER INSERT ON Loans
+FOR EACH ROW
+BEGIN
+  INSERT INTO LoanRollupQueue (customerId, itemId, loanDay)
+  VALUES (:NEW.customerId, :NEW.itemId, TRUNC(:NEW.loanDate));
+END;"""
+
+REFRESH_ROLLUPS_PROC = f"""\
+CREATE OR REPLACE PROCEDURE refresh_rollups (p_snapshot IN VARCHAR2 DEFAULT 'N') AS
+  TYPE num_list IS TABLE OF NUMBER;
+  TYPE day_list IS TABLE OF DATE;
+  c_batch CONSTANT PLS_INTEGER := {ROLLUP_BATCH};
+  v_cust num_list;
+  v_item num_list;
+  v_day  day_list;
+  v_have INT;
+BEGIN
+  -- Claim the queued loans c_batch at a time; new checkouts keep queueing
+  -- behind us, and a short batch means we have caught up.
+  LOOP
+    DELETE FROM LoanRollupQueue
+    WHERE ROWNUM <= c_batch
+    RETURNING customerId, itemId, loanDay BULK COLLECT INTO v_cust, v_item, v_day;
+    EXIT WHEN v_cust.COUNT = 0;
+
+    FORALL i IN 1 .. v_cust.COUNT
+      INSERT INTO LoanRollupBatch (customerId, itemId, loanDay)
+      VALUES (v_cust(i), v_item(i), v_day(i));
+
+    MERGE INTO LoanDailyGenre t
+    USING (
+      SELECT b.loanDay, NVL(r.Genre, '(none)') AS Genre, COUNT(*) AS n
+      FROM LoanRollupBatch b
+      JOIN LibraryInventory li ON li.ItemID = b.itemId
+      JOIN Record r            ON r.RecordID = li.RecordID
+      GROUP BY b.loanDay, NVL(r.Genre, '(none)')
+    ) s
+    ON (t.LoanDay = s.loanDay AND t.Genre = s.Genre)
+    WHEN MATCHED THEN UPDATE SET t.Loans = t.Loans + s.n
+    WHEN NOT MATCHED THEN INSERT (LoanDay, Genre, Loans) VALUES (s.loanDay, s.Genre, s.n);
+
+    MERGE INTO LoanDailyRecord t
+    USING (
+      SELECT b.loanDay, li.RecordID, COUNT(*) AS n
+      FROM LoanRollupBatch b
+      JOIN LibraryInventory li ON li.ItemID = b.itemId
+      GROUP BY b.loanDay, li.RecordID
+    ) s
+    ON (t.LoanDay = s.loanDay AND t.RecordID = s.RecordID)
+    WHEN MATCHED THEN UPDATE SET t.Loans = t.Loans + s.n
+    WHEN NOT MATCHED THEN INSERT (LoanDay, RecordID, Loans) VALUES (s.loanDay, s.RecordID, s.n);
+
+    MERGE INTO LoanDailyCustomer t
+    USING (
+      SELECT loanDay, customerId, COUNT(*) AS n
+      FROM LoanRollupBatch
+      GROUP BY loanDay, customerId
+    ) s
+    ON (t.LoanDay = s.loanDay AND t.CustomerID = s.customerId)
+    WHEN MATCHED THEN UPDATE SET t.Loans = t.Loans + s.n
+    WHEN NOT MATCHED THEN INSERT (LoanDay, CustomerID, Loans) VALUES (s.loanDay, s.customerId, s.n);
+
+    DELETE FROM LoanRollupBatch;
+    EXIT WHEN v_cust.COUNT < c_batch;
+  END LOOP;
+
+  -- One utilization snapshot per day (p_snapshot = 'Y' re-takes today's).
+  SELECT COUNT(*) INTO v_have
+  FROM UtilizationDaily
+  WHERE SnapshotDay = TRUNC(SYSDATE) AND ROWNUM = 1;
+
+  IF p_snapshot = 'Y' OR v_have = 0 THEN
+    MERGE INTO UtilizationDaily t
+    USING (
+      SELECT RecordID, SUM(TotalCopies) AS tc, SUM(ActiveLoans) AS al
+      FROM RecordAvailableStock
+      GROUP BY RecordID
+    ) s
+    ON (t.SnapshotDay = TRUNC(SYSDATE) AND t.RecordID = s.RecordID)
+    WHEN MATCHED THEN UPDATE SET t.TotalCopies = s.tc, t.ActiveLoans = s.al
+    WHEN NOT MATCHED THEN INSERT (SnapshotDay, RecordID, TotalCopies, ActiveLoans)
+      VALUES (TRUNC(SYSDATE), s.RecordID, s.tc, s.al);
+  END IF;
+END;"""
+
+ROLLUP_NIGHTLY_JOB = job_ddl("ROLLUP_NIGHTLY_JOB", "BEGIN refresh_rollups('Y'); COMMIT; END;",
+                             "FREQ=DAILY;BYHOUR=1;BYMINUTE=0")
+
+
+def rollup_plsql():
+    """Queue trigger, refresh_rollups and the nightly job, in creation order."""
+    return [LOANS_ROLLUP_TRIGGER, REFRESH_ROLLUPS_PROC, ROLLUP_NIGHTLY_JOB]
+
+
+def shared_plsql():
+    """Every block main.sql must carry verbatim (whitespace aside), the stock view included."""
+    return (scan_code_plsql() + [view_ddl(), PURGE_TOMBSTONES_PROC, TOMBSTONE_PURGE_JOB]
+            + catalog_plsql() + rollup_plsql())
+
+
+def check_script(text):
+    """Names of shared blocks missing from (or drifted in) a SQL script."""
+    flat = " ".join(text.split())
+    return [re.search(r"(?:TRIGGER|PROCEDURE|VIEW|job_name\s*=>)\s*'?(\w+)", block).group(1)
+            for block in shared_plsql() if " ".join(block.split()) not in flat]
+
+
+
+# RESULT CACHE
+
+class ResultCache:
+    """
+    Results by (query name, binds), kept for the query's cache_ttl.
+    invalidate(table) drops every cached result whose query touches it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}   # (name, binds) -> (expires, result)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(name, params):
+        return name, tuple(sorted((params or {}).items()))
+
+    def get(self, name, params=None):
+        with self.lock:
+            entry = self.entries.get(self.key(name, params))
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, name, params, result):
+        ttl = get(name).cache_ttl
+        if ttl > 0:
+            with self.lock:
+                self.entries[self.key(name, params)] = (time.monotonic() + ttl, result)
+        return result
+
+    def invalidate(self, table):
+        """Forget results of queries touching `table`; returns how many went."""
+        names = set(touching(table))
+        with self.lock:
+            stale = [k for k in self.entries if k[0] in names]
+            for k in stale:
+                del self.entries[k]
+        return len(stale)
+
+
+class LRUCache:
+    """
+    The maxsize most recently used results, each kept for ttl seconds
+    (thread-safe). get() returns None on a miss.
+    """
+
+    def __init__(self, maxsize=256, ttl=30.0):
+        self.lock = threading.Lock()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()    # key -> (expires, value), oldest first
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class DetailCache:
+    """
+    record_detail() results by RecordID (middle tier, GUI direct path).
+    The catalogue part is kept `ttl` seconds, the stock counts only
+    `stock_ttl`: after that a hit re-reads just record_detail_stock, so
+    copies lent at other desks show within seconds. invalidate() drops one
+    record (or only its counts); a read that began before any invalidate
+    is not stored, so it can't put back what a write just dropped.
+    """
+
+    # Writes to these only change counts; other record_detail tables change the detail itself
+    STOCK_TABLES = ("Loans", "Hold")
+
+    def __init__(self, maxsize=1024, ttl=60.0, stock_ttl=5.0):
+        self.details = LRUCache(maxsize, ttl)   # record_id -> (stock expires, detail)
+        self.stock_ttl = stock_ttl
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.stock_reads = 0
+
+    @property
+    def misses(self):
+        return self.details.misses
+
+    def begin(self):
+        """Token for a read about to start; pass it to put / put_stock."""
+        with self.lock:
+            return self.generation
+
+    def get(self, record_id):
+        """(detail, stock still fresh) or (None, False)."""
+        entry = self.details.get(record_id)
+        if entry is None:
+            return None, False
+        fresh = entry[0] > time.monotonic()
+        with self.lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.stock_reads += 1
+        return entry[1], fresh
+
+    def put(self, record_id, detail, token):
+        with self.lock:
+            if token == self.generation:
+                self.details.put(record_id, (time.monotonic() + self.stock_ttl, detail))
+        return detail
+
+    def put_stock(self, record_id, detail, columns, rows, token):
+        """
+        A copy of detail with record_detail_stock counts, stored like put().
+        None when the record's items changed meanwhile (reload it in full).
+        """
+        idx = {c.upper(): i for i, c in enumerate(columns)}
+        counts = {row[idx["ITEMID"]]: row for row in rows}
+        if sorted(counts) != [item["ITEMID"] for item in detail["items"]]:
+            return None
+        items = [dict(item, **{c: counts[item["ITEMID"]][idx[c]] for c in RECORD_DETAIL_STOCK_COLUMNS})
+                 for item in detail["items"]]
+        return self.put(record_id, dict(detail, items=items), token)
+
+    def invalidate(self, record_id=None, item_id=None, stock_only=False):
+        """Drop the record (found by item_id if not given); stock_only keeps its catalogue part."""
+        with self.lock, self.details.lock:
+            self.generation += 1
+            entries = self.details.entries
+            if record_id is None:
+                record_id = next((rid for rid, (_, (_, d)) in entries.items()
+                                  if any(item["ITEMID"] == item_id for item in d["items"])), None)
+            entry = entries.get(record_id)
+            if entry is None:
+                return
+            if stock_only:
+                expires, (_, detail) = entry
+                entries[record_id] = (expires, (0.0, detail))
+            else:
+                del entries[record_id]
+
+    def invalidate_table(self, table):
+        """After a write to `table` whose rows aren't known: counts of every record, or everything."""
+        if not get("record_detail").touches(table):
+            return
+        with self.lock, self.details.lock:
+            self.generation += 1
+            entries = self.details.entries
+            if any(t.upper() == table.upper() for t in self.STOCK_TABLES):
+                for record_id, (expires, (_, detail)) in list(entries.items()):
+                    entries[record_id] = (expires, (0.0, detail))
+            else:
+                entries.clear()
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.details.clear()
+
+
+
+# LISTING
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["--check"]:
+        problems = 0
+        for path in argv[1:] or ["main.sql"]:
+            with open(path, encoding="utf-8") as f:
+                missing = check_script(f.read())
+            for first_line in missing:
+                print(f"{path}: differs from a9queries: {first_line}")
+            problems += len(missing)
+        print(f"{len(shared_plsql())} shared PL/SQL block(s) checked, {problems} problem(s)")
+        return 1 if problems else 0
+
+    print(f"{len(REGISTRY)} registered statement(s)\n")
+    for q in REGISTRY.values():
+        binds = ", ".join(":" + b for b in q.binds) or "-"
+        ttl = f"{q.cache_ttl}s" if q.cache_ttl else "-"
+        print(f"{q.name:<24} binds {binds:<16} arraysize {q.arraysize:<5} ttl {ttl:<4} {q.title}")
+        print(f"{'':<24} tables: {', '.join(q.tables)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
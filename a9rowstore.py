@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+#Wafee Rahman , Richie Au , Umair Ansar
+
+"""
+Library DBMS – compact columnar store for loaded result sets
+
+- One typed column per result column instead of one tuple per row:
+    * int       -> array('q')
+    * float     -> array('d')
+    * datetime  -> array('q') of epoch seconds
+    * str       -> dictionary-encoded: array('l') codes + distinct values
+  plus a null bitmap (bytearray) per column.
+
+- Sorting and quick filters run in memory and return row-index arrays,
+  so the GUI grid can re-order / narrow a loaded table without a SELECT.
+
+- Memory check (Loans-shaped rows):
+    python a9rowstore.py --rows 1000000
+"""
+
+import argparse
+import sys
+import tracemalloc
+from array import array
+from datetime import datetime, timedelta
+
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def display_text(value):
+    """Same text the Treeview shows for a value."""
+    return "" if value is None else str(value)
+
+
+def mixed_key(value):
+    """Sort key for untyped columns: numbers first (numerically), then text."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value, "")
+    return (1, 0, display_text(value).lower())
+
+
+def zeros(typecode, n):
+    return array(typecode, [0]) * n
+
+
+
+# COLUMN
+
+class Column:
+    """One typed, append-only column. Kind is decided by the first non-null value."""
+
+    __slots__ = ("kind", "data", "nulls", "values", "codes")
+
+    def __init__(self):
+        self.kind = None          # None until first non-null value
+        self.data = None          # array for int / float / datetime
+        self.nulls = bytearray()  # 1 = NULL
+        self.values = None        # str: distinct values (code -> value)
+        self.codes = None         # str: value -> code
+
+    def __len__(self):
+        return len(self.nulls)
+
+    def _start(self, value):
+        n = len(self.nulls)
+        if isinstance(value, bool) or not isinstance(value, (int, float, datetime, str)):
+            self.kind = "obj"
+            self.data = [None] * n
+        elif isinstance(value, int):
+            self.kind = "int"
+            self.data = zeros("q", n)
+        elif isinstance(value, float):
+            self.kind = "float"
+            self.data = zeros("d", n)
+        elif isinstance(value, datetime):
+            self.kind = "datetime"
+            self.data = zeros("q", n)
+        else:
+            self.kind = "str"
+            self.data = zeros("l", n)
+            self.values = []
+            self.codes = {}
+
+    def _demote(self):
+        """Fall back to a plain list when a value doesn't fit the column type."""
+        old = [self.get(i) for i in range(len(self.nulls))]
+        self.kind = "obj"
+        self.data = old
+        self.values = None
+        self.codes = None
+
+    def _encode(self, value):
+        """Value -> stored slot for this column's kind, or raise TypeError."""
+        kind = self.kind
+        if kind == "obj":
+            return value
+        if isinstance(value, bool):
+            raise TypeError
+        if kind == "int" and isinstance(value, int):
+            if not -(1 << 63) <= value < (1 << 63):
+                raise TypeError
+            return value
+        if kind == "float" and isinstance(value, float):
+            return value
+        if kind == "datetime" and isinstance(value, datetime):
+            return int((value - EPOCH).total_seconds())
+        if kind == "str" and isinstance(value, str):
+            code = self.codes.get(value)
+            if code is None:
+                code = len(self.values)
+                self.codes[value] = code
+                self.values.append(value)
+            return code
+        raise TypeError
+
+    def _encode_or_demote(self, value):
+        if self.kind is None:
+            self._start(value)
+        while True:
+            try:
+                return self._encode(value)
+            except TypeError:
+                self._demote()
+
+    def append(self, value):
+        if value is None:
+            self.nulls.append(1)
+            if self.kind is not None:
+                self.data.append(None if self.kind == "obj" else 0)
+            return
+        slot = self._encode_or_demote(value)
+        self.data.append(slot)
+        self.nulls.append(0)
+
+    def set(self, idx, value):
+        """Overwrite one cell (used when a row is patched in place)."""
+        if value is None:
+            self.nulls[idx] = 1
+            return
+        slot = self._encode_or_demote(value)
+        self.data[idx] = slot
+        self.nulls[idx] = 0
+
+    def get(self, idx):
+        if self.nulls[idx]:
+            return None
+        kind = self.kind
+        if kind == "str":
+            return self.values[self.data[idx]]
+        if kind == "datetime":
+            return EPOCH + timedelta(seconds=self.data[idx])
+        return self.data[idx]
+
+    def sort_key(self):
+        """Key function over row indices (NULLs sort last)."""
+        nulls = self.nulls
+        data = self.data
+        if self.kind == "str":
+            # Rank distinct values once, then sort rows by rank.
+            order = sorted(range(len(self.values)), key=lambda c: self.values[c].lower())
+            rank = zeros("l", len(order))
+            for r, c in enumerate(order):
+                rank[c] = r
+            return lambda i: (nulls[i], rank[data[i]] if not nulls[i] else 0)
+        if self.kind == "obj":
+            return lambda i: (nulls[i],) + mixed_key(data[i])
+        if self.kind is None:
+            return lambda i: 0
+        return lambda i: (nulls[i], data[i])
+
+    def value_key(self):
+        """Same order as sort_key() without ranking every distinct value (for a few lookups)."""
+        if self.kind != "str":
+            return self.sort_key()
+        nulls = self.nulls
+        data = self.data
+        values = self.values
+        return lambda i: (nulls[i], values[data[i]].lower() if not nulls[i] else "")
+
+    def matches(self, needle):
+        """Predicate over row indices: display text contains `needle` (lower-case)."""
+        nulls = self.nulls
+        if self.kind is None:
+            return lambda i: False
+        if self.kind == "str":
+            hits = bytearray(1 if needle in v.lower() else 0 for v in self.values)
+            data = self.data
+            return lambda i: not nulls[i] and hits[data[i]]
+        return lambda i: not nulls[i] and needle in display_text(self.get(i)).lower()
+
+    def nbytes(self):
+        size = sys.getsizeof(self.nulls)
+        if isinstance(self.data, array):
+            size += sys.getsizeof(self.data)
+        elif self.data is not None:
+            size += sys.getsizeof(self.data) + sum(sys.getsizeof(v) for v in self.data)
+        if self.values is not None:
+            size += sys.getsizeof(self.values) + sys.getsizeof(self.codes)
+            size += sum(sys.getsizeof(v) for v in self.values)
+        return size
+
+
+
+# STORE
+
+class ColumnStore:
+    """Column-oriented result set with in-memory sort / filter."""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.cols = [Column() for _ in self.columns]
+        self.dead = bytearray()  # 1 = row deleted since load (slot is kept)
+
+    def __len__(self):
+        return len(self.dead)
+
+    def live_count(self):
+        return len(self.dead) - self.dead.count(1)
+
+    def append(self, row):
+        """Add a row; returns its row index."""
+        for col, value in zip(self.cols, row):
+            col.append(value)
+        self.dead.append(0)
+        return len(self.dead) - 1
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def update(self, idx, row):
+        for col, value in zip(self.cols, row):
+            col.set(idx, value)
+
+    def delete(self, idx):
+        self.dead[idx] = 1
+
+    def row(self, idx):
+        return tuple(col.get(idx) for col in self.cols)
+
+    def display_row(self, idx):
+        return tuple(display_text(col.get(idx)) for col in self.cols)
+
+    def column_index(self, name):
+        return self.columns.index(name)
+
+    def all_indices(self):
+        dead = self.dead
+        return array("l", (i for i in range(len(dead)) if not dead[i]))
+
+    def sorted_indices(self, col_idx, reverse=False, indices=None):
+        """Row indices ordered by one column (NULLs last either way)."""
+        if indices is None:
+            indices = self.all_indices()
+        key = self.cols[col_idx].sort_key()
+        non_null = [i for i in indices if not self.cols[col_idx].nulls[i]]
+        nulls = [i for i in indices if self.cols[col_idx].nulls[i]]
+        non_null.sort(key=key, reverse=reverse)
+        return array("l", non_null + nulls)
+
+    def insert_position(self, indices, idx, col_idx, reverse=False):
+        """Where row `idx` goes in `indices` (as ordered by sorted_indices) to keep it sorted."""
+        col = self.cols[col_idx]
+        nulls = col.nulls
+        if nulls[idx]:
+            return len(indices)
+        key = col.value_key()
+        k = key(idx)
+        lo, hi = 0, len(indices)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            j = indices[mid]
+            if nulls[j] or (key(j) < k if reverse else k < key(j)):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def filter_indices(self, text, col_idx=None, indices=None):
+        """
+        Row indices whose text contains `text` (case-insensitive),
+        in one column or in any column when col_idx is None.
+        """
+        if indices is None:
+            indices = self.all_indices()
+        needle = text.lower()
+        if not needle:
+            return array("l", indices)
+        targets = self.cols if col_idx is None else [self.cols[col_idx]]
+        preds = [c.matches(needle) for c in targets]
+        return array("l", (i for i in indices if any(p(i) for p in preds)))
+
+    def nbytes(self):
+        return sum(c.nbytes() for c in self.cols)
+
+
+
+# MEMORY MEASUREMENT
+
+def loans_rows(n):
+    """Loans-shaped rows as cx_Oracle returns them (ints, datetimes, 'Y'/'N')."""
+    base = datetime(2025, 1, 1)
+    for i in range(1, n + 1):
+        loan_date = base + timedelta(days=i % 365)
+        yield (
+            i,
+            1000 + i % 50000,
+            100 + i % 20000,
+            1 + i % 10,
+            loan_date,
+            loan_date + timedelta(days=14),
+            "Y" if i % 7 == 0 else "N",
+        )
+
+
+def measure(n):
+    """Return bytes used for n Loans rows: (tuples, tuples+Treeview strings, ColumnStore)."""
+    tracemalloc.start()
+
+    snap = tracemalloc.get_traced_memory()[0]
+    rows = list(loans_rows(n))  # what fetchall() hands load_table()
+    tuples_bytes = tracemalloc.get_traced_memory()[0] - snap
+
+    snap = tracemalloc.get_traced_memory()[0]
+    texts = [tuple(display_text(v) for v in r) for r in rows]  # what Treeview values become
+    text_bytes = tracemalloc.get_traced_memory()[0] - snap
+    del rows, texts
+
+    snap = tracemalloc.get_traced_memory()[0]
+    store = ColumnStore(["LOANID", "CUSTOMERID", "ITEMID", "STAFFID", "LOANDATE", "DUEDATE", "OVERDUE"])
+    store.extend(loans_rows(n))
+    store_bytes = tracemalloc.get_traced_memory()[0] - snap
+
+    tracemalloc.stop()
+    return tuples_bytes, tuples_bytes + text_bytes, store_bytes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare memory per Loans row: tuples vs ColumnStore.")
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args(argv)
+
+    tuples_bytes, current_bytes, store_bytes = measure(args.rows)
+    n = args.rows
+    print(f"Rows: {n}")
+    print(f"  fetchall() tuples           : {tuples_bytes / n:8.1f} bytes/row  ({tuples_bytes / 1e6:.1f} MB)")
+    print(f"  tuples + Treeview strings   : {current_bytes / n:8.1f} bytes/row  ({current_bytes / 1e6:.1f} MB)")
+    print(f"  ColumnStore                 : {store_bytes / n:8.1f} bytes/row  ({store_bytes / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
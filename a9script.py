@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+#Wafee Rahman , Richie Au , Umair Ansar
+
+"""
+Library DBMS – SQL script splitting and batching (shared by CLI and GUI)
+
+- split_statements(text) cuts a script into statements the way sqlplus does:
+    * ';' ends a SQL statement (not inside quotes or comments)
+    * PL/SQL (DECLARE / BEGIN blocks, CREATE PROCEDURE / FUNCTION / PACKAGE /
+      TRIGGER / TYPE) runs until a line holding only '/'
+    * EXEC proc(...) and CALL proc(...) become BEGIN proc(...); END;
+      (CALL ... INTO :bind stays as it is and runs on its own)
+    * SQL*Plus commands (SET, PROMPT, SPOOL, ...) are kept as kind "sqlplus"
+
+- plan(statements) groups consecutive DML / PL/SQL statements so each group
+  goes to the server as ONE anonymous block (one round trip). Queries and DDL
+  run on their own. The block reports per-statement row counts and server
+  time through two binds, :a9_report and :a9_failed, so the same block text
+  works from cx_Oracle (GUI) and from sqlplus VARIABLEs (CLI).
+
+- Try it without a database:
+    python a9script.py main.sql
+"""
+
+import re
+import sys
+
+
+# Statements per generated block (keeps :a9_report under 4000 chars)
+SCRIPT_BATCH = 100
+
+REPORT_SIZE = 4000
+
+KINDS = {
+    "select": "query", "with": "query",
+    "insert": "dml", "update": "dml", "delete": "dml", "merge": "dml",
+    "begin": "plsql", "declare": "plsql", "call": "call",
+    "create": "ddl", "alter": "ddl", "drop": "ddl", "truncate": "ddl",
+    "grant": "ddl", "revoke": "ddl", "rename": "ddl", "comment": "ddl",
+    "analyze": "ddl", "purge": "ddl", "flashback": "ddl",
+    "commit": "tx", "rollback": "tx", "savepoint": "tx",
+}
+
+# Kinds that may share a generated block
+BATCHABLE = {"dml", "plsql", "tx"}
+
+# Statements that need a '/' line, not ';', to end them
+PLSQL_HEAD = re.compile(
+    r"^(declare|begin"
+    r"|create\s+(or\s+replace\s+)?((editionable|noneditionable)\s+)?"
+    r"(procedure|function|package|trigger|type|library))\b",
+    re.IGNORECASE,
+)
+
+# Line-oriented SQL*Plus commands (no ';' needed). SET TRANSACTION is SQL.
+SQLPLUS_HEAD = re.compile(
+    r"^(set(?!\s+transaction\b)|prompt|spool|exit|quit|whenever|column|col"
+    r"|show|rem|remark|connect|define|undefine|variable|var|print|@)(\s|$)",
+    re.IGNORECASE,
+)
+EXEC_HEAD = re.compile(r"^exec(ute)?\s+(?!immediate\b)", re.IGNORECASE)
+# CALL is SQL: it can't sit in a PL/SQL block, so it's rewritten unless it has INTO
+CALL_HEAD = re.compile(r"^call\s+(?!.*\)\s*into\s+:\w+\s*$)", re.IGNORECASE | re.DOTALL)
+
+REPORT_LINE = re.compile(r"^(\d+) (-|\d+) (\d+)$")
+ERROR_LINE = re.compile(r"^(\d+) ERR (.*)$", re.DOTALL)
+
+
+
+# STATEMENTS
+
+class Statement:
+    """One statement of a script: 1-based position, text (no terminator) and kind."""
+
+    __slots__ = ("index", "text", "kind")
+
+    def __init__(self, index, text, kind):
+        self.index = index
+        self.text = text
+        self.kind = kind
+
+    def __repr__(self):
+        return f"Statement({self.index}, {self.kind}, {summary(self.text)!r})"
+
+    @property
+    def is_plsql_unit(self):
+        """True when sqlplus needs a '/' line after it."""
+        return bool(PLSQL_HEAD.match(self.text))
+
+
+def classify(text):
+    if PLSQL_HEAD.match(text) and not text.lower().startswith("create"):
+        return "plsql"
+    m = re.match(r"[a-z]+", text, re.IGNORECASE)
+    if re.match(r"set\s+transaction\b", text, re.IGNORECASE):
+        return "tx"
+    return KINDS.get(m.group(0).lower(), "other") if m else "other"
+
+
+def summary(text, width=60):
+    """One-line, whitespace-collapsed preview of a statement."""
+    flat = " ".join(text.split())
+    return flat if len(flat) <= width else flat[:width - 1] + "…"
+
+
+def split_statements(script):
+    """Split a script into Statement objects (comments between statements are dropped)."""
+    statements = []
+    buf = []          # characters of the current statement
+    i, n = 0, len(script)
+    line_start = True
+
+    def finish(text):
+        text = strip_leading_comments("".join(text)).strip()
+        if not text:
+            return
+        if EXEC_HEAD.match(text):
+            call = EXEC_HEAD.sub("", text, count=1).strip().rstrip(";").strip()
+            text, kind = f"BEGIN {call}; END;", "plsql"
+        elif CALL_HEAD.match(text):
+            text, kind = f"BEGIN {CALL_HEAD.sub('', text, count=1).strip()}; END;", "plsql"
+        elif SQLPLUS_HEAD.match(text):
+            kind = "sqlplus"
+        else:
+            kind = classify(text)
+        statements.append(Statement(len(statements) + 1, text, kind))
+
+    while i < n:
+        ch = script[i]
+
+        if line_start:
+            eol = script.find("\n", i)
+            eol = n if eol < 0 else eol
+            line = script[i:eol].strip()
+            pending = strip_leading_comments("".join(buf)).strip()
+            # '/' alone on a line ends the current statement (or is a no-op)
+            if line == "/":
+                finish(buf)
+                buf = []
+                i = eol + 1
+                continue
+            # SQL*Plus commands and EXEC are one line each
+            if not pending and (SQLPLUS_HEAD.match(line) or EXEC_HEAD.match(line)):
+                finish([line])
+                buf = []
+                i = eol + 1
+                continue
+            line_start = False
+
+        if ch == "\n":
+            buf.append(ch)
+            line_start = True
+            i += 1
+            continue
+
+        if ch == "-" and script.startswith("--", i):
+            eol = script.find("\n", i)
+            eol = n if eol < 0 else eol
+            buf.append(script[i:eol])
+            i = eol
+            continue
+
+        if ch == "/" and script.startswith("/*", i):
+            end = script.find("*/", i + 2)
+            end = n if end < 0 else end + 2
+            buf.append(script[i:end])
+            i = end
+            continue
+
+        if ch in "'\"":
+            if ch == "'" and i > 0 and script[i - 1] in "qQ" and i + 1 < n:
+                # q'[...]' alternative quoting
+                close = {"[": "]", "{": "}", "(": ")", "<": ">"}.get(script[i + 1], script[i + 1])
+                end = script.find(close + "'", i + 2)
+                end = n if end < 0 else end + 2
+            else:
+                end = i + 1
+                while True:
+                    end = script.find(ch, end)
+                    if end < 0:
+                        end = n
+                        break
+                    if script.startswith(ch * 2, end):
+                        end += 2
+                        continue
+                    end += 1
+                    break
+            buf.append(script[i:end])
+            i = end
+            continue
+
+        if ch == ";":
+            if PLSQL_HEAD.match(strip_leading_comments("".join(buf))):
+                buf.append(ch)      # part of the block; '/' ends it
+            else:
+                finish(buf)
+                buf = []
+            i += 1
+            continue
+
+        buf.append(ch)
+        i += 1
+
+    finish(buf)
+    return statements
+
+
+def strip_leading_comments(text):
+    while True:
+        text = text.lstrip()
+        if text.startswith("--"):
+            nl = text.find("\n")
+            text = "" if nl < 0 else text[nl + 1:]
+        elif text.startswith("/*"):
+            end = text.find("*/")
+            text = "" if end < 0 else text[end + 2:]
+        else:
+            return text
+
+
+def ends_transaction(statements):
+    """Statements that commit or roll back on their own (DDL, COMMIT, ROLLBACK)."""
+    return [
+        s for s in statements
+        if s.kind == "ddl"
+        or (s.kind == "tx" and re.match(r"(commit|rollback(?!\s+to\b))", s.text, re.IGNORECASE))
+    ]
+
+
+
+# BATCHING
+
+def plan(statements, batch_size=SCRIPT_BATCH):
+    """
+    Group statements into round trips: runs of batchable statements become
+    one group (up to batch_size), everything else is a group of one.
+    """
+    groups = []
+    for stmt in statements:
+        if (stmt.kind in BATCHABLE and groups and len(groups[-1]) < batch_size
+                and groups[-1][-1].kind in BATCHABLE):
+            groups[-1].append(stmt)
+        else:
+            groups.append([stmt])
+    return groups
+
+
+def batch_block(statements):
+    """
+    One anonymous block running `statements` in order. Writes one line per
+    statement to :a9_report ("<index> <rows|-> <microseconds>") and stops at
+    the first error with "<index> ERR <message>" and :a9_failed = index.
+    """
+    lines = [
+        "DECLARE",
+        "  a9_t0 TIMESTAMP WITH TIME ZONE;",
+        "  a9_n  PLS_INTEGER;",
+        "  FUNCTION a9_us(d INTERVAL DAY TO SECOND) RETURN NUMBER IS",
+        "  BEGIN",
+        "    RETURN ROUND((((EXTRACT(DAY FROM d) * 24 + EXTRACT(HOUR FROM d)) * 60",
+        "                  + EXTRACT(MINUTE FROM d)) * 60 + EXTRACT(SECOND FROM d)) * 1000000);",
+        "  END;",
+        "BEGIN",
+        "  :a9_report := NULL;",
+        "  :a9_failed := 0;",
+    ]
+    for stmt in statements:
+        text = stmt.text if stmt.text.endswith(";") else stmt.text + ";"
+        if "--" in text.rsplit("\n", 1)[-1]:
+            text = stmt.text + "\n;"
+        rows = "SQL%ROWCOUNT" if stmt.kind == "dml" else "'-'"
+        lines += [
+            f"  a9_n := {stmt.index};",
+            "  a9_t0 := SYSTIMESTAMP;",
+            "  " + text.replace("\n", "\n  "),
+            f"  :a9_report := :a9_report || '{stmt.index} ' || {rows} || ' '"
+            " || a9_us(SYSTIMESTAMP - a9_t0) || CHR(10);",
+        ]
+    lines += [
+        "EXCEPTION",
+        "  WHEN OTHERS THEN",
+        "    :a9_failed := a9_n;",
+        "    :a9_report := :a9_report || a9_n || ' ERR ' || SQLERRM;",
+        "END;",
+    ]
+    return "\n".join(lines)
+
+
+def parse_report(report):
+    """
+    Decode :a9_report -> ({index: (rows or None, ms)}, (index, message) or None).
+    """
+    done, error = {}, None
+    text = report or ""
+    err_at = re.search(r"^\d+ ERR ", text, re.MULTILINE)
+    if err_at:
+        m = ERROR_LINE.match(text[err_at.start():].strip())
+        error = (int(m.group(1)), m.group(2).strip())
+        text = text[:err_at.start()]
+    for line in text.splitlines():
+        m = REPORT_LINE.match(line.strip())
+        if m:
+            rows = None if m.group(2) == "-" else int(m.group(2))
+            done[int(m.group(1))] = (rows, int(m.group(3)) / 1000.0)
+    return done, error
+
+
+
+# PREVIEW
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("usage: python a9script.py SCRIPT.sql")
+        return 2
+    with open(argv[0], encoding="utf-8") as f:
+        statements = split_statements(f.read())
+    groups = plan(statements)
+    print(f"{len(statements)} statement(s), {len(groups)} round trip(s)")
+    for group in groups:
+        label = "block" if len(group) > 1 else group[0].kind
+        print(f"  [{group[0].index}-{group[-1].index}] {label}")
+        for stmt in group:
+            print(f"      {stmt.index:>4} {stmt.kind:<8}{summary(stmt.text)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1091 @@
+#!/usr/bin/env python3
+#Wafee Rahman , Richie Au , Umair Ansar
+
+"""
+Library DBMS – local middle tier (HTTP/JSON) over one shared connection pool
+
+- Desk clients (a9gui.py, a9cli.py) call this service instead of each
+  opening its own database session. All requests share a bounded pool
+  with a statement cache, so 50 desks cost POOL_SIZE sessions, not 50.
+
+- API (JSON in / JSON out; rows come back as {"columns": [...], "rows": [[...]]}):
+    GET    /health
+    GET    /tables/<table>/columns
+    GET    /tables/<table>?limit=&offset=
+    GET    /tables/<table>/search?term=
+    POST   /tables/<table>        {"row": {...}}                 -> inserted row
+    POST   /tables/<table>/bulk   {"rows": [{...}, ...]}         -> {"keys": [...]}
+    PUT    /tables/<table>        {"key": {...}, "row": {...}}   -> updated row
+    DELETE /tables/<table>        {"key": {...}}                 -> {"deleted": n}
+    GET    /reports/<name>        (stock, loans, overdue, staff; cached per
+                                   a9queries cache_ttl, dropped on writes)
+    POST   /checkout              {"customerId", "itemId", "staffId", "days"}
+                                  (hold-aware: see a9holds.py)
+    POST   /returns               {"loanId"} -> the copy goes to the next hold
+    GET    /holds?record=         hold queue: ready, then waiting in order
+    POST   /holds                 {"recordId", "customerId", "priority", "expiryDate"}
+    DELETE /holds/<id>            cancel (a copy set aside goes to the next in line)
+    GET    /lookup/<code>         scanned barcode or ISBN -> items + availability
+    GET    /records/<id>          record + subtype, authors, items and availability
+                                  in one query (LRU per RecordID, dropped on writes)
+    GET    /customers?q=          type-ahead: name prefix, phone or postal code
+    POST   /availability          {"kind": "record"|"item"|"isbn", "keys": [...]}
+                                  -> items + availability for every key, one query
+
+- Backends:
+    * stand-in (a9standin.py, sqlite): python a9service.py --db library_standin.db
+    * Oracle (cx_Oracle SessionPool):  python a9service.py --oracle 'user/pass@host:1521/XE'
+
+- Point the front ends at it:
+    A9_SERVICE=http://127.0.0.1:8510 ./a9cli.py    (predefined queries)
+    a9gui.py login dialog -> "Middle tier URL"     (Browse & Edit, Desk scans)
+
+- One-machine check (stand-in + server + concurrent clients):
+    python a9service.py --smoke
+"""
+
+import argparse
+import http.client
+import json
+import os
+import queue
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlencode, urlsplit
+
+import a9holds
+import a9queries
+import a9standin
+
+
+DEFAULT_PORT = 8510
+POOL_SIZE = 8
+STATEMENT_CACHE = 64      # cached parsed statements per pooled connection
+ACQUIRE_TIMEOUT_S = 10.0  # wait for a free connection before answering 503
+LOOKUP_CACHE_SIZE = 512   # recent barcode / ISBN scans kept per client
+LOOKUP_CACHE_TTL_S = 15.0 # ...for this long (availability may change)
+DETAIL_CACHE_SIZE = 1024  # record details kept by the service (and the GUI's direct path)
+DETAIL_CACHE_TTL_S = 60.0 # ...dropped sooner by a write through the service to that record
+DETAIL_STOCK_TTL_S = 5.0  # their copy counts are re-read after this (writes at other desks)
+BROWSE_LIMIT = 20000      # matches the GUI's render cap
+
+# Tables the service will touch, with their primary-key columns.
+TABLE_KEYS = {
+    "Staff": ["StaffID"],
+    "Author": ["AuthorID"],
+    "Address": ["AddressID"],
+    "Customer": ["CustomerID"],
+    "Record": ["RecordID"],
+    "RecordAuthor": ["RecordID", "AuthorID"],
+    "LibraryInventory": ["ItemID"],
+    "Book": ["RecordID"],
+    "EBook": ["RecordID"],
+    "DVD": ["RecordID"],
+    "Loans": ["loanId"],
+    "Hold": ["HoldID"],
+}
+
+# Browse / search only
+READ_ONLY_TABLES = ["RecordAvailableStock"]
+
+# Surrogate keys generated from seq_<Table> (Oracle) when a row leaves them out
+GENERATED_KEYS = {
+    "Staff": "StaffID",
+    "Author": "AuthorID",
+    "Address": "AddressID",
+    "Customer": "CustomerID",
+    "Record": "RecordID",
+    "LibraryInventory": "ItemID",
+    "Loans": "loanId",
+    "Hold": "HoldID",
+}
+
+
+class ServiceError(Exception):
+    """Error with an HTTP status; raised by operations and by the client."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+
+# CONNECTION POOLS
+
+class StandinPool:
+    """Fixed set of sqlite stand-in connections handed out one user at a time."""
+
+    dialect = "sqlite"
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.size = size
+        self.idle = queue.LifoQueue()
+        for _ in range(size):
+            self.idle.put(a9standin.connect(
+                path, check_same_thread=False, cached_statements=STATEMENT_CACHE,
+            ))
+        self.db_errors = (a9standin.sqlite3.Error,)
+        self.id_lock = threading.Lock()
+        self.next_id = {}  # table -> first key not yet handed out
+
+    def acquire(self, timeout=ACQUIRE_TIMEOUT_S):
+        try:
+            return self.idle.get(timeout=timeout)
+        except queue.Empty:
+            raise PoolTimeout(f"no free connection after {timeout:g}s") from None
+
+    def release(self, conn):
+        conn.rollback()
+        self.idle.put(conn)
+
+    def busy(self):
+        return self.size - self.idle.qsize()
+
+    def close(self):
+        while not self.idle.empty():
+            self.idle.get().close()
+
+    def columns(self, conn, table):
+        """[(NAME, TYPE), ...] in Oracle terms (the stand-in keeps dates as text)."""
+        cols = []
+        for _, name, decl, *_ in conn.execute(f"PRAGMA table_info({table})"):
+            upper = name.upper()
+            if upper.endswith("DATE") or upper == "DATEOFPUBLICATION":
+                col_type = "DATE"
+            elif "INT" in decl.upper():
+                col_type = "NUMBER"
+            else:
+                col_type = "VARCHAR2"
+            cols.append((upper, col_type))
+        return cols
+
+    def page(self, sql):
+        return sql + " LIMIT :limit OFFSET :offset"
+
+    def key_list(self, conn, sql, type_name, keys):
+        """(statement, bind) for a TABLE(:keys) query: json_each over a JSON array."""
+        return a9standin.collection_sql(sql), a9standin.collection_bind(keys)
+
+    def reserve_ids(self, conn, table, n):
+        """No sequences in sqlite: hand out MAX+1.. blocks, remembered across requests."""
+        key = GENERATED_KEYS[table]
+        with self.id_lock:
+            start = conn.execute(f"SELECT COALESCE(MAX({key}), 0) + 1 FROM {table}").fetchone()[0]
+            start = max(start, self.next_id.get(table, 0))
+            self.next_id[table] = start + n
+        return list(range(start, start + n))
+
+
+class OraclePool:
+    """
+    cx_Oracle SessionPool (threaded, statement cache). Sessions it hands out
+    are kept here between requests, so per-connection state (the collection
+    types key_list binds) is looked up once per session, not per request.
+    """
+
+    dialect = "oracle"
+
+    def __init__(self, conn_str, size=POOL_SIZE):
+        try:
+            import cx_Oracle
+        except ImportError:
+            print("ERROR: cx_Oracle is required for --oracle (pip install cx_Oracle).")
+            sys.exit(1)
+        self.cx = cx_Oracle
+        user, _, rest = conn_str.partition("/")
+        password, _, dsn = rest.partition("@")
+        self.size = size
+        self.pool = cx_Oracle.SessionPool(
+            user=user,
+            password=password,
+            dsn=dsn,
+            min=1,
+            max=size,
+            increment=1,
+            threaded=True,
+            encoding="UTF-8",
+            getmode=cx_Oracle.SPOOL_ATTRVAL_TIMEDWAIT,
+            wait_timeout=int(ACQUIRE_TIMEOUT_S * 1000),
+            stmtcachesize=STATEMENT_CACHE,
+        )
+        self.db_errors = (cx_Oracle.DatabaseError,)
+        self.slots = threading.BoundedSemaphore(size)
+        self.idle = queue.LifoQueue()  # sessions taken from the SessionPool, not in use
+        self.types_lock = threading.Lock()
+        self.types = {}  # (connection, type name) -> ObjectType
+
+    def acquire(self, timeout=ACQUIRE_TIMEOUT_S):
+        if not self.slots.acquire(timeout=timeout):
+            raise PoolTimeout(f"no free connection after {timeout:g}s")
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self.pool.acquire()
+        except self.cx.DatabaseError as e:
+            self.slots.release()
+            raise PoolTimeout(str(e)) from None
+
+    def release(self, conn):
+        try:
+            conn.rollback()
+        except self.cx.DatabaseError:
+            self.drop(conn)     # dead session: the SessionPool opens a new one when needed
+        else:
+            self.idle.put(conn)
+        finally:
+            self.slots.release()
+
+    def drop(self, conn):
+        with self.types_lock:
+            for key in [k for k in self.types if k[0] is conn]:
+                del self.types[key]
+        try:
+            self.pool.drop(conn)
+        except self.cx.DatabaseError:
+            pass
+
+    def busy(self):
+        return self.pool.busy - self.idle.qsize()
+
+    def close(self):
+        while not self.idle.empty():
+            self.pool.release(self.idle.get())
+        self.pool.close()
+
+    def columns(self, conn, table):
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT column_name, data_type
+            FROM user_tab_columns
+            WHERE table_name = :t
+            ORDER BY column_id
+            """,
+            {"t": table.upper()},
+        )
+        return cur.fetchall()
+
+    def page(self, sql):
+        return sql + " OFFSET :offset ROWS FETCH NEXT :limit ROWS ONLY"
+
+    def key_list(self, conn, sql, type_name, keys):
+        """(statement, bind) for a TABLE(:keys) query: the whole list as one collection object."""
+        key = (conn, type_name)
+        with self.types_lock:
+            obj_type = self.types.get(key)
+        if obj_type is None:
+            obj_type = conn.gettype(type_name)  # a round trip; once per session
+            with self.types_lock:
+                self.types[key] = obj_type
+        return sql, obj_type.newobject(keys)
+
+    def reserve_ids(self, conn, table, n):
+        """Next n values of seq_<table> in one round trip (served from the sequence cache)."""
+        cur = conn.cursor()
+        cur.execute(f"SELECT seq_{table}.NEXTVAL FROM dual CONNECT BY LEVEL <= :n", {"n": n})
+        return [r[0] for r in cur.fetchall()]
+
+
+
+# OPERATIONS (one pooled connection each)
+
+def canonical_table(name, writable=False):
+    for t in TABLE_KEYS:
+        if t.upper() == name.upper():
+            return t
+    for t in READ_ONLY_TABLES:
+        if t.upper() == name.upper():
+            if writable:
+                raise ServiceError(403, f"{t} is read-only")
+            return t
+    raise ServiceError(404, f"unknown table {name}")
+
+
+def fetch(cur, sql, params=None):
+    cur.execute(sql, params or {})
+    cols = [d[0].upper() for d in cur.description]
+    return {"columns": cols, "rows": [list(r) for r in cur.fetchall()]}
+
+
+def pick_columns(columns, values):
+    """Match request keys to real columns (case-insensitive); unknown keys are an error."""
+    by_name = {name: col_type for name, col_type in columns}
+    picked = []
+    for key, value in values.items():
+        col_type = by_name.get(key.upper())
+        if col_type is None:
+            raise ServiceError(400, f"unknown column {key}")
+        picked.append((key.upper(), col_type, value))
+    return picked
+
+
+def value_expr(name, col_type):
+    bind = name.lower()
+    if col_type.upper() == "DATE":
+        return f"TO_DATE(:{bind}, 'YYYY-MM-DD')"
+    return f":{bind}"
+
+
+def key_where(table, key):
+    key_cols = [c.upper() for c in TABLE_KEYS[table]]
+    given = {k.upper(): v for k, v in key.items()}
+    if sorted(given) != sorted(key_cols):
+        raise ServiceError(400, f"key for {table} must be {', '.join(TABLE_KEYS[table])}")
+    where = " AND ".join(f"{c} = :k_{c.lower()}" for c in key_cols)
+    return where, {f"k_{c.lower()}": given[c] for c in key_cols}
+
+
+def select_by_key(cur, table, key):
+    where, binds = key_where(table, key)
+    return fetch(cur, f"SELECT * FROM {table} WHERE {where}", binds)
+
+
+def op_columns(pool, conn, table):
+    table = canonical_table(table)
+    return {"columns": [list(c) for c in pool.columns(conn, table)]}
+
+
+def op_browse(pool, conn, table, limit=BROWSE_LIMIT, offset=0):
+    table = canonical_table(table)
+    order = ", ".join(TABLE_KEYS.get(table, ["1"]))
+    sql = pool.page(f"SELECT * FROM {table} ORDER BY {order}")
+    return fetch(conn.cursor(), sql, {"limit": limit, "offset": offset})
+
+
+def op_search(pool, conn, table, term, limit=BROWSE_LIMIT):
+    table = canonical_table(table)
+    text_cols = [name for name, t in pool.columns(conn, table)
+                 if "CHAR" in t.upper() or "CLOB" in t.upper()]
+    if not text_cols:
+        raise ServiceError(400, f"{table} has no text columns to search")
+    where = " OR ".join(f"LOWER({c}) LIKE :term" for c in text_cols)
+    sql = pool.page(f"SELECT * FROM {table} WHERE {where}")
+    return fetch(conn.cursor(), sql, {"term": "%" + term.lower() + "%", "limit": limit, "offset": 0})
+
+
+def fill_keys(pool, conn, table, rows):
+    """Give rows without a generated key the next IDs, reserved in one round trip."""
+    key = GENERATED_KEYS.get(table, "").upper()
+    missing = [r for r in rows if key and r.get(key) in (None, "")]
+    if missing:
+        for row, new_id in zip(missing, pool.reserve_ids(conn, table, len(missing))):
+            row[key] = new_id
+
+
+def insert_rows(pool, conn, table, rows):
+    """One array INSERT for all rows; returns their key dicts."""
+    table = canonical_table(table, writable=True)
+    rows = [{k.upper(): v for k, v in r.items()} for r in rows]
+    if not rows or not all(rows):
+        raise ServiceError(400, "rows must be non-empty objects")
+    fill_keys(pool, conn, table, rows)
+
+    names = []
+    for r in rows:
+        names += [k for k in r if k not in names]
+    picked = pick_columns(pool.columns(conn, table), {n: None for n in names})
+    sql = (f"INSERT INTO {table} ({', '.join(n for n, _, _ in picked)}) "
+           f"VALUES ({', '.join(value_expr(n, t) for n, t, _ in picked)})")
+    cur = conn.cursor()
+    cur.executemany(sql, [{n.lower(): r.get(n) for n, _, _ in picked} for r in rows])
+    return table, cur, [{c: r.get(c.upper()) for c in TABLE_KEYS[table]} for r in rows]
+
+
+def op_insert(pool, conn, table, row):
+    """Insert one row (key generated if left out) and return it as stored."""
+    table, cur, keys = insert_rows(pool, conn, table, [row])
+    result = select_by_key(cur, table, keys[0])
+    conn.commit()
+    return result
+
+
+def op_insert_many(pool, conn, table, rows):
+    """Bulk insert (imports): one key reservation + one array INSERT."""
+    table, _, keys = insert_rows(pool, conn, table, rows)
+    conn.commit()
+    return {"inserted": len(keys), "keys": keys}
+
+
+def op_update(pool, conn, table, key, row):
+    table = canonical_table(table, writable=True)
+    key_upper = {c.upper() for c in TABLE_KEYS[table]}
+    picked = [p for p in pick_columns(pool.columns(conn, table), row) if p[0] not in key_upper]
+    if not picked:
+        raise ServiceError(400, "nothing to update")
+    where, binds = key_where(table, key)
+    binds.update({n.lower(): v for n, _, v in picked})
+    cur = conn.cursor()
+    cur.execute(
+        f"UPDATE {table} SET {', '.join(f'{n} = {value_expr(n, t)}' for n, t, _ in picked)} WHERE {where}",
+        binds,
+    )
+    if cur.rowcount == 0:
+        raise ServiceError(404, "no row with that key")
+    result = select_by_key(cur, table, key)
+    conn.commit()
+    return result
+
+
+def op_delete(pool, conn, table, key):
+    table = canonical_table(table, writable=True)
+    where, binds = key_where(table, key)
+    cur = conn.cursor()
+    cur.execute(f"DELETE FROM {table} WHERE {where}", binds)
+    deleted = cur.rowcount
+    conn.commit()
+    return {"deleted": deleted, "key": key}
+
+
+def op_report(pool, conn, name):
+    if name not in a9queries.REPORTS:
+        raise ServiceError(404, f"unknown report {name} (choose from {', '.join(a9queries.REPORTS)})")
+    query = a9queries.get(name)
+    cur = conn.cursor()
+    cur.arraysize = query.arraysize
+    return fetch(cur, query.sql)
+
+
+def op_lookup(pool, conn, code):
+    """Scanned barcode or ISBN -> matching items with live availability (one round trip)."""
+    code = a9queries.scan_code(code)
+    if not code:
+        raise ServiceError(400, "empty barcode / ISBN")
+    query = a9queries.get("scan_lookup")
+    cur = conn.cursor()
+    cur.arraysize = query.arraysize
+    return fetch(cur, query.sql, {"code": code})
+
+
+def op_query(pool, conn, name, binds):
+    """(columns, rows) of one registered query."""
+    query = a9queries.get(name)
+    cur = conn.cursor()
+    cur.arraysize = query.arraysize
+    result = fetch(cur, query.sql, binds)
+    return result["columns"], result["rows"]
+
+
+def op_availability(pool, conn, kind, keys):
+    """
+    Availability for many RecordIDs / ItemIDs / ISBNs in one statement.
+    Rows come back in key order; keys with no inventory are listed in "missing".
+    """
+    try:
+        keys = a9queries.availability_keys(kind, keys)
+    except ValueError as e:
+        raise ServiceError(400, str(e)) from None
+    if not keys:
+        raise ServiceError(400, "no keys given")
+    name, type_name = a9queries.AVAILABILITY[kind]
+    query = a9queries.get(name)
+    sql, bind = pool.key_list(conn, query.sql, type_name, keys)
+    cur = conn.cursor()
+    cur.arraysize = query.arraysize
+    result = fetch(cur, sql, {"keys": bind})
+    result["rows"], result["missing"] = a9queries.in_key_order(kind, keys, result["columns"], result["rows"])
+    return result
+
+
+def op_customers(pool, conn, text, limit=a9queries.CUSTOMER_LOOKUP_LIMIT):
+    """Type-ahead: first `limit` customers by name prefix, phone or postal code."""
+    plan = a9queries.customer_search(text)
+    if plan is None:
+        return {"columns": list(a9queries.CUSTOMER_LOOKUP_COLUMNS), "rows": []}
+    name, binds = plan
+    cur = conn.cursor()
+    cur.arraysize = limit
+    cur.execute(a9queries.get(name).sql, binds)
+    cols = [d[0].upper() for d in cur.description]
+    rows = [list(r) for r in cur.fetchmany(limit)]
+    cur.close()
+    return {"columns": cols, "rows": rows}
+
+
+def op_checkout(pool, conn, customer_id, item_id, staff_id, days=14, loan_id=None):
+    """
+    Check one item out. a9holds locks the record's inventory rows before the
+    hold-aware availability check, so two desks can't over-issue a copy while
+    checkouts of other records run in parallel; loanId comes from seq_Loans
+    unless given. A refusal rolls back (pool.release), dropping the row locks.
+    """
+    cur = conn.cursor()
+    if loan_id is None:
+        loan_id = pool.reserve_ids(conn, "Loans", 1)[0]
+    try:
+        a9holds.checkout(cur, loan_id, customer_id, item_id, staff_id, days)
+    except LookupError as e:
+        raise ServiceError(404, str(e)) from None
+    except a9holds.HoldConflict as e:
+        raise ServiceError(409, str(e)) from None
+    conn.commit()
+    return select_by_key(cur, "Loans", {"loanId": loan_id})
+
+
+def allocated_json(allocated):
+    return [{"holdId": hold_id, "customerId": customer_id} for hold_id, customer_id in allocated]
+
+
+def op_return(pool, conn, loan_id):
+    """End a loan; the copy goes to the next hold on the record in the same transaction."""
+    cur = conn.cursor()
+    result = a9holds.return_loan(cur, loan_id)
+    if result is None:
+        raise ServiceError(404, f"no loan {loan_id} out")
+    conn.commit()
+    result["allocated"] = allocated_json(result["allocated"])
+    return result
+
+
+def op_holds(pool, conn, record_id):
+    """Hold queue for one record: ready holds, then waiting ones in allocation order."""
+    cur = conn.cursor()
+    return fetch(cur, a9queries.get("hold_queue").sql, {"record_id": record_id})
+
+
+def op_place_hold(pool, conn, record_id, customer_id, priority=a9queries.HOLD_PRIORITY,
+                  expiry_date=None):
+    """Queue a hold (set a copy aside at once if one is free). Returns the hold row."""
+    cur = conn.cursor()
+    hold_id = pool.reserve_ids(conn, "Hold", 1)[0]
+    try:
+        a9holds.place_hold(cur, hold_id, record_id, customer_id, priority, expiry_date)
+    except a9holds.HoldConflict as e:
+        raise ServiceError(409, str(e)) from None
+    conn.commit()
+    return select_by_key(cur, "Hold", {"HoldID": hold_id})
+
+
+def op_cancel_hold(pool, conn, hold_id):
+    cur = conn.cursor()
+    hold = a9holds.fetch_one(cur, "hold_by_id", {"hold_id": hold_id})
+    if hold is None:
+        raise ServiceError(404, f"no hold {hold_id}")
+    try:
+        allocated = a9holds.cancel_hold(cur, hold_id)
+    except a9holds.HoldConflict as e:
+        raise ServiceError(409, str(e)) from None
+    if allocated is None:
+        raise ServiceError(404, f"no hold {hold_id}")
+    conn.commit()
+    return {"holdId": hold_id, "recordId": hold[1], "allocated": allocated_json(allocated)}
+
+
+
+# HTTP SERVER
+
+class ServiceStats:
+    """Request counters for /health (thread-safe)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+
+    def record(self, elapsed_ms, ok):
+        with self.lock:
+            self.requests += 1
+            self.errors += 0 if ok else 1
+            self.total_ms += elapsed_ms
+
+
+def to_json(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"not JSON serializable: {type(value).__name__}")
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    server_version = "a9service/1.0"
+    protocol_version = "HTTP/1.1"  # keep-alive: one TCP connection per desk
+    disable_nagle_algorithm = True  # headers + body go out without a delayed-ACK stall
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def do_DELETE(self):
+        self.dispatch("DELETE")
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            raise ServiceError(400, "body is not valid JSON") from None
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload, default=to_json).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def dispatch(self, method):
+        start = time.perf_counter()
+        status = 200
+        try:
+            url = urlsplit(self.path)
+            parts = [p for p in url.path.split("/") if p]
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            body = self.read_body() if method in ("POST", "PUT", "DELETE") else {}
+            payload = self.route(method, parts, query, body)
+        except ServiceError as e:
+            status, payload = e.status, {"error": str(e)}
+        except PoolTimeout as e:
+            status, payload = 503, {"error": f"service busy: {e}"}
+        except self.server.pool.db_errors as e:
+            status, payload = 500, {"error": str(e)}
+        except (KeyError, TypeError, ValueError) as e:
+            status, payload = 400, {"error": f"bad request: {e}"}
+        self.send_json(status, payload)
+        self.server.stats.record((time.perf_counter() - start) * 1000.0, status < 400)
+
+    def route(self, method, parts, query, body):
+        server = self.server
+        if parts == ["health"] and method == "GET":
+            stats = server.stats
+            return {
+                "ok": True,
+                "dialect": server.pool.dialect,
+                "pool_size": server.pool.size,
+                "pool_busy": server.pool.busy(),
+                "requests": stats.requests,
+                "errors": stats.errors,
+                "avg_ms": stats.total_ms / stats.requests if stats.requests else 0.0,
+                "cache_hits": server.results.hits,
+                "cache_misses": server.results.misses,
+                "detail_cache_hits": server.details.hits,
+                "detail_cache_stock_reads": server.details.stock_reads,
+                "detail_cache_misses": server.details.misses,
+            }
+
+        if parts and parts[0] == "tables" and len(parts) in (2, 3):
+            table = parts[1]
+            if len(parts) == 3 and parts[2] == "columns" and method == "GET":
+                return self.with_conn(op_columns, table)
+            if len(parts) == 3 and parts[2] == "search" and method == "GET":
+                return self.with_conn(op_search, table, query["term"],
+                                      int(query.get("limit", BROWSE_LIMIT)))
+            if len(parts) == 2 and method == "GET":
+                return self.with_conn(op_browse, table, int(query.get("limit", BROWSE_LIMIT)),
+                                      int(query.get("offset", 0)))
+            if len(parts) == 2 and method == "POST":
+                return self.wrote(table, self.with_conn(op_insert, table, body["row"]))
+            if len(parts) == 3 and parts[2] == "bulk" and method == "POST":
+                return self.wrote(table, self.with_conn(op_insert_many, table, body["rows"]))
+            if len(parts) == 2 and method == "PUT":
+                return self.wrote(table, self.with_conn(op_update, table, body["key"], body["row"]))
+            if len(parts) == 2 and method == "DELETE":
+                return self.wrote(table, self.with_conn(op_delete, table, body["key"]))
+
+        if len(parts) == 2 and parts[0] == "reports" and method == "GET":
+            name = parts[1].lower()
+            cached = server.results.get(name)
+            if cached is not None:
+                return cached
+            return server.results.put(name, None, self.with_conn(op_report, name))
+
+        if len(parts) == 2 and parts[0] == "lookup" and method == "GET":
+            return self.with_conn(op_lookup, parts[1])
+
+        if len(parts) == 2 and parts[0] == "records" and method == "GET":
+            return self.record_detail(int(parts[1]))
+
+        if parts == ["customers"] and method == "GET":
+            return self.with_conn(op_customers, query.get("q", ""),
+                                  min(int(query.get("limit", a9queries.CUSTOMER_LOOKUP_LIMIT)), BROWSE_LIMIT))
+
+        if parts == ["availability"] and method == "POST":
+            return self.with_conn(op_availability, body["kind"], body["keys"])
+
+        if parts == ["checkout"] and method == "POST":
+            result = self.with_conn(
+                op_checkout,
+                body["customerId"], body["itemId"], body["staffId"],
+                body.get("days", 14), body.get("loanId"),
+            )
+            return self.circulated(result, item_id=result["rows"][0][result["columns"].index("ITEMID")])
+
+        if parts == ["returns"] and method == "POST":
+            result = self.with_conn(op_return, int(body["loanId"]))
+            return self.circulated(result, item_id=result["itemId"])
+
+        if parts == ["holds"] and method == "GET":
+            return self.with_conn(op_holds, int(query["record"]))
+
+        if parts == ["holds"] and method == "POST":
+            record_id = int(body["recordId"])
+            return self.circulated(self.with_conn(
+                op_place_hold,
+                record_id, int(body["customerId"]),
+                int(body.get("priority", a9queries.HOLD_PRIORITY)), body.get("expiryDate"),
+            ), record_id=record_id)
+
+        if len(parts) == 2 and parts[0] == "holds" and method == "DELETE":
+            result = self.with_conn(op_cancel_hold, int(parts[1]))
+            return self.circulated(result, record_id=result["recordId"])
+
+        raise ServiceError(404, f"no route for {method} {self.path}")
+
+    def wrote(self, table, result):
+        """Drop cached results that read `table` (TTL covers writes made elsewhere)."""
+        self.server.results.invalidate(table)
+        self.server.details.invalidate_table(table)
+        return result
+
+    def circulated(self, result, record_id=None, item_id=None):
+        """After a checkout / return / hold: drop Loans / Hold results and that record's counts only."""
+        for table in a9queries.DetailCache.STOCK_TABLES:
+            self.server.results.invalidate(table)
+        self.server.details.invalidate(record_id, item_id, stock_only=True)
+        return result
+
+    def record_detail(self, record_id):
+        """One record with its subtype, authors, items and availability (cached; see DetailCache)."""
+        detail, _ = a9queries.cached_record_detail(
+            self.server.details, record_id, lambda name, binds: self.with_conn(op_query, name, binds))
+        if detail is None:
+            raise ServiceError(404, f"no record {record_id}")
+        return detail
+
+    def with_conn(self, op, *args):
+        pool = self.server.pool
+        conn = pool.acquire()
+        try:
+            return op(pool, conn, *args)
+        finally:
+            pool.release(conn)
+
+
+def make_server(pool, host="127.0.0.1", port=DEFAULT_PORT, verbose=False):
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+    server.pool = pool
+    server.stats = ServiceStats()
+    server.results = a9queries.ResultCache()
+    server.details = a9queries.DetailCache(DETAIL_CACHE_SIZE, DETAIL_CACHE_TTL_S, DETAIL_STOCK_TTL_S)
+    server.verbose = verbose
+    return server
+
+
+
+# CLIENT (used by a9cli.py / a9gui.py)
+
+ISO_DATETIME_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?$")
+
+
+def decode_value(value):
+    """ISO datetimes back to datetime (what cx_Oracle would have returned)."""
+    if isinstance(value, str) and ISO_DATETIME_RE.match(value):
+        return datetime.fromisoformat(value)
+    return value
+
+
+class ServiceClient:
+    """
+    Thin client over one keep-alive HTTP connection. Not thread-safe:
+    one client per desk / thread.
+    """
+
+    def __init__(self, base_url, timeout=30.0):
+        url = urlsplit(base_url if "://" in base_url else "http://" + base_url)
+        self.base_url = f"http://{url.netloc}"
+        self.host = url.hostname
+        self.port = url.port or DEFAULT_PORT
+        self.timeout = timeout
+        self.conn = None
+        self.lookups = a9queries.LRUCache(LOOKUP_CACHE_SIZE, LOOKUP_CACHE_TTL_S)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def call(self, method, path, body=None, **query):
+        if query:
+            path += "?" + urlencode(query)
+        data = json.dumps(body, default=to_json).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        # Only GETs are retried: a POST/PUT/DELETE that lost its response may
+        # already be committed, and sending it again could double-apply it.
+        attempts = (1, 2) if method == "GET" else (2,)
+        for attempt in attempts:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=data, headers=headers)
+                resp = self.conn.getresponse()
+                payload = json.loads(resp.read() or b"{}")
+                break
+            except (http.client.HTTPException, ConnectionError) as e:
+                # Server closed an idle keep-alive connection: retry once on a new one.
+                self.close()
+                if attempt == 2:
+                    raise ServiceError(503, f"middle tier unreachable: {e}") from None
+            except OSError as e:
+                self.close()
+                raise ServiceError(503, f"middle tier unreachable: {e}") from None
+        if resp.status >= 400:
+            raise ServiceError(resp.status, payload.get("error", resp.reason))
+        return payload
+
+    @staticmethod
+    def result(payload):
+        """{"columns", "rows"} -> (columns, [tuple, ...])"""
+        rows = [tuple(decode_value(v) for v in r) for r in payload["rows"]]
+        return payload["columns"], rows
+
+    def health(self):
+        return self.call("GET", "/health")
+
+    def columns(self, table):
+        return [tuple(c) for c in self.call("GET", f"/tables/{quote(table)}/columns")["columns"]]
+
+    def browse(self, table, limit=BROWSE_LIMIT, offset=0):
+        return self.result(self.call("GET", f"/tables/{quote(table)}", limit=limit, offset=offset))
+
+    def search(self, table, term, limit=BROWSE_LIMIT):
+        return self.result(self.call("GET", f"/tables/{quote(table)}/search", term=term, limit=limit))
+
+    def insert(self, table, row):
+        return self.result(self.call("POST", f"/tables/{quote(table)}", {"row": row}))
+
+    def insert_many(self, table, rows):
+        """Returns the key of each inserted row (generated ones filled in)."""
+        return self.call("POST", f"/tables/{quote(table)}/bulk", {"rows": rows})["keys"]
+
+    def update(self, table, key, row):
+        return self.result(self.call("PUT", f"/tables/{quote(table)}", {"key": key, "row": row}))
+
+    def delete(self, table, key):
+        return self.call("DELETE", f"/tables/{quote(table)}", {"key": key})["deleted"]
+
+    def report(self, name):
+        return self.result(self.call("GET", f"/reports/{quote(name)}"))
+
+    def checkout(self, customer_id, item_id, staff_id, days=14, loan_id=None):
+        body = {"customerId": customer_id, "itemId": item_id, "staffId": staff_id, "days": days}
+        if loan_id is not None:
+            body["loanId"] = loan_id
+        self.lookups.clear()    # availability changed
+        return self.result(self.call("POST", "/checkout", body))
+
+    def return_loan(self, loan_id):
+        """{"loanId", "itemId", "allocated": [{"holdId", "customerId"}, ...]}"""
+        self.lookups.clear()
+        return self.call("POST", "/returns", {"loanId": loan_id})
+
+    def holds(self, record_id):
+        return self.result(self.call("GET", "/holds", record=record_id))
+
+    def place_hold(self, record_id, customer_id, priority=a9queries.HOLD_PRIORITY, expiry_date=None):
+        body = {"recordId": record_id, "customerId": customer_id, "priority": priority}
+        if expiry_date is not None:
+            body["expiryDate"] = expiry_date
+        self.lookups.clear()
+        return self.result(self.call("POST", "/holds", body))
+
+    def cancel_hold(self, hold_id):
+        self.lookups.clear()
+        return self.call("DELETE", f"/holds/{int(hold_id)}")
+
+    def customers(self, text, limit=a9queries.CUSTOMER_LOOKUP_LIMIT):
+        return self.result(self.call("GET", "/customers", q=text, limit=limit))
+
+    def availability(self, kind, keys):
+        """(columns, rows, missing keys) for a list of RecordIDs / ItemIDs / ISBNs."""
+        payload = self.call("POST", "/availability", {"kind": kind, "keys": list(keys)})
+        columns, rows = self.result(payload)
+        return columns, rows, payload["missing"]
+
+    def record(self, record_id):
+        """{"record": {...}, "authors": [...], "items": [...]} for one RecordID."""
+        detail = self.call("GET", f"/records/{int(record_id)}")
+        detail["record"] = {k: decode_value(v) for k, v in detail["record"].items()}
+        return detail
+
+    def lookup(self, code):
+        """
+        Items for a scanned barcode / ISBN. Repeat scans within
+        LOOKUP_CACHE_TTL_S are answered from this client's LRU.
+        """
+        code = a9queries.scan_code(code)
+        cached = self.lookups.get(code)
+        if cached is not None:
+            return cached
+        return self.lookups.put(code, self.result(self.call("GET", f"/lookup/{quote(code)}")))
+
+
+
+# SMOKE TEST (stand-in + server + concurrent clients on one machine)
+
+def smoke(clients=20, seconds=3.0, pool_size=POOL_SIZE):
+    tmp = tempfile.mkdtemp(prefix="a9service-")
+    path = os.path.join(tmp, "standin.db")
+    a9standin.build(path, records=2000, customers=500, loans=1000)
+
+    pool = StandinPool(path, pool_size)
+    server = make_server(pool, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"[Smoke test: stand-in {path}, service {url}, pool {pool_size}]")
+
+    client = ServiceClient(url)
+    columns, rows = client.report("stock")
+    free_item = next(r[columns.index("ITEMID")] for r in rows if r[columns.index("AVAILABLESTOCK")])
+    # Hold checks: a one-copy item, lent out, then two holds queue behind it
+    item_col, record_col = columns.index("ITEMID"), columns.index("RECORDID")
+    held_item, held_record = next(
+        (r[item_col], r[record_col]) for r in rows
+        if r[columns.index("TOTALCOPIES")] == 1 and r[columns.index("AVAILABLESTOCK")] and r[item_col] != free_item)
+    held_loan = []
+
+    def refused(call):
+        try:
+            call()
+        except ServiceError as e:
+            return f"refused ({e.status}): {e}"
+        return "NOT refused"
+
+    def detail(record_id):
+        d = client.record(record_id)
+        item = d["items"][0]
+        return (f"{d['record']['MEDIATYPE']}, {len(d['authors'])} author(s), {len(d['items'])} item(s), "
+                f"{item['ACTIVELOANS']} out / {item['ONHOLDSHELF']} on hold shelf")
+
+    checks = [
+        ("columns Loans", lambda: client.columns("Loans")),
+        ("browse Record", lambda: client.browse("Record", limit=5)),
+        ("search Record", lambda: client.search("Record", "shadow", limit=5)),
+        ("report staff", lambda: client.report("staff")),
+        ("insert Staff", lambda: client.insert("Staff", {"StaffID": 99, "StaffName": "Smoke Test"})),
+        ("update Staff", lambda: client.update("Staff", {"StaffID": 99}, {"StaffName": "Smoke Tested"})),
+        ("bulk Author", lambda: client.insert_many("Author", [{"AuthorName": f"Bulk {i}"} for i in range(500)])),
+        ("lookup barcode", lambda: client.lookup(f"LIB{free_item:09d}")),
+        ("lookup ISBN", lambda: client.lookup("978-0-00-000001-9")),
+        ("lookup (LRU)", lambda: client.lookup("9780000000019")),
+        ("customers name", lambda: client.customers("smi")),
+        ("customers phone", lambda: client.customers("(416) 555-01")),
+        ("avail x1", lambda: client.availability("record", [1])),
+        ("avail x100", lambda: client.availability("record", range(1, 101))),
+        ("avail x1000", lambda: client.availability("record", range(1, 1001))),
+        ("avail ISBN x50", lambda: client.availability("isbn", [a9standin.isbn13(n) for n in range(1, 51)])),
+        ("checkout", lambda: client.checkout(1001, free_item, 1)),
+        ("lend 1-copy", lambda: held_loan.append(client.checkout(1002, held_item, 1)[1][0][0]) or held_loan),
+        ("hold", lambda: client.place_hold(held_record, 1003)),
+        ("hold prio 1", lambda: client.place_hold(held_record, 1004, priority=1)),
+        ("return", lambda: client.return_loan(held_loan[0])),
+        ("return again", lambda: refused(lambda: client.return_loan(held_loan[0]))),
+        ("checkout other", lambda: refused(lambda: client.checkout(1005, held_item, 1))),
+        ("checkout held", lambda: client.checkout(1004, held_item, 1)),
+        ("hold queue", lambda: client.holds(held_record)),
+        ("record detail", lambda: detail(held_record)),
+        ("record (LRU)", lambda: detail(held_record)),
+        ("delete Staff", lambda: client.delete("Staff", {"StaffID": 99})),
+    ]
+    for label, check in checks:
+        start = time.perf_counter()
+        result = check()
+        ms = (time.perf_counter() - start) * 1000.0
+        if isinstance(result, tuple) and isinstance(result[1], list):
+            shown = f"{len(result[1])} row(s)"
+        elif isinstance(result, list):
+            shown = f"{len(result)} item(s), {result[0]} .. {result[-1]}"
+        else:
+            shown = result
+        print(f"  {label:<15}{ms:8.2f} ms  {shown}")
+
+    def desk(n):
+        c = ServiceClient(url)
+        done = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            if done % 2:
+                c.search("Record", "river", limit=50)
+            else:
+                c.browse("RecordAvailableStock", limit=50, offset=(n * 50) % 1000)
+            done += 1
+        c.close()
+        return done
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as ex:
+        total = sum(ex.map(desk, range(clients)))
+    elapsed = time.perf_counter() - start
+    health = client.health()
+    print(f"  {clients} clients x {seconds:g}s: {total / elapsed:.0f} req/s "
+          f"over {pool_size} pooled connections "
+          f"(avg {health['avg_ms']:.2f} ms, errors {health['errors']})")
+
+    client.close()
+    server.shutdown()
+    pool.close()
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+
+# MAIN
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Library DBMS middle tier (HTTP/JSON, pooled connections).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--pool", type=int, default=POOL_SIZE, help="max pooled database connections")
+    parser.add_argument("--db", default="library_standin.db", help="stand-in sqlite file")
+    parser.add_argument("--build", action="store_true", help="(re)build and seed the stand-in first")
+    parser.add_argument("--oracle", default=None, help="user/pass@dsn to serve Oracle instead")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    parser.add_argument("--smoke", action="store_true", help="run a one-machine smoke test and exit")
+    args = parser.parse_args(argv)
+
+    if args.smoke:
+        smoke(pool_size=args.pool)
+        return
+
+    if args.oracle:
+        pool = OraclePool(args.oracle, args.pool)
+    else:
+        if args.build or not os.path.exists(args.db):
+            print(f"[Building stand-in database {args.db}...]")
+            a9standin.build(args.db)
+        pool = StandinPool(args.db, args.pool)
+
+    server = make_server(pool, args.host, args.port, args.verbose)
+    print(f"Serving {pool.dialect} on http://{args.host}:{args.port} (pool {args.pool}); Ctrl-C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping...")
+    finally:
+        server.server_close()
+        pool.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
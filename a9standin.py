@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+#Wafee Rahman , Richie Au , Umair Ansar
+
+"""
+Library DBMS – local stand-in database (sqlite3, no Oracle needed)
+
+- Same tables / view as main.sql, translated to sqlite types:
+    Staff, Author, Address, Customer, Record, RecordAuthor,
+    LibraryInventory, Book, EBook, DVD, Loans, Hold, RecordAvailableStock
+
+- Registers the Oracle functions our SQL uses (TO_DATE, NVL, GREATEST, LPAD,
+  ORA_HASH) so the same statement text (with :named binds) runs on both.
+  Collection binds (TABLE(:keys)) go through collection_sql / collection_bind.
+
+- Used by the tools that need a database on one machine
+  (load generator, middle-tier service, etc.). Build one with:
+    python a9standin.py library.db --records 5000 --customers 2000 --loans 20000
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import sqlite3
+import sys
+from datetime import date, timedelta
+
+import a9queries
+
+
+# Digits-only phone number (no REGEXP_REPLACE in sqlite): strip the usual punctuation
+PHONE_DIGITS_SQL = ("REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE("
+                    "NEW.PhoneNumber, ' ', ''), '-', ''), '(', ''), ')', ''), '.', ''), '+', '')")
+
+
+def scan_code_sql(column):
+    """a9queries.scan_code() in SQL: no spaces / tabs / hyphens, upper case."""
+    return f"UPPER(REPLACE(REPLACE(REPLACE(NEW.{column}, ' ', ''), CHAR(9), ''), '-', ''))"
+
+
+# TABLE ORDER (parent -> child). Drop in reverse.
+TABLES = [
+    "Staff",
+    "Author",
+    "Address",
+    "Customer",
+    "Record",
+    "RecordAuthor",
+    "LibraryInventory",
+    "Book",
+    "EBook",
+    "DVD",
+    "Loans",
+    "Hold",
+]
+
+
+DDL_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS Staff (
+      StaffID   INTEGER PRIMARY KEY,
+      StaffName TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Author (
+      AuthorID   INTEGER PRIMARY KEY,
+      AuthorName TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Address (
+      AddressID  INTEGER PRIMARY KEY,
+      Street     TEXT,
+      City       TEXT,
+      Province   TEXT,
+      PostalCode TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Customer (
+      CustomerID  INTEGER PRIMARY KEY,
+      FirstName   TEXT NOT NULL,
+      LastName    TEXT NOT NULL,
+      PhoneNumber TEXT,
+      AddressID   INTEGER REFERENCES Address(AddressID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Record (
+      RecordID          INTEGER PRIMARY KEY,
+      Title             TEXT NOT NULL,
+      Genre             TEXT,
+      DateOfPublication TEXT,
+      CatalogedBy       INTEGER NOT NULL REFERENCES Staff(StaffID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS RecordAuthor (
+      RecordID INTEGER NOT NULL REFERENCES Record(RecordID),
+      AuthorID INTEGER NOT NULL REFERENCES Author(AuthorID),
+      PRIMARY KEY (RecordID, AuthorID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS LibraryInventory (
+      ItemID     INTEGER PRIMARY KEY,
+      RecordID   INTEGER NOT NULL REFERENCES Record(RecordID),
+      TotalStock INTEGER DEFAULT 1,
+      Barcode    TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Book (
+      RecordID INTEGER PRIMARY KEY REFERENCES Record(RecordID),
+      DRMType  TEXT,
+      Binding  TEXT,
+      ISBN     TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS EBook (
+      RecordID   INTEGER PRIMARY KEY REFERENCES Record(RecordID),
+      DRMType    TEXT,
+      FileFormat TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS DVD (
+      RecordID INTEGER PRIMARY KEY REFERENCES Record(RecordID),
+      RunTime  INTEGER,
+      PGRating TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Loans (
+      loanId     INTEGER PRIMARY KEY,
+      customerId INTEGER NOT NULL REFERENCES Customer(CustomerID) ON DELETE CASCADE,
+      itemId     INTEGER NOT NULL REFERENCES LibraryInventory(ItemID) ON DELETE CASCADE,
+      staffId    INTEGER NOT NULL REFERENCES Staff(StaffID),
+      loanDate   TEXT    DEFAULT (date('now')) NOT NULL,
+      dueDate    TEXT    NOT NULL,
+      overdue    TEXT    DEFAULT 'N' CHECK (overdue IN ('Y','N')),
+      returnDate TEXT,
+      CHECK (dueDate > loanDate),
+      CHECK (returnDate IS NULL OR returnDate >= loanDate)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Hold (
+      HoldID       INTEGER PRIMARY KEY,
+      RecordID     INTEGER NOT NULL REFERENCES Record(RecordID) ON DELETE CASCADE,
+      CustomerID   INTEGER NOT NULL REFERENCES Customer(CustomerID) ON DELETE CASCADE,
+      Priority     INTEGER DEFAULT 5 NOT NULL,
+      Status       TEXT    DEFAULT 'W' NOT NULL CHECK (Status IN ('W','R','F','C','X')),
+      PlacedDate   TEXT    DEFAULT (date('now')) NOT NULL,
+      ExpiryDate   TEXT,
+      ItemID       INTEGER REFERENCES LibraryInventory(ItemID) ON DELETE SET NULL,
+      ReadyDate    TEXT,
+      PickupByDate TEXT
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_Loans_itemId ON Loans(itemId)
+    """,
+    # Loans still out (a9queries: ACTIVE LOANS). sqlite indexes the NULL keys
+    # of returned loans too, but a probe for an ItemID / due date never
+    # reads them.
+    """
+    CREATE INDEX IF NOT EXISTS ix_Loans_active ON Loans(CASE WHEN returnDate IS NULL THEN itemId END)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_Loans_active_due ON Loans(CASE WHEN returnDate IS NULL THEN dueDate END)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_Hold_Queue ON Hold(RecordID, Status, Priority, HoldID)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_Hold_Item ON Hold(ItemID, Status)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_Hold_Customer ON Hold(CustomerID, RecordID, Status)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_LI_RecordID ON LibraryInventory(RecordID)
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_LI_Barcode ON LibraryInventory(Barcode)
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_Book_ISBN ON Book(ISBN)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_Customer_Name ON Customer(UPPER(LastName), UPPER(FirstName), CustomerID)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_Customer_Phone ON Customer(PhoneNumber, CustomerID)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_Customer_AddressID ON Customer(AddressID)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_Address_Postal ON Address(UPPER(REPLACE(PostalCode, ' ', '')))
+    """,
+    # Phone numbers are stored as digits only (Oracle: trg_Customer_phone)
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_Customer_phone_ins AFTER INSERT ON Customer
+    WHEN NEW.PhoneNumber GLOB '*[^0-9]*'
+    BEGIN
+      UPDATE Customer SET PhoneNumber = {PHONE_DIGITS_SQL} WHERE CustomerID = NEW.CustomerID;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_Customer_phone_upd AFTER UPDATE OF PhoneNumber ON Customer
+    WHEN NEW.PhoneNumber GLOB '*[^0-9]*'
+    BEGIN
+      UPDATE Customer SET PhoneNumber = {PHONE_DIGITS_SQL} WHERE CustomerID = NEW.CustomerID;
+    END
+    """,
+    # ISBNs and barcodes are stored as a desk scan looks them up (Oracle: trg_Book_isbn, ...)
+    *[f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_{column.lower()}_{when[:3].lower()} AFTER {when} ON {table}
+    WHEN NEW.{column} <> {scan_code_sql(column)}
+    BEGIN
+      UPDATE {table} SET {column} = {scan_code_sql(column)} WHERE {key} = NEW.{key};
+    END
+    """ for table, column, key in (("Book", "ISBN", "RecordID"), ("LibraryInventory", "Barcode", "ItemID"))
+      for when in ("INSERT", f"UPDATE OF {column}")],
+]
+
+# performance profile (a9queries.SCHEMA_PROFILES), as far as sqlite goes:
+# WITHOUT ROWID keeps RecordAuthor's rows in its primary-key B-tree, like an
+# index-organized table. sqlite has no clusters or table compression, and
+# its INTEGER PRIMARY KEY tables are already stored in key order.
+PERFORMANCE_SUFFIX = {"RecordAuthor": " WITHOUT ROWID"}
+TABLE_RE = re.compile(r"CREATE TABLE IF NOT EXISTS (\w+)")
+
+# Same body as the Oracle view (only CREATE OR REPLACE differs).
+VIEW_SQL = a9queries.view_ddl("sqlite")
+
+
+GENRES = [
+    "Fantasy", "Mystery", "Horror", "Romance", "Science Fiction",
+    "Non-Fiction", "Dystopian", "Thriller", "Technology", "Sci-Fi Movie",
+]
+FIRST_NAMES = ["John", "Jane", "Michael", "Sarah", "Daniel", "Emily", "Kevin", "Olivia", "Liam", "Sophia"]
+LAST_NAMES = ["Doe", "Smith", "Brown", "Lee", "Kim", "Wilson", "Nguyen", "Patel", "Garcia", "Lopez"]
+STREETS = ["King St", "Queen St", "Dundas St", "Bloor St", "Spadina Ave", "Yonge St", "Bay St", "College St"]
+WORDS = ["Shadow", "River", "Winter", "Garden", "Empire", "Secret", "Machine", "Ocean", "Stone", "Night"]
+
+
+
+# ORACLE COMPATIBILITY FUNCTIONS
+
+def _to_date(value, fmt=None):
+    # Dates are stored as ISO 'YYYY-MM-DD' text; strip any time part.
+    if value is None:
+        return None
+    return str(value)[:10]
+
+
+def _nvl(value, default):
+    return default if value is None else value
+
+
+def _greatest(*values):
+    if any(v is None for v in values):
+        return None
+    return max(values)
+
+
+def _lpad(value, width, pad=" "):
+    if value is None:
+        return None
+    text = str(value)
+    return text[:width] if len(text) >= width else (pad * width)[:width - len(text)] + text
+
+
+def _ora_hash(value, max_bucket=4294967295, seed=0):
+    # Stable 32-bit hash of the text form; not Oracle's values, only its shape.
+    if value is None:
+        return None
+    digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=4,
+                             salt=int(seed).to_bytes(16, "little")).digest()
+    return int.from_bytes(digest, "little") % (int(max_bucket) + 1)
+
+
+def collection_sql(sql):
+    """Oracle `TABLE(:keys) k ... k.COLUMN_VALUE` -> json_each over a JSON array bind."""
+    sql = re.sub(r"\bTABLE\((:\w+)\)", r"json_each(\1)", sql)
+    return re.sub(r"\bCOLUMN_VALUE\b", "value", sql)
+
+
+def collection_bind(values):
+    """Python list -> the JSON array json_each reads (Oracle binds a collection object)."""
+    return json.dumps(list(values))
+
+
+def connect(path, timeout=5.0, check_same_thread=True, cached_statements=128):
+    """
+    Open a stand-in connection with the Oracle helper functions registered.
+    One connection per thread/worker; a pool that hands connections between
+    threads (one user at a time) passes check_same_thread=False.
+    """
+    conn = sqlite3.connect(
+        path,
+        timeout=timeout,
+        check_same_thread=check_same_thread,
+        cached_statements=cached_statements,
+    )
+    # deterministic: TO_DATE(:bind) is then a constant sqlite can probe an index with
+    conn.create_function("TO_DATE", 1, _to_date, deterministic=True)
+    conn.create_function("TO_DATE", 2, _to_date, deterministic=True)
+    conn.create_function("NVL", 2, _nvl)
+    conn.create_function("GREATEST", -1, _greatest)
+    conn.create_function("LPAD", 2, _lpad)
+    conn.create_function("LPAD", 3, _lpad)
+    for nargs in (1, 2, 3):
+        conn.create_function("ORA_HASH", nargs, _ora_hash, deterministic=True)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+
+
+# SCHEMA
+
+def create_schema(conn, profile="standard"):
+    a9queries.check_profile(profile)
+    for ddl in DDL_STATEMENTS:
+        table = TABLE_RE.search(ddl)
+        if profile == "performance" and table:
+            ddl = ddl.rstrip() + PERFORMANCE_SUFFIX.get(table.group(1), "")
+        conn.execute(ddl)
+    conn.execute(VIEW_SQL)
+    conn.commit()
+
+
+def drop_schema(conn):
+    conn.execute("DROP VIEW IF EXISTS RecordAvailableStock")
+    for t in reversed(TABLES):
+        conn.execute(f"DROP TABLE IF EXISTS {t}")
+    conn.commit()
+
+
+
+# SEED DATA (synthetic, scalable)
+
+def seed_data(conn, records=1000, customers=500, loans=2000, staff=10, authors=200, seed=510):
+    """
+    Fill the stand-in with synthetic rows shaped like the demo data.
+    RecordID n has ItemID 100 + n; records are split Book / EBook / DVD.
+    """
+    rnd = random.Random(seed)
+
+    conn.executemany(
+        "INSERT INTO Staff (StaffID, StaffName) VALUES (?, ?)",
+        [(i, f"Staff {i}") for i in range(1, staff + 1)],
+    )
+    conn.executemany(
+        "INSERT INTO Author (AuthorID, AuthorName) VALUES (?, ?)",
+        [(i, f"Author {i}") for i in range(1, authors + 1)],
+    )
+    conn.executemany(
+        "INSERT INTO Address (AddressID, Street, City, Province, PostalCode) VALUES (?, ?, ?, ?, ?)",
+        [
+            (i, f"{rnd.randint(1, 999)} {rnd.choice(STREETS)}", "Toronto", "ON",
+             f"M{rnd.randint(1, 9)}{rnd.choice('ABCEGHJ')} {rnd.randint(1, 9)}{rnd.choice('ABCEGHJ')}{rnd.randint(1, 9)}")
+            for i in range(1, customers + 1)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO Customer (CustomerID, FirstName, LastName, PhoneNumber, AddressID) VALUES (?, ?, ?, ?, ?)",
+        [
+            (1000 + i, rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES), f"416555{i:04d}"[-10:], i)
+            for i in range(1, customers + 1)
+        ],
+    )
+
+    record_rows, ra_rows, inv_rows = [], [], []
+    book_rows, ebook_rows, dvd_rows = [], [], []
+    for n in range(1, records + 1):
+        pub = date(1900, 1, 1) + timedelta(days=rnd.randint(0, 45000))
+        title = f"{rnd.choice(WORDS)} {rnd.choice(WORDS)} {n}"
+        record_rows.append((n, title, rnd.choice(GENRES), pub.isoformat(), rnd.randint(1, staff)))
+        ra_rows.append((n, rnd.randint(1, authors)))
+        inv_rows.append((100 + n, n, rnd.randint(1, 5)))
+        kind = n % 10
+        if kind < 7:
+            book_rows.append((n, "PhysicalCopy", rnd.choice(["Paperback", "Hardcover"]), isbn13(n)))
+        elif kind < 9:
+            ebook_rows.append((n, rnd.choice(["AdobeDRM", "Watermark"]), rnd.choice(["EPUB", "PDF"])))
+        else:
+            dvd_rows.append((n, rnd.randint(80, 180), rnd.choice(["G", "PG", "PG-13", "R"])))
+
+    conn.executemany(
+        "INSERT INTO Record (RecordID, Title, Genre, DateOfPublication, CatalogedBy) VALUES (?, ?, ?, ?, ?)",
+        record_rows,
+    )
+    conn.executemany("INSERT INTO RecordAuthor (RecordID, AuthorID) VALUES (?, ?)", ra_rows)
+    conn.executemany("INSERT INTO LibraryInventory (ItemID, RecordID, TotalStock) VALUES (?, ?, ?)", inv_rows)
+    conn.executemany("INSERT INTO Book (RecordID, DRMType, Binding, ISBN) VALUES (?, ?, ?, ?)", book_rows)
+    conn.executemany("INSERT INTO EBook (RecordID, DRMType, FileFormat) VALUES (?, ?, ?)", ebook_rows)
+    conn.executemany("INSERT INTO DVD (RecordID, RunTime, PGRating) VALUES (?, ?, ?)", dvd_rows)
+
+    # Most loans past their due date have come back (kept as history). An
+    # item never has more loans out than copies: the rest were returned.
+    today = date.today()
+    stock = {item_id: total for item_id, _, total in inv_rows}
+    out = dict.fromkeys(stock, 0)
+    loan_rows = []
+    for n in range(1, loans + 1):
+        item_id = 100 + rnd.randint(1, records)
+        loan_date = today - timedelta(days=rnd.randint(0, 60))
+        due_date = loan_date + timedelta(days=14)
+        returned = None
+        if (due_date < today and rnd.random() < 0.8) or out[item_id] >= stock[item_id]:
+            returned = min(today, loan_date + timedelta(days=rnd.randint(1, 21)))
+        else:
+            out[item_id] += 1
+        loan_rows.append((
+            n,
+            1000 + rnd.randint(1, customers),
+            item_id,
+            rnd.randint(1, staff),
+            loan_date.isoformat(),
+            due_date.isoformat(),
+            "Y" if due_date < (returned or today) else "N",
+            returned and returned.isoformat(),
+        ))
+    conn.executemany(
+        """
+        INSERT INTO Loans (loanId, customerId, itemId, staffId, loanDate, dueDate, overdue, returnDate)
+        VALUES (?, ?, ?, ?, TO_DATE(?, 'YYYY-MM-DD'), TO_DATE(?, 'YYYY-MM-DD'), ?, TO_DATE(?, 'YYYY-MM-DD'))
+        """,
+        loan_rows,
+    )
+    conn.execute(a9queries.get("assign_barcodes").sql)
+    conn.commit()
+
+
+def isbn13(n):
+    """Synthetic ISBN-13 (978 prefix, valid check digit) for record n."""
+    digits = f"978{n:09d}"
+    check = (10 - sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits)) % 10) % 10
+    return f"{digits}{check}"
+
+
+def build(path, records=1000, customers=500, loans=2000, profile="standard"):
+    """Drop, create and seed a stand-in database file. Returns the path."""
+    conn = connect(path)
+    try:
+        drop_schema(conn)
+        create_schema(conn, profile)
+        seed_data(conn, records=records, customers=customers, loans=loans)
+    finally:
+        conn.close()
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a local stand-in Library DBMS (sqlite).")
+    parser.add_argument("path", help="sqlite database file to (re)create")
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--loans", type=int, default=2000)
+    parser.add_argument("--profile", choices=a9queries.SCHEMA_PROFILES, default="standard",
+                        help="physical layout (performance: RecordAuthor WITHOUT ROWID)")
+    args = parser.parse_args(argv)
+
+    build(args.path, records=args.records, customers=args.customers, loans=args.loans, profile=args.profile)
+    print(f"Stand-in database written to {args.path} "
+          f"({args.records} records, {args.customers} customers, {args.loans} loans)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,34 +3,87 @@
    Wafee Rahman, Richie Au, Umair Ansar
 */
 
+/* 0) KEY SEQUENCES
+  One cached sequence per surrogate key; each key column is
+  DEFAULT ON NULL seq_<Table>.NEXTVAL, so an INSERT that leaves the key
+  out (or NULL) gets the next ID inside the same statement and can read
+  it back with RETURNING. CACHE keeps NEXTVAL in memory (no dictionary
+  write per ID); bulk loads reserve a block with
+    SELECT seq_Loans.NEXTVAL FROM dual CONNECT BY LEVEL <= :n */
+CREATE SEQUENCE seq_Staff START WITH 1 CACHE 100;
+CREATE SEQUENCE seq_Author START WITH 1 CACHE 100;
+CREATE SEQUENCE seq_Address START WITH 1 CACHE 100;
+CREATE SEQUENCE seq_Customer START WITH 1 CACHE 100;
+CREATE SEQUENCE seq_Record START WITH 1 CACHE 100;
+CREATE SEQUENCE seq_LibraryInventory START WITH 1 CACHE 100;
+CREATE SEQUENCE seq_Loans START WITH 1 CACHE 1000;
+CREATE SEQUENCE seq_Hold START WITH 1 CACHE 100;
+
+/* 0b) PHYSICAL-DESIGN PROFILE
+  standard    – every table is a heap table.
+  performance – RecordAuthor is index-organized (its rows are the
+                primary-key index, prefix-compressed on RecordID);
+                Record, Book, EBook and DVD share the RecordCluster
+                index cluster, so one title is one block; Loans is
+                compressed and partitioned by month of loanDate.
+  Edit the DEFINE to pick one. The clauses match
+  a9queries.PERFORMANCE_STORAGE (GUI / CLI "Layout" choice);
+  a9layout.py measures the two against each other. */
+DEFINE a9_profile = standard
+
+SET VERIFY OFF
+COLUMN record_storage NEW_VALUE record_storage NOPRINT
+COLUMN link_storage   NEW_VALUE link_storage   NOPRINT
+COLUMN loans_storage  NEW_VALUE loans_storage  NOPRINT
+SELECT DECODE('&a9_profile', 'performance', 'CLUSTER RecordCluster (RecordID)',
+              'ROWDEPENDENCIES') AS record_storage,
+       DECODE('&a9_profile', 'performance', 'ORGANIZATION INDEX COMPRESS 1',
+              'ROWDEPENDENCIES') AS link_storage,
+       DECODE('&a9_profile', 'performance',
+              'ROW STORE COMPRESS ADVANCED '
+              || 'PARTITION BY RANGE (loanDate) INTERVAL (NUMTOYMINTERVAL(1, ''MONTH'')) '
+              || '(PARTITION p_old VALUES LESS THAN (DATE ''2000-01-01'')) '
+              || 'ROWDEPENDENCIES',
+              'ROWDEPENDENCIES') AS loans_storage
+FROM dual;
+
+-- Clustered tables take ROWDEPENDENCIES from the cluster
+BEGIN
+  IF '&a9_profile' = 'performance' THEN
+    EXECUTE IMMEDIATE 'CREATE CLUSTER RecordCluster (RecordID INT) SIZE 512 ROWDEPENDENCIES';
+    EXECUTE IMMEDIATE 'CREATE INDEX ix_RecordCluster ON CLUSTER RecordCluster';
+  END IF;
+END;
+/
+
 /* 1) STAFF
   Stores staff members. */
 CREATE TABLE Staff (
-  StaffID   INT PRIMARY KEY,
+  StaffID   INT DEFAULT ON NULL seq_Staff.NEXTVAL PRIMARY KEY,
   StaffName VARCHAR2(100) NOT NULL
-);
+) ROWDEPENDENCIES;
 
 /* 2) AUTHOR
   Stores authors. */
 CREATE TABLE Author (
-  AuthorID   INT PRIMARY KEY,
+  AuthorID   INT DEFAULT ON NULL seq_Author.NEXTVAL PRIMARY KEY,
   AuthorName VARCHAR2(100) NOT NULL
-);
+) ROWDEPENDENCIES;
 
 /* 3) ADDRESS
   Customer addresses. */
 CREATE TABLE Address (
-  AddressID  INT           PRIMARY KEY,
+  AddressID  INT           DEFAULT ON NULL seq_Address.NEXTVAL PRIMARY KEY,
   Street     VARCHAR2(100),
   City       VARCHAR2(100),
   Province   VARCHAR2(50),
   PostalCode VARCHAR2(10)
-);
+) ROWDEPENDENCIES;
 
 /* 4) CUSTOMER
   Library patrons; references Address. */
 CREATE TABLE Customer (
-  CustomerID  NUMBER(9)    PRIMARY KEY,
+  CustomerID  NUMBER(9)    DEFAULT ON NULL seq_Customer.NEXTVAL PRIMARY KEY,
   FirstName   VARCHAR2(50) NOT NULL,
   LastName    VARCHAR2(50) NOT NULL,
   PhoneNumber VARCHAR2(15),
@@ -38,12 +91,12 @@ CREATE TABLE Customer (
   CONSTRAINT fk_Customer_Address
     FOREIGN KEY (AddressID)
     REFERENCES Address(AddressID)
-);
+) ROWDEPENDENCIES;
 
 /* 5) RECORD
   Bibliographic record; cataloged by staff. */
 CREATE TABLE Record (
-   RecordID          INT           PRIMARY KEY,
+   RecordID          INT           DEFAULT ON NULL seq_Record.NEXTVAL PRIMARY KEY,
    Title             VARCHAR2(255) NOT NULL,
    Genre             VARCHAR2(100),
    DateOfPublication DATE,
@@ -51,7 +104,7 @@ CREATE TABLE Record (
    CONSTRAINT fk_Record_Staff
       FOREIGN KEY (CatalogedBy)
       REFERENCES Staff(StaffID)
-);
+) &record_storage;
 
 /* 6) RECORDAUTHOR
   M:N link between Record and Author. */
@@ -71,15 +124,18 @@ CREATE TABLE RecordAuthor (
      - Single-key table.
      - All attributes depend on AddressID.
      - In 3NF and BCNF.
-);
+) &link_storage;
 
 CREATE TABLE Address (
-  AddressID  INT           PRIMARY KEY,
+  AddressID  INT           DEFAULT ON NULL seq_Address.NEXTVAL PRIMARY KEY,
   Street     VARCHAR2(100),
   City       VARCHAR2(100),
   Province   VARCHAR2(50),
   PostalCode VARCHAR2(10)
-);
+) ROWDEPENDENCIES;
+
+-- Customer lookup by postal code prefix ('M5V', 'm5v 2t6')
+CREATE INDEX ix_Address_Postal ON Address (UPPER(REPLACE(PostalCode, ' ', '')));
 
 
 /* ============================================================
@@ -102,9 +158,15 @@ CREATE TABLE Address (
      - All non-key attributes in Customer depend only on CustomerID.
      - Address details are moved to separate Address table.
      - In 3NF and BCNF.
+
+   Desk lookup (type-ahead):
+     - PhoneNumber is stored as digits only (trg_Customer_phone).
+     - Name prefixes are case-insensitive ranges on ix_Customer_Name;
+       phone prefixes on ix_Customer_Phone; postal codes go through
+       ix_Address_Postal and ix_Customer_AddressID.
    ============================================================ */
 CREATE TABLE Customer (
-   CustomerID  NUMBER(9)    PRIMARY KEY,
+   CustomerID  NUMBER(9)    DEFAULT ON NULL seq_Customer.NEXTVAL PRIMARY KEY,
    FirstName   VARCHAR2(50) NOT NULL,
    LastName    VARCHAR2(50) NOT NULL,
    PhoneNumber VARCHAR2(15),
@@ -112,7 +174,19 @@ CREATE TABLE Customer (
    CONSTRAINT fk_Customer_Address
      FOREIGN KEY (AddressID)
      REFERENCES Address(AddressID)
-);
+) ROWDEPENDENCIES;
+
+CREATE INDEX ix_Customer_Name ON Customer (UPPER(LastName), UPPER(FirstName), CustomerID);
+CREATE INDEX ix_Customer_Phone ON Customer (PhoneNumber, CustomerID);
+CREATE INDEX ix_Customer_AddressID ON Customer (AddressID);
+
+CREATE OR REPLACE TRIGGER trg_Customer_phone
+BEFORE INSERT OR UPDATE OF PhoneNumber ON Customer
+FOR EACH ROW
+BEGIN
+  :NEW.PhoneNumber := REGEXP_REPLACE(:NEW.PhoneNumber, '[^0-9]', '');
+END;
+/
 
 
 /* ============================================================
@@ -134,7 +208,7 @@ CREATE TABLE Customer (
      - In 3NF and BCNF.
    ============================================================ */
 CREATE TABLE Record (
-    RecordID          INT           PRIMARY KEY,
+    RecordID          INT           DEFAULT ON NULL seq_Record.NEXTVAL PRIMARY KEY,
     Title             VARCHAR2(255) NOT NULL,
     Genre             VARCHAR2(100),
     DateOfPublication DATE,
@@ -142,7 +216,7 @@ CREATE TABLE Record (
     CONSTRAINT fk_Record_Staff
         FOREIGN KEY (CatalogedBy)
         REFERENCES Staff(StaffID)
-);
+) &record_storage;
 
 
 /* ============================================================
@@ -171,7 +245,7 @@ CREATE TABLE RecordAuthor (
     CONSTRAINT fk_RA_Author
         FOREIGN KEY (AuthorID)
         REFERENCES Author(AuthorID)
-);
+) &link_storage;
 
 
 /* ============================================================
@@ -190,15 +264,29 @@ CREATE TABLE RecordAuthor (
      - Determinant (ItemID) is the key; table in BCNF.
    ============================================================ */
 CREATE TABLE LibraryInventory (
-    ItemID     INT PRIMARY KEY,
+    ItemID     INT DEFAULT ON NULL seq_LibraryInventory.NEXTVAL PRIMARY KEY,
     RecordID   INT NOT NULL,
     TotalStock INT DEFAULT 1,
+    Barcode    VARCHAR2(32),
     CONSTRAINT fk_LI_Record
         FOREIGN KEY (RecordID)
         REFERENCES Record(RecordID)
     -- Uncomment below if you want at most one inventory row per Record:
     -- ,CONSTRAINT uq_LI_Record UNIQUE (RecordID)
-);
+) ROWDEPENDENCIES;
+
+-- Desk scans resolve a label in one probe; unlabelled items (NULL) are not indexed.
+CREATE UNIQUE INDEX ux_LI_Barcode ON LibraryInventory (Barcode);
+CREATE INDEX ix_LI_RecordID ON LibraryInventory (RecordID);
+
+-- Labels are stored as a9queries.scan_code() writes them (no spaces / hyphens, upper case).
+CREATE OR REPLACE TRIGGER trg_LibraryInventory_barcode
+BEFORE INSERT OR UPDATE OF Barcode ON LibraryInventory
+FOR EACH ROW
+BEGIN
+  :NEW.Barcode := UPPER(REGEXP_REPLACE(:NEW.Barcode, '[[:space:]-]', ''));
+END;
+/
 
 
 /* ============================================================
@@ -208,10 +296,12 @@ CREATE TABLE LibraryInventory (
      - Stores attributes specific to book-type records.
 
    NOTE (matching PDF description):
-     - Book table: (RecordID, DRMType, Binding)
+     - Book table: (RecordID, DRMType, Binding), plus ISBN for
+       desk scans (unique when present).
 
    Functional Dependency:
-     - RecordID → (DRMType, Binding)
+     - RecordID → (DRMType, Binding, ISBN)
+     - ISBN → RecordID
 
    Normal Form:
      - RecordID is both PK and FK to Record.
@@ -222,10 +312,22 @@ CREATE TABLE Book (
     RecordID INT PRIMARY KEY,
     DRMType  VARCHAR2(50),
     Binding  VARCHAR2(50),
+    ISBN     VARCHAR2(20),
     CONSTRAINT fk_Book_Record
         FOREIGN KEY (RecordID)
         REFERENCES Record(RecordID)
-);
+) &record_storage;
+
+CREATE UNIQUE INDEX ux_Book_ISBN ON Book (ISBN);
+
+-- "978-0-13-..." is stored as 978013..., the form a desk scan looks up.
+CREATE OR REPLACE TRIGGER trg_Book_isbn
+BEFORE INSERT OR UPDATE OF ISBN ON Book
+FOR EACH ROW
+BEGIN
+  :NEW.ISBN := UPPER(REGEXP_REPLACE(:NEW.ISBN, '[[:space:]-]', ''));
+END;
+/
 
 
 /* ============================================================
@@ -252,7 +354,7 @@ CREATE TABLE EBook (
     CONSTRAINT fk_EBook_Record
         FOREIGN KEY (RecordID)
         REFERENCES Record(RecordID)
-);
+) &record_storage;
 
 
 /* ============================================================
@@ -276,7 +378,7 @@ CREATE TABLE DVD (
     CONSTRAINT fk_DVD_Record
         FOREIGN KEY (RecordID)
         REFERENCES Record(RecordID)
-);
+) &record_storage;
 
 
 /* ============================================================
@@ -284,33 +386,46 @@ CREATE TABLE DVD (
    ------------------------------------------------------------
    Purpose:
      - Tracks each loan transaction of a physical item.
+     - A loan is active (the copy is out) until ReturnDate is
+       set. Returned loans stay as history.
 
    Attributes (matching PDF):
      - LoanID, CustomerID, ItemID, StaffID, LoanDate,
-       DueDate, Overdue?
+       DueDate, Overdue?, ReturnDate
 
    Functional Dependency:
      - LoanID → (CustomerID, ItemID, StaffID,
-                 LoanDate, DueDate, Overdue)
+                 LoanDate, DueDate, Overdue, ReturnDate)
 
    Constraints:
      - Each loan references a valid Customer, Item, and Staff.
      - DueDate must be after LoanDate.
+     - ReturnDate, once set, is not before LoanDate.
      - Overdue ∈ {'Y','N'}.
 
+   Active-loan indexes:
+     - ix_Loans_active / ix_Loans_active_due key on
+         CASE WHEN returnDate IS NULL THEN itemId END
+         CASE WHEN returnDate IS NULL THEN dueDate END
+       A returned loan's key is NULL, and Oracle leaves all-NULL
+       keys out of a B-tree, so both indexes hold only the loans
+       still out. Availability and overdue queries repeat the
+       expression (a9queries.py) and never read returned history.
+
    Normal Form:
      - All non-key attributes depend on LoanID.
      - No partial or transitive dependencies.
      - In 3NF and BCNF.
    ============================================================ */
 CREATE TABLE Loans (
-  loanId     NUMBER       PRIMARY KEY,
+  loanId     NUMBER       DEFAULT ON NULL seq_Loans.NEXTVAL PRIMARY KEY,
   customerId NUMBER(9)    NOT NULL,
   itemId     NUMBER       NOT NULL,
   staffId    NUMBER       NOT NULL,
   loanDate   DATE         DEFAULT SYSDATE NOT NULL,
   dueDate    DATE         NOT NULL,
   overdue    CHAR(1)      DEFAULT 'N' CHECK (overdue IN ('Y','N')),
+  returnDate DATE,
 
   CONSTRAINT fkLoansCustomer FOREIGN KEY (customerId)
     REFERENCES Customer(CustomerID) ON DELETE CASCADE,
@@ -321,8 +436,69 @@ CREATE TABLE Loans (
   CONSTRAINT fkLoansStaff FOREIGN KEY (staffId)
     REFERENCES Staff(StaffID),
 
-  CONSTRAINT chkDueDate CHECK (dueDate > loanDate)
-);
+  CONSTRAINT chkDueDate CHECK (dueDate > loanDate),
+
+  CONSTRAINT chkReturnDate CHECK (returnDate IS NULL OR returnDate >= loanDate)
+) &loans_storage;
+
+-- Loans per item (foreign key: cascaded item deletes)
+CREATE INDEX ix_Loans_itemId ON Loans (itemId);
+
+-- Loans still out, per item (availability, scan lookups) and by due date (overdue)
+CREATE INDEX ix_Loans_active ON Loans (CASE WHEN returnDate IS NULL THEN itemId END);
+CREATE INDEX ix_Loans_active_due ON Loans (CASE WHEN returnDate IS NULL THEN dueDate END);
+
+
+/* ============================================================
+   11b) HOLD  (reservation queue per record)
+   ------------------------------------------------------------
+   Purpose:
+     - A customer waiting for a title with no free copy. When a
+       loan ends, the copy goes to the next eligible hold in the
+       same transaction (a9holds.py: return_loan / allocate).
+
+   Status:
+     - W waiting, R ready (ItemID set aside until PickupByDate),
+       F filled (checked out), C cancelled, X expired.
+
+   Queue order:
+     - Lowest Priority first, then HoldID (first come first
+       served). ix_Hold_Queue holds each record's waiting holds
+       in exactly that order, so the next hold is the first entry
+       of one index range: O(log n) however long the queue is.
+
+   Functional Dependency:
+     - HoldID → (RecordID, CustomerID, Priority, Status,
+                 PlacedDate, ExpiryDate, ItemID, ReadyDate,
+                 PickupByDate)
+     - In 3NF and BCNF.
+   ============================================================ */
+CREATE TABLE Hold (
+  HoldID       NUMBER     DEFAULT ON NULL seq_Hold.NEXTVAL PRIMARY KEY,
+  RecordID     INT        NOT NULL,
+  CustomerID   NUMBER(9)  NOT NULL,
+  Priority     INT        DEFAULT 5 NOT NULL,
+  Status       CHAR(1)    DEFAULT 'W' NOT NULL CHECK (Status IN ('W','R','F','C','X')),
+  PlacedDate   DATE       DEFAULT SYSDATE NOT NULL,
+  ExpiryDate   DATE,
+  ItemID       INT,
+  ReadyDate    DATE,
+  PickupByDate DATE,
+
+  CONSTRAINT fk_Hold_Record FOREIGN KEY (RecordID)
+    REFERENCES Record(RecordID) ON DELETE CASCADE,
+
+  CONSTRAINT fk_Hold_Customer FOREIGN KEY (CustomerID)
+    REFERENCES Customer(CustomerID) ON DELETE CASCADE,
+
+  CONSTRAINT fk_Hold_Item FOREIGN KEY (ItemID)
+    REFERENCES LibraryInventory(ItemID) ON DELETE SET NULL
+) ROWDEPENDENCIES;
+
+-- Next hold for a record; copies set aside per item; a customer's open holds
+CREATE INDEX ix_Hold_Queue ON Hold (RecordID, Status, Priority, HoldID);
+CREATE INDEX ix_Hold_Item ON Hold (ItemID, Status);
+CREATE INDEX ix_Hold_Customer ON Hold (CustomerID, RecordID, Status);
 
 
 /* ============================================================
@@ -331,43 +507,719 @@ CREATE TABLE Loans (
    Purpose:
      - Advanced summary report that shows, per Record + ItemID:
          • TotalCopies (TotalStock)
-         • ActiveLoans  (number of Loans rows per itemId)
-         • AvailableStock = TotalCopies – ActiveLoans (min 0)
+         • ActiveLoans  (Loans rows per itemId not yet returned)
+         • OnHoldShelf  (copies set aside for a ready hold, Status 'R')
+         • AvailableStock = TotalCopies – ActiveLoans – OnHoldShelf (min 0)
        along with bibliographic info from Record.
 
    Assumption:
-     - Every row in Loans represents a currently-out copy.
-       (If you later add returnDate or status, the derived subquery
-        can be adjusted to filter returned loans.)
+     - A Loans row with returnDate NULL is a currently-out copy;
+       returned loans are history and not counted.
 
    Logic:
      1) Join Record to LibraryInventory to get TotalStock.
-     2) LEFT JOIN a derived table that counts loans per itemId.
-     3) Use NVL to handle items with zero loans, and GREATEST
-        to clamp available stock at zero.
+     2) Count each item's active loans with a scalar subquery on
+        the ix_Loans_active expression: one index probe per item,
+        touching only loans still out (none for an idle item).
+        Ready holds are counted the same way through ix_Hold_Item, so
+        "available" here is what a9holds.checkout will lend.
+     3) Use GREATEST to clamp available stock at zero.
 
    This view is your "advanced report" object. Code is formatted
    and commented to satisfy the rubric’s requirement for clear
    reporting logic.
+
+   The body is kept byte-identical to "record_available_stock" in
+   a9queries.py, which the CLI, GUI and stand-in build it from.
    ============================================================ */
 CREATE OR REPLACE VIEW RecordAvailableStock AS
 SELECT
-  r.RecordID,
-  r.Title,
-  r.Genre,
-  r.DateOfPublication,
-  r.CatalogedBy,
-  li.ItemID,
-  li.TotalStock                         AS TotalCopies,
-  NVL(al.active_loans, 0)               AS ActiveLoans,
-  GREATEST(li.TotalStock - NVL(al.active_loans, 0), 0)
+  s.RecordID,
+  s.Title,
+  s.Genre,
+  s.DateOfPublication,
+  s.CatalogedBy,
+  s.ItemID,
+  s.TotalCopies,
+  s.ActiveLoans,
+  s.OnHoldShelf,
+  GREATEST(s.TotalCopies - s.ActiveLoans - s.OnHoldShelf, 0)
     AS AvailableStock
-FROM Record r
-JOIN LibraryInventory li
-  ON li.RecordID = r.RecordID
-LEFT JOIN (
-  SELECT itemId, COUNT(*) AS active_loans
-  FROM Loans
-  GROUP BY itemId
-) al
-  ON al.itemId = li.ItemID;
+FROM (
+  SELECT
+    r.RecordID,
+    r.Title,
+    r.Genre,
+    r.DateOfPublication,
+    r.CatalogedBy,
+    li.ItemID,
+    li.TotalStock                       AS TotalCopies,
+    (SELECT COUNT(*)
+       FROM Loans l
+      WHERE CASE WHEN l.returnDate IS NULL THEN l.itemId END = +li.ItemID)
+                                        AS ActiveLoans,
+    (SELECT COUNT(*)
+       FROM Hold h
+      WHERE h.ItemID = li.ItemID AND h.Status = 'R')
+                                        AS OnHoldShelf
+  FROM Record r
+  JOIN LibraryInventory li
+    ON li.RecordID = r.RecordID
+) s;
+
+
+/* ============================================================
+   13) ROWTOMBSTONE + DELETE TRIGGERS  (change tracking)
+   ------------------------------------------------------------
+   Purpose:
+     - Lets the GUI refresh a loaded table with only the rows that
+       changed since it was loaded, instead of SELECT * again.
+
+   How it works:
+     - All base tables are created with ROWDEPENDENCIES, so
+       ORA_ROWSCN is tracked per row:
+         SELECT t.* FROM Loans t WHERE ORA_ROWSCN > :last_scn
+       returns inserted / updated rows.
+     - Deleted rows leave no row behind, so an AFTER DELETE trigger
+       on each table records its key here. PKValue is the primary
+       key as text (composite keys joined with '|').
+
+   Housekeeping:
+     - purge_tombstones (nightly, TOMBSTONE_PURGE_JOB) drops
+       tombstones older than 7 days and records the newest commit
+       SCN it removed in RowTombstonePurge.PurgedScn. A grid loaded
+       before that SCN may have missed a delete, so the GUI reloads
+       it in full instead of applying a delta.
+   ============================================================ */
+CREATE TABLE RowTombstone (
+  TableName VARCHAR2(30)  NOT NULL,
+  PKValue   VARCHAR2(100) NOT NULL,
+  DeletedAt DATE          DEFAULT SYSDATE NOT NULL
+) ROWDEPENDENCIES;
+
+-- Delta refresh reads one table's tombstones
+CREATE INDEX ix_RowTombstone_Table ON RowTombstone (TableName);
+
+-- Purge watermark (one row)
+CREATE TABLE RowTombstonePurge (
+  PurgedScn NUMBER DEFAULT 0 NOT NULL
+);
+INSERT INTO RowTombstonePurge (PurgedScn) VALUES (0);
+COMMIT;
+
+-- Same text as a9queries.PURGE_TOMBSTONES_PROC
+CREATE OR REPLACE PROCEDURE purge_tombstones (p_keep_days IN NUMBER DEFAULT 7) AS
+  v_scn NUMBER;
+BEGIN
+  SELECT MAX(ORA_ROWSCN) INTO v_scn
+  FROM RowTombstone
+  WHERE DeletedAt < SYSDATE - p_keep_days;
+  IF v_scn IS NULL THEN
+    RETURN;
+  END IF;
+  -- Watermark and delete commit together; only rows at or below the
+  -- recorded SCN go, so a delete committing meanwhile is kept.
+  UPDATE RowTombstonePurge SET PurgedScn = GREATEST(PurgedScn, v_scn);
+  DELETE FROM RowTombstone
+  WHERE DeletedAt < SYSDATE - p_keep_days
+    AND ORA_ROWSCN <= v_scn;
+  COMMIT;
+END;
+/
+
+-- Optional: nightly purge at 02:00 (needs CREATE JOB).
+BEGIN
+  DBMS_SCHEDULER.CREATE_JOB(
+    job_name        => 'TOMBSTONE_PURGE_JOB',
+    job_type        => 'PLSQL_BLOCK',
+    job_action      => 'BEGIN purge_tombstones; END;',
+    repeat_interval => 'FREQ=DAILY;BYHOUR=2;BYMINUTE=0',
+    enabled         => TRUE
+  );
+EXCEPTION
+  WHEN OTHERS THEN NULL;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_Staff_tomb
+AFTER DELETE ON Staff
+FOR EACH ROW
+BEGIN
+  INSERT INTO RowTombstone (TableName, PKValue)
+  VALUES ('STAFF', TO_CHAR(:OLD.StaffID));
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_Author_tomb
+AFTER DELETE ON Author
+FOR EACH ROW
+BEGIN
+  INSERT INTO RowTombstone (TableName, PKValue)
+  VALUES ('AUTHOR', TO_CHAR(:OLD.AuthorID));
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_Address_tomb
+AFTER DELETE ON Address
+FOR EACH ROW
+BEGIN
+  INSERT INTO RowTombstone (TableName, PKValue)
+  VALUES ('ADDRESS', TO_CHAR(:OLD.AddressID));
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_Customer_tomb
+AFTER DELETE ON Customer
+FOR EACH ROW
+BEGIN
+  INSERT INTO RowTombstone (TableName, PKValue)
+  VALUES ('CUSTOMER', TO_CHAR(:OLD.CustomerID));
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_Record_tomb
+AFTER DELETE ON Record
+FOR EACH ROW
+BEGIN
+  INSERT INTO RowTombstone (TableName, PKValue)
+  VALUES ('RECORD', TO_CHAR(:OLD.RecordID));
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_RecordAuthor_tomb
+AFTER DELETE ON RecordAuthor
+FOR EACH ROW
+BEGIN
+  INSERT INTO RowTombstone (TableName, PKValue)
+  VALUES ('RECORDAUTHOR', TO_CHAR(:OLD.RecordID) || '|' || TO_CHAR(:OLD.AuthorID));
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_LibraryInventory_tomb
+AFTER DELETE ON LibraryInventory
+FOR EACH ROW
+BEGIN
+  INSERT INTO RowTombstone (TableName, PKValue)
+  VALUES ('LIBRARYINVENTORY', TO_CHAR(:OLD.ItemID));
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_Book_tomb
+AFTER DELETE ON Book
+FOR EACH ROW
+BEGIN
+  INSERT INTO RowTombstone (TableName, PKValue)
+  VALUES ('BOOK', TO_CHAR(:OLD.RecordID));
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_EBook_tomb
+AFTER DELETE ON EBook
+FOR EACH ROW
+BEGIN
+  INSERT INTO RowTombstone (TableName, PKValue)
+  VALUES ('EBOOK', TO_CHAR(:OLD.RecordID));
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_DVD_tomb
+AFTER DELETE ON DVD
+FOR EACH ROW
+BEGIN
+  INSERT INTO RowTombstone (TableName, PKValue)
+  VALUES ('DVD', TO_CHAR(:OLD.RecordID));
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_Loans_tomb
+AFTER DELETE ON Loans
+FOR EACH ROW
+BEGIN
+  INSERT INTO RowTombstone (TableName, PKValue)
+  VALUES ('LOANS', TO_CHAR(:OLD.loanId));
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_Hold_tomb
+AFTER DELETE ON Hold
+FOR EACH ROW
+BEGIN
+  INSERT INTO RowTombstone (TableName, PKValue)
+  VALUES ('HOLD', TO_CHAR(:OLD.HoldID));
+END;
+/
+
+/* ============================================================
+   14) CATALOG PROJECTION  (denormalized title/author lookups)
+   ------------------------------------------------------------
+   Purpose:
+     - One CatalogEntry row per record: title, genre, authors
+       (LISTAGG), media type, Book/EBook/DVD attributes and
+       copy/loan/availability counts. Patron lookups read this
+       single indexed table instead of joining seven tables.
+
+   How it works:
+     - Triggers on the source tables queue changed RecordIDs in
+       CatalogDirty (cheap single-row inserts in the writer's
+       transaction).
+     - refresh_catalog rebuilds only the queued records, 5,000 at a
+       time with a commit after each batch (a9queries.CATALOG_BATCH); the
+       scheduler job below runs it every minute. Readers that need
+       the queue applied now call refresh_catalog_now (autonomous
+       transaction: commits its own work only).
+     - Full rebuild:
+         EXEC refresh_catalog_now('Y');
+     - The procedures, triggers and job are defined once in
+       a9queries.py; `python a9queries.py --check main.sql` checks
+       this file still matches.
+   ============================================================ */
+CREATE TABLE CatalogEntry (
+  RecordID          INT            PRIMARY KEY,
+  Title             VARCHAR2(255)  NOT NULL,
+  Genre             VARCHAR2(100),
+  DateOfPublication DATE,
+  Authors           VARCHAR2(1000),
+  MediaType         VARCHAR2(10),
+  ISBN              VARCHAR2(20),
+  Binding           VARCHAR2(50),
+  DRMType           VARCHAR2(50),
+  FileFormat        VARCHAR2(20),
+  RunTime           INT,
+  PGRating          VARCHAR2(10),
+  TotalCopies       INT  DEFAULT 0,
+  ActiveLoans       INT  DEFAULT 0,
+  AvailableStock    INT  DEFAULT 0,
+  RefreshedAt       DATE DEFAULT SYSDATE
+);
+
+CREATE INDEX ix_Catalog_Title ON CatalogEntry (UPPER(Title));
+CREATE INDEX ix_Catalog_Genre ON CatalogEntry (Genre);
+
+CREATE TABLE CatalogDirty (
+  RecordID INT NOT NULL
+);
+
+CREATE OR REPLACE TYPE CatalogIdList AS TABLE OF NUMBER;
+/
+
+CREATE OR REPLACE PROCEDURE refresh_catalog AS
+  c_batch CONSTANT PLS_INTEGER := 5000;
+  v_ids CatalogIdList;
+BEGIN
+  -- Claim the queued ids c_batch at a time and commit each batch, so a full
+  -- rebuild never holds every RecordID or one huge transaction. Later
+  -- changes queue new rows. It commits: run it in its own transaction
+  -- (CATALOG_REFRESH_JOB, refresh_catalog_now).
+  LOOP
+    DELETE FROM CatalogDirty
+    WHERE ROWNUM <= c_batch
+    RETURNING RecordID BULK COLLECT INTO v_ids;
+    EXIT WHEN v_ids.COUNT = 0;
+
+    DELETE FROM CatalogEntry
+    WHERE RecordID IN (SELECT COLUMN_VALUE FROM TABLE(v_ids));
+
+    INSERT INTO CatalogEntry (
+      RecordID, Title, Genre, DateOfPublication, Authors, MediaType,
+      ISBN, Binding, DRMType, FileFormat, RunTime, PGRating,
+      TotalCopies, ActiveLoans, AvailableStock, RefreshedAt
+    )
+    SELECT
+      r.RecordID,
+      r.Title,
+      r.Genre,
+      r.DateOfPublication,
+      (SELECT LISTAGG(a.AuthorName, '; ') WITHIN GROUP (ORDER BY a.AuthorName)
+         FROM RecordAuthor ra
+         JOIN Author a ON a.AuthorID = ra.AuthorID
+        WHERE ra.RecordID = r.RecordID),
+      CASE
+        WHEN b.RecordID IS NOT NULL THEN 'BOOK'
+        WHEN e.RecordID IS NOT NULL THEN 'EBOOK'
+        WHEN d.RecordID IS NOT NULL THEN 'DVD'
+      END,
+      b.ISBN,
+      b.Binding,
+      COALESCE(b.DRMType, e.DRMType),
+      e.FileFormat,
+      d.RunTime,
+      d.PGRating,
+      NVL(s.TotalCopies, 0),
+      NVL(s.ActiveLoans, 0),
+      NVL(s.AvailableStock, 0),
+      SYSDATE
+    FROM Record r
+    LEFT JOIN Book b  ON b.RecordID = r.RecordID
+    LEFT JOIN EBook e ON e.RecordID = r.RecordID
+    LEFT JOIN DVD d   ON d.RecordID = r.RecordID
+    LEFT JOIN (
+      SELECT RecordID,
+             SUM(TotalCopies)    AS TotalCopies,
+             SUM(ActiveLoans)    AS ActiveLoans,
+             SUM(AvailableStock) AS AvailableStock
+      FROM RecordAvailableStock
+      GROUP BY RecordID
+    ) s ON s.RecordID = r.RecordID
+    WHERE r.RecordID IN (SELECT COLUMN_VALUE FROM TABLE(v_ids));
+
+    COMMIT;
+    EXIT WHEN v_ids.COUNT < c_batch;
+  END LOOP;
+END;
+/
+
+-- Applies the queue now and commits in its own transaction, so a reader
+-- (GUI / CLI catalog search) never commits its caller's pending work.
+CREATE OR REPLACE PROCEDURE refresh_catalog_now (p_full IN VARCHAR2 DEFAULT 'N') AS
+  PRAGMA AUTONOMOUS_TRANSACTION;
+BEGIN
+  IF p_full = 'Y' THEN
+    INSERT INTO CatalogDirty (RecordID) SELECT RecordID FROM Record;
+  END IF;
+  refresh_catalog;
+  COMMIT;
+END;
+/
+
+-- A row moved to another record (UPDATE of RecordID) queues both records
+CREATE OR REPLACE TRIGGER trg_Record_catalog
+AFTER INSERT OR UPDATE OR DELETE ON Record
+FOR EACH ROW
+BEGIN
+  IF :NEW.RecordID IS NOT NULL THEN
+    INSERT INTO CatalogDirty (RecordID) VALUES (:NEW.RecordID);
+  END IF;
+  IF :OLD.RecordID IS NOT NULL AND (:NEW.RecordID IS NULL OR :NEW.RecordID <> :OLD.RecordID) THEN
+    INSERT INTO CatalogDirty (RecordID) VALUES (:OLD.RecordID);
+  END IF;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_RecordAuthor_catalog
+AFTER INSERT OR UPDATE OR DELETE ON RecordAuthor
+FOR EACH ROW
+BEGIN
+  IF :NEW.RecordID IS NOT NULL THEN
+    INSERT INTO CatalogDirty (RecordID) VALUES (:NEW.RecordID);
+  END IF;
+  IF :OLD.RecordID IS NOT NULL AND (:NEW.RecordID IS NULL OR :NEW.RecordID <> :OLD.RecordID) THEN
+    INSERT INTO CatalogDirty (RecordID) VALUES (:OLD.RecordID);
+  END IF;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_Book_catalog
+AFTER INSERT OR UPDATE OR DELETE ON Book
+FOR EACH ROW
+BEGIN
+  IF :NEW.RecordID IS NOT NULL THEN
+    INSERT INTO CatalogDirty (RecordID) VALUES (:NEW.RecordID);
+  END IF;
+  IF :OLD.RecordID IS NOT NULL AND (:NEW.RecordID IS NULL OR :NEW.RecordID <> :OLD.RecordID) THEN
+    INSERT INTO CatalogDirty (RecordID) VALUES (:OLD.RecordID);
+  END IF;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_EBook_catalog
+AFTER INSERT OR UPDATE OR DELETE ON EBook
+FOR EACH ROW
+BEGIN
+  IF :NEW.RecordID IS NOT NULL THEN
+    INSERT INTO CatalogDirty (RecordID) VALUES (:NEW.RecordID);
+  END IF;
+  IF :OLD.RecordID IS NOT NULL AND (:NEW.RecordID IS NULL OR :NEW.RecordID <> :OLD.RecordID) THEN
+    INSERT INTO CatalogDirty (RecordID) VALUES (:OLD.RecordID);
+  END IF;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_DVD_catalog
+AFTER INSERT OR UPDATE OR DELETE ON DVD
+FOR EACH ROW
+BEGIN
+  IF :NEW.RecordID IS NOT NULL THEN
+    INSERT INTO CatalogDirty (RecordID) VALUES (:NEW.RecordID);
+  END IF;
+  IF :OLD.RecordID IS NOT NULL AND (:NEW.RecordID IS NULL OR :NEW.RecordID <> :OLD.RecordID) THEN
+    INSERT INTO CatalogDirty (RecordID) VALUES (:OLD.RecordID);
+  END IF;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_LibraryInventory_catalog
+AFTER INSERT OR UPDATE OR DELETE ON LibraryInventory
+FOR EACH ROW
+BEGIN
+  IF :NEW.RecordID IS NOT NULL THEN
+    INSERT INTO CatalogDirty (RecordID) VALUES (:NEW.RecordID);
+  END IF;
+  IF :OLD.RecordID IS NOT NULL AND (:NEW.RecordID IS NULL OR :NEW.RecordID <> :OLD.RecordID) THEN
+    INSERT INTO CatalogDirty (RecordID) VALUES (:OLD.RecordID);
+  END IF;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_Hold_catalog
+AFTER INSERT OR UPDATE OR DELETE ON Hold
+FOR EACH ROW
+BEGIN
+  IF :NEW.RecordID IS NOT NULL THEN
+    INSERT INTO CatalogDirty (RecordID) VALUES (:NEW.RecordID);
+  END IF;
+  IF :OLD.RecordID IS NOT NULL AND (:NEW.RecordID IS NULL OR :NEW.RecordID <> :OLD.RecordID) THEN
+    INSERT INTO CatalogDirty (RecordID) VALUES (:OLD.RecordID);
+  END IF;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_Author_catalog
+AFTER UPDATE OF AuthorName ON Author
+FOR EACH ROW
+BEGIN
+  INSERT INTO CatalogDirty (RecordID)
+  SELECT RecordID FROM RecordAuthor WHERE AuthorID = :NEW.AuthorID;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_Loans_catalog
+AFTER INSERT OR UPDATE OR DELETE ON Loans
+FOR EACH ROW
+DECLARE
+  mutating EXCEPTION;
+  PRAGMA EXCEPTION_INIT(mutating, -4091);
+BEGIN
+  INSERT INTO CatalogDirty (RecordID)
+  SELECT RecordID FROM LibraryInventory
+  WHERE ItemID IN (:NEW.itemId, :OLD.itemId);
+EXCEPTION
+  -- Cascaded from a LibraryInventory delete; that trigger queues the record.
+  WHEN mutating THEN NULL;
+END;
+/
+
+-- Initial build from existing data
+INSERT INTO CatalogDirty (RecordID) SELECT RecordID FROM Record;
+EXEC refresh_catalog;
+COMMIT;
+
+-- Optional: apply queued changes every minute (needs CREATE JOB).
+BEGIN
+  DBMS_SCHEDULER.CREATE_JOB(
+    job_name        => 'CATALOG_REFRESH_JOB',
+    job_type        => 'PLSQL_BLOCK',
+    job_action      => 'BEGIN refresh_catalog; COMMIT; END;',
+    repeat_interval => 'FREQ=MINUTELY',
+    enabled         => TRUE
+  );
+EXCEPTION
+  WHEN OTHERS THEN NULL;
+END;
+/
+
+/* ============================================================
+   15) CIRCULATION ROLLUPS  (daily summary tables for reports)
+   ------------------------------------------------------------
+   Purpose:
+     - Loans per day / week by genre, top-borrowed titles,
+       per-customer activity and utilization over time, read
+       from small daily tables instead of aggregating Loans.
+
+   How it works:
+     - trg_Loans_rollup appends every new loan to LoanRollupQueue
+       (append-only, so concurrent desks never update the same
+       summary row inside their checkout transaction).
+     - refresh_rollups claims the queue 10,000 rows at a time
+       (a9queries.ROLLUP_BATCH) and MERGEs the counts into
+       LoanDailyGenre / LoanDailyRecord / LoanDailyCustomer. It also
+       snapshots RecordAvailableStock into UtilizationDaily once a
+       day (refresh_rollups('Y') re-takes today's snapshot).
+     - The front ends call it before each report; the nightly job
+       below keeps the tables current when nobody does.
+     - Rolled-up history is kept even if loans are later deleted.
+   ============================================================ */
+CREATE TABLE LoanRollupQueue (
+  customerId INT  NOT NULL,
+  itemId     INT  NOT NULL,
+  loanDay    DATE NOT NULL
+);
+
+CREATE GLOBAL TEMPORARY TABLE LoanRollupBatch (
+  customerId INT,
+  itemId     INT,
+  loanDay    DATE
+) ON COMMIT DELETE ROWS;
+
+CREATE TABLE LoanDailyGenre (
+  LoanDay DATE          NOT NULL,
+  Genre   VARCHAR2(100) NOT NULL,
+  Loans   INT DEFAULT 0 NOT NULL,
+  CONSTRAINT pk_LoanDailyGenre PRIMARY KEY (LoanDay, Genre)
+);
+
+CREATE TABLE LoanDailyRecord (
+  LoanDay  DATE NOT NULL,
+  RecordID INT  NOT NULL,
+  Loans    INT DEFAULT 0 NOT NULL,
+  CONSTRAINT pk_LoanDailyRecord PRIMARY KEY (LoanDay, RecordID)
+);
+
+CREATE TABLE LoanDailyCustomer (
+  LoanDay    DATE NOT NULL,
+  CustomerID INT  NOT NULL,
+  Loans      INT DEFAULT 0 NOT NULL,
+  CONSTRAINT pk_LoanDailyCustomer PRIMARY KEY (LoanDay, CustomerID)
+);
+
+CREATE TABLE UtilizationDaily (
+  SnapshotDay DATE NOT NULL,
+  RecordID    INT  NOT NULL,
+  TotalCopies INT DEFAULT 0 NOT NULL,
+  ActiveLoans INT DEFAULT 0 NOT NULL,
+  CONSTRAINT pk_UtilizationDaily PRIMARY KEY (SnapshotDay, RecordID)
+);
+
+CREATE OR REPLACE TRIGGER trg_Loans_rollup
+AFTER INSERT ON Loans
+FOR EACH ROW
+BEGIN
+  INSERT INTO LoanRollupQueue (customerId, itemId, loanDay)
+  VALUES (:NEW.customerId, :NEW.itemId, TRUNC(:NEW.loanDate));
+END;
+/
+
+CREATE OR REPLACE PROCEDURE refresh_rollups (p_snapshot IN VARCHAR2 DEFAULT 'N') AS
+  TYPE num_list IS TABLE OF NUMBER;
+  TYPE day_list IS TABLE OF DATE;
+  c_batch CONSTANT PLS_INTEGER := 10000;
+  v_cust num_list;
+  v_item num_list;
+  v_day  day_list;
+  v_have INT;
+BEGIN
+  -- Claim the queued loans c_batch at a time; new checkouts keep queueing
+  -- behind us, and a short batch means we have caught up.
+  LOOP
+    DELETE FROM LoanRollupQueue
+    WHERE ROWNUM <= c_batch
+    RETURNING customerId, itemId, loanDay BULK COLLECT INTO v_cust, v_item, v_day;
+    EXIT WHEN v_cust.COUNT = 0;
+
+    FORALL i IN 1 .. v_cust.COUNT
+      INSERT INTO LoanRollupBatch (customerId, itemId, loanDay)
+      VALUES (v_cust(i), v_item(i), v_day(i));
+
+    MERGE INTO LoanDailyGenre t
+    USING (
+      SELECT b.loanDay, NVL(r.Genre, '(none)') AS Genre, COUNT(*) AS n
+      FROM LoanRollupBatch b
+      JOIN LibraryInventory li ON li.ItemID = b.itemId
+      JOIN Record r            ON r.RecordID = li.RecordID
+      GROUP BY b.loanDay, NVL(r.Genre, '(none)')
+    ) s
+    ON (t.LoanDay = s.loanDay AND t.Genre = s.Genre)
+    WHEN MATCHED THEN UPDATE SET t.Loans = t.Loans + s.n
+    WHEN NOT MATCHED THEN INSERT (LoanDay, Genre, Loans) VALUES (s.loanDay, s.Genre, s.n);
+
+    MERGE INTO LoanDailyRecord t
+    USING (
+      SELECT b.loanDay, li.RecordID, COUNT(*) AS n
+      FROM LoanRollupBatch b
+      JOIN LibraryInventory li ON li.ItemID = b.itemId
+      GROUP BY b.loanDay, li.RecordID
+    ) s
+    ON (t.LoanDay = s.loanDay AND t.RecordID = s.RecordID)
+    WHEN MATCHED THEN UPDATE SET t.Loans = t.Loans + s.n
+    WHEN NOT MATCHED THEN INSERT (LoanDay, RecordID, Loans) VALUES (s.loanDay, s.RecordID, s.n);
+
+    MERGE INTO LoanDailyCustomer t
+    USING (
+      SELECT loanDay, customerId, COUNT(*) AS n
+      FROM LoanRollupBatch
+      GROUP BY loanDay, customerId
+    ) s
+    ON (t.LoanDay = s.loanDay AND t.CustomerID = s.customerId)
+    WHEN MATCHED THEN UPDATE SET t.Loans = t.Loans + s.n
+    WHEN NOT MATCHED THEN INSERT (LoanDay, CustomerID, Loans) VALUES (s.loanDay, s.customerId, s.n);
+
+    DELETE FROM LoanRollupBatch;
+    EXIT WHEN v_cust.COUNT < c_batch;
+  END LOOP;
+
+  -- One utilization snapshot per day (p_snapshot = 'Y' re-takes today's).
+  SELECT COUNT(*) INTO v_have
+  FROM UtilizationDaily
+  WHERE SnapshotDay = TRUNC(SYSDATE) AND ROWNUM = 1;
+
+  IF p_snapshot = 'Y' OR v_have = 0 THEN
+    MERGE INTO UtilizationDaily t
+    USING (
+      SELECT RecordID, SUM(TotalCopies) AS tc, SUM(ActiveLoans) AS al
+      FROM RecordAvailableStock
+      GROUP BY RecordID
+    ) s
+    ON (t.SnapshotDay = TRUNC(SYSDATE) AND t.RecordID = s.RecordID)
+    WHEN MATCHED THEN UPDATE SET t.TotalCopies = s.tc, t.ActiveLoans = s.al
+    WHEN NOT MATCHED THEN INSERT (SnapshotDay, RecordID, TotalCopies, ActiveLoans)
+      VALUES (TRUNC(SYSDATE), s.RecordID, s.tc, s.al);
+  END IF;
+END;
+/
+
+-- Initial build from existing loans
+INSERT INTO LoanRollupQueue (customerId, itemId, loanDay)
+SELECT customerId, itemId, TRUNC(loanDate) FROM Loans;
+EXEC refresh_rollups('Y');
+COMMIT;
+
+-- Optional: nightly batch at 01:00 (needs CREATE JOB).
+BEGIN
+  DBMS_SCHEDULER.CREATE_JOB(
+    job_name        => 'ROLLUP_NIGHTLY_JOB',
+    job_type        => 'PLSQL_BLOCK',
+    job_action      => 'BEGIN refresh_rollups(''Y''); COMMIT; END;',
+    repeat_interval => 'FREQ=DAILY;BYHOUR=1;BYMINUTE=0',
+    enabled         => TRUE
+  );
+EXCEPTION
+  WHEN OTHERS THEN NULL;
+END;
+/
+
+/* ============================================================
+   16) SEQUENCE SYNC  (after loading rows with explicit IDs)
+   ------------------------------------------------------------
+   Purpose:
+     - Seed data and restores insert explicit keys; the sequences
+       must then start above them or the next generated ID collides.
+
+   Usage:
+     EXEC sync_sequences;
+     (ALTER SEQUENCE is DDL: run it when no desks are inserting.)
+   ============================================================ */
+CREATE OR REPLACE PROCEDURE sync_sequences AS
+  -- Move a sequence past the highest key already in its table
+  -- (after seeding / restoring rows with explicit IDs).
+  PROCEDURE bump(p_seq VARCHAR2, p_table VARCHAR2, p_col VARCHAR2) IS
+    v_max  NUMBER;
+    v_next NUMBER;
+  BEGIN
+    EXECUTE IMMEDIATE 'SELECT NVL(MAX(' || p_col || '), 0) FROM ' || p_table INTO v_max;
+    EXECUTE IMMEDIATE 'SELECT ' || p_seq || '.NEXTVAL FROM dual' INTO v_next;
+    IF v_next < v_max THEN
+      EXECUTE IMMEDIATE 'ALTER SEQUENCE ' || p_seq || ' INCREMENT BY ' || (v_max - v_next);
+      EXECUTE IMMEDIATE 'SELECT ' || p_seq || '.NEXTVAL FROM dual' INTO v_next;
+      EXECUTE IMMEDIATE 'ALTER SEQUENCE ' || p_seq || ' INCREMENT BY 1';
+    END IF;
+  END;
+BEGIN
+  bump('seq_Staff', 'Staff', 'StaffID');
+  bump('seq_Author', 'Author', 'AuthorID');
+  bump('seq_Address', 'Address', 'AddressID');
+  bump('seq_Customer', 'Customer', 'CustomerID');
+  bump('seq_Record', 'Record', 'RecordID');
+  bump('seq_LibraryInventory', 'LibraryInventory', 'ItemID');
+  bump('seq_Loans', 'Loans', 'loanId');
+  bump('seq_Hold', 'Hold', 'HoldID');
+END;
+/
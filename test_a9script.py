@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+#Wafee Rahman , Richie Au , Umair Ansar
+
+"""
+Library DBMS – tests for a9script (no database needed)
+
+    python -m unittest test_a9script
+"""
+
+import unittest
+
+import a9script
+
+
+def split(script):
+    return [(s.kind, s.text) for s in a9script.split_statements(script)]
+
+
+
+# SPLITTING
+
+class SplitStatementsTest(unittest.TestCase):
+
+    def test_semicolons_end_statements(self):
+        self.assertEqual(
+            split("SELECT 1 FROM dual;\nINSERT INTO t VALUES (1);\n"),
+            [("query", "SELECT 1 FROM dual"), ("dml", "INSERT INTO t VALUES (1)")],
+        )
+
+    def test_doubled_quote_is_not_a_terminator(self):
+        self.assertEqual(
+            split("INSERT INTO t VALUES ('it''s; fine');\nCOMMIT;"),
+            [("dml", "INSERT INTO t VALUES ('it''s; fine')"), ("tx", "COMMIT")],
+        )
+
+    def test_q_quote(self):
+        self.assertEqual(
+            split("UPDATE t SET s = q'[a;'b]';\nUPDATE t SET s = q'{x}';"),
+            [("dml", "UPDATE t SET s = q'[a;'b]'"), ("dml", "UPDATE t SET s = q'{x}'")],
+        )
+
+    def test_comment_hides_semicolon(self):
+        self.assertEqual(
+            split("DELETE FROM t -- old rows; not the end\nWHERE id = 1;"),
+            [("dml", "DELETE FROM t -- old rows; not the end\nWHERE id = 1")],
+        )
+
+    def test_comments_between_statements_are_dropped(self):
+        self.assertEqual(
+            split("-- header\n/* block ; */\nSELECT 1 FROM dual;"),
+            [("query", "SELECT 1 FROM dual")],
+        )
+
+    def test_plsql_unit_ends_at_slash(self):
+        script = (
+            "CREATE OR REPLACE PROCEDURE p IS\nBEGIN\n  NULL;\nEND;\n/\n"
+            "BEGIN\n  p;\nEND;\n/\n"
+            "SELECT 1 FROM dual;\n"
+        )
+        stmts = a9script.split_statements(script)
+        self.assertEqual([s.kind for s in stmts], ["ddl", "plsql", "query"])
+        self.assertEqual(stmts[0].text, "CREATE OR REPLACE PROCEDURE p IS\nBEGIN\n  NULL;\nEND;")
+        self.assertEqual(stmts[1].text, "BEGIN\n  p;\nEND;")
+        self.assertTrue(stmts[0].is_plsql_unit)
+        self.assertFalse(stmts[2].is_plsql_unit)
+
+    def test_exec_becomes_block(self):
+        self.assertEqual(
+            split("EXEC refresh_catalog_now\nexecute p(1, 'a;b');"),
+            [("plsql", "BEGIN refresh_catalog_now; END;"), ("plsql", "BEGIN p(1, 'a;b'); END;")],
+        )
+
+    def test_execute_immediate_is_not_exec(self):
+        stmts = a9script.split_statements("BEGIN\n  EXECUTE IMMEDIATE 'x';\nEND;\n/")
+        self.assertEqual(stmts[0].text, "BEGIN\n  EXECUTE IMMEDIATE 'x';\nEND;")
+
+    def test_call_becomes_block(self):
+        self.assertEqual(split("CALL p(1);"), [("plsql", "BEGIN p(1); END;")])
+
+    def test_call_into_is_left_alone(self):
+        self.assertEqual(
+            split("CALL f(1) INTO :result;"),
+            [("call", "CALL f(1) INTO :result")],
+        )
+
+    def test_set_transaction_is_sql(self):
+        self.assertEqual(
+            split("SET TRANSACTION READ ONLY;\nSET SERVEROUTPUT ON\nSELECT 1 FROM dual;"),
+            [("tx", "SET TRANSACTION READ ONLY"), ("sqlplus", "SET SERVEROUTPUT ON"),
+             ("query", "SELECT 1 FROM dual")],
+        )
+
+    def test_sqlplus_commands_are_one_line(self):
+        self.assertEqual(
+            split("PROMPT loading; please wait\nSELECT 1 FROM dual;"),
+            [("sqlplus", "PROMPT loading; please wait"), ("query", "SELECT 1 FROM dual")],
+        )
+
+
+
+# BATCHING
+
+class BatchTest(unittest.TestCase):
+
+    def test_plan_groups_batchable_runs(self):
+        stmts = a9script.split_statements(
+            "INSERT INTO t VALUES (1);\nUPDATE t SET x = 2;\nSELECT * FROM t;\n"
+            "DELETE FROM t;\nCOMMIT;\nCALL f(1) INTO :r;\n"
+        )
+        groups = a9script.plan(stmts)
+        self.assertEqual([[s.index for s in g] for g in groups], [[1, 2], [3], [4, 5], [6]])
+
+    def test_plan_respects_batch_size(self):
+        stmts = a9script.split_statements("DELETE FROM t;\n" * 5)
+        self.assertEqual([len(g) for g in a9script.plan(stmts, batch_size=2)], [2, 2, 1])
+
+    def test_block_reports_each_statement(self):
+        stmts = a9script.split_statements("UPDATE t SET x = 1;\nCOMMIT;")
+        block = a9script.batch_block(stmts)
+        self.assertTrue(block.startswith("DECLARE"))
+        self.assertTrue(block.endswith("END;"))
+        self.assertIn("  UPDATE t SET x = 1;\n", block)
+        self.assertIn(":a9_report := :a9_report || '1 ' || SQL%ROWCOUNT", block)
+        self.assertIn(":a9_report := :a9_report || '2 ' || '-'", block)
+
+    def test_block_keeps_plsql_terminator(self):
+        stmts = a9script.split_statements("BEGIN\n  NULL;\nEND;\n/")
+        block = a9script.batch_block(stmts)
+        self.assertIn("  BEGIN\n    NULL;\n  END;\n", block)
+        self.assertNotIn("END;;", block)
+
+    def test_block_terminator_after_trailing_comment(self):
+        # A ';' appended to a line ending in '--' would be commented out
+        stmts = a9script.split_statements("UPDATE t SET x = 1\nWHERE id = 2 -- only this one\n;")
+        block = a9script.batch_block(stmts)
+        self.assertIn("WHERE id = 2 -- only this one\n  ;", block)
+
+
+
+# REPORT
+
+class ParseReportTest(unittest.TestCase):
+
+    def test_rows_and_times(self):
+        done, error = a9script.parse_report("1 3 1500\n2 - 20\n")
+        self.assertEqual(done, {1: (3, 1.5), 2: (None, 0.02)})
+        self.assertIsNone(error)
+
+    def test_error_tail(self):
+        report = "1 3 1500\n2 ERR ORA-00001: unique constraint (A9.PK_T) violated\n"
+        done, error = a9script.parse_report(report)
+        self.assertEqual(done, {1: (3, 1.5)})
+        self.assertEqual(error, (2, "ORA-00001: unique constraint (A9.PK_T) violated"))
+
+    def test_multiline_error_message(self):
+        report = "1 ERR ORA-06512: at line 4\nORA-01722: invalid number\n"
+        done, error = a9script.parse_report(report)
+        self.assertEqual(done, {})
+        self.assertEqual(error, (1, "ORA-06512: at line 4\nORA-01722: invalid number"))
+
+    def test_empty_report(self):
+        self.assertEqual(a9script.parse_report(None), ({}, None))
+
+
+if __name__ == "__main__":
+    unittest.main()